@@ -1,6 +1,7 @@
 import numpy as np
 import plotly.graph_objects as go
 import pandas as pd
+import argparse
 import csv
 
 
@@ -317,6 +318,126 @@ def create_benchmark_visualization(df: pd.DataFrame):
     )
 
 
+def read_latency_data(file_paths):
+    """Successful calls recorded by benchmarks/providers.py"""
+    df = pd.concat([pd.read_csv(file_path) for file_path in file_paths])
+    df = df[df["error"].isna()]
+    for column in ["target_width", "ttfb_ms", "latency_ms", "input_tokens"]:
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    return df
+
+
+def model_key(model_name):
+    """Compare display names (GPT-5 mini) with model ids (gpt-5-mini)"""
+    return model_name.strip().lower().replace(" ", "-")
+
+
+def match_model_name(model_id, model_names):
+    """Display name of a model id, the longest name the id starts with"""
+    matches = [
+        name for name in model_names if model_key(model_id).startswith(model_key(name))
+    ]
+    return max(matches, key=len) if matches else None
+
+
+def apply_dark_layout(fig, title, xaxis_title, yaxis_title):
+    fig.update_layout(
+        title={"text": title, "font": {"size": 50}},
+        xaxis_title=xaxis_title,
+        yaxis_title=yaxis_title,
+        paper_bgcolor="#0d1117",
+        plot_bgcolor="#161b22",
+        font=dict(color="white", family="Inter", size=25),
+        xaxis=dict(color="white", linecolor="grey", showgrid=False, zeroline=False),
+        yaxis=dict(color="white", linecolor="grey", showgrid=False, zeroline=False),
+    )
+
+
+def create_latency_visualization(latency_df: pd.DataFrame, df: pd.DataFrame):
+    """Median latency of every benchmarked model against its MMMU score"""
+    fig = go.Figure()
+    latency = latency_df.groupby("model")["latency_ms"].median() / 1000
+    ttfb = latency_df.groupby("model")["ttfb_ms"].median() / 1000
+    scores = df.set_index("Model")["Overall"].astype(float)
+    scores = scores[~scores.index.duplicated()]
+
+    for model_id, seconds in latency.items():
+        name = match_model_name(model_id, scores.index)
+        if name is None:
+            print(f"No MMMU score for {model_id}, skipping")
+            continue
+        fig.add_trace(
+            go.Scatter(
+                x=[seconds],
+                y=[scores[name]],
+                mode="markers",
+                name=model_id,
+                marker=dict(size=20),
+                hovertext=f"TTFB {ttfb[model_id]:.2f} s",
+            )
+        )
+        fig.add_annotation(
+            x=seconds, y=scores[name], text=model_id, showarrow=False, yshift=-35
+        )
+
+    apply_dark_layout(
+        fig,
+        "Performance vs Latency of Models in LLM Vision",
+        "Median Latency (s)",
+        "MMMU Score",
+    )
+    fig.write_image(
+        "benchmark_visualization/latency_benchmark_visualization.jpg",
+        width=1920,
+        height=1080,
+        scale=1,
+    )
+
+
+def create_tokens_visualization(latency_df: pd.DataFrame):
+    """Median input tokens per image at every target_width, one line per model"""
+    fig = go.Figure()
+    tokens = latency_df.groupby(["model", "target_width"])["input_tokens"].median()
+
+    for model_id, group in tokens.groupby(level="model"):
+        fig.add_trace(
+            go.Scatter(
+                x=group.index.get_level_values("target_width"),
+                y=group.values,
+                mode="lines+markers",
+                name=model_id,
+                line=dict(width=6),
+                marker=dict(size=20),
+            )
+        )
+
+    apply_dark_layout(
+        fig,
+        "Input Tokens vs Target Width in LLM Vision",
+        "Target Width (px)",
+        "Input Tokens per Image",
+    )
+    fig.write_image(
+        "benchmark_visualization/tokens_benchmark_visualization.jpg",
+        width=1920,
+        height=1080,
+        scale=1,
+    )
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--latency-data",
+        nargs="*",
+        default=[],
+        help="CSV files of benchmarks/providers.py",
+    )
+    args = parser.parse_args()
+
     df = read_benchmark_data()
     create_benchmark_visualization(df)
+    if args.latency_data:
+        latency_df = read_latency_data(args.latency_data)
+        create_latency_visualization(latency_df, read_benchmark_data())
+        create_tokens_visualization(latency_df)
@@ -0,0 +1 @@
+"""Benchmarks of LLM Vision, see README_TESTING.md"""
@@ -0,0 +1,174 @@
+"""Per call overhead of the AWS Bedrock provider with IAM credentials
+
+Sends Converse requests to a local stub through the three ways the provider has
+called Bedrock: a new boto3 client per call, one reused boto3 client, and SigV4
+signed requests on Home Assistant's aiohttp session. Run from the repository root:
+
+    python -m benchmarks.bedrock
+    python -m benchmarks.bedrock --rounds 200 --image-width 1280
+    python -m benchmarks.bedrock --compare benchmarks/results/bedrock-1a2b3c4.json
+
+The stub answers immediately by default, so the numbers are the overhead of the
+client and not the model. The boto3 variants need boto3 (requirements-test.txt)
+and are skipped without it. Results are written to
+benchmarks/results/bedrock-<commit>.json.
+"""
+
+from functools import partial
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import sys
+
+from custom_components.llmvision.providers import AWSBedrock
+
+from .common import compare, measure, measure_async, synthetic_jpeg, write_results
+from .load import StubServer, benchmark_hass, stub_endpoints
+
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+MODEL = "anthropic.claude-3-5-haiku-20241022-v1:0"
+REGION = "us-east-1"
+CREDENTIALS = {
+    "aws_access_key_id": "AKIDEXAMPLE",
+    "aws_secret_access_key": "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY",
+}
+
+
+def converse_data(image: bytes) -> dict:
+    """Converse request with one image, as AWSBedrock._prepare_vision_data builds it"""
+    return {
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {"text": "Describe what happens in one sentence."},
+                    {"image": {"format": "jpeg", "source": {"bytes": image}}},
+                ],
+            }
+        ],
+        "inferenceConfig": {"maxTokens": 100, "temperature": 0.5, "topP": 0.9},
+    }
+
+
+async def run_benchmarks(args, stub: StubServer) -> dict:
+    results = {}
+
+    def report(name: str, result: dict) -> None:
+        results[name] = result
+        print(
+            f"{name:<30} median {result['median_ms']:>10.3f} ms  "
+            f"p95 {result['p95_ms']:>10.3f} ms  ({result['rounds']} rounds)"
+        )
+
+    width = args.image_width
+    data = converse_data(synthetic_jpeg(width, width * 9 // 16))
+    async with benchmark_hass({}, {}) as hass:
+        provider = AWSBedrock(
+            hass,
+            aws_region_name=REGION,
+            model=MODEL,
+            **CREDENTIALS,
+        )
+        report(
+            "sigv4_sign",
+            measure(
+                lambda: provider.signer.sign(
+                    "POST",
+                    f"{stub.url}/model/{MODEL}/converse",
+                    {"Content-Type": "application/json"},
+                    json.dumps(data, default=AWSBedrock._encode_bytes).encode(),
+                ),
+                args.rounds,
+            ),
+        )
+        report(
+            "sigv4_call",
+            await measure_async(
+                lambda: provider.invoke_bedrock(MODEL, data), args.rounds
+            ),
+        )
+
+        if boto3 is None:
+            print("boto3 not found, skipping the boto3 client variants")
+            return results
+
+        def new_client():
+            return boto3.client(
+                "bedrock-runtime",
+                region_name=REGION,
+                endpoint_url=stub.url,
+                **CREDENTIALS,
+            )
+
+        async def converse(client):
+            return await hass.async_add_executor_job(
+                partial(client.converse, modelId=MODEL, **data)
+            )
+
+        async def client_per_call():
+            client = await hass.async_add_executor_job(new_client)
+            return await converse(client)
+
+        # botocore loads and caches the service model with the first client
+        report("boto3_first_client_creation", measure(new_client, 1, warmup=0))
+        client = new_client()
+        report("boto3_client_creation", measure(new_client, args.rounds))
+        report(
+            "boto3_call_new_client",
+            await measure_async(client_per_call, args.rounds),
+        )
+        report(
+            "boto3_call_reused_client",
+            await measure_async(lambda: converse(client), args.rounds),
+        )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds per stub response"
+    )
+    parser.add_argument("--image-width", type=int, default=1280)
+    parser.add_argument("--output", type=Path, help="Results file")
+    parser.add_argument("--compare", type=Path, help="Results of a previous run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Slowdown of the median reported as regression (default 10%%)",
+    )
+    args = parser.parse_args()
+
+    stub = StubServer(latency=args.latency, jitter=0.0)
+    stub.start()
+    try:
+        with stub_endpoints(stub.url):
+            results = asyncio.run(run_benchmarks(args, stub))
+    finally:
+        stub.stop()
+
+    if not stub.stats.get("bedrock", {}).get("ok"):
+        print(
+            "No request reached the stub, the results measure nothing",
+            file=sys.stderr,
+        )
+        return 1
+    output = write_results("bedrock", results, args.output)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
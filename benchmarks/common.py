@@ -0,0 +1,162 @@
+"""Shared helpers of the benchmark runners: synthetic frames, timing and results"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+import io
+import json
+import math
+import platform
+import statistics
+import subprocess
+import time
+
+import numpy as np
+from PIL import Image
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+
+
+def synthetic_frame(width: int, height: int, step: int = 0, seed: int = 0):
+    """RGB camera-like frame: a gradient scene, sensor noise and a moving object
+
+    Frames with the same seed show the same scene, the object moves with step.
+    """
+    rng = np.random.default_rng(seed * 1000 + step)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frame = np.empty((height, width, 3), dtype=np.float32)
+    frame[..., 0] = x * 0.6 + y * 0.2 + seed * 7 % 40
+    frame[..., 1] = y * 0.7 + 30
+    frame[..., 2] = (x[::-1] * 0.4 + y * 0.3) % 255
+    frame += rng.normal(0, 3, frame.shape).astype(np.float32)
+    size = max(8, height // 6)
+    left = (step * size // 2) % max(1, width - size)
+    top = height // 2 - size // 2
+    frame[top : top + size, left : left + size] = (200, 40, 40)
+    return Image.fromarray(np.clip(frame, 0, 255).astype(np.uint8), "RGB")
+
+
+def synthetic_jpeg(width: int, height: int, step: int = 0, seed: int = 0) -> bytes:
+    buffer = io.BytesIO()
+    synthetic_frame(width, height, step, seed).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def synthetic_stream(width: int, height: int, frames: int) -> bytes:
+    """Concatenated JPEG frames as written by ffmpeg -f image2pipe"""
+    return b"".join(synthetic_jpeg(width, height, step) for step in range(frames))
+
+
+def _summary(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "rounds": len(samples),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        # Nearest rank, so short runs don't report a p95 below the median
+        "p95_ms": round(ordered[math.ceil(len(ordered) * 0.95) - 1] * 1000, 3),
+        "stdev_ms": round(statistics.pstdev(ordered) * 1000, 3),
+    }
+
+
+def measure(
+    func: Callable[[], object], rounds: int = 20, warmup: int = 2, budget: float = 10.0
+) -> dict:
+    """Time func, stopping early once the time budget in seconds is used up"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < rounds and (not samples or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return _summary(samples)
+
+
+async def measure_async(
+    func: Callable[[], Awaitable[object]],
+    rounds: int = 20,
+    warmup: int = 2,
+    budget: float = 10.0,
+) -> dict:
+    """Time a coroutine function like measure()"""
+    for _ in range(warmup):
+        await func()
+    samples = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < rounds and (not samples or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - start)
+    return _summary(samples)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def metadata() -> dict:
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "pillow": Image.__version__,
+    }
+
+
+def write_results(suite: str, results: dict, output: Path | None = None) -> Path:
+    """Store results as JSON, by default as results/<suite>-<commit>.json"""
+    meta = metadata()
+    if output is None:
+        output = RESULTS_DIR / f"{suite}-{meta['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps({"suite": suite, "meta": meta, "results": results}, indent=2)
+    )
+    return output
+
+
+def compare(results: dict, baseline_path: Path, threshold: float = 0.1) -> list[str]:
+    """Print the change of every median against a previous run
+
+    Returns the names of benchmarks that got slower by more than threshold.
+    """
+    baseline = json.loads(baseline_path.read_text())
+    print(f"\nCompared to {baseline['meta'].get('commit')} ({baseline_path.name}):")
+    regressions = []
+    for name, result in results.items():
+        previous = baseline["results"].get(name)
+        if not previous or not previous.get("median_ms"):
+            print(f"  {name:<45} new")
+            continue
+        change = result["median_ms"] / previous["median_ms"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(
+            f"  {name:<45} {previous['median_ms']:>10.3f} -> "
+            f"{result['median_ms']:>10.3f} ms ({change:+.1%}){flag}"
+        )
+    return regressions
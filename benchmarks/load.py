@@ -0,0 +1,696 @@
+"""End-to-end load test of the analyzer services against local provider stubs
+
+Starts stub servers speaking the OpenAI, Anthropic, Gemini and Ollama wire formats
+and fake cameras serving synthetic JPEGs, registers the services with the real
+setup() and sends concurrent analyzer calls through Home Assistant's service
+registry. Run from the repository root:
+
+    python -m benchmarks.load
+    python -m benchmarks.load --calls 500 --concurrency 50 --cameras 8
+    python -m benchmarks.load --services image_analyzer stream_analyzer \\
+        --providers openai ollama --latency 2 --error-rate 0.05 --rate-limit-rate 0.1
+
+Reports throughput, latency percentiles per service, event loop lag and memory
+(RSS) and writes them to benchmarks/results/load-<commit>.json. The stubs run in
+a thread with their own event loop so only the integration loads the measured
+loop. video_analyzer needs ffmpeg to create the test clip.
+"""
+
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+import argparse
+import asyncio
+import json
+import random
+import resource
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from aiohttp import web
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.llmvision import setup
+from custom_components.llmvision.const import (
+    CONF_API_KEY,
+    CONF_CUSTOM_OPENAI_ENDPOINT,
+    CONF_DEFAULT_MODEL,
+    CONF_HTTPS,
+    CONF_IP_ADDRESS,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_RETRIES,
+    CONF_PORT,
+    CONF_PROVIDER,
+    DOMAIN,
+    DURATION,
+    IMAGE_ENTITY,
+    MAX_FRAMES,
+    MAXTOKENS,
+    MESSAGE,
+    PROVIDER,
+    TARGET_WIDTH,
+    VIDEO_FILE,
+)
+from custom_components.llmvision.metrics import MetricsRegistry
+
+from .common import RESOLUTIONS, synthetic_jpeg, write_results
+
+SERVICES = ("image_analyzer", "stream_analyzer", "video_analyzer")
+PROVIDERS = ("openai", "anthropic", "gemini", "ollama")
+RESPONSE_TEXT = "A person walks up to the front door and rings the bell."
+# Rough token count of an image, the stubs only need plausible usage numbers
+IMAGE_TOKENS = 255
+
+
+def _count_images(value) -> int:
+    """Images in a request body of any of the supported wire formats"""
+    if isinstance(value, list):
+        return sum(_count_images(item) for item in value)
+    if not isinstance(value, dict):
+        return 0
+    count = 0
+    for key, item in value.items():
+        if key in ("image_url", "inline_data", "inlineData"):
+            count += 1
+        elif key == "image" and isinstance(item, dict):
+            count += 1
+        elif key == "images" and isinstance(item, list):
+            count += len(item)
+        elif key == "type" and item == "image":
+            count += 1
+        else:
+            count += _count_images(item)
+    return count
+
+
+class StubServer:
+    """Provider and camera endpoints served from a thread with its own loop
+
+    Every provider request waits latency +/- jitter seconds, then fails with a
+    500 at error_rate or a 429 (with Retry-After) at rate_limit_rate.
+    """
+
+    def __init__(
+        self,
+        frames: list[bytes] | None = None,
+        clip: Path | None = None,
+        latency: float = 0.5,
+        jitter: float = 0.1,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: int = 1,
+        camera_latency: float = 0.0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.camera_latency = camera_latency
+        self.frames = frames or []
+        self.clip = clip
+        self.stats: dict[str, dict[str, int]] = {}
+        self._random = random.Random(0)
+        self._socket = socket.socket()
+        self._socket.bind(("127.0.0.1", 0))
+        self.port = self._socket.getsockname()[1]
+        self._loop = asyncio.new_event_loop()
+        self._runner: web.AppRunner | None = None
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> None:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    def stop(self) -> None:
+        if self._runner is not None:
+            asyncio.run_coroutine_threadsafe(
+                self._runner.cleanup(), self._loop
+            ).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _start(self) -> None:
+        app = web.Application(client_max_size=64 * 1024**2)
+        app.router.add_post("/v1/chat/completions", self._openai)
+        app.router.add_post("/v1/messages", self._anthropic)
+        app.router.add_post("/v1beta/models/{model}", self._gemini)
+        app.router.add_post("/api/chat", self._ollama)
+        app.router.add_post("/model/{model}/converse", self._bedrock)
+        app.router.add_get("/api/camera_proxy/{entity_id}", self._camera)
+        app.router.add_get("/clips/bench.mp4", self._clip)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.SockSite(self._runner, self._socket).start()
+
+    def _count(self, route: str, outcome: str) -> None:
+        stats = self.stats.setdefault(route, {})
+        stats[outcome] = stats.get(outcome, 0) + 1
+
+    async def _respond(self, request: web.Request, route: str, success, error):
+        """Wait like a provider would, then answer with success or error bodies"""
+        body = await request.json()
+        delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        await asyncio.sleep(max(0.0, delay))
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            self._count(route, "rate_limited")
+            return web.json_response(
+                error("Rate limit exceeded", "rate_limit_error"),
+                status=429,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            self._count(route, "errors")
+            return web.json_response(
+                error("Internal server error", "api_error"), status=500
+            )
+        self._count(route, "ok")
+        prompt_tokens = 50 + IMAGE_TOKENS * _count_images(body)
+        completion_tokens = len(RESPONSE_TEXT) // 4
+        return web.json_response(success(body, prompt_tokens, completion_tokens))
+
+    async def _openai(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            request,
+            "openai",
+            lambda body, prompt, completion: {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion",
+                "model": body.get("model"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": RESPONSE_TEXT},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt,
+                    "completion_tokens": completion,
+                    "total_tokens": prompt + completion,
+                },
+            },
+            lambda message, kind: {"error": {"message": message, "type": kind}},
+        )
+
+    async def _anthropic(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            request,
+            "anthropic",
+            lambda body, prompt, completion: {
+                "id": "msg_bench",
+                "type": "message",
+                "role": "assistant",
+                "model": body.get("model"),
+                "content": [{"type": "text", "text": RESPONSE_TEXT}],
+                "stop_reason": "end_turn",
+                "usage": {"input_tokens": prompt, "output_tokens": completion},
+            },
+            lambda message, kind: {
+                "type": "error",
+                "error": {"type": kind, "message": message},
+            },
+        )
+
+    async def _gemini(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            request,
+            "gemini",
+            lambda body, prompt, completion: {
+                "candidates": [
+                    {
+                        "content": {
+                            "role": "model",
+                            "parts": [{"text": RESPONSE_TEXT}],
+                        },
+                        "finishReason": "STOP",
+                    }
+                ],
+                "usageMetadata": {
+                    "promptTokenCount": prompt,
+                    "candidatesTokenCount": completion,
+                    "totalTokenCount": prompt + completion,
+                },
+            },
+            lambda message, kind: {"error": {"message": message, "status": kind}},
+        )
+
+    async def _ollama(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            request,
+            "ollama",
+            lambda body, prompt, completion: {
+                "model": body.get("model"),
+                "message": {"role": "assistant", "content": RESPONSE_TEXT},
+                "done": True,
+                "total_duration": int(self.latency * 1e9),
+                "load_duration": 0,
+                "prompt_eval_count": prompt,
+                "eval_count": completion,
+            },
+            lambda message, kind: {"error": message},
+        )
+
+    async def _bedrock(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            request,
+            "bedrock",
+            lambda body, prompt, completion: {
+                "output": {
+                    "message": {
+                        "role": "assistant",
+                        "content": [{"text": RESPONSE_TEXT}],
+                    }
+                },
+                "stopReason": "end_turn",
+                "usage": {
+                    "inputTokens": prompt,
+                    "outputTokens": completion,
+                    "totalTokens": prompt + completion,
+                },
+                "metrics": {"latencyMs": int(self.latency * 1000)},
+            },
+            lambda message, kind: {"message": message},
+        )
+
+    async def _camera(self, request: web.Request) -> web.Response:
+        """The next frame of the camera, so consecutive fetches differ"""
+        self._count("camera", "ok")
+        if self.camera_latency:
+            await asyncio.sleep(self.camera_latency)
+        number = int(request.match_info["entity_id"].rsplit("_", 1)[-1])
+        frame = self.frames[(number + self.stats["camera"]["ok"]) % len(self.frames)]
+        return web.Response(body=frame, content_type="image/jpeg")
+
+    async def _clip(self, request: web.Request) -> web.StreamResponse:
+        self._count("clip", "ok")
+        if self.clip is None:
+            return web.Response(status=404)
+        return web.FileResponse(self.clip)
+
+
+def make_clip(directory: Path, width: int, height: int, seconds: int) -> Path | None:
+    """Test clip with a key frame per second, None without ffmpeg"""
+    if shutil.which("ffmpeg") is None:
+        return None
+    clip = directory / "bench.mp4"
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc=size={width}x{height}:rate=10",
+            "-t",
+            str(seconds),
+            "-g",
+            "10",
+            "-pix_fmt",
+            "yuv420p",
+            str(clip),
+        ],
+        check=True,
+    )
+    return clip
+
+
+def provider_entries(stub: StubServer) -> dict[str, dict]:
+    """Provider config entries pointing at the stub, keyed by entry id"""
+    return {
+        "openai": {
+            CONF_PROVIDER: "Custom OpenAI",
+            CONF_API_KEY: "bench",
+            CONF_CUSTOM_OPENAI_ENDPOINT: f"{stub.url}/v1",
+            CONF_DEFAULT_MODEL: "gpt-4o-mini",
+        },
+        "anthropic": {
+            CONF_PROVIDER: "Anthropic",
+            CONF_API_KEY: "bench",
+            CONF_DEFAULT_MODEL: "claude-3-5-haiku-latest",
+        },
+        "gemini": {
+            CONF_PROVIDER: "Google",
+            CONF_API_KEY: "bench",
+            CONF_DEFAULT_MODEL: "gemini-2.0-flash",
+        },
+        "ollama": {
+            CONF_PROVIDER: "Ollama",
+            CONF_IP_ADDRESS: "127.0.0.1",
+            CONF_PORT: stub.port,
+            CONF_HTTPS: False,
+            CONF_DEFAULT_MODEL: "gemma3:4b",
+        },
+    }
+
+
+def read_rss() -> int:
+    """Resident set size of this process in bytes"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # Peak instead of current outside Linux (kilobytes on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class LoopMonitor:
+    """Samples how late the event loop wakes up from a sleep, and the RSS"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.lags: list[float] = []
+        self.rss: list[int] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - start - self.interval))
+            self.rss.append(read_rss())
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def latency_summary(samples: list[float]) -> dict:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    return {
+        "min_ms": round(ordered[0] * 1000, 1),
+        "p50_ms": round(statistics.median(ordered) * 1000, 1),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1000, 1),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+def service_data(args, service: str, provider: str, call: int) -> dict:
+    cameras = [
+        f"camera.bench_{(call + offset) % args.cameras}"
+        for offset in range(args.cameras_per_call)
+    ]
+    data = {
+        PROVIDER: provider,
+        MESSAGE: "Describe what happens in one sentence.",
+        MAXTOKENS: 100,
+        TARGET_WIDTH: args.target_width,
+    }
+    if service == "image_analyzer":
+        data[IMAGE_ENTITY] = cameras
+    elif service == "stream_analyzer":
+        data[IMAGE_ENTITY] = cameras
+        data[DURATION] = args.duration
+        data[MAX_FRAMES] = args.max_frames
+    else:
+        data[VIDEO_FILE] = args.clip_url
+        data[MAX_FRAMES] = args.max_frames
+    return data
+
+
+async def run_load(hass, args) -> dict:
+    """Send args.calls calls with at most args.concurrency in flight"""
+    latencies: dict[str, list[float]] = {service: [] for service in args.services}
+    failures: dict[str, dict[str, int]] = {service: {} for service in args.services}
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(call: int) -> None:
+        service = args.services[call % len(args.services)]
+        provider = args.providers[call % len(args.providers)]
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await hass.services.async_call(
+                    DOMAIN,
+                    service,
+                    service_data(args, service, provider, call),
+                    blocking=True,
+                    return_response=True,
+                )
+            except Exception as e:  # every failure counts, the run goes on
+                name = type(e).__name__
+                failures[service][name] = failures[service].get(name, 0) + 1
+                return
+            latencies[service].append(time.perf_counter() - start)
+
+    monitor = LoopMonitor()
+    rss_before = read_rss()
+    monitor.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(one(call) for call in range(args.calls)))
+    elapsed = time.perf_counter() - start
+    await monitor.stop()
+
+    completed = sum(len(samples) for samples in latencies.values())
+    all_latencies = [sample for samples in latencies.values() for sample in samples]
+    return {
+        "calls": args.calls,
+        "completed": completed,
+        "failed": args.calls - completed,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(completed / elapsed, 3) if elapsed else None,
+        "latency": latency_summary(all_latencies),
+        "services": {
+            service: {
+                "completed": len(latencies[service]),
+                "failures": failures[service],
+                **latency_summary(latencies[service]),
+            }
+            for service in args.services
+        },
+        "loop_lag": latency_summary(monitor.lags),
+        "rss_mb": {
+            "before": round(rss_before / 1024**2, 1),
+            "peak": round(max(monitor.rss, default=rss_before) / 1024**2, 1),
+            "after": round(read_rss() / 1024**2, 1),
+        },
+    }
+
+
+@contextmanager
+def stub_endpoints(url: str):
+    """Point the providers whose endpoints are not configurable at url"""
+    with (
+        patch(
+            "custom_components.llmvision.providers.ENDPOINT_ANTHROPIC",
+            f"{url}/v1/messages",
+        ),
+        patch(
+            "custom_components.llmvision.providers.ENDPOINT_AWS_BEDROCK",
+            f"{url}/model/{{model}}/{{action}}",
+        ),
+        patch(
+            "custom_components.llmvision.providers.ENDPOINT_GOOGLE",
+            f"{url}/v1beta/models/{{model}}:generateContent?key={{api_key}}",
+        ),
+    ):
+        yield
+
+
+@asynccontextmanager
+async def benchmark_hass(settings: dict, entries: dict[str, dict], url: str = ""):
+    """Home Assistant with the config entries and the services of setup()
+
+    Args:
+        settings (dict): Data of the Settings entry
+        entries (dict): Data of the provider entries by entry id
+        url (str): Internal URL, camera entity_pictures are fetched from here
+    """
+    async with async_test_home_assistant() as hass:
+        if url:
+            hass.config.internal_url = url
+        # setup() registers the API views, benchmarks only need the services
+        hass.http = SimpleNamespace(register_view=lambda view: None)
+        # The shared client session resolves hosts through zeroconf, which needs
+        # the network adapters
+        if not await async_setup_component(hass, "network", {}):
+            raise RuntimeError("Could not set up the network integration")
+
+        settings = {**settings, CONF_PROVIDER: "Settings"}
+        MockConfigEntry(domain=DOMAIN, data=settings, entry_id="settings").add_to_hass(
+            hass
+        )
+        hass.data[DOMAIN] = {"settings": settings}
+        for entry_id, data in entries.items():
+            MockConfigEntry(domain=DOMAIN, data=data, entry_id=entry_id).add_to_hass(
+                hass
+            )
+            hass.data[DOMAIN][entry_id] = data
+
+        # setup() registers services the way integrations do outside the loop
+        await hass.async_add_executor_job(setup, hass, {})
+        yield hass
+
+
+async def run(args, stub: StubServer) -> dict:
+    settings = {
+        CONF_MAX_CONCURRENT_REQUESTS: args.max_concurrent_requests,
+        CONF_MAX_RETRIES: args.max_retries,
+    }
+    async with benchmark_hass(settings, provider_entries(stub), stub.url) as hass:
+        for number in range(args.cameras):
+            entity_id = f"camera.bench_{number}"
+            hass.states.async_set(
+                entity_id,
+                "idle",
+                {"entity_picture": f"/api/camera_proxy/{entity_id}?token=bench"},
+            )
+
+        results = await run_load(hass, args)
+        results["metrics"] = MetricsRegistry.get(hass).as_dict()
+        results["stub"] = stub.stats
+    return results
+
+
+def print_report(results: dict) -> None:
+    print(
+        f"{results['completed']}/{results['calls']} calls in "
+        f"{results['elapsed_s']:.1f} s, {results['throughput_per_s']} calls/s"
+    )
+    for service, summary in results["services"].items():
+        line = f"  {service:<16} {summary['completed']:>6} ok"
+        if "p50_ms" in summary:
+            line += (
+                f"  p50 {summary['p50_ms']:>8.1f} ms  p95 {summary['p95_ms']:>8.1f} ms"
+                f"  p99 {summary['p99_ms']:>8.1f} ms"
+            )
+        if summary["failures"]:
+            line += f"  failures {summary['failures']}"
+        print(line)
+    lag = results["loop_lag"]
+    if lag:
+        print(
+            f"  event loop lag   p50 {lag['p50_ms']:.1f} ms  p99 {lag['p99_ms']:.1f} ms"
+            f"  max {lag['max_ms']:.1f} ms"
+        )
+    rss = results["rss_mb"]
+    print(
+        f"  RSS              {rss['before']} MB before, {rss['peak']} MB peak, "
+        f"{rss['after']} MB after"
+    )
+    print(f"  stub requests    {json.dumps(results['stub'])}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--services", nargs="+", choices=SERVICES, default=["image_analyzer"]
+    )
+    parser.add_argument("--providers", nargs="+", choices=PROVIDERS, default=["openai"])
+    parser.add_argument("--cameras", type=int, default=4)
+    parser.add_argument("--cameras-per-call", type=int, default=1)
+    parser.add_argument("--resolution", choices=list(RESOLUTIONS), default="1080p")
+    parser.add_argument("--target-width", type=int, default=1280)
+    parser.add_argument(
+        "--duration", type=int, default=3, help="Seconds recorded by stream_analyzer"
+    )
+    parser.add_argument("--max-frames", type=int, default=3)
+    parser.add_argument(
+        "--latency", type=float, default=0.5, help="Seconds per provider response"
+    )
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--retry-after", type=int, default=1, help="Retry-After of 429s in seconds"
+    )
+    parser.add_argument(
+        "--camera-latency", type=float, default=0.0, help="Seconds per camera fetch"
+    )
+    parser.add_argument(
+        "--max-concurrent-requests",
+        type=int,
+        default=4,
+        help="Concurrent requests per provider (Settings entry)",
+    )
+    parser.add_argument("--max-retries", type=int, default=2)
+    parser.add_argument("--output", type=Path, help="Results file")
+    args = parser.parse_args()
+    args.services = list(dict.fromkeys(args.services))
+    args.providers = list(dict.fromkeys(args.providers))
+
+    width, height = RESOLUTIONS[args.resolution]
+    frames = [synthetic_jpeg(width, height, step) for step in range(8)]
+    with tempfile.TemporaryDirectory() as directory:
+        clip = None
+        if "video_analyzer" in args.services:
+            clip = make_clip(Path(directory), width, height, args.duration * 2)
+            if clip is None:
+                print("ffmpeg not found, skipping video_analyzer")
+                args.services.remove("video_analyzer")
+                if not args.services:
+                    return 1
+
+        stub = StubServer(
+            frames,
+            clip,
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            retry_after=args.retry_after,
+            camera_latency=args.camera_latency,
+        )
+        stub.start()
+        args.clip_url = f"{stub.url}/clips/bench.mp4"
+        try:
+            with stub_endpoints(stub.url):
+                results = asyncio.run(run(args, stub))
+        finally:
+            stub.stop()
+
+    results["config"] = {
+        key: value
+        for key, value in vars(args).items()
+        if key not in ("output", "clip_url")
+    }
+    print_report(results)
+    output = write_results("load", results, args.output)
+    print(f"\nResults written to {output}")
+    if not results["completed"]:
+        print("No call completed, the results measure nothing", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
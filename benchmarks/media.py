@@ -0,0 +1,194 @@
+"""Micro-benchmarks of the frame processing primitives in media_handlers.py
+
+Runs offline on synthetic 720p, 1080p and 4K frames. Run from the repository root:
+
+    python -m benchmarks.media
+    python -m benchmarks.media --resolutions 720p 4k --filter resize
+    python -m benchmarks.media --compare benchmarks/results/media-1a2b3c4.json
+
+Results are written to benchmarks/results/media-<commit>.json. Recorded ffmpeg
+image2pipe streams (*.mjpeg) in --streams are replayed through the JPEG splitter
+in addition to the synthetic ones. Record one with:
+
+    ffmpeg -i clip.mp4 -vf fps=2 -f image2pipe -vcodec mjpeg clip.mjpeg
+"""
+
+from pathlib import Path
+from unittest.mock import Mock, patch
+import argparse
+import asyncio
+import random
+import sys
+
+import numpy as np
+
+from custom_components.llmvision.media_handlers import MediaProcessor
+
+from .common import (
+    RESOLUTIONS,
+    compare,
+    measure,
+    measure_async,
+    synthetic_frame,
+    synthetic_jpeg,
+    synthetic_stream,
+    write_results,
+)
+
+# Size of the reads from ffmpeg's stdout in add_video
+CHUNK_SIZE = 4096
+
+
+class _Hass:
+    """The parts of Home Assistant used by MediaProcessor's primitives"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.data = {}
+
+    async def async_add_executor_job(self, target, *args):
+        return await self.loop.run_in_executor(None, target, *args)
+
+
+def make_processor() -> MediaProcessor:
+    with patch("custom_components.llmvision.media_handlers.async_get_clientsession"):
+        return MediaProcessor(_Hass(asyncio.get_running_loop()), Mock())
+
+
+def replay_stream(stream: bytes) -> int:
+    """Feed a stream to the JPEG splitter in chunks like add_video does"""
+    buffer = b""
+    count = 0
+    for offset in range(0, len(stream), CHUNK_SIZE):
+        buffer += stream[offset : offset + CHUNK_SIZE]
+        found, buffer = MediaProcessor._split_jpeg_frames(buffer)
+        count += len(found)
+    return count
+
+
+def recording(cameras: int, frames: int):
+    """Frames of a recording in the shape record() collects them"""
+    rng = random.Random(0)
+    first_frames = {}
+    camera_frames = {}
+    for number in range(cameras):
+        entity = f"camera.bench_{number}"
+        first_frames[entity] = (f"camera{number}-frame-0", b"")
+        camera_frames[entity] = {
+            f"camera{number}-frame-{index}": {
+                "frame_data": b"",
+                "ssim_score": rng.random(),
+                "camera_number": number,
+                "frame_index": index,
+            }
+            for index in range(1, frames)
+        }
+    return list(first_frames), first_frames, camera_frames
+
+
+async def run_benchmarks(args) -> dict:
+    processor = make_processor()
+    results = {}
+
+    async def bench(name: str, func, is_async: bool = True):
+        if args.filter and args.filter not in name:
+            return
+        if is_async:
+            result = await measure_async(func, args.rounds, budget=args.budget)
+        else:
+            result = measure(func, args.rounds, budget=args.budget)
+        results[name] = result
+        print(
+            f"{name:<45} median {result['median_ms']:>10.3f} ms  "
+            f"p95 {result['p95_ms']:>10.3f} ms  ({result['rounds']} rounds)"
+        )
+
+    for label in args.resolutions:
+        width, height = RESOLUTIONS[label]
+        frames = [synthetic_jpeg(width, height, step) for step in range(5)]
+        image = synthetic_frame(width, height)
+        gray = [
+            np.array(synthetic_frame(width, height, step).convert("L"))
+            for step in (0, 1)
+        ]
+        stream = synthetic_stream(width, height, args.stream_frames)
+
+        await bench(
+            f"similarity_score[{label}]",
+            lambda: processor._similarity_score(gray[0], gray[1]),
+            is_async=False,
+        )
+        await bench(
+            f"select_keyframe_index[{label}x5]",
+            lambda: processor._select_keyframe_index(frames[-1], frames),
+        )
+        await bench(
+            f"resize_image[{label}->{args.target_width}]",
+            lambda: processor.resize_image(
+                target_width=args.target_width, image_data=frames[0]
+            ),
+        )
+        await bench(f"encode_image[{label}]", lambda: processor._encode_image(image))
+        await bench(
+            f"split_jpeg_stream[{label}x{args.stream_frames}]",
+            lambda: replay_stream(stream),
+            is_async=False,
+        )
+
+    if args.streams:
+        for path in sorted(Path(args.streams).glob("*.mjpeg")):
+            recorded = path.read_bytes()
+            await bench(
+                f"split_jpeg_stream[{path.stem}]",
+                lambda: replay_stream(recorded),
+                is_async=False,
+            )
+
+    for cameras, frames in ((1, 30), (4, 60)):
+        entities, first_frames, camera_frames = recording(cameras, frames)
+        await bench(
+            f"select_frames[{cameras}x{frames}]",
+            lambda: MediaProcessor._select_frames(
+                entities, first_frames, camera_frames, 10
+            ),
+            is_async=False,
+        )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--resolutions", nargs="+", choices=list(RESOLUTIONS), default=list(RESOLUTIONS)
+    )
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument(
+        "--budget", type=float, default=10.0, help="Seconds per benchmark at most"
+    )
+    parser.add_argument("--target-width", type=int, default=1280)
+    parser.add_argument("--stream-frames", type=int, default=5)
+    parser.add_argument("--streams", help="Directory with recorded *.mjpeg streams")
+    parser.add_argument("--filter", help="Only run benchmarks containing this")
+    parser.add_argument("--output", type=Path, help="Results file")
+    parser.add_argument("--compare", type=Path, help="Results of a previous run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Slowdown of the median reported as regression (default 10%%)",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(args))
+    output = write_results("media", results, args.output)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
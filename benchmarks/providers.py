@@ -0,0 +1,276 @@
+"""Latency, token and payload benchmark of provider models at several target widths
+
+Replays a fixed image set through image_analyzer for every model and target width
+and records time to first byte, total latency, tokens and the request payload
+size of each call. Run from the repository root against the local stubs:
+
+    python -m benchmarks.providers --stub --provider Anthropic \\
+        --models claude-sonnet-4-0 claude-3-5-haiku-latest
+
+or against a real endpoint, with the provider's config entry fields as key=value:
+
+    python -m benchmarks.providers --provider OpenAI --config api_key=sk-... \\
+        --models gpt-5-mini gpt-4o-mini --target-widths 512 1024 1920
+    python -m benchmarks.providers --provider Ollama \\
+        --config ip_address=192.168.1.10 port=11434 --models gemma3:4b --images clips
+
+Rows are written to benchmarks/results/providers-<commit>.csv. Plot them with
+benchmark_visualization/model_benchmark_visualizer.py --latency-data <csv>.
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import csv
+import statistics
+import sys
+import tempfile
+
+from custom_components.llmvision.const import (
+    CONF_PROVIDER,
+    DOMAIN,
+    ERROR_GENERATION_FAILED,
+    IMAGE_FILE,
+    INCLUDE_TIMINGS,
+    MAXTOKENS,
+    MESSAGE,
+    MODEL,
+    PROVIDER,
+    TARGET_WIDTH,
+)
+from custom_components.llmvision.metrics import MetricsRegistry
+
+from .common import RESULTS_DIR, git_commit, synthetic_frame
+from .load import StubServer, benchmark_hass, provider_entries, stub_endpoints
+
+ENTRY_ID = "benchmark"
+# Provider names of the config flow that the stubs speak the wire format of
+STUB_FORMATS = {
+    "OpenAI": "openai",
+    "Custom OpenAI": "openai",
+    "Anthropic": "anthropic",
+    "Google": "gemini",
+    "Ollama": "ollama",
+}
+FIELDS = (
+    "provider",
+    "model",
+    "target_width",
+    "image",
+    "round",
+    "ttfb_ms",
+    "latency_ms",
+    "call_ms",
+    "input_tokens",
+    "output_tokens",
+    "payload_bytes",
+    "retries",
+    "error",
+)
+SYNTHETIC_IMAGES = 5
+
+
+def _spans(node: dict, name: str):
+    """Spans called name in a timings tree, depth first"""
+    if node.get("name") == name:
+        yield node
+    for child in node.get("children", []):
+        yield from _spans(child, name)
+
+
+def image_set(directory: str | None, scratch: Path) -> list[Path]:
+    """Images of directory, or synthetic 1080p frames written to scratch"""
+    if directory:
+        images = sorted(
+            path
+            for path in Path(directory).iterdir()
+            if path.suffix.lower() in (".jpg", ".jpeg", ".png", ".webp")
+        )
+        if not images:
+            raise SystemExit(f"No images found in {directory}")
+        return images
+    images = []
+    for seed in range(SYNTHETIC_IMAGES):
+        path = scratch / f"synthetic-{seed}.jpg"
+        synthetic_frame(1920, 1080, step=seed, seed=seed).save(path, format="JPEG")
+        images.append(path)
+    return images
+
+
+def entry_data(args, stub: StubServer | None) -> dict:
+    """Config entry data of the benchmarked provider"""
+    if stub is not None:
+        data = dict(provider_entries(stub)[STUB_FORMATS[args.provider]])
+        if args.provider == "OpenAI":
+            # The stub speaks the OpenAI format on a configurable endpoint
+            data[CONF_PROVIDER] = "Custom OpenAI"
+        return data
+    data = {CONF_PROVIDER: args.provider}
+    for item in args.config:
+        key, _, value = item.partition("=")
+        data[key] = value
+    return data
+
+
+async def measure_call(hass, args, model: str, width: int, image: Path) -> dict:
+    """Analyze one image and return its CSV row"""
+    row = {"model": model, "target_width": width, "image": image.name, "error": ""}
+    metrics = MetricsRegistry.get(hass)
+    uploaded = metrics.bytes_uploaded.get(ENTRY_ID, 0)
+    try:
+        response = await hass.services.async_call(
+            DOMAIN,
+            "image_analyzer",
+            {
+                PROVIDER: ENTRY_ID,
+                MODEL: model,
+                MESSAGE: args.message,
+                IMAGE_FILE: str(image),
+                TARGET_WIDTH: width,
+                MAXTOKENS: args.max_tokens,
+                INCLUDE_TIMINGS: True,
+            },
+            blocking=True,
+            return_response=True,
+        )
+    except Exception as e:  # recorded in the row, the run goes on
+        row["error"] = f"{type(e).__name__}: {e}"
+        return row
+
+    if response.get("response_text") == ERROR_GENERATION_FAILED:
+        # Provider errors are logged and answered with this text
+        row["error"] = ERROR_GENERATION_FAILED
+        return row
+    timings = response.get("timings") or {}
+    requests = list(_spans(timings, "vision_request"))
+    attempts = list(_spans(timings, "http"))
+    usage = response.get("usage") or {}
+    row.update(
+        {
+            # Upload and wait for the response headers of the successful attempt
+            "ttfb_ms": attempts[-1]["duration_ms"] if attempts else None,
+            "latency_ms": requests[-1]["duration_ms"] if requests else None,
+            "call_ms": timings.get("duration_ms"),
+            "input_tokens": usage.get("input_tokens"),
+            "output_tokens": usage.get("output_tokens"),
+            "payload_bytes": metrics.bytes_uploaded.get(ENTRY_ID, 0) - uploaded,
+            "retries": response.get("retries", 0),
+        }
+    )
+    return row
+
+
+async def run(args, images: list[Path], stub: StubServer | None) -> list[dict]:
+    rows = []
+    # The response cache is off in this Settings entry, every call is sent
+    async with benchmark_hass({}, {ENTRY_ID: entry_data(args, stub)}) as hass:
+        for model in args.models:
+            for width in args.target_widths:
+                for number in range(args.rounds):
+                    for image in images:
+                        row = await measure_call(hass, args, model, width, image)
+                        row.update({"provider": args.provider, "round": number})
+                        rows.append(row)
+                print_summary(model, width, rows[-args.rounds * len(images) :])
+    return rows
+
+
+def _median(rows: list[dict], field: str) -> float | None:
+    values = [row[field] for row in rows if row.get(field) is not None]
+    return statistics.median(values) if values else None
+
+
+def _format(value: float | None, spec: str, scale: float = 1) -> str:
+    return "-" if value is None else format(value / scale, spec)
+
+
+def print_summary(model: str, width: int, rows: list[dict]) -> None:
+    ok = [row for row in rows if not row["error"]]
+    line = f"{model:<32} {width:>5}px  {len(ok)}/{len(rows)} ok"
+    if ok:
+        line += (
+            f"  ttfb {_format(_median(ok, 'ttfb_ms'), '>8.1f')} ms"
+            f"  latency {_format(_median(ok, 'latency_ms'), '>8.1f')} ms"
+            f"  input {_format(_median(ok, 'input_tokens'), '>7.0f')} tokens"
+            f"  payload {_format(_median(ok, 'payload_bytes'), '>7.1f', 1024)} KiB"
+        )
+    print(line)
+    for row in rows:
+        if row["error"]:
+            print(f"  {row['image']}: {row['error']}")
+            break
+
+
+def write_csv(rows: list[dict], output: Path | None) -> Path:
+    if output is None:
+        output = RESULTS_DIR / f"providers-{git_commit()}.csv"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    return output
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--provider", required=True, help="Provider name as in the config flow"
+    )
+    parser.add_argument("--models", nargs="+", required=True)
+    parser.add_argument(
+        "--config",
+        nargs="*",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Config entry fields of the provider, e.g. api_key=...",
+    )
+    parser.add_argument(
+        "--stub",
+        action="store_true",
+        help=f"Send requests to local stubs ({', '.join(STUB_FORMATS)})",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.5, help="Seconds per stub response"
+    )
+    parser.add_argument("--images", help="Directory with the image set")
+    parser.add_argument(
+        "--target-widths", nargs="+", type=int, default=[512, 1024, 1280, 1920]
+    )
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--max-tokens", type=int, default=100)
+    parser.add_argument(
+        "--message", default="Describe what happens in the image in one sentence."
+    )
+    parser.add_argument("--output", type=Path, help="CSV file")
+    args = parser.parse_args()
+    if args.stub and args.provider not in STUB_FORMATS:
+        parser.error(f"--stub supports {', '.join(STUB_FORMATS)}")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        images = image_set(args.images, Path(scratch))
+        if not args.stub:
+            rows = asyncio.run(run(args, images, None))
+        else:
+            stub = StubServer(latency=args.latency)
+            stub.start()
+            try:
+                with stub_endpoints(stub.url):
+                    rows = asyncio.run(run(args, images, stub))
+            finally:
+                stub.stop()
+
+    if all(row["error"] for row in rows):
+        # An empty CSV would plot as a result in the visualizer
+        print(
+            f"\nNo call succeeded, first error: {rows[0]['error'] if rows else '-'}",
+            file=sys.stderr,
+        )
+        return 1
+    output = write_csv(rows, args.output)
+    print(f"\nResults written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,16 @@
 from datetime import datetime
 from .timeline import Timeline
-from .providers import Request
-from .memory import Memory
+from .providers import PROVIDER_DATA, ProviderRegistry, Request
+from .health import HealthRegistry
+from .scheduler import SCHEDULER_DATA, AdmissionControl
+from .cache import CACHE_DATA
+from .usage import UsageRegistry
+from .warmup import WarmupRegistry
+from .memory import MEMORY_DATA, Memory
 from .media_handlers import MediaProcessor
+from .tracing import TraceRegistry, span
+from .metrics import MetricsRegistry
+from functools import wraps
 import os, re
 from datetime import timedelta
 from homeassistant.util import dt as dt_util
@@ -11,7 +19,13 @@ from homeassistant.core import SupportsResponse
 from homeassistant.exceptions import ServiceValidationError
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.dispatcher import async_dispatcher_send
-from .api import TimelineEventView, TimelineEventsView, TimelineEventCreateView
+from .api import (
+    MetricsView,
+    TimelineEventView,
+    TimelineEventsView,
+    TimelineEventCreateView,
+    TimelineThumbnailView,
+)
 
 import logging
 
@@ -31,14 +45,18 @@ from .const import (
     CONF_AZURE_DEPLOYMENT,
     CONF_CUSTOM_OPENAI_ENDPOINT,
     CONF_RETENTION_TIME,
+    CONF_KEY_FRAME_FORMAT,
     CONF_MEMORY_PATHS,
     CONF_MEMORY_IMAGES_ENCODED,
     CONF_MEMORY_STRINGS,
+    CONF_MEMORY_CAMERAS,
+    CONF_MEMORY_MAX_IMAGES,
     CONF_SYSTEM_PROMPT,
     CONF_TITLE_PROMPT,
     CONF_AWS_ACCESS_KEY_ID,
     CONF_AWS_SECRET_ACCESS_KEY,
     CONF_AWS_REGION_NAME,
+    CONF_AWS_STREAM,
     MESSAGE,
     STORE_IN_TIMELINE,
     USE_MEMORY,
@@ -57,6 +75,10 @@ from .const import (
     EXPOSE_IMAGES,
     GENERATE_TITLE,
     SENSOR_ENTITY,
+    PRIORITY,
+    UNCHANGED_THRESHOLD,
+    INCLUDE_PREVIOUS_RESPONSE,
+    INCLUDE_TIMINGS,
     DATA_EXTRACTION_PROMPT,
     DEFAULT_OPENAI_MODEL,
     DEFAULT_ANTHROPIC_MODEL,
@@ -71,6 +93,14 @@ from .const import (
     CONF_CONTEXT_WINDOW,
     CONF_KEEP_ALIVE,
     CONF_REQUEST_TIMEOUT,
+    CONF_MAX_RETRIES,
+    CONF_COST_TABLE,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_REQUESTS_PER_MINUTE,
+    CONF_RESPONSE_CACHE,
+    CONF_CACHE_TOLERANCE,
+    CONF_CACHE_TTL,
+    CONF_CACHE_MAX_ENTRIES,
     RESPONSE_FORMAT,
     STRUCTURE,
     TITLE_FIELD,
@@ -79,6 +109,11 @@ from .const import (
     CONF_THINKING_BUDGET,
     CONF_THINK,
     CONF_REASONING_EFFORT,
+    CONF_WARMUP,
+    CONF_WARMUP_INTERVAL,
+    CONF_WARMUP_SENSORS,
+    CONF_WARMUP_START,
+    CONF_WARMUP_END,
 )
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
@@ -101,9 +136,21 @@ async def async_setup_entry(hass, entry):
         CONF_TEMPERATURE: entry.data.get(CONF_TEMPERATURE),
         CONF_TOP_P: entry.data.get(CONF_TOP_P),
         CONF_REQUEST_TIMEOUT: entry.data.get(CONF_REQUEST_TIMEOUT),
+        CONF_MAX_RETRIES: entry.data.get(CONF_MAX_RETRIES),
+        CONF_MAX_CONCURRENT_REQUESTS: entry.data.get(CONF_MAX_CONCURRENT_REQUESTS),
+        CONF_REQUESTS_PER_MINUTE: entry.data.get(CONF_REQUESTS_PER_MINUTE),
+        CONF_RESPONSE_CACHE: entry.data.get(CONF_RESPONSE_CACHE),
+        CONF_CACHE_TOLERANCE: entry.data.get(CONF_CACHE_TOLERANCE),
+        CONF_CACHE_TTL: entry.data.get(CONF_CACHE_TTL),
+        CONF_CACHE_MAX_ENTRIES: entry.data.get(CONF_CACHE_MAX_ENTRIES),
         # Ollama specific
         CONF_CONTEXT_WINDOW: entry.data.get(CONF_CONTEXT_WINDOW),
         CONF_KEEP_ALIVE: entry.data.get(CONF_KEEP_ALIVE),
+        CONF_WARMUP: entry.data.get(CONF_WARMUP),
+        CONF_WARMUP_INTERVAL: entry.data.get(CONF_WARMUP_INTERVAL),
+        CONF_WARMUP_SENSORS: entry.data.get(CONF_WARMUP_SENSORS),
+        CONF_WARMUP_START: entry.data.get(CONF_WARMUP_START),
+        CONF_WARMUP_END: entry.data.get(CONF_WARMUP_END),
         # Azure specific
         CONF_AZURE_BASE_URL: entry.data.get(CONF_AZURE_BASE_URL),
         CONF_AZURE_DEPLOYMENT: entry.data.get(CONF_AZURE_DEPLOYMENT),
@@ -114,11 +161,16 @@ async def async_setup_entry(hass, entry):
         CONF_AWS_ACCESS_KEY_ID: entry.data.get(CONF_AWS_ACCESS_KEY_ID),
         CONF_AWS_SECRET_ACCESS_KEY: entry.data.get(CONF_AWS_SECRET_ACCESS_KEY),
         CONF_AWS_REGION_NAME: entry.data.get(CONF_AWS_REGION_NAME),
+        CONF_AWS_STREAM: entry.data.get(CONF_AWS_STREAM),
         # Settings
         CONF_RETENTION_TIME: entry.data.get(CONF_RETENTION_TIME),
+        CONF_KEY_FRAME_FORMAT: entry.data.get(CONF_KEY_FRAME_FORMAT),
+        CONF_COST_TABLE: entry.data.get(CONF_COST_TABLE),
         CONF_MEMORY_PATHS: entry.data.get(CONF_MEMORY_PATHS),
         CONF_MEMORY_IMAGES_ENCODED: entry.data.get(CONF_MEMORY_IMAGES_ENCODED),
         CONF_MEMORY_STRINGS: entry.data.get(CONF_MEMORY_STRINGS),
+        CONF_MEMORY_CAMERAS: entry.data.get(CONF_MEMORY_CAMERAS),
+        CONF_MEMORY_MAX_IMAGES: entry.data.get(CONF_MEMORY_MAX_IMAGES),
         CONF_SYSTEM_PROMPT: entry.data.get(CONF_SYSTEM_PROMPT),
         CONF_TITLE_PROMPT: entry.data.get(CONF_TITLE_PROMPT),
         # Thinking/reasoning parameters
@@ -141,9 +193,34 @@ async def async_setup_entry(hass, entry):
 
     # If this is the Settings entry, set up the calendar and run cleanup
     if filtered_provider_config.get(CONF_PROVIDER) == "Settings":
-        await hass.config_entries.async_forward_entry_setups(entry, ["calendar"])
+        # Apply changed concurrency, rate limits and cache settings to new requests
+        hass.data.pop(SCHEDULER_DATA, None)
+        hass.data.pop(CACHE_DATA, None)
+        # Providers resolve the request timeout when they are created
+        hass.data.pop(PROVIDER_DATA, None)
+        # Memory is loaded again from the updated entry
+        hass.data.pop(MEMORY_DATA, None)
+        await hass.config_entries.async_forward_entry_setups(
+            entry, ["calendar", "sensor"]
+        )
         timeline = Timeline(hass, entry)
         await timeline._cleanup()
+        entry.async_on_unload(timeline.start_maintenance())
+    else:
+        # Start with a fresh health record (e.g. after reconfiguring the provider)
+        HealthRegistry.get(hass).remove(entry_uid)
+        ProviderRegistry.get(hass).remove(entry_uid)
+        WarmupRegistry.get(hass).remove(entry_uid)
+        # Apply changed concurrency and rate limits of the provider
+        AdmissionControl.get(hass).remove(entry_uid)
+        await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
+        # Keep the local model loaded so events don't wait for it to load
+        if filtered_provider_config.get(CONF_PROVIDER) == "Ollama" and (
+            filtered_provider_config.get(CONF_WARMUP)
+        ):
+            entry.async_on_unload(
+                WarmupRegistry.get(hass).start(entry_uid, filtered_provider_config)
+            )
 
     # Sanitize provider config (remove api_key and value)
     sanitized_provider_config = {
@@ -164,6 +241,7 @@ async def async_remove_entry(hass, entry):
         _LOGGER.info(f"Removing {entry.title} from hass.data")
         await async_unload_entry(hass, entry)
         hass.data[DOMAIN].pop(entry_uid)
+        UsageRegistry.get(hass).remove(entry_uid)
         if entry.data[CONF_PROVIDER] == "Settings":
             db_path = os.path.join(hass.config.path("llmvision"), "events.db")
             if os.path.exists(db_path):
@@ -181,7 +259,12 @@ async def async_unload_entry(hass, entry) -> bool:
     if entry.data.get(CONF_RETENTION_TIME) is not None:
         # unload the calendar
         unload_ok = await hass.config_entries.async_unload_platforms(
-            entry, ["calendar"]
+            entry, ["calendar", "sensor"]
+        )
+    elif entry.data.get(CONF_PROVIDER) not in (None, "Settings"):
+        # unload the provider health sensor
+        unload_ok = await hass.config_entries.async_unload_platforms(
+            entry, ["sensor"]
         )
     else:
         unload_ok = True
@@ -479,6 +562,15 @@ class ServiceCallData:
         self.expose_images: bool = data_call.data.get(EXPOSE_IMAGES, False)
         self.generate_title: bool = data_call.data.get(GENERATE_TITLE, False)
         self.sensor_entity: str = data_call.data.get(SENSOR_ENTITY, "")
+        self.priority: str = data_call.data.get(PRIORITY, "normal")
+        self.unchanged_threshold: float | None = (
+            float(data_call.data.get(UNCHANGED_THRESHOLD))
+            if data_call.data.get(UNCHANGED_THRESHOLD) is not None
+            else None
+        )
+        self.include_previous_response: bool = data_call.data.get(
+            INCLUDE_PREVIOUS_RESPONSE, False
+        )
         self.response_format: str = data_call.data.get(RESPONSE_FORMAT, "text")
         self.structure: dict | None = data_call.data.get(STRUCTURE, None)
         self.title_field: str = data_call.data.get(TITLE_FIELD, "")
@@ -596,15 +688,16 @@ async def _create_event(
             if description_field_value is not None:
                 description = str(description_field_value)
 
-        await timeline.create_event(
-            start=start,
-            end=dt_util.now() + timedelta(minutes=1),
-            title=title,
-            description=description,
-            key_frame=key_frame,
-            camera_name=camera_name,
-            label="",
-        )
+        with span("timeline"):
+            await timeline.create_event(
+                start=start,
+                end=dt_util.now() + timedelta(minutes=1),
+                title=title,
+                description=description,
+                key_frame=key_frame,
+                camera_name=camera_name,
+                label="",
+            )
         async_dispatcher_send(hass, SIGNAL_TIMELINE_UPDATED)
 
 
@@ -665,7 +758,49 @@ async def _update_sensor(hass, sensor_entity: str, value: str | int, type: str)
         raise
 
 
+async def _unchanged_scene_response(
+    processor: MediaProcessor, call: ServiceCallData
+) -> dict | None:
+    """Return a no change result if the frames match the last analyzed frames"""
+    if call.unchanged_threshold is None:
+        return None
+    with span("compare_baseline"):
+        similarity = await processor.compare_to_baseline()
+    if similarity is None or similarity < call.unchanged_threshold:
+        return None
+    _LOGGER.info(
+        f"Scene unchanged (similarity {similarity:.4f}), skipping provider call"
+    )
+    response = {"no_significant_change": True, "similarity": round(similarity, 4)}
+    if call.include_previous_response:
+        response["previous_response"] = processor.previous_response()
+    return response
+
+
 def setup(hass, config):
+    def _traced(service, handler):
+        """Record the stages of every call and add them to the response if asked"""
+
+        @wraps(handler)
+        async def wrapper(data_call):
+            metrics = MetricsRegistry.get(hass)
+            with TraceRegistry.get(hass).trace(
+                service, provider=data_call.data.get(PROVIDER)
+            ) as root:
+                try:
+                    response = await handler(data_call)
+                except Exception:
+                    metrics.record_call(service, root.duration, failed=True)
+                    raise
+            metrics.record_call(service, root.duration)
+            if data_call.data.get(INCLUDE_TIMINGS, False) and isinstance(
+                response, dict
+            ):
+                response["timings"] = root.as_dict()
+            return response
+
+        return wrapper
+
     async def image_analyzer(data_call):
         """Handle the service call to analyze an image with LLM Vision"""
         start = dt_util.now()
@@ -687,19 +822,29 @@ def setup(hass, config):
         # Fetch and preprocess images
         processor = MediaProcessor(hass, request)
         # Send images to RequestHandler client
-        request = await processor.add_images(
-            image_entities=call.image_entities,
-            image_paths=call.image_paths,
-            target_width=call.target_width,
-            include_filename=call.include_filename,
-            expose_images=call.expose_images,
-        )
+        with span("media"):
+            request = await processor.add_images(
+                image_entities=call.image_entities,
+                image_paths=call.image_paths,
+                target_width=call.target_width,
+                include_filename=call.include_filename,
+                expose_images=call.expose_images,
+            )
 
-        call.memory = Memory(hass)
-        await call.memory._update_memory()
+        unchanged = await _unchanged_scene_response(processor, call)
+        if unchanged is not None:
+            return unchanged
+
+        memory = Memory.get(hass)
+        with span("memory"):
+            await memory._update_memory()
+        call.memory = memory.for_entities(call.image_entities)
 
         # Validate configuration, input data and make the call
-        response = await request.call(call)
+        with span("request"):
+            response = await request.call(call)
+        if call.unchanged_threshold is not None:
+            await processor.update_baseline(response)
         _LOGGER.info(f"Response: {response}")
         # Add processor.key_frame to response if it exists
         if processor.key_frame:
@@ -728,18 +873,22 @@ def setup(hass, config):
             temperature=call.temperature,
         )
         processor = MediaProcessor(hass, request)
-        request = await processor.add_videos(
-            video_paths=call.video_paths,
-            event_ids=call.event_id,
-            max_frames=call.max_frames,
-            target_width=call.target_width,
-            include_filename=call.include_filename,
-            expose_images=call.expose_images,
-        )
-        call.memory = Memory(hass)
-        await call.memory._update_memory()
+        with span("media"):
+            request = await processor.add_videos(
+                video_paths=call.video_paths,
+                event_ids=call.event_id,
+                max_frames=call.max_frames,
+                target_width=call.target_width,
+                include_filename=call.include_filename,
+                expose_images=call.expose_images,
+            )
+        memory = Memory.get(hass)
+        with span("memory"):
+            await memory._update_memory()
+        call.memory = memory.for_entities(call.image_entities)
 
-        response = await request.call(call)
+        with span("request"):
+            response = await request.call(call)
         # Add processor.key_frame to response if it exists
         if processor.key_frame:
             response["key_frame"] = processor.key_frame
@@ -768,19 +917,29 @@ def setup(hass, config):
         )
         processor = MediaProcessor(hass, request)
 
-        request = await processor.add_streams(
-            image_entities=call.image_entities,
-            duration=call.duration,
-            max_frames=call.max_frames,
-            target_width=call.target_width,
-            include_filename=call.include_filename,
-            expose_images=call.expose_images,
-        )
+        with span("media"):
+            request = await processor.add_streams(
+                image_entities=call.image_entities,
+                duration=call.duration,
+                max_frames=call.max_frames,
+                target_width=call.target_width,
+                include_filename=call.include_filename,
+                expose_images=call.expose_images,
+            )
+
+        unchanged = await _unchanged_scene_response(processor, call)
+        if unchanged is not None:
+            return unchanged
 
-        call.memory = Memory(hass)
-        await call.memory._update_memory()
+        memory = Memory.get(hass)
+        with span("memory"):
+            await memory._update_memory()
+        call.memory = memory.for_entities(call.image_entities)
 
-        response = await request.call(call)
+        with span("request"):
+            response = await request.call(call)
+        if call.unchanged_threshold is not None:
+            await processor.update_baseline(response)
         # Add processor.key_frame to response if it exists
         if processor.key_frame:
             response["key_frame"] = processor.key_frame
@@ -848,18 +1007,24 @@ def setup(hass, config):
             temperature=call.temperature,
         )
         processor = MediaProcessor(hass, request)
-        request = await processor.add_visual_data(
-            image_entities=call.image_entities,
-            image_paths=call.image_paths,
-            target_width=call.target_width,
-            include_filename=call.include_filename,
-            expose_images=call.expose_images,
-        )
+        with span("media"):
+            request = await processor.add_visual_data(
+                image_entities=call.image_entities,
+                image_paths=call.image_paths,
+                target_width=call.target_width,
+                include_filename=call.include_filename,
+                expose_images=call.expose_images,
+            )
 
-        call.memory = Memory(hass, system_prompt=DATA_EXTRACTION_PROMPT)
-        await call.memory._update_memory()
+        memory = Memory.get(hass)
+        with span("memory"):
+            await memory._update_memory()
+        call.memory = memory.with_system_prompt(DATA_EXTRACTION_PROMPT).for_entities(
+            call.image_entities
+        )
 
-        response = await request.call(call)
+        with span("request"):
+            response = await request.call(call)
         # Add processor.key_frame to response if it exists
         if processor.key_frame:
             response["key_frame"] = processor.key_frame
@@ -939,23 +1104,26 @@ def setup(hass, config):
     hass.services.register(
         DOMAIN,
         "image_analyzer",
-        image_analyzer,
+        _traced("image_analyzer", image_analyzer),
         supports_response=SupportsResponse.ONLY,
     )
     hass.services.register(
         DOMAIN,
         "video_analyzer",
-        video_analyzer,
+        _traced("video_analyzer", video_analyzer),
         supports_response=SupportsResponse.ONLY,
     )
     hass.services.register(
         DOMAIN,
         "stream_analyzer",
-        stream_analyzer,
+        _traced("stream_analyzer", stream_analyzer),
         supports_response=SupportsResponse.ONLY,
     )
     hass.services.register(
-        DOMAIN, "data_analyzer", data_analyzer, supports_response=SupportsResponse.ONLY
+        DOMAIN,
+        "data_analyzer",
+        _traced("data_analyzer", data_analyzer),
+        supports_response=SupportsResponse.ONLY,
     )
     hass.services.register(
         DOMAIN,
@@ -970,6 +1138,8 @@ def setup(hass, config):
     )
     hass.http.register_view(TimelineEventsView)
     hass.http.register_view(TimelineEventView)
+    hass.http.register_view(TimelineThumbnailView)
     hass.http.register_view(TimelineEventCreateView)
+    hass.http.register_view(MetricsView)
 
     return True
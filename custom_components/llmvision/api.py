@@ -1,13 +1,26 @@
+import hashlib
 import json
 import logging
+import os
 from datetime import datetime, timedelta
 from typing import Any, Optional
+from aiohttp import web
 from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.http import HomeAssistantView
 from homeassistant.helpers.json import json_dumps
 from homeassistant.util import dt as dt_util
 from .calendar import Timeline
 from .const import DOMAIN, CONF_PROVIDER, SIGNAL_TIMELINE_UPDATED
+from .metrics import MetricsRegistry
+from .snapshots import (
+    SNAPSHOTS_MARKER,
+    SNAPSHOTS_PATH,
+    THUMBNAIL_URL,
+    THUMBNAIL_WIDTHS,
+    generate_thumbnails,
+    snapshot_name,
+    thumbnail_path,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -305,3 +318,80 @@ class TimelineEventView(HomeAssistantView):
             return self.json({"event": json.loads(json_dumps(updated))})
         except Exception:
             return self.json({"event_id": event_id, "status": "updated"})
+
+
+def _read_thumbnail(root: str, name: str, width: int) -> tuple[bytes, str] | None:
+    """Bytes and ETag of a thumbnail, generated first if it is missing"""
+    path = thumbnail_path(root, name, width)
+    if not os.path.exists(path):
+        # Snapshots from before thumbnails, or whose generation failed
+        generate_thumbnails(root, name)
+    try:
+        with open(path, "rb") as file:
+            body = file.read()
+    except OSError:
+        return None
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+class TimelineThumbnailView(HomeAssistantView):
+    """View to serve the thumbnails of event key frames.
+    Parameters:
+        - width: Thumbnail width, one of THUMBNAIL_WIDTHS
+        - name: Path of the key frame relative to the snapshots folder
+    Returns:
+        - 200: JPEG thumbnail
+        - 304: Thumbnail matches If-None-Match
+        - 404: Unknown width or snapshot
+    """
+
+    url = THUMBNAIL_URL + "/{width}/{name:.+}"
+    name = "api:llmvision:timeline:thumbnail"
+    requires_auth = True
+
+    # Revalidated with the ETag afterwards
+    cache_control = "private, max-age=86400"
+
+    async def get(self, request, width, name):
+        hass = request.app["hass"]
+        if not width.isdigit() or int(width) not in THUMBNAIL_WIDTHS:
+            return self.json_message("Unknown thumbnail width", status_code=404)
+        if snapshot_name(SNAPSHOTS_MARKER + name) is None:
+            return self.json_message("Snapshot not found", status_code=404)
+
+        thumbnail = await hass.async_add_executor_job(
+            _read_thumbnail, SNAPSHOTS_PATH, name, int(width)
+        )
+        if thumbnail is None:
+            return self.json_message("Snapshot not found", status_code=404)
+        body, etag = thumbnail
+
+        headers = {"ETag": etag, "Cache-Control": self.cache_control}
+        if_none_match = request.headers.get("If-None-Match", "")
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type="image/jpeg", headers=headers)
+
+
+class MetricsView(HomeAssistantView):
+    """View to scrape latency, frame, upload, cache and fallback metrics.
+    Parameters:
+        - format: "prometheus" (default) or "json"
+    Returns:
+        - 200: Metrics since Home Assistant was started
+    """
+
+    url = "/api/llmvision/metrics"
+    name = "api:llmvision:metrics"
+    requires_auth = True
+
+    async def get(self, request):
+        hass = request.app["hass"]
+        metrics = MetricsRegistry.get(hass)
+        if request.query.get("format", "prometheus").lower() == "json":
+            return self.json(metrics.as_dict())
+        return web.Response(
+            text=metrics.prometheus(),
+            content_type="text/plain",
+            charset="utf-8",
+        )
@@ -0,0 +1,176 @@
+"""AWS Signature Version 4 signing and event stream decoding for Bedrock"""
+
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, quote, urlsplit
+import hashlib
+import hmac
+import struct
+import zlib
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+
+# Value sizes of fixed length event stream header types
+_HEADER_SIZES = {2: 1, 3: 2, 4: 4, 5: 8, 8: 8, 9: 16}
+
+
+def _hmac(key: bytes, msg: str) -> bytes:
+    return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+
+
+class SigV4Signer:
+    """Sign requests for one set of credentials, region and service
+
+    The signing key only depends on the date, so it is derived once per day
+    and reused by every request signed on that day.
+
+    Args:
+        access_key (str): AWS access key id
+        secret_key (str): AWS secret access key
+        region (str): AWS region, e.g. us-east-1
+        service (str): Signing name of the service
+        session_token (str, optional): Token of temporary credentials
+    """
+
+    def __init__(
+        self,
+        access_key: str,
+        secret_key: str,
+        region: str,
+        service: str = "bedrock",
+        session_token: str | None = None,
+    ):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.service = service
+        self.session_token = session_token
+        self._key_date: str | None = None
+        self._key: bytes = b""
+
+    def _signing_key(self, date_stamp: str) -> bytes:
+        if self._key_date != date_stamp:
+            key = _hmac(f"AWS4{self.secret_key}".encode("utf-8"), date_stamp)
+            for part in (self.region, self.service, "aws4_request"):
+                key = _hmac(key, part)
+            self._key, self._key_date = key, date_stamp
+        return self._key
+
+    def sign(
+        self,
+        method: str,
+        url: str,
+        headers: dict,
+        body: bytes,
+        now: datetime | None = None,
+    ) -> dict:
+        """Return headers including X-Amz-Date and Authorization for a request"""
+        now = now or datetime.now(timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date_stamp = now.strftime("%Y%m%d")
+        parts = urlsplit(url)
+
+        signed_headers = dict(headers)
+        signed_headers["X-Amz-Date"] = amz_date
+        if self.session_token:
+            signed_headers["X-Amz-Security-Token"] = self.session_token
+        canonical = {
+            key.lower(): " ".join(str(value).split())
+            for key, value in signed_headers.items()
+        }
+        canonical["host"] = parts.netloc
+        names = sorted(canonical)
+
+        query = sorted(
+            (quote(k, safe="-_.~"), quote(v, safe="-_.~"))
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        )
+        canonical_request = "\n".join(
+            [
+                method.upper(),
+                # Path segments are encoded once more, except for S3
+                quote(parts.path or "/", safe="/~"),
+                "&".join(f"{k}={v}" for k, v in query),
+                "".join(f"{name}:{canonical[name]}\n" for name in names),
+                ";".join(names),
+                hashlib.sha256(body).hexdigest(),
+            ]
+        )
+        scope = f"{date_stamp}/{self.region}/{self.service}/aws4_request"
+        string_to_sign = "\n".join(
+            [
+                ALGORITHM,
+                amz_date,
+                scope,
+                hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+            ]
+        )
+        signature = hmac.new(
+            self._signing_key(date_stamp),
+            string_to_sign.encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()
+        signed_headers["Authorization"] = (
+            f"{ALGORITHM} Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={';'.join(names)}, Signature={signature}"
+        )
+        return signed_headers
+
+
+class EventStreamDecoder:
+    """Incremental decoder for application/vnd.amazon.eventstream responses
+
+    Feed it chunks as they arrive; it returns every message that is complete.
+    """
+
+    def __init__(self):
+        self._buffer = b""
+
+    def feed(self, data: bytes) -> list[tuple[dict, bytes]]:
+        """Return (headers, payload) of all messages completed by data"""
+        self._buffer += data
+        messages = []
+        while len(self._buffer) >= 12:
+            total_length, headers_length, prelude_crc = struct.unpack(
+                ">III", self._buffer[:12]
+            )
+            if zlib.crc32(self._buffer[:8]) != prelude_crc:
+                raise ValueError("Event stream prelude checksum mismatch")
+            if len(self._buffer) < total_length:
+                break
+            message = self._buffer[:total_length]
+            self._buffer = self._buffer[total_length:]
+            (message_crc,) = struct.unpack(">I", message[-4:])
+            if zlib.crc32(message[:-4]) != message_crc:
+                raise ValueError("Event stream message checksum mismatch")
+            headers = self._parse_headers(message[12 : 12 + headers_length])
+            messages.append((headers, message[12 + headers_length : -4]))
+        return messages
+
+    @staticmethod
+    def _parse_headers(data: bytes) -> dict:
+        headers = {}
+        offset = 0
+        while offset < len(data):
+            name_length = data[offset]
+            offset += 1
+            name = data[offset : offset + name_length].decode("utf-8")
+            offset += name_length
+            value_type = data[offset]
+            offset += 1
+            if value_type in (0, 1):
+                value = value_type == 0
+            elif value_type in (6, 7):
+                (length,) = struct.unpack(">H", data[offset : offset + 2])
+                offset += 2
+                value = data[offset : offset + length]
+                if value_type == 7:
+                    value = value.decode("utf-8")
+                offset += length
+            elif value_type in _HEADER_SIZES:
+                size = _HEADER_SIZES[value_type]
+                value = data[offset : offset + size]
+                offset += size
+            else:
+                raise ValueError(f"Unknown event stream header type {value_type}")
+            headers[name] = value
+        return headers
@@ -0,0 +1,210 @@
+"""Merge concurrent requests to the same provider and model into one request"""
+
+from typing import Any
+import asyncio
+import copy
+import json
+import logging
+import re
+from homeassistant.core import HomeAssistant
+from .const import (
+    DOMAIN,
+    BATCH_PROMPT,
+    BATCH_STRUCTURE,
+    ERROR_GENERATION_FAILED,
+)
+from .tracing import current_span, span
+
+_LOGGER = logging.getLogger(__name__)
+
+BATCH_DATA = f"{DOMAIN}_batching"
+
+# Providers that only accept a single image per request
+SINGLE_IMAGE_PROVIDERS = ("Groq",)
+
+
+class _Pending:
+    """A request waiting for its batch to be sent"""
+
+    def __init__(self, request, call: Any):
+        self.request = request
+        self.call = call
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class RequestBatcher:
+    """Collect requests arriving within a short window and send them together
+
+    Requests with the same provider, model and request options that arrive
+    within the window are sent as one multi-image request with a section per
+    camera. The structured answer is split back into one result per caller.
+    Requests are submitted after the cascade triage, so only escalated events
+    are batched.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._pending: dict[tuple, list[_Pending]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def get(hass: HomeAssistant) -> "RequestBatcher":
+        """Return the batcher stored in hass.data, creating it if needed"""
+        batcher = hass.data.get(BATCH_DATA)
+        if not isinstance(batcher, RequestBatcher):
+            batcher = RequestBatcher(hass)
+            hass.data[BATCH_DATA] = batcher
+        return batcher
+
+    @staticmethod
+    def can_batch(request, call: Any) -> bool:
+        """Whether the call can share a request with others"""
+        if getattr(call, "response_format", "text") == "json":
+            return False
+        provider_name = request.get_provider(request.hass, call.provider)
+        if provider_name is None:
+            return False
+        return provider_name not in SINGLE_IMAGE_PROVIDERS
+
+    async def submit(self, request, call: Any, window: float) -> dict:
+        """Wait up to window seconds for compatible requests, return this result"""
+        call.model = call.model or request.get_default_model(call.provider)
+        key = (
+            call.provider,
+            call.model,
+            bool(getattr(call, "use_memory", False)),
+            bool(getattr(call, "include_filename", False)),
+            getattr(call, "temperature", None),
+            getattr(call, "max_tokens", None),
+        )
+        pending = _Pending(request, call)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = []
+            asyncio.get_running_loop().call_later(window, self._flush, key)
+        batch.append(pending)
+        with span("batch") as waited:
+            result = await pending.future
+            if waited is not None:
+                waited.attributes["size"] = result.get("batched", 1)
+        return result
+
+    def _flush(self, key: tuple) -> None:
+        batch = self._pending.pop(key, [])
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: list[_Pending]) -> None:
+        # Spans of the batch would otherwise end up in the first caller's trace
+        current_span.set(None)
+        if len(batch) == 1:
+            await self._send_single(batch[0])
+            return
+        _LOGGER.debug(f"Sending {len(batch)} requests as one batch")
+        try:
+            sections = await self._send_batch(batch)
+        except Exception as e:
+            _LOGGER.warning(f"Batched request failed, sending individually: {e}")
+            sections = {}
+        results = []
+        for index, pending in enumerate(batch, start=1):
+            result = sections.get(index)
+            if result is None:
+                results.append(self._send_single(pending))
+            elif not pending.future.done():
+                pending.future.set_result(result)
+        if results:
+            await asyncio.gather(*results)
+
+    async def _send_single(self, pending: _Pending) -> None:
+        try:
+            result = await pending.request._call(pending.call)
+        except Exception as e:
+            if not pending.future.done():
+                pending.future.set_exception(e)
+            return
+        if not pending.future.done():
+            pending.future.set_result(result)
+
+    async def _send_batch(self, batch: list[_Pending]) -> dict[int, dict]:
+        """Send one request for the whole batch, return results by camera number"""
+        first = batch[0]
+        merged = type(first.request)(
+            self.hass,
+            message=first.request.message,
+            max_tokens=sum(pending.call.max_tokens for pending in batch),
+            temperature=first.request.temperature,
+        )
+        message = BATCH_PROMPT.format(count=len(batch))
+        position = 1
+        entities = []
+        for index, pending in enumerate(batch, start=1):
+            images = pending.request.base64_images
+            filenames = pending.request.filenames
+            merged.base64_images.extend(images)
+            if len(filenames) == len(images):
+                merged.filenames.extend(filenames)
+            else:
+                merged.filenames.extend([""] * len(images))
+            cameras = ", ".join(getattr(pending.call, "image_entities", None) or [])
+            label = f" ({cameras})" if cameras else ""
+            message += (
+                f"\nCamera {index}{label}, images {position}-"
+                f"{position + len(images) - 1}: {pending.call.message}"
+            )
+            position += len(images)
+            entities.extend(getattr(pending.call, "image_entities", None) or [])
+
+        call = copy.copy(first.call)
+        call.message = message
+        call.max_tokens = merged.max_tokens
+        call.response_format = "json"
+        call.structure = BATCH_STRUCTURE
+        call.title_field = None
+        call.generate_title = False
+        memory = getattr(call, "memory", None)
+        if getattr(call, "use_memory", False) and hasattr(memory, "for_entities"):
+            call.memory = memory.for_entities(entities)
+
+        response = await merged._call(call)
+        answer = response.get("structured_response")
+        if not isinstance(answer, dict):
+            text = response.get("response_text")
+            if text == ERROR_GENERATION_FAILED:
+                return {}
+            try:
+                answer = json.loads(merged.heal_json(text))
+            except (TypeError, ValueError):
+                return {}
+        sections = answer.get("cameras") if isinstance(answer, dict) else None
+        if not isinstance(sections, list):
+            return {}
+
+        results = {}
+        for section in sections:
+            if not isinstance(section, dict):
+                continue
+            try:
+                index = int(section.get("camera"))
+            except (TypeError, ValueError):
+                continue
+            description = section.get("description")
+            if not 1 <= index <= len(batch) or description is None:
+                continue
+            pending = batch[index - 1]
+            pending.call.provider = call.provider
+            pending.call.model = call.model
+            result = {}
+            if pending.call.generate_title and section.get("title"):
+                result["title"] = re.sub(
+                    r"[^a-zA-Z0-9À-ÖØ-öø-ɏ\s]", "", str(section["title"])
+                )
+            result["response_text"] = str(description)
+            result["batched"] = len(batch)
+            # Statistics (including usage) are those of the whole batch
+            merged._add_stats(result)
+            results[index] = result
+        return results
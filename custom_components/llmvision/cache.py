@@ -0,0 +1,196 @@
+"""Response cache keyed by prompt and perceptual frame hashes"""
+
+from collections import OrderedDict
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+from PIL import Image
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from .const import (
+    DOMAIN,
+    CONF_PROVIDER,
+    CONF_RESPONSE_CACHE,
+    CONF_CACHE_TOLERANCE,
+    CONF_CACHE_TTL,
+    CONF_CACHE_MAX_ENTRIES,
+    SIGNAL_CACHE_UPDATED,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+CACHE_DATA = f"{DOMAIN}_cache"
+CACHE_FILE = "response_cache.json"
+
+
+def frame_hash(base64_image: str) -> int:
+    """64 bit difference hash (dHash) of a base64 encoded image"""
+    with Image.open(io.BytesIO(base64.b64decode(base64_image))) as img:
+        small = img.convert("L").resize((9, 8), Image.Resampling.BILINEAR)
+        pixels = list(small.getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class ResponseCache:
+    """Bounded LRU of responses, persisted in the llmvision config directory
+
+    Each entry is stored under a digest of the text inputs (model, prompts, format)
+    and matches a new request if every frame hash is within tolerance bits.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        tolerance: int = 4,
+        ttl: float = 600,
+        max_entries: int = 256,
+    ):
+        self.hass = hass
+        self.tolerance = tolerance
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._loaded = False
+        self._path = os.path.join(hass.config.path(DOMAIN), CACHE_FILE)
+
+    @staticmethod
+    def get(hass: HomeAssistant) -> "ResponseCache | None":
+        """Return the cache if enabled in the Settings config entry, otherwise None"""
+        settings = None
+        for _, data in (hass.data.get(DOMAIN) or {}).items():
+            if data.get(CONF_PROVIDER) == "Settings":
+                settings = data
+                break
+        if not settings or not settings.get(CONF_RESPONSE_CACHE, False):
+            return None
+        cache = hass.data.get(CACHE_DATA)
+        if not isinstance(cache, ResponseCache):
+            try:
+                cache = ResponseCache(
+                    hass,
+                    tolerance=int(settings.get(CONF_CACHE_TOLERANCE, 4)),
+                    ttl=float(settings.get(CONF_CACHE_TTL, 10)) * 60,
+                    max_entries=int(settings.get(CONF_CACHE_MAX_ENTRIES, 256)),
+                )
+            except (TypeError, ValueError):
+                cache = ResponseCache(hass)
+            hass.data[CACHE_DATA] = cache
+        return cache
+
+    @staticmethod
+    def text_key(*parts) -> str:
+        """Digest of everything besides the frames that influences the response"""
+        return hashlib.sha256(
+            json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    async def async_hash_frames(self, base64_images: list[str]) -> list[int] | None:
+        """Hash frames in the executor, None if any frame can't be decoded"""
+
+        def _hash_all():
+            return [frame_hash(image) for image in base64_images]
+
+        try:
+            return await self.hass.async_add_executor_job(_hash_all)
+        except Exception as e:
+            _LOGGER.debug(f"Could not hash frames for response cache: {e}")
+            return None
+
+    async def async_lookup(self, text_key: str, hashes: list[int]) -> dict | None:
+        await self._async_load()
+        now = time.time()
+        for entry_id, entry in list(self._entries.items()):
+            if now - entry["created"] > self.ttl:
+                del self._entries[entry_id]
+                continue
+            if entry["text_key"] != text_key or len(entry["hashes"]) != len(hashes):
+                continue
+            if all(
+                hamming_distance(cached, new) <= self.tolerance
+                for cached, new in zip(entry["hashes"], hashes)
+            ):
+                self._entries.move_to_end(entry_id)
+                self.hits += 1
+                self._notify()
+                return dict(entry["response"])
+        self.misses += 1
+        self._notify()
+        return None
+
+    async def async_store(self, text_key: str, hashes: list[int], response: dict):
+        await self._async_load()
+        entry_id = f"{text_key}:{'-'.join(f'{h:016x}' for h in hashes)}"
+        self._entries[entry_id] = {
+            "text_key": text_key,
+            "hashes": hashes,
+            "response": response,
+            "created": time.time(),
+        }
+        self._entries.move_to_end(entry_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        await self._async_save()
+        self._notify()
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    async def _async_load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+
+        def _read():
+            if not os.path.exists(self._path):
+                return {}
+            with open(self._path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        try:
+            stored = await self.hass.async_add_executor_job(_read)
+        except Exception as e:
+            _LOGGER.warning(f"Could not read response cache: {e}")
+            return
+        for entry_id, entry in stored.get("entries", {}).items():
+            self._entries[entry_id] = entry
+        self.hits = stored.get("hits", 0)
+        self.misses = stored.get("misses", 0)
+
+    async def _async_save(self) -> None:
+        data = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": dict(self._entries),
+        }
+
+        def _write():
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            tmp_path = f"{self._path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self._path)
+
+        try:
+            await self.hass.async_add_executor_job(_write)
+        except Exception as e:
+            _LOGGER.warning(f"Could not write response cache: {e}")
+
+    def _notify(self) -> None:
+        async_dispatcher_send(self.hass, SIGNAL_CACHE_UPDATED)
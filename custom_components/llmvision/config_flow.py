@@ -31,16 +31,37 @@ from .const import (
     CONF_AZURE_DEPLOYMENT,
     CONF_CUSTOM_OPENAI_ENDPOINT,
     CONF_RETENTION_TIME,
+    CONF_KEY_FRAME_FORMAT,
     CONF_TIMELINE_LANGUAGE,
     CONF_FALLBACK_PROVIDER,
+    CONF_FALLBACK_PROVIDERS,
+    CONF_FALLBACK_SORT_BY_LATENCY,
+    CONF_HEDGE_REQUESTS,
+    CONF_HEDGE_PERCENTILE,
+    CONF_HEDGE_MIN_DELAY,
+    CONF_BATCH_WINDOW,
+    CONF_COST_TABLE,
+    CONF_RESPONSE_CACHE,
+    CONF_CACHE_TOLERANCE,
+    CONF_CACHE_TTL,
+    CONF_CACHE_MAX_ENTRIES,
+    CONF_CASCADE_PROVIDER,
+    CONF_CASCADE_CONFIDENCE,
+    CONF_CASCADE_TRIAGE_FRAMES,
     CONF_MEMORY_PATHS,
     CONF_MEMORY_STRINGS,
+    CONF_MEMORY_CAMERAS,
+    CONF_MEMORY_MAX_IMAGES,
     CONF_SYSTEM_PROMPT,
     CONF_TITLE_PROMPT,
     CONF_REQUEST_TIMEOUT,
+    CONF_MAX_RETRIES,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_REQUESTS_PER_MINUTE,
     CONF_AWS_ACCESS_KEY_ID,
     CONF_AWS_SECRET_ACCESS_KEY,
     CONF_AWS_REGION_NAME,
+    CONF_AWS_STREAM,
     DEFAULT_TITLE_PROMPT,
     DEFAULT_SYSTEM_PROMPT,
     DEFAULT_OPENAI_MODEL,
@@ -62,6 +83,11 @@ from .const import (
     CONF_THINK,
     CONF_REASONING_EFFORT,
     CONF_KEEP_ALIVE,
+    CONF_WARMUP,
+    CONF_WARMUP_INTERVAL,
+    CONF_WARMUP_SENSORS,
+    CONF_WARMUP_START,
+    CONF_WARMUP_END,
     VERSION_AZURE,
 )
 
@@ -188,6 +214,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     ),
                     {"collapsed": False},
                 ),
+                vol.Optional("limits_section"): limits_section(),
             }
         )
 
@@ -208,6 +235,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_TEMPERATURE: self.init_info.get(CONF_TEMPERATURE, 0.5),
                     CONF_TOP_P: self.init_info.get(CONF_TOP_P, 0.9),
                 },
+                "limits_section": limits_suggested(self.init_info),
             }
             data_schema = self.add_suggested_values_to_schema(data_schema, suggested)
 
@@ -306,6 +334,38 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     ),
                     {"collapsed": True},
                 ),
+                vol.Optional("warmup_section"): section(
+                    vol.Schema(
+                        {
+                            vol.Optional(CONF_WARMUP, default=False): selector(
+                                {"boolean": {}}
+                            ),
+                            vol.Optional(CONF_WARMUP_INTERVAL, default=4): selector(
+                                {
+                                    "number": {
+                                        "min": 0,
+                                        "max": 60,
+                                        "step": 1,
+                                        "unit_of_measurement": "min",
+                                        "mode": "box",
+                                    }
+                                }
+                            ),
+                            vol.Optional(CONF_WARMUP_SENSORS, default=[]): selector(
+                                {
+                                    "entity": {
+                                        "domain": "binary_sensor",
+                                        "multiple": True,
+                                    }
+                                }
+                            ),
+                            vol.Optional(CONF_WARMUP_START): selector({"time": {}}),
+                            vol.Optional(CONF_WARMUP_END): selector({"time": {}}),
+                        }
+                    ),
+                    {"collapsed": True},
+                ),
+                vol.Optional("limits_section"): limits_section(),
             }
         )
 
@@ -332,6 +392,14 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_CONTEXT_WINDOW: self.init_info.get(CONF_CONTEXT_WINDOW, 2048),
                     CONF_KEEP_ALIVE: self.init_info.get(CONF_KEEP_ALIVE, "5m"),
                 },
+                "warmup_section": {
+                    CONF_WARMUP: self.init_info.get(CONF_WARMUP, False),
+                    CONF_WARMUP_INTERVAL: self.init_info.get(CONF_WARMUP_INTERVAL, 4),
+                    CONF_WARMUP_SENSORS: self.init_info.get(CONF_WARMUP_SENSORS, []),
+                    CONF_WARMUP_START: self.init_info.get(CONF_WARMUP_START),
+                    CONF_WARMUP_END: self.init_info.get(CONF_WARMUP_END),
+                },
+                "limits_section": limits_suggested(self.init_info),
             }
             data_schema = self.add_suggested_values_to_schema(data_schema, suggested)
 
@@ -427,6 +495,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     ),
                     {"collapsed": False},
                 ),
+                vol.Optional("limits_section"): limits_section(),
             }
         )
 
@@ -448,6 +517,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_TEMPERATURE: self.init_info.get(CONF_TEMPERATURE, 0.5),
                     CONF_TOP_P: self.init_info.get(CONF_TOP_P, 0.9),
                 },
+                "limits_section": limits_suggested(self.init_info),
             }
             data_schema = self.add_suggested_values_to_schema(data_schema, suggested)
 
@@ -554,6 +624,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     ),
                     {"collapsed": False},
                 ),
+                vol.Optional("limits_section"): limits_section(),
             }
         )
 
@@ -573,6 +644,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         CONF_REASONING_EFFORT, "none"
                     ),
                 },
+                "limits_section": limits_suggested(self.init_info),
             }
             data_schema = self.add_suggested_values_to_schema(data_schema, suggested)
 
@@ -665,6 +737,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     ),
                     {"collapsed": False},
                 ),
+                vol.Optional("limits_section"): limits_section(),
             }
         )
 
@@ -692,6 +765,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_TEMPERATURE: self.init_info.get(CONF_TEMPERATURE, 0.5),
                     CONF_TOP_P: self.init_info.get(CONF_TOP_P, 0.9),
                 },
+                "limits_section": limits_suggested(self.init_info),
             }
             data_schema = self.add_suggested_values_to_schema(data_schema, suggested)
 
@@ -790,6 +864,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     ),
                     {"collapsed": False},
                 ),
+                vol.Optional("limits_section"): limits_section(),
             }
         )
 
@@ -807,6 +882,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_TOP_P: self.init_info.get(CONF_TOP_P, 0.9),
                     CONF_THINKING_BUDGET: self.init_info.get(CONF_THINKING_BUDGET, 0),
                 },
+                "limits_section": limits_suggested(self.init_info),
             }
             data_schema = self.add_suggested_values_to_schema(data_schema, suggested)
 
@@ -901,6 +977,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     ),
                     {"collapsed": False},
                 ),
+                vol.Optional("limits_section"): limits_section(),
             }
         )
 
@@ -918,6 +995,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_TOP_P: self.init_info.get(CONF_TOP_P, 0.9),
                     CONF_THINKING_BUDGET: self.init_info.get(CONF_THINKING_BUDGET, 0),
                 },
+                "limits_section": limits_suggested(self.init_info),
             }
             data_schema = self.add_suggested_values_to_schema(data_schema, suggested)
 
@@ -1002,6 +1080,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     ),
                     {"collapsed": False},
                 ),
+                vol.Optional("limits_section"): limits_section(),
             }
         )
 
@@ -1018,6 +1097,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_TEMPERATURE: self.init_info.get(CONF_TEMPERATURE, 0.5),
                     CONF_TOP_P: self.init_info.get(CONF_TOP_P, 0.9),
                 },
+                "limits_section": limits_suggested(self.init_info),
             }
             data_schema = self.add_suggested_values_to_schema(data_schema, suggested)
 
@@ -1104,6 +1184,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     ),
                     {"collapsed": False},
                 ),
+                vol.Optional("limits_section"): limits_section(),
             }
         )
 
@@ -1126,6 +1207,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_TEMPERATURE: self.init_info.get(CONF_TEMPERATURE, 0.5),
                     CONF_TOP_P: self.init_info.get(CONF_TOP_P, 0.9),
                 },
+                "limits_section": limits_suggested(self.init_info),
             }
             data_schema = self.add_suggested_values_to_schema(data_schema, suggested)
 
@@ -1183,6 +1265,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                             vol.Required(
                                 CONF_AWS_REGION_NAME, default="us-east-1"
                             ): str,
+                            vol.Optional(CONF_AWS_STREAM, default=False): bool,
                         }
                     ),
                     {"collapsed": False},
@@ -1217,6 +1300,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     ),
                     {"collapsed": False},
                 ),
+                vol.Optional("limits_section"): limits_section(),
             }
         )
 
@@ -1233,6 +1317,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_AWS_REGION_NAME: self.init_info.get(
                         CONF_AWS_REGION_NAME, "us-east-1"
                     ),
+                    CONF_AWS_STREAM: self.init_info.get(CONF_AWS_STREAM, False),
                 },
                 "model_section": {
                     CONF_DEFAULT_MODEL: self.init_info.get(
@@ -1241,6 +1326,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_TEMPERATURE: self.init_info.get(CONF_TEMPERATURE, 0.5),
                     CONF_TOP_P: self.init_info.get(CONF_TOP_P, 0.9),
                 },
+                "limits_section": limits_suggested(self.init_info),
             }
             data_schema = self.add_suggested_values_to_schema(data_schema, suggested)
 
@@ -1337,6 +1423,17 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                                     }
                                 }
                             ),
+                            vol.Optional(CONF_FALLBACK_PROVIDERS): selector(
+                                {
+                                    "select": {
+                                        "options": fallback_options[1:],
+                                        "multiple": True,
+                                    }
+                                }
+                            ),
+                            vol.Optional(
+                                CONF_FALLBACK_SORT_BY_LATENCY, default=False
+                            ): bool,
                             vol.Optional(CONF_REQUEST_TIMEOUT, default=60): selector(
                                 {
                                     "number": {
@@ -1347,6 +1444,73 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                                     }
                                 }
                             ),
+                            vol.Optional(CONF_MAX_RETRIES, default=2): selector(
+                                {
+                                    "number": {
+                                        "min": 0,
+                                        "max": 5,
+                                        "step": 1,
+                                        "mode": "box",
+                                    }
+                                }
+                            ),
+                            vol.Optional(
+                                CONF_MAX_CONCURRENT_REQUESTS, default=4
+                            ): selector(
+                                {
+                                    "number": {
+                                        "min": 1,
+                                        "max": 32,
+                                        "step": 1,
+                                        "mode": "box",
+                                    }
+                                }
+                            ),
+                            vol.Optional(CONF_REQUESTS_PER_MINUTE, default=0): selector(
+                                {
+                                    "number": {
+                                        "min": 0,
+                                        "max": 1000,
+                                        "step": 1,
+                                        "mode": "box",
+                                    }
+                                }
+                            ),
+                            vol.Optional(CONF_HEDGE_REQUESTS, default=False): bool,
+                            vol.Optional(CONF_HEDGE_PERCENTILE, default=95): selector(
+                                {
+                                    "number": {
+                                        "min": 50,
+                                        "max": 99,
+                                        "step": 1,
+                                        "mode": "slider",
+                                    }
+                                }
+                            ),
+                            vol.Optional(CONF_HEDGE_MIN_DELAY, default=3): selector(
+                                {
+                                    "number": {
+                                        "min": 0.5,
+                                        "max": 60,
+                                        "step": 0.5,
+                                        "mode": "box",
+                                    }
+                                }
+                            ),
+                            vol.Optional(CONF_BATCH_WINDOW, default=0): selector(
+                                {
+                                    "number": {
+                                        "min": 0,
+                                        "max": 5000,
+                                        "step": 50,
+                                        "unit_of_measurement": "ms",
+                                        "mode": "box",
+                                    }
+                                }
+                            ),
+                            vol.Optional(CONF_COST_TABLE, default=""): selector(
+                                {"text": {"multiline": True, "multiple": False}}
+                            ),
                         }
                     ),
                     {"collapsed": False},
@@ -1408,6 +1572,104 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                                     }
                                 }
                             ),
+                            vol.Optional(
+                                CONF_KEY_FRAME_FORMAT, default="jpeg"
+                            ): selector(
+                                {
+                                    "select": {
+                                        "options": [
+                                            {"label": "JPEG", "value": "jpeg"},
+                                            {"label": "WebP", "value": "webp"},
+                                            {"label": "AVIF", "value": "avif"},
+                                        ],
+                                        "mode": "dropdown",
+                                    }
+                                }
+                            ),
+                        }
+                    ),
+                    {"collapsed": True},
+                ),
+                vol.Optional("cascade_section"): section(
+                    vol.Schema(
+                        {
+                            vol.Optional(
+                                CONF_CASCADE_PROVIDER, default="no_cascade"
+                            ): selector(
+                                {
+                                    "select": {
+                                        "options": [
+                                            {
+                                                "label": "No Cascade",
+                                                "value": "no_cascade",
+                                            }
+                                        ]
+                                        + fallback_options[1:],
+                                    }
+                                }
+                            ),
+                            vol.Optional(
+                                CONF_CASCADE_CONFIDENCE, default=0.7
+                            ): selector(
+                                {
+                                    "number": {
+                                        "min": 0,
+                                        "max": 1,
+                                        "step": 0.05,
+                                        "mode": "slider",
+                                    }
+                                }
+                            ),
+                            vol.Optional(
+                                CONF_CASCADE_TRIAGE_FRAMES, default=2
+                            ): selector(
+                                {
+                                    "number": {
+                                        "min": 1,
+                                        "max": 10,
+                                        "step": 1,
+                                        "mode": "box",
+                                    }
+                                }
+                            ),
+                        }
+                    ),
+                    {"collapsed": True},
+                ),
+                vol.Optional("cache_section"): section(
+                    vol.Schema(
+                        {
+                            vol.Optional(CONF_RESPONSE_CACHE, default=False): bool,
+                            vol.Optional(CONF_CACHE_TOLERANCE, default=4): selector(
+                                {
+                                    "number": {
+                                        "min": 0,
+                                        "max": 16,
+                                        "step": 1,
+                                        "mode": "slider",
+                                    }
+                                }
+                            ),
+                            vol.Optional(CONF_CACHE_TTL, default=10): selector(
+                                {
+                                    "number": {
+                                        "min": 1,
+                                        "max": 1440,
+                                        "step": 1,
+                                        "mode": "box",
+                                    }
+                                }
+                            ),
+                            vol.Optional(CONF_CACHE_MAX_ENTRIES, default=256): selector(
+                                {
+                                    "number": {
+                                        "min": 16,
+                                        "max": 4096,
+                                        "step": 16,
+                                        "mode": "box",
+                                    }
+                                }
+                            ),
                         }
                     ),
                     {"collapsed": True},
@@ -1421,6 +1683,19 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                             vol.Optional(CONF_MEMORY_STRINGS): selector(
                                 {"text": {"multiline": False, "multiple": True}}
                             ),
+                            vol.Optional(CONF_MEMORY_CAMERAS): selector(
+                                {"text": {"multiline": False, "multiple": True}}
+                            ),
+                            vol.Optional(CONF_MEMORY_MAX_IMAGES, default=0): selector(
+                                {
+                                    "number": {
+                                        "min": 0,
+                                        "max": 50,
+                                        "step": 1,
+                                        "mode": "box",
+                                    }
+                                }
+                            ),
                         }
                     ),
                     {"collapsed": True},
@@ -1442,7 +1717,25 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 CONF_FALLBACK_PROVIDER: self.init_info.get(
                     CONF_FALLBACK_PROVIDER, "no_fallback"
                 ),
+                CONF_FALLBACK_PROVIDERS: self.init_info.get(
+                    CONF_FALLBACK_PROVIDERS, []
+                ),
+                CONF_FALLBACK_SORT_BY_LATENCY: self.init_info.get(
+                    CONF_FALLBACK_SORT_BY_LATENCY, False
+                ),
                 CONF_REQUEST_TIMEOUT: self.init_info.get(CONF_REQUEST_TIMEOUT, 60),
+                CONF_MAX_RETRIES: self.init_info.get(CONF_MAX_RETRIES, 2),
+                CONF_MAX_CONCURRENT_REQUESTS: self.init_info.get(
+                    CONF_MAX_CONCURRENT_REQUESTS, 4
+                ),
+                CONF_REQUESTS_PER_MINUTE: self.init_info.get(
+                    CONF_REQUESTS_PER_MINUTE, 0
+                ),
+                CONF_HEDGE_REQUESTS: self.init_info.get(CONF_HEDGE_REQUESTS, False),
+                CONF_HEDGE_PERCENTILE: self.init_info.get(CONF_HEDGE_PERCENTILE, 95),
+                CONF_HEDGE_MIN_DELAY: self.init_info.get(CONF_HEDGE_MIN_DELAY, 3),
+                CONF_BATCH_WINDOW: self.init_info.get(CONF_BATCH_WINDOW, 0),
+                CONF_COST_TABLE: self.init_info.get(CONF_COST_TABLE, ""),
             },
             "prompt_section": {
                 CONF_SYSTEM_PROMPT: self.init_info.get(
@@ -1457,13 +1750,35 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_TIMELINE_LANGUAGE, "English"
                 ),
                 CONF_RETENTION_TIME: self.init_info.get(CONF_RETENTION_TIME, 7),
+                CONF_KEY_FRAME_FORMAT: self.init_info.get(
+                    CONF_KEY_FRAME_FORMAT, "jpeg"
+                ),
                 # CONF_TIMELINE_TODAY_SUMMARY: self.init_info.get(CONF_TIMELINE_TODAY_SUMMARY, False),
                 # CONF_TIMELINE_SUMMARY_PROMPT: self.init_info.get(
                 #     CONF_TIMELINE_SUMMARY_PROMPT, DEFAULT_SUMMARY_PROMPT),
             },
+            "cache_section": {
+                CONF_RESPONSE_CACHE: self.init_info.get(CONF_RESPONSE_CACHE, False),
+                CONF_CACHE_TOLERANCE: self.init_info.get(CONF_CACHE_TOLERANCE, 4),
+                CONF_CACHE_TTL: self.init_info.get(CONF_CACHE_TTL, 10),
+                CONF_CACHE_MAX_ENTRIES: self.init_info.get(CONF_CACHE_MAX_ENTRIES, 256),
+            },
+            "cascade_section": {
+                CONF_CASCADE_PROVIDER: self.init_info.get(
+                    CONF_CASCADE_PROVIDER, "no_cascade"
+                ),
+                CONF_CASCADE_CONFIDENCE: self.init_info.get(
+                    CONF_CASCADE_CONFIDENCE, 0.7
+                ),
+                CONF_CASCADE_TRIAGE_FRAMES: self.init_info.get(
+                    CONF_CASCADE_TRIAGE_FRAMES, 2
+                ),
+            },
             "memory_section": {
                 CONF_MEMORY_PATHS: self.init_info.get(CONF_MEMORY_PATHS),
                 CONF_MEMORY_STRINGS: self.init_info.get(CONF_MEMORY_STRINGS),
+                CONF_MEMORY_CAMERAS: self.init_info.get(CONF_MEMORY_CAMERAS),
+                CONF_MEMORY_MAX_IMAGES: self.init_info.get(CONF_MEMORY_MAX_IMAGES, 0),
             },
         }
         _LOGGER.debug(f"Suggested values: {suggested}, adding to schema...")
@@ -1476,13 +1791,15 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             user_input = flatten_dict(user_input)
 
             # Ensure both memory fields are always present, even if empty
-            for _key in (CONF_MEMORY_PATHS, CONF_MEMORY_STRINGS):
+            for _key in (CONF_MEMORY_PATHS, CONF_MEMORY_STRINGS, CONF_MEMORY_CAMERAS):
                 if _key not in user_input:
                     user_input[_key] = []
 
             errors = {}
             if len(user_input.get(CONF_MEMORY_PATHS, [])) != len(
                 user_input.get(CONF_MEMORY_STRINGS, [])
+            ) or len(user_input.get(CONF_MEMORY_CAMERAS, [])) > len(
+                user_input.get(CONF_MEMORY_PATHS, [])
             ):
                 errors = {"base": "mismatched_lengths"}
             for path in user_input.get(CONF_MEMORY_PATHS, []):
@@ -1569,6 +1886,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     ),
                     {"collapsed": False},
                 ),
+                vol.Optional("limits_section"): limits_section(),
             }
         )
 
@@ -1590,6 +1908,7 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         CONF_REASONING_EFFORT, "none"
                     ),
                 },
+                "limits_section": limits_suggested(self.init_info),
             }
             data_schema = self.add_suggested_values_to_schema(data_schema, suggested)
 
@@ -1640,6 +1959,31 @@ class llmvisionConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
 
 # Helper functions
+def limits_section() -> section:
+    """Concurrency and rate limit of a provider, the Settings entry's if unset"""
+    return section(
+        vol.Schema(
+            {
+                vol.Optional(CONF_MAX_CONCURRENT_REQUESTS): selector(
+                    {"number": {"min": 1, "max": 32, "step": 1, "mode": "box"}}
+                ),
+                vol.Optional(CONF_REQUESTS_PER_MINUTE): selector(
+                    {"number": {"min": 0, "max": 1000, "step": 1, "mode": "box"}}
+                ),
+            }
+        ),
+        {"collapsed": True},
+    )
+
+
+def limits_suggested(data) -> dict:
+    """Suggested values of limits_section from a config entry's data"""
+    return {
+        CONF_MAX_CONCURRENT_REQUESTS: data.get(CONF_MAX_CONCURRENT_REQUESTS),
+        CONF_REQUESTS_PER_MINUTE: data.get(CONF_REQUESTS_PER_MINUTE),
+    }
+
+
 def flatten_dict(data: dict) -> dict:
     """Flatten one level of nested dicts (from section fields) into the top-level dict."""
     flat = {}
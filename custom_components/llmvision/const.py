@@ -17,7 +17,15 @@ CONF_THINK = "think"
 CONF_REASONING_EFFORT = "reasoning_effort"
 CONF_CONTEXT_WINDOW = "context_window"  # (ollama: num_ctx)
 CONF_KEEP_ALIVE = "keep_alive"
+CONF_WARMUP = "warmup"
+CONF_WARMUP_INTERVAL = "warmup_interval"
+CONF_WARMUP_SENSORS = "warmup_sensors"
+CONF_WARMUP_START = "warmup_start"
+CONF_WARMUP_END = "warmup_end"
 CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_MAX_RETRIES = "max_retries"
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+CONF_REQUESTS_PER_MINUTE = "requests_per_minute"
 
 # Azure specific
 CONF_AZURE_BASE_URL = "azure_base_url"
@@ -28,21 +36,39 @@ CONF_AZURE_VERSION = "azure_version"
 CONF_AWS_ACCESS_KEY_ID = "aws_access_key_id"
 CONF_AWS_SECRET_ACCESS_KEY = "aws_secret_access_key"
 CONF_AWS_REGION_NAME = "aws_region_name"
+CONF_AWS_STREAM = "aws_stream"
 
 # Custom OpenAI specific
 CONF_CUSTOM_OPENAI_ENDPOINT = "custom_openai_endpoint"
 
 # Timeline
 CONF_RETENTION_TIME = "retention_time"
+CONF_KEY_FRAME_FORMAT = "key_frame_format"
 
 # Settings
 CONF_TIMELINE_LANGUAGE = "timeline_language"
 CONF_FALLBACK_PROVIDER = "fallback_provider"
+CONF_FALLBACK_PROVIDERS = "fallback_providers"
+CONF_FALLBACK_SORT_BY_LATENCY = "fallback_sort_by_latency"
+CONF_HEDGE_REQUESTS = "hedge_requests"
+CONF_HEDGE_PERCENTILE = "hedge_percentile"
+CONF_HEDGE_MIN_DELAY = "hedge_min_delay"
+CONF_BATCH_WINDOW = "batch_window"
+CONF_COST_TABLE = "cost_table"
+CONF_RESPONSE_CACHE = "response_cache"
+CONF_CACHE_TOLERANCE = "cache_tolerance"
+CONF_CACHE_TTL = "cache_ttl"
+CONF_CACHE_MAX_ENTRIES = "cache_max_entries"
+CONF_CASCADE_PROVIDER = "cascade_provider"
+CONF_CASCADE_CONFIDENCE = "cascade_confidence"
+CONF_CASCADE_TRIAGE_FRAMES = "cascade_triage_frames"
 CONF_TIMELINE_TODAY_SUMMARY = "timeline_today_summary"
 CONF_TIMELINE_SUMMARY_PROMPT = "timeline_summary_prompt"
 CONF_MEMORY_PATHS = "memory_paths"
 CONF_MEMORY_IMAGES_ENCODED = "memory_images_encoded"
 CONF_MEMORY_STRINGS = "memory_strings"
+CONF_MEMORY_CAMERAS = "memory_cameras"
+CONF_MEMORY_MAX_IMAGES = "memory_max_images"
 CONF_SYSTEM_PROMPT = "system_prompt"
 CONF_TITLE_PROMPT = "title_prompt"
 CONF_MEMORY_PATHS = "memory_paths"
@@ -51,6 +77,10 @@ CONF_MEMORY_STRINGS = "memory_strings"
 
 # Dispatcher signals
 SIGNAL_TIMELINE_UPDATED = f"{DOMAIN}_timeline_updated"
+SIGNAL_PROVIDER_HEALTH_UPDATED = f"{DOMAIN}_provider_health_updated"
+SIGNAL_CACHE_UPDATED = f"{DOMAIN}_cache_updated"
+SIGNAL_WARMUP_UPDATED = f"{DOMAIN}_warmup_updated"
+SIGNAL_USAGE_UPDATED = f"{DOMAIN}_usage_updated"
 
 
 # SERVICE CALL CONSTANTS
@@ -79,12 +109,17 @@ INCLUDE_FILENAME = "include_filename"
 EXPOSE_IMAGES = "expose_images"
 GENERATE_TITLE = "generate_title"
 SENSOR_ENTITY = "sensor_entity"
+PRIORITY = "priority"
+UNCHANGED_THRESHOLD = "unchanged_threshold"
+INCLUDE_PREVIOUS_RESPONSE = "include_previous_response"
+INCLUDE_TIMINGS = "include_timings"
 
 # Error messages
 ERROR_NOT_CONFIGURED = "{provider} is not configured"
 ERROR_GROQ_MULTIPLE_IMAGES = "Groq does not support videos or streams"
 ERROR_NO_IMAGE_INPUT = "No image input provided"
 ERROR_HANDSHAKE_FAILED = "Connection could not be established"
+ERROR_GENERATION_FAILED = "Couldn't generate content. Check logs for details."
 
 # Versions
 VERSION_ANTHROPIC = "2023-06-01"  # https://docs.anthropic.com/en/api/versioning
@@ -134,6 +169,37 @@ Description Rules:
 
 Do not mention camera angle, lighting quality, or image clarity.
 """
+GLIMPSE_NO_ACTIVITY_TITLE = "No activity"
+CASCADE_TRIAGE_PROMPT = "First decide whether these images show anything worth notifying about (people, vehicles, animals, deliveries or anything unusual). Set interesting accordingly, set confidence between 0 and 1 to how sure you are, and answer the following in title and description: "
+CASCADE_TRIAGE_STRUCTURE = {
+    "type": "object",
+    "properties": {
+        "interesting": {"type": "boolean"},
+        "confidence": {"type": "number"},
+        "title": {"type": "string"},
+        "description": {"type": "string"},
+    },
+    "required": ["interesting", "confidence", "title", "description"],
+}
+BATCH_PROMPT = "The attached images come from {count} cameras and are attached in the order of the camera sections below. Answer the request of every camera separately, only using the images of that camera. Return one entry per camera with its number, a short title and the answer as description.\n"
+BATCH_STRUCTURE = {
+    "type": "object",
+    "properties": {
+        "cameras": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "camera": {"type": "integer"},
+                    "title": {"type": "string"},
+                    "description": {"type": "string"},
+                },
+                "required": ["camera", "title", "description"],
+            },
+        }
+    },
+    "required": ["cameras"],
+}
 # Models
 DEFAULT_OPENAI_MODEL = "gpt-4o-mini"
 DEFAULT_ANTHROPIC_MODEL = "claude-haiku-4-5"
@@ -153,9 +219,12 @@ DEFAULT_SUMMARY_PROMPT = "Provide a brief summary for the following titles. Focu
 ENDPOINT_OPENAI = "https://api.openai.com/v1/chat/completions"
 ENDPOINT_ANTHROPIC = "https://api.anthropic.com/v1/messages"
 ENDPOINT_GOOGLE = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
+ENDPOINT_GOOGLE_CACHE = "https://generativelanguage.googleapis.com/v1beta/cachedContents?key={api_key}"
 ENDPOINT_GROQ = "https://api.groq.com/openai/v1/chat/completions"
 ENDPOINT_LOCALAI = "{protocol}://{ip_address}:{port}/v1/chat/completions"
 ENDPOINT_OLLAMA = "{protocol}://{ip_address}:{port}/api/chat"
+ENDPOINT_OLLAMA_GENERATE = "{protocol}://{ip_address}:{port}/api/generate"
 ENDPOINT_OPENWEBUI = "{protocol}://{ip_address}:{port}/api/chat/completions"
 ENDPOINT_AZURE = "{base_url}openai/deployments/{deployment}/chat/completions?api-version={api_version}"
 ENDPOINT_OPENROUTER = "https://openrouter.ai/api/v1/chat/completions"
+ENDPOINT_AWS_BEDROCK = "https://bedrock-runtime.{region}.amazonaws.com/model/{model}/{action}"
@@ -0,0 +1,28 @@
+"""Diagnostics with the latency traces of recent service calls and DB maintenance"""
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from .const import CONF_PROVIDER
+from .timeline import MAINTENANCE_DATA
+from .tracing import TraceRegistry
+
+
+def _uses_provider(span: dict, entry_id: str) -> bool:
+    """Whether a provider entry took part in a traced call"""
+    if span.get("attributes", {}).get("provider") == entry_id:
+        return True
+    return any(_uses_provider(child, entry_id) for child in span.get("children", []))
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict:
+    """Recent traces, limited to those using the provider for provider entries
+
+    The Settings entry also reports the last timeline database maintenance.
+    """
+    traces = TraceRegistry.get(hass).traces()
+    if entry.data.get(CONF_PROVIDER) != "Settings":
+        traces = [trace for trace in traces if _uses_provider(trace, entry.entry_id)]
+        return {"traces": traces}
+    return {"traces": traces, "timeline_maintenance": hass.data.get(MAINTENANCE_DATA)}
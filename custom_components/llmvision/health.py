@@ -0,0 +1,175 @@
+"""Provider health tracking and circuit breaker for llmvision"""
+
+from collections import deque
+import logging
+import time
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from .const import DOMAIN, SIGNAL_PROVIDER_HEALTH_UPDATED
+
+_LOGGER = logging.getLogger(__name__)
+
+HEALTH_DATA = f"{DOMAIN}_health"
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+BREAKER_STATES = [STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN]
+
+
+class ProviderHealth:
+    """Rolling error rate, latency and circuit breaker state of one provider entry
+
+    Args:
+        window (int): Number of recent requests to keep
+        failure_threshold (int): Consecutive failures that open the breaker
+        cooldown (float): Seconds the breaker stays open before a probe is allowed
+        min_samples (int): Latency samples required before percentiles are reported
+    """
+
+    def __init__(
+        self,
+        window: int = 50,
+        failure_threshold: int = 5,
+        cooldown: float = 60,
+        min_samples: int = 10,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self.results: deque = deque(maxlen=window)
+        self.latencies: deque = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.state = STATE_CLOSED
+        self.opened_at: float | None = None
+        self._probe_in_flight = False
+
+    @property
+    def error_rate(self) -> float:
+        if not self.results:
+            return 0.0
+        return round(self.results.count(False) / len(self.results), 3)
+
+    def percentile(self, pct: float) -> float | None:
+        """Return the pct-th percentile latency, or None until enough samples exist"""
+        if len(self.latencies) < self.min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def is_available(self, now: float) -> bool:
+        """Whether a request would currently be let through (does not claim a probe)"""
+        if self.state == STATE_CLOSED:
+            return True
+        if self._probe_in_flight:
+            return False
+        return self.opened_at is None or now - self.opened_at >= self.cooldown
+
+    def allow_request(self, now: float) -> bool:
+        """Let a request through, moving an expired open breaker to half-open"""
+        if not self.is_available(now):
+            return False
+        if self.state != STATE_CLOSED:
+            self.state = STATE_HALF_OPEN
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self, latency: float) -> None:
+        self.results.append(True)
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+        self.state = STATE_CLOSED
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self, now: float) -> None:
+        self.results.append(False)
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if (
+            self.state == STATE_HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = STATE_OPEN
+            self.opened_at = now
+
+    def release(self) -> None:
+        """Release a half-open probe that was cancelled before it completed"""
+        self._probe_in_flight = False
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "error_rate": self.error_rate,
+            "requests": len(self.results),
+            "consecutive_failures": self.consecutive_failures,
+            "latency_p50": self.percentile(50),
+            "latency_p95": self.percentile(95),
+        }
+
+
+class HealthRegistry:
+    """Health of every provider config entry, shared by all requests"""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._providers: dict[str, ProviderHealth] = {}
+
+    @staticmethod
+    def get(hass: HomeAssistant) -> "HealthRegistry":
+        """Return the registry stored in hass.data, creating it if needed"""
+        registry = hass.data.get(HEALTH_DATA)
+        if not isinstance(registry, HealthRegistry):
+            registry = HealthRegistry(hass)
+            hass.data[HEALTH_DATA] = registry
+        return registry
+
+    def get_health(self, entry_id: str) -> ProviderHealth:
+        health = self._providers.get(entry_id)
+        if health is None:
+            health = self._providers[entry_id] = ProviderHealth()
+        return health
+
+    def is_available(self, entry_id: str) -> bool:
+        return self.get_health(entry_id).is_available(time.monotonic())
+
+    def allow_request(self, entry_id: str) -> bool:
+        health = self.get_health(entry_id)
+        previous = health.state
+        allowed = health.allow_request(time.monotonic())
+        if health.state != previous:
+            _LOGGER.info(f"Circuit breaker for {entry_id} is {health.state}, probing")
+            self._notify(entry_id)
+        return allowed
+
+    def percentile(self, entry_id: str, pct: float) -> float | None:
+        return self.get_health(entry_id).percentile(pct)
+
+    def record_success(self, entry_id: str, latency: float) -> None:
+        health = self.get_health(entry_id)
+        if health.state != STATE_CLOSED:
+            _LOGGER.info(f"Circuit breaker for {entry_id} closed")
+        health.record_success(latency)
+        self._notify(entry_id)
+
+    def record_failure(self, entry_id: str) -> None:
+        health = self.get_health(entry_id)
+        previous = health.state
+        health.record_failure(time.monotonic())
+        if health.state == STATE_OPEN and previous != STATE_OPEN:
+            _LOGGER.warning(
+                f"Circuit breaker for {entry_id} opened after "
+                f"{health.consecutive_failures} consecutive failures"
+            )
+        self._notify(entry_id)
+
+    def release(self, entry_id: str) -> None:
+        self.get_health(entry_id).release()
+
+    def remove(self, entry_id: str) -> None:
+        """Forget an entry, e.g. after it has been reconfigured or removed"""
+        self._providers.pop(entry_id, None)
+
+    def _notify(self, entry_id: str) -> None:
+        async_dispatcher_send(self.hass, SIGNAL_PROVIDER_HEALTH_UPDATED, entry_id)
@@ -1,4 +1,5 @@
 import base64
+import hashlib
 import io
 import os
 import uuid
@@ -16,16 +17,49 @@ from homeassistant.components.media_player.browse_media import (
 )
 
 from urllib.parse import urlparse
-from functools import partial
-from PIL import Image, UnidentifiedImageError
+from functools import lru_cache
+from PIL import Image, UnidentifiedImageError, features
 import numpy as np
 from homeassistant.helpers.network import get_url
 from homeassistant.exceptions import ServiceValidationError
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_PROVIDER,
+    CONF_KEY_FRAME_FORMAT,
+    ERROR_GENERATION_FAILED,
+)
+from .metrics import MetricsRegistry
+from .snapshots import (
+    async_claim_snapshot,
+    async_register_snapshot,
+    new_snapshot_path,
+)
+from .tracing import add_span, annotate, span, traced
 
 _LOGGER = logging.getLogger(__name__)
 
+SCENE_DATA = f"{DOMAIN}_scene_baselines"
+# Width in pixels of the grayscale thumbnails kept as scene baselines
+BASELINE_WIDTH = 64
+# File extension and Pillow save options of the key frame formats
+KEY_FRAME_FORMATS = {
+    "jpeg": ("jpg", {}),
+    "webp": ("webp", {"format": "WEBP", "quality": 80}),
+    "avif": ("avif", {"format": "AVIF", "quality": 60}),
+}
+
+
+@lru_cache(maxsize=None)
+def _can_encode(image_format: str) -> bool:
+    """Whether the installed Pillow can write image_format, warns once if not"""
+    if image_format == "jpeg" or features.check(image_format):
+        return True
+    _LOGGER.warning(
+        f"Pillow can't write {image_format.upper()}, key frames are stored as JPEG"
+    )
+    return False
+
 
 class MediaProcessor:
     def __init__(self, hass, client):
@@ -34,8 +68,10 @@ class MediaProcessor:
         self.client = client
         self.base64_images = []
         self.filenames = []
-        self.snapshots_path = f"/media/{DOMAIN}/snapshots/"
         self.key_frame = ""
+        # Frames sent to the provider, per image path, camera entity or
+        # position in a recording
+        self.source_frames: dict[str, bytes] = {}
 
     async def _encode_image(self, img):
         """Encode image as base64"""
@@ -44,53 +80,80 @@ class MediaProcessor:
         base64_image = base64.b64encode(img_byte_arr.getvalue()).decode("utf-8")
         return base64_image
 
-    async def _save_clip(
-        self, clip_data=None, clip_path=None, image_data=None, image_path=None
-    ):
-        _LOGGER.debug(f"Saving clip to {clip_path} and image to {image_path}")
-        # Ensure dir exists
-        await self.hass.loop.run_in_executor(
-            None, partial(os.makedirs, self.snapshots_path, exist_ok=True)
-        )
-
-        def _run_save_clips(clip_data, clip_path, image_data, image_path):
-            _LOGGER.info(f"[save_clip] clip: {clip_path}, image: {image_path}")
-            if image_data:
-                with open(image_path, "wb") as f:
-                    if type(image_data) == bytes:
-                        f.write(image_data)
-                    else:
-                        f.write(base64.b64decode(image_data))
-            elif clip_data:
-                with open(clip_path, "wb") as f:
-                    f.write(clip_data)
-
-        await self.hass.loop.run_in_executor(
-            None, _run_save_clips, clip_data, clip_path, image_data, image_path
-        )
-
     def _convert_to_rgb(self, img):
         if img.mode == "RGBA" or img.format == "GIF":
             img = img.convert("RGB")
         return img
 
-    async def _expose_image(self, frame_name, image_data, uid, frame_path=None):
-        # ensure /media/llmvision/snapshots dir exists
+    def _key_frame_format(self) -> str:
+        """Format of new key frames as set in the Settings entry"""
+        image_format = "jpeg"
+        for data in (self.hass.data.get(DOMAIN) or {}).values():
+            if isinstance(data, dict) and data.get(CONF_PROVIDER) == "Settings":
+                image_format = data.get(CONF_KEY_FRAME_FORMAT) or image_format
+                break
+        if image_format not in KEY_FRAME_FORMATS or not _can_encode(image_format):
+            return "jpeg"
+        return image_format
+
+    @staticmethod
+    def _decode_key_frame(image_data) -> tuple[bytes, str]:
+        """JPEG bytes of a key frame and the hash they are stored under"""
+        if not isinstance(image_data, bytes):
+            image_data = base64.b64decode(image_data)
+        return image_data, hashlib.sha256(image_data).hexdigest()[:32]
+
+    @staticmethod
+    def _write_key_frame(path: str, data: bytes) -> None:
+        """Write a key frame unless it exists, re-encoded to the format of path"""
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        extension = path.rsplit(".", 1)[-1]
+        options = next(
+            (opts for ext, opts in KEY_FRAME_FORMATS.values() if ext == extension), {}
+        )
+        if options:
+            with Image.open(io.BytesIO(data)) as image:
+                buffer = io.BytesIO()
+                image.save(buffer, **options)
+                data = buffer.getvalue()
+        with open(path, "wb") as file:
+            file.write(data)
+
+    @traced("expose_image")
+    async def _expose_image(self, image_data=None, frame_path=None):
+        """Store the first exposed frame as the key frame of the event
+
+        Key frames are named by the hash of their JPEG bytes, a frame that is
+        already stored, e.g. of a static scene, is reused instead of written again.
+        """
+        if self.key_frame != "":
+            return
+        if image_data is None and frame_path is not None:
+            # open image in hass.loop
+            with await self.hass.loop.run_in_executor(
+                None, Image.open, frame_path
+            ) as image:
+                await self.hass.loop.run_in_executor(None, image.load)
+                image_data = await self._encode_image(image)
+        data, digest = await self.hass.loop.run_in_executor(
+            None, self._decode_key_frame, image_data
+        )
+
+        key_frame = await async_claim_snapshot(self.hass, digest)
+        stored = key_frame is not None
+        if not stored:
+            extension = KEY_FRAME_FORMATS[self._key_frame_format()][0]
+            # Stored in the folder of the day, indexed until its event references it
+            key_frame = new_snapshot_path(f"{digest}.{extension}")
+        # Only writes stored key frames again if their file went missing
         await self.hass.loop.run_in_executor(
-            None,
-            partial(os.makedirs, f"/media/{DOMAIN}/snapshots", exist_ok=True),
+            None, self._write_key_frame, key_frame, data
         )
-        if self.key_frame == "":
-            filename = f"/media/{DOMAIN}/snapshots/{uid}-{frame_name}.jpg"
-            self.key_frame = filename
-            if image_data is None and frame_path is not None:
-                # open image in hass.loop
-                with await self.hass.loop.run_in_executor(
-                    None, Image.open, frame_path
-                ) as image:
-                    await self.hass.loop.run_in_executor(None, image.load)
-                    image_data = await self._encode_image(image)
-            await self._save_clip(image_data=image_data, image_path=filename)
+        if not stored:
+            await async_register_snapshot(self.hass, key_frame, digest)
+        self.key_frame = key_frame
 
     def _similarity_score(self, previous_frame, current_frame_gray):
         """
@@ -132,6 +195,76 @@ class MediaProcessor:
 
         return ssim
 
+    @staticmethod
+    def _baseline_thumbnail(frame_bytes):
+        """Downscaled grayscale copy of a frame used as scene baseline"""
+        with Image.open(io.BytesIO(frame_bytes)) as img:
+            gray = img.convert("L")
+            width, height = gray.size
+            target_height = max(1, round(BASELINE_WIDTH * height / width))
+            return np.array(gray.resize((BASELINE_WIDTH, target_height)))
+
+    def _scene_key(self) -> tuple[str, str]:
+        """The prompt and the sources, a response only answers both"""
+        prompt = getattr(self.client, "message", None) or ""
+        return str(prompt), ",".join(sorted(self.source_frames))
+
+    async def compare_to_baseline(self) -> float | None:
+        """Lowest SSIM between the new frames and the last analyzed frames
+
+        Returns None if any source has no baseline yet or can't be decoded.
+        """
+        if not self.source_frames or self.previous_response() is None:
+            return None
+        frames = self.hass.data[SCENE_DATA]["frames"]
+        scores = []
+        for source, frame_bytes in self.source_frames.items():
+            baseline = frames.get(source)
+            if baseline is None:
+                return None
+            try:
+                thumbnail = await self.hass.async_add_executor_job(
+                    self._baseline_thumbnail, frame_bytes
+                )
+            except (UnidentifiedImageError, OSError) as e:
+                _LOGGER.debug(f"Could not compare {source} to baseline: {e}")
+                return None
+            if thumbnail.shape != baseline.shape:
+                return None
+            scores.append(self._similarity_score(baseline, thumbnail))
+        return float(min(scores))
+
+    def previous_response(self) -> dict | None:
+        """Response of the last request with the same prompt and sources"""
+        prompt, sources = self._scene_key()
+        baselines = self.hass.data.get(SCENE_DATA, {})
+        last = baselines.get("responses", {}).get(sources)
+        if last is None or last[0] != prompt:
+            return None
+        return last[1]
+
+    async def update_baseline(self, response: dict) -> None:
+        """Remember the frames just analyzed and the response they produced"""
+        if not self.source_frames:
+            return
+        if response.get("response_text") == ERROR_GENERATION_FAILED:
+            return
+        baselines = self.hass.data.setdefault(
+            SCENE_DATA, {"frames": {}, "responses": {}}
+        )
+        for source, frame_bytes in self.source_frames.items():
+            try:
+                baselines["frames"][source] = await self.hass.async_add_executor_job(
+                    self._baseline_thumbnail, frame_bytes
+                )
+            except (UnidentifiedImageError, OSError) as e:
+                _LOGGER.debug(f"Could not store baseline for {source}: {e}")
+                baselines["frames"].pop(source, None)
+        # Only the last response per set of sources is kept, templated prompts
+        # would otherwise add an entry per call
+        prompt, sources = self._scene_key()
+        baselines["responses"][sources] = (prompt, dict(response))
+
     async def _select_keyframe_index(
         self, reference_frame_bytes, candidate_frames_bytes
     ):
@@ -161,6 +294,7 @@ class MediaProcessor:
                 best_idx = idx
         return best_idx
 
+    @traced("resize")
     async def resize_image(
         self, target_width, image_path=None, image_data=None, img=None
     ):
@@ -221,10 +355,13 @@ class MediaProcessor:
 
         return base64_image
 
+    @traced("fetch")
     async def _fetch(
         self, url, target_file=None, max_retries=2, retry_delay=1, entity_name=None
     ):
         """Fetch image from url and return image data"""
+        if entity_name:
+            annotate(camera=entity_name)
         retries = 0
         entity_prefix = f"Camera {entity_name}: " if entity_name else ""
         while retries < max_retries:
@@ -241,6 +378,7 @@ class MediaProcessor:
                     # Just read file into buffer
                     if target_file is None:
                         data = await response.read()
+                        annotate(bytes=len(data), attempts=retries + 1)
                         return data
                     else:  # Save response into file in stream fashion to avoid memory leaks
                         _LOGGER.debug(f"writing response into file {target_file}")
@@ -264,6 +402,65 @@ class MediaProcessor:
             f"{entity_prefix}Failed to fetch {url} after {max_retries} retries"
         )
 
+    @staticmethod
+    def _split_jpeg_frames(data):
+        """Split complete JPEG images off a buffer, returns them and the rest"""
+        frames = []
+        start = 0
+        while True:
+            soi = data.find(b"\xff\xd8", start)
+            eoi = data.find(b"\xff\xd9", soi)
+            if soi == -1 or eoi == -1:
+                break
+            frames.append(data[soi : eoi + 2])
+            start = eoi + 2
+        return frames, data[start:]
+
+    @staticmethod
+    def _select_frames(image_entities, first_frames, camera_frames, max_frames):
+        """Pick the frames of a recording to send
+
+        The first frame of every camera comes first, the remaining slots go to
+        the frames that changed the most, in the order they were captured.
+        Returns (label, frame bytes, SSIM score) tuples.
+        """
+        # Extract frames and their SSIM scores
+        frames_with_scores = []
+        for frame in camera_frames:
+            for frame_name, frame_data in camera_frames[frame].items():
+                frames_with_scores.append(
+                    (
+                        frame_name,
+                        frame_data["frame_data"],
+                        frame_data["ssim_score"],
+                        frame_data["camera_number"],
+                        frame_data["frame_index"],
+                    )
+                )
+
+        # Sort frames by SSIM score
+        frames_with_scores.sort(key=lambda x: x[2])
+
+        # Frame selection: prepend first frames, then best-scored (respect max_frames)
+        selected_frames = []
+        remaining = max(0, max_frames)
+
+        # Prepend first frames in the order of requested entities
+        for entity in image_entities:
+            if remaining <= 0:
+                break
+            if entity in first_frames:
+                label, data = first_frames[entity]
+                selected_frames.append((label, data, None))
+                remaining -= 1
+
+        # Fill remaining slots with best scored frames, then restore stable capture order
+        best_rest = frames_with_scores[:remaining]
+        best_rest.sort(key=lambda x: (x[4], x[3]))
+        for name, data, score, _, _ in best_rest:
+            selected_frames.append((name, data, score))
+        return selected_frames
+
     async def record(
         self,
         image_entities,
@@ -430,11 +627,15 @@ class MediaProcessor:
         _LOGGER.info(f"Recording {camera_names} for {duration} seconds")
 
         # start threads for each camera
-        await asyncio.gather(
-            *(
-                record_camera(image_entity, image_entities.index(image_entity))
-                for image_entity in image_entities
+        with span("record", duration=duration):
+            await asyncio.gather(
+                *(
+                    record_camera(image_entity, image_entities.index(image_entity))
+                    for image_entity in image_entities
+                )
             )
+        MetricsRegistry.get(self.hass).record_frames_captured(
+            sum(len(frames) for frames in camera_frames.values()) + len(first_frames)
         )
 
         # Check if any cameras successfully captured frames
@@ -443,41 +644,9 @@ class MediaProcessor:
                 "No cameras available - all cameras offline or unavailable"
             )
 
-        # Extract frames and their SSIM scores
-        frames_with_scores = []
-        for frame in camera_frames:
-            for frame_name, frame_data in camera_frames[frame].items():
-                frames_with_scores.append(
-                    (
-                        frame_name,
-                        frame_data["frame_data"],
-                        frame_data["ssim_score"],
-                        frame_data["camera_number"],
-                        frame_data["frame_index"],
-                    )
-                )
-
-        # Sort frames by SSIM score
-        frames_with_scores.sort(key=lambda x: x[2])
-
-        # Frame selection: prepend first frames, then best-scored (respect max_frames)
-        selected_frames = []
-        remaining = max(0, max_frames)
-
-        # Prepend first frames in the order of requested entities
-        for entity in image_entities:
-            if remaining <= 0:
-                break
-            if entity in first_frames:
-                label, data = first_frames[entity]
-                selected_frames.append((label, data, None))
-                remaining -= 1
-
-        # Fill remaining slots with best scored frames, then restore stable capture order
-        best_rest = frames_with_scores[:remaining]
-        best_rest.sort(key=lambda x: (x[4], x[3]))
-        for name, data, score, _, _ in best_rest:
-            selected_frames.append((name, data, score))
+        selected_frames = self._select_frames(
+            image_entities, first_frames, camera_frames, max_frames
+        )
 
         # Add selected frames to client
         if selected_frames:
@@ -497,15 +666,16 @@ class MediaProcessor:
                 resized_base64.append(resized_image)
                 self.client.add_frame(base64_image=resized_image, filename=frame_name)
 
-            if expose_images:
-                key_name = selected_frames[key_idx][0]
-                key_b64 = resized_base64[key_idx]
-                await self._expose_image(
-                    frame_name=key_name.split("-")[0],
-                    image_data=key_b64,
-                    uid=str(uuid.uuid4())[:8],
+            # Frames are compared by their position among the frames sent
+            recording = ",".join(image_entities)
+            for index, resized_image in enumerate(resized_base64):
+                self.source_frames[f"{recording}#{index}"] = base64.b64decode(
+                    resized_image
                 )
 
+            if expose_images:
+                await self._expose_image(image_data=resized_base64[key_idx])
+
     async def add_images(
         self, image_entities, image_paths, target_width, include_filename, expose_images
     ):
@@ -541,10 +711,12 @@ class MediaProcessor:
                         _LOGGER.warning(f"Camera {image_entity}: Failed to fetch image")
                         continue
 
+                    MetricsRegistry.get(self.hass).record_frames_captured(1)
                     # If entity snapshot requested, use entity name as 'filename'
                     resized_image = await self.resize_image(
                         target_width=target_width, image_data=image_data
                     )
+                    self.source_frames[image_entity] = base64.b64decode(resized_image)
                     self.client.add_frame(
                         base64_image=resized_image,
                         filename=(
@@ -555,11 +727,7 @@ class MediaProcessor:
                     )
 
                     if expose_images:
-                        await self._expose_image(
-                            frame_name="0",
-                            image_data=resized_image,
-                            uid=str(uuid.uuid4())[:8],
-                        )
+                        await self._expose_image(image_data=resized_image)
 
                     successful_image_entities += 1
 
@@ -596,13 +764,11 @@ class MediaProcessor:
                     )
 
                     self.client.add_frame(base64_image=image_data, filename=filename)
+                    self.source_frames[image_path] = base64.b64decode(image_data)
+                    MetricsRegistry.get(self.hass).record_frames_captured(1)
 
                     if expose_images:
-                        await self._expose_image(
-                            frame_name="0",
-                            image_data=image_data,
-                            uid=str(uuid.uuid4())[:8],
-                        )
+                        await self._expose_image(image_data=image_data)
                 except Exception as e:
                     raise ServiceValidationError(f"Error: {e}")
         return self.client
@@ -746,18 +912,6 @@ class MediaProcessor:
             jpeg_buffer = b""
             first_frame = None
 
-            def find_jpeg_frames(data):
-                frames = []
-                start = 0
-                while True:
-                    soi = data.find(b"\xff\xd8", start)
-                    eoi = data.find(b"\xff\xd9", soi)
-                    if soi == -1 or eoi == -1:
-                        break
-                    frames.append(data[soi : eoi + 2])
-                    start = eoi + 2
-                return frames, data[start:]
-
             try:
                 per_read_timeout = 30  # seconds
                 # Ensure stdout is readable
@@ -782,7 +936,7 @@ class MediaProcessor:
                         break
 
                     jpeg_buffer += chunk
-                    found_frames, jpeg_buffer = find_jpeg_frames(jpeg_buffer)
+                    found_frames, jpeg_buffer = self._split_jpeg_frames(jpeg_buffer)
 
                     for jpeg_data in found_frames:
                         try:
@@ -855,6 +1009,10 @@ class MediaProcessor:
 
             ffmpeg_time = time.monotonic_ns() - ffmpeg_start
             _LOGGER.debug(f"FFmpeg took {ffmpeg_time / 1_000_000:.2f} ms")
+            add_span("ffmpeg", ffmpeg_time / 1e9, frames=len(frames))
+            MetricsRegistry.get(self.hass).record_frames_captured(
+                len(frames) + (first_frame is not None)
+            )
 
             if len(frames) == 0 and first_frame is None:
                 raise ServiceValidationError("No frames extracted from video.")
@@ -903,13 +1061,7 @@ class MediaProcessor:
                 key_idx = await self._select_keyframe_index(
                     reference_bytes, candidate_bytes
                 )
-                # selected_frames items are (frame_bytes, score, original_index)
-                frame_idx_label = (selected_frames[key_idx][2] or 0) + 1
-                await self._expose_image(
-                    frame_name=str(frame_idx_label),
-                    image_data=resized_base64[key_idx],
-                    uid=str(uuid.uuid4())[:8],
-                )
+                await self._expose_image(image_data=resized_base64[key_idx])
         except Exception as e:
             raise ServiceValidationError(f"Error processing video {video_path}: {e}")
 
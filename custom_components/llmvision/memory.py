@@ -3,23 +3,163 @@ from .const import (
     CONF_MEMORY_PATHS,
     CONF_MEMORY_IMAGES_ENCODED,
     CONF_MEMORY_STRINGS,
+    CONF_MEMORY_CAMERAS,
+    CONF_MEMORY_MAX_IMAGES,
     CONF_SYSTEM_PROMPT,
     CONF_TITLE_PROMPT,
     DEFAULT_SYSTEM_PROMPT,
     DEFAULT_TITLE_PROMPT,
 )
+import asyncio
 import base64
+import copy
+import hashlib
 import io
+import itertools
+import json
+import os
 from PIL import Image
 import logging
 
 _LOGGER = logging.getLogger(__name__)
 
+MEMORY_DATA = f"{DOMAIN}_memory"
+MEMORY_DIR = "memory"
+MEMORY_INDEX_FILE = "index.json"
+# Versions of the memory content, unique across Memory instances
+_CONTENT_VERSIONS = itertools.count()
+MEMORY_PROMPT = "The following images along with descriptions serve as reference. They are not to be mentioned in the response."
+
+
+def encode_memory_image(image_path: str) -> bytes:
+    """Resize an image to fit 512x512 and return it as JPEG bytes"""
+    with Image.open(image_path) as img:
+        img.load()
+        # calculate new height and width based on aspect ratio
+        width, height = img.size
+        aspect_ratio = width / height
+        if aspect_ratio > 1:
+            new_width = 512
+            new_height = int(512 / aspect_ratio)
+        else:
+            new_height = 512
+            new_width = int(512 * aspect_ratio)
+        img = img.resize((new_width, new_height))
+
+        # Convert Memory Images to RGB mode if needed
+        if img.mode == "RGBA":
+            img = img.convert("RGB")
+
+        img_byte_arr = io.BytesIO()
+        img.save(img_byte_arr, format="JPEG")
+        return img_byte_arr.getvalue()
+
+
+class MemoryImageStore:
+    """Content-addressed store of encoded memory images
+
+    Encoded images are saved as <sha256>.jpg in the llmvision config directory.
+    An index maps each source path (with its size and mtime) to the digest of its
+    encoded image, so sources are only encoded again when they change. Images
+    read from disk are kept in memory.
+    """
+
+    def __init__(self, hass):
+        self.hass = hass
+        self._dir = os.path.join(hass.config.path(DOMAIN), MEMORY_DIR)
+        self._index: dict[str, dict] | None = None
+        # digest -> base64 encoded image
+        self._images: dict[str, str] = {}
+
+    async def async_get_images(self, paths: list[str]) -> list[str | None]:
+        """Base64 images for paths, None for paths that can't be read"""
+        return await self.hass.async_add_executor_job(self._get_images, list(paths))
+
+    def _get_images(self, paths: list[str]) -> list[str | None]:
+        index = self._load_index()
+        images = []
+        new_index = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                entry = index.get(path)
+                if (
+                    entry is None
+                    or entry["size"] != stat.st_size
+                    or entry["mtime"] != stat.st_mtime
+                ):
+                    entry = {
+                        "size": stat.st_size,
+                        "mtime": stat.st_mtime,
+                        "digest": self._write(encode_memory_image(path)),
+                    }
+                image = self._read(entry["digest"])
+            except (OSError, ValueError) as e:
+                _LOGGER.warning(f"Could not load memory image {path}: {e}")
+                images.append(None)
+                continue
+            new_index[path] = entry
+            images.append(image)
+
+        if new_index != index:
+            self._save_index(new_index)
+        return images
+
+    def _write(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        self._images[digest] = base64.b64encode(data).decode("utf-8")
+        file_path = os.path.join(self._dir, f"{digest}.jpg")
+        if not os.path.exists(file_path):
+            os.makedirs(self._dir, exist_ok=True)
+            with open(file_path, "wb") as f:
+                f.write(data)
+        return digest
+
+    def _read(self, digest: str) -> str:
+        if digest not in self._images:
+            with open(os.path.join(self._dir, f"{digest}.jpg"), "rb") as f:
+                self._images[digest] = base64.b64encode(f.read()).decode("utf-8")
+        return self._images[digest]
+
+    def _load_index(self) -> dict[str, dict]:
+        if self._index is None:
+            try:
+                with open(os.path.join(self._dir, MEMORY_INDEX_FILE), "r") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self, index: dict[str, dict]) -> None:
+        self._index = index
+        os.makedirs(self._dir, exist_ok=True)
+        index_path = os.path.join(self._dir, MEMORY_INDEX_FILE)
+        with open(f"{index_path}.tmp", "w") as f:
+            json.dump(index, f)
+        os.replace(f"{index_path}.tmp", index_path)
+
+        # Remove images no source refers to anymore
+        digests = {entry["digest"] for entry in index.values()}
+        for digest in list(self._images):
+            if digest not in digests:
+                del self._images[digest]
+        for filename in os.listdir(self._dir):
+            if filename.endswith(".jpg") and filename[:-4] not in digests:
+                os.remove(os.path.join(self._dir, filename))
+
 
 class Memory:
     def __init__(self, hass, strings=[], paths=[], system_prompt=None):
         self.hass = hass
         self.entry = self._find_memory_entry()
+        # Provider specific content blocks per selection of memory entries,
+        # built once per memory change
+        self._blocks: dict[tuple, list] = {}
+        self._store: MemoryImageStore | None = None
+        self._lock = asyncio.Lock()
+        # Indices of the entries sent with requests, None for all entries
+        self._selection: tuple[int, ...] | None = None
+        self.max_images = 0
         if self.entry is None:
 
             self._system_prompt = (
@@ -28,6 +168,7 @@ class Memory:
             self._title_prompt = DEFAULT_TITLE_PROMPT
             self.memory_strings = strings
             self.memory_paths = paths
+            self.memory_cameras = []
             self.memory_images = []
 
         else:
@@ -41,20 +182,134 @@ class Memory:
             )
             self.memory_strings = self.entry.data.get(CONF_MEMORY_STRINGS, strings)
             self.memory_paths = self.entry.data.get(CONF_MEMORY_PATHS, paths)
-            self.memory_images = self.entry.data.get(CONF_MEMORY_IMAGES_ENCODED, [])
+            self.memory_cameras = [
+                self._parse_cameras(cameras)
+                for cameras in self.entry.data.get(CONF_MEMORY_CAMERAS) or []
+            ]
+            try:
+                self.max_images = int(self.entry.data.get(CONF_MEMORY_MAX_IMAGES, 0))
+            except (TypeError, ValueError):
+                self.max_images = 0
+            # Loaded from the image store by _update_memory
+            self.memory_images = []
 
         _LOGGER.debug(self)
 
+    @staticmethod
+    def get(hass) -> "Memory":
+        """Return the memory stored in hass.data, creating it if needed"""
+        memory = hass.data.get(MEMORY_DATA)
+        if not isinstance(memory, Memory):
+            memory = Memory(hass)
+            hass.data[MEMORY_DATA] = memory
+        return memory
+
+    def with_system_prompt(self, system_prompt: str) -> "Memory":
+        """Copy sharing images and content blocks, with another system prompt"""
+        memory = copy.copy(self)
+        memory._system_prompt = system_prompt
+        return memory
+
+    def for_entities(self, image_entities: list | None) -> "Memory":
+        """Copy that only sends entries relevant to the analyzed cameras
+
+        Entries tagged with cameras are included if one of their values is part of
+        an entity id in image_entities; untagged entries are always included. With
+        max_images set, entries tagged with the cameras are preferred.
+        """
+        entities = [entity.lower() for entity in image_entities or []]
+        indices = range(len(self.memory_images))
+        if entities:
+            specific = []
+            general = []
+            for index in indices:
+                cameras = (
+                    self.memory_cameras[index]
+                    if index < len(self.memory_cameras)
+                    else []
+                )
+                if not cameras:
+                    general.append(index)
+                elif any(camera in entity for camera in cameras for entity in entities):
+                    specific.append(index)
+            selected = specific + general
+        else:
+            selected = list(indices)
+        if self.max_images > 0:
+            selected = selected[: self.max_images]
+
+        memory = copy.copy(self)
+        # Keep the configured order so the memory block stays a stable prefix
+        memory._selection = tuple(sorted(selected))
+        return memory
+
+    @staticmethod
+    def _parse_cameras(cameras: str) -> list[str]:
+        return [
+            camera.strip().lower()
+            for camera in str(cameras or "").split(",")
+            if camera.strip() and camera.strip() != "*"
+        ]
+
+    @property
+    def memory_strings(self) -> list:
+        return self._memory_strings
+
+    @memory_strings.setter
+    def memory_strings(self, strings: list) -> None:
+        self._memory_strings = strings
+        self._blocks = {}
+        self._version = next(_CONTENT_VERSIONS)
+
+    @property
+    def memory_images(self) -> list:
+        return self._memory_images
+
+    @memory_images.setter
+    def memory_images(self, images: list) -> None:
+        self._memory_images = images
+        self._blocks = {}
+        self._version = next(_CONTENT_VERSIONS)
+
+    @property
+    def content_key(self) -> tuple:
+        """Identifies the memory content sent with requests, changes with it"""
+        return self._version, self._selection
+
+    @property
+    def entries_key(self) -> tuple:
+        """Like content_key, but stable across restarts for persisted keys
+
+        Stored images are identified by their path instead of their content.
+        """
+        return (
+            tuple(self.memory_strings),
+            tuple(self.memory_paths),
+            self._selection,
+            self._system_prompt,
+        )
+
     def _get_memory_images(self, memory_type="OpenAI") -> list:
+        """Memory content in the format of memory_type
+
+        The list is shared by all requests until memory changes, so callers must
+        not modify it.
+        """
+        key = (memory_type, self._selection)
+        if key not in self._blocks:
+            self._blocks[key] = self._build_memory_content(memory_type)
+        return self._blocks[key]
+
+    def _build_memory_content(self, memory_type: str) -> list:
         content = []
-        memory_prompt = "The following images along with descriptions serve as reference. They are not to be mentioned in the response."
+        entries = list(zip(self.memory_strings, self.memory_images))
+        if self._selection is not None:
+            entries = [entries[index] for index in self._selection]
 
         if memory_type == "OpenAI":
-            if self.memory_images:
-                content.append({"type": "text", "text": memory_prompt})
-            for image in self.memory_images:
-                tag = self.memory_strings[self.memory_images.index(image)]
-
+            if entries:
+                content.append({"type": "text", "text": MEMORY_PROMPT})
+            for tag, image in entries:
                 content.append({"type": "text", "text": tag + ":"})
                 content.append(
                     {
@@ -64,11 +319,9 @@ class Memory:
                 )
 
         elif memory_type == "OpenAI-legacy":
-            if self.memory_images:
-                content.append({"type": "text", "text": memory_prompt})
-            for image in self.memory_images:
-                tag = self.memory_strings[self.memory_images.index(image)]
-
+            if entries:
+                content.append({"type": "text", "text": MEMORY_PROMPT})
+            for tag, image in entries:
                 content.append({"type": "text", "text": tag + ":"})
                 content.append(
                     {
@@ -78,21 +331,17 @@ class Memory:
                 )
 
         elif memory_type == "Ollama":
-            if self.memory_images:
-                content.append({"role": "user", "content": memory_prompt})
-            for image in self.memory_images:
-                tag = self.memory_strings[self.memory_images.index(image)]
-
+            if entries:
+                content.append({"role": "user", "content": MEMORY_PROMPT})
+            for tag, image in entries:
                 content.append(
                     {"role": "user", "content": tag + ":", "images": [image]}
                 )
 
         elif memory_type == "Anthropic":
-            if self.memory_images:
-                content.append({"type": "text", "text": memory_prompt})
-            for image in self.memory_images:
-                tag = self.memory_strings[self.memory_images.index(image)]
-
+            if entries:
+                content.append({"type": "text", "text": MEMORY_PROMPT})
+            for tag, image in entries:
                 content.append({"type": "text", "text": tag + ":"})
                 content.append(
                     {
@@ -105,21 +354,17 @@ class Memory:
                     }
                 )
         elif memory_type == "Google":
-            if self.memory_images:
-                content.append({"text": memory_prompt})
-            for image in self.memory_images:
-                tag = self.memory_strings[self.memory_images.index(image)]
-
+            if entries:
+                content.append({"text": MEMORY_PROMPT})
+            for tag, image in entries:
                 content.append({"text": tag + ":"})
                 content.append(
                     {"inline_data": {"mime_type": "image/jpeg", "data": image}}
                 )
         elif memory_type == "AWS":
-            if self.memory_images:
-                content.append({"text": memory_prompt})
-            for image in self.memory_images:
-                tag = self.memory_strings[self.memory_images.index(image)]
-
+            if entries:
+                content.append({"text": MEMORY_PROMPT})
+            for tag, image in entries:
                 content.append({"text": tag + ":"})
                 content.append(
                     {
@@ -154,49 +399,43 @@ class Memory:
 
     async def _encode_images(self, image_paths):
         """Encode images as base64"""
-        encoded_images = []
-
-        for image_path in image_paths:
-            img = await self.hass.loop.run_in_executor(None, Image.open, image_path)
-            with img:
-                await self.hass.loop.run_in_executor(None, img.load)
-                # calculate new height and width based on aspect ratio
-                width, height = img.size
-                aspect_ratio = width / height
-                if aspect_ratio > 1:
-                    new_width = 512
-                    new_height = int(512 / aspect_ratio)
-                else:
-                    new_height = 512
-                    new_width = int(512 * aspect_ratio)
-                img = img.resize((new_width, new_height))
-
-                # Convert Memory Images to RGB mode if needed
-                if img.mode == "RGBA":
-                    img = img.convert("RGB")
-
-                # Encode the image to base64
-                img_byte_arr = io.BytesIO()
-                img.save(img_byte_arr, format="JPEG")
-                base64_image = base64.b64encode(img_byte_arr.getvalue()).decode("utf-8")
-                encoded_images.append(base64_image)
-
-        return encoded_images
+        if self._store is None:
+            self._store = MemoryImageStore(self.hass)
+        return await self._store.async_get_images(image_paths)
 
     async def _update_memory(self):
-        """Manage encoded images"""
-        # check if len(memory_paths) != len(memory_images)
+        """Load memory images from the image store when memory paths change"""
         if self.entry is None:
             _LOGGER.debug("Memory entry not found; skipping memory update.")
             return
 
-        if len(self.memory_paths) != len(self.memory_images):
-            self.memory_images = await self._encode_images(self.memory_paths)
+        async with self._lock:
+            if len(self.memory_paths) != len(self.memory_images):
+                images = await self._encode_images(self.memory_paths)
+                cameras = self.memory_cameras + [[]] * (
+                    len(self.memory_paths) - len(self.memory_cameras)
+                )
+                # Skip images that can't be loaded along with their descriptions
+                loaded = [
+                    (path, string, camera, image)
+                    for path, string, camera, image in zip(
+                        self.memory_paths, self.memory_strings, cameras, images
+                    )
+                    if image is not None
+                ]
+                self.memory_paths = [entry[0] for entry in loaded]
+                self.memory_strings = [entry[1] for entry in loaded]
+                self.memory_cameras = [entry[2] for entry in loaded]
+                self.memory_images = [entry[3] for entry in loaded]
 
-            # update memory with new images
-            memory = self.entry.data.copy()
-            memory["images"] = self.memory_images
-            self.hass.config_entries.async_update_entry(self.entry, data=memory)
+        # Earlier versions kept encoded images in the config entry itself
+        if "images" in self.entry.data or CONF_MEMORY_IMAGES_ENCODED in self.entry.data:
+            data = {
+                key: value
+                for key, value in self.entry.data.items()
+                if key not in ("images", CONF_MEMORY_IMAGES_ENCODED)
+            }
+            self.hass.config_entries.async_update_entry(self.entry, data=data)
 
     def __str__(self):
         return f"Memory({self.memory_strings}, {self.memory_paths}, {len(self.memory_images)})"
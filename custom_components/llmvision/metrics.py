@@ -0,0 +1,264 @@
+"""Aggregated latency, frame, upload and fallback metrics"""
+
+from bisect import bisect_left
+from homeassistant.core import HomeAssistant
+from .cache import ResponseCache
+from .const import DOMAIN, CONF_PROVIDER
+
+METRICS_DATA = f"{DOMAIN}_metrics"
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    20.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Bucketed latencies, memory does not grow with the number of samples"""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        # The last bucket counts samples above the largest bound
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate a quantile by interpolating within its bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    # Unbounded bucket, the largest bound is the best estimate
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def as_dict(self) -> dict:
+        result = {
+            "count": self.count,
+            "errors": self.errors,
+            "sum": round(self.sum, 3),
+        }
+        for q in QUANTILES:
+            value = self.quantile(q)
+            result[f"p{round(q * 100)}"] = round(value, 3) if value is not None else None
+        return result
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+        + "}"
+    )
+
+
+class MetricsRegistry:
+    """Metrics of all service calls and provider requests since startup"""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.services: dict[str, Histogram] = {}
+        self.providers: dict[str, Histogram] = {}
+        self.frames_captured = 0
+        self.frames_sent = 0
+        self.bytes_uploaded: dict[str, int] = {}
+        self.fallbacks = 0
+
+    @staticmethod
+    def get(hass: HomeAssistant) -> "MetricsRegistry":
+        """Return the registry stored in hass.data, creating it if needed"""
+        registry = hass.data.get(METRICS_DATA)
+        if not isinstance(registry, MetricsRegistry):
+            registry = MetricsRegistry(hass)
+            hass.data[METRICS_DATA] = registry
+        return registry
+
+    def record_call(self, service: str, duration: float, failed: bool = False) -> None:
+        """Add the end-to-end latency of a service call"""
+        histogram = self.services.setdefault(service, Histogram())
+        histogram.observe(duration)
+        if failed:
+            histogram.errors += 1
+
+    def record_request(
+        self, entry_id: str, duration: float, frames: int, failed: bool = False
+    ) -> None:
+        """Add the latency of a vision request and the frames it sent"""
+        histogram = self.providers.setdefault(entry_id, Histogram())
+        if failed:
+            histogram.errors += 1
+        else:
+            histogram.observe(duration)
+        self.frames_sent += frames
+
+    def record_frames_captured(self, frames: int) -> None:
+        self.frames_captured += frames
+
+    def record_upload(self, entry_id: str, size: int) -> None:
+        self.bytes_uploaded[entry_id] = self.bytes_uploaded.get(entry_id, 0) + size
+
+    def record_fallback(self) -> None:
+        self.fallbacks += 1
+
+    @property
+    def fallback_rate(self) -> float | None:
+        """Fallbacks per service call"""
+        calls = sum(histogram.count for histogram in self.services.values())
+        return round(self.fallbacks / calls, 4) if calls else None
+
+    def _provider_name(self, entry_id: str) -> str:
+        data = (self.hass.data.get(DOMAIN) or {}).get(entry_id) or {}
+        return data.get(CONF_PROVIDER) or ""
+
+    def as_dict(self) -> dict:
+        cache = ResponseCache.get(self.hass)
+        return {
+            "services": {
+                service: histogram.as_dict()
+                for service, histogram in self.services.items()
+            },
+            "providers": {
+                entry_id: {
+                    "provider": self._provider_name(entry_id),
+                    "bytes_uploaded": self.bytes_uploaded.get(entry_id, 0),
+                    **histogram.as_dict(),
+                }
+                for entry_id, histogram in self.providers.items()
+            },
+            "frames_captured": self.frames_captured,
+            "frames_sent": self.frames_sent,
+            "bytes_uploaded": sum(self.bytes_uploaded.values()),
+            "cache_hits": cache.hits if cache else 0,
+            "cache_misses": cache.misses if cache else 0,
+            "fallbacks": self.fallbacks,
+            "fallback_rate": self.fallback_rate,
+        }
+
+    def prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        lines: list[str] = []
+
+        def _histogram(name: str, help_text: str, histograms: dict, label: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, histogram in histograms.items():
+                labels = {label: key}
+                if label == "entry_id":
+                    labels["provider"] = self._provider_name(key)
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    bucket = _labels(**labels, le=f"{bound:g}")
+                    lines.append(f"{name}_bucket{bucket} {cumulative}")
+                bucket = _labels(**labels, le="+Inf")
+                lines.append(f"{name}_bucket{bucket} {histogram.count}")
+                lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+        def _counter(name: str, help_text: str, values: dict[str, int | float]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in values.items():
+                lines.append(f"{name}{labels} {value}")
+
+        _histogram(
+            "llmvision_service_duration_seconds",
+            "End-to-end latency of analyzer service calls",
+            self.services,
+            "service",
+        )
+        _counter(
+            "llmvision_service_errors_total",
+            "Analyzer service calls that failed",
+            {
+                _labels(service=service): histogram.errors
+                for service, histogram in self.services.items()
+            },
+        )
+        _histogram(
+            "llmvision_provider_request_duration_seconds",
+            "Latency of successful vision requests per provider entry",
+            self.providers,
+            "entry_id",
+        )
+        _counter(
+            "llmvision_provider_request_errors_total",
+            "Vision requests that failed per provider entry",
+            {
+                _labels(entry_id=entry_id, provider=self._provider_name(entry_id)): (
+                    histogram.errors
+                )
+                for entry_id, histogram in self.providers.items()
+            },
+        )
+        _counter(
+            "llmvision_upload_bytes_total",
+            "Approximate request payload bytes sent per provider entry",
+            {
+                _labels(entry_id=entry_id, provider=self._provider_name(entry_id)): size
+                for entry_id, size in self.bytes_uploaded.items()
+            },
+        )
+        cache = ResponseCache.get(self.hass)
+        for name, help_text, value in (
+            (
+                "llmvision_frames_captured_total",
+                "Frames fetched from cameras or extracted from videos",
+                self.frames_captured,
+            ),
+            (
+                "llmvision_frames_sent_total",
+                "Frames sent to providers",
+                self.frames_sent,
+            ),
+            (
+                "llmvision_cache_hits_total",
+                "Calls answered from the response cache",
+                cache.hits if cache else 0,
+            ),
+            (
+                "llmvision_cache_misses_total",
+                "Calls not found in the response cache",
+                cache.misses if cache else 0,
+            ),
+            (
+                "llmvision_fallbacks_total",
+                "Requests retried with a fallback provider",
+                self.fallbacks,
+            ),
+        ):
+            _counter(name, help_text, {"": value})
+        return "\n".join(lines) + "\n"
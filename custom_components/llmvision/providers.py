@@ -1,12 +1,17 @@
 from abc import ABC, abstractmethod
-from aiohttp import ClientTimeout
-import boto3
+from aiohttp import ClientConnectionError, ClientTimeout
+from dataclasses import dataclass
 from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.core import HomeAssistant
-from functools import partial
-from typing import Any, cast
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, cast
+from urllib.parse import quote
+import asyncio
+import copy
 import logging
+import random
+import time
 import inspect
 import re
 import json
@@ -26,11 +31,14 @@ from .const import (
     CONF_AWS_ACCESS_KEY_ID,
     CONF_AWS_SECRET_ACCESS_KEY,
     CONF_AWS_REGION_NAME,
+    CONF_AWS_STREAM,
     VERSION_ANTHROPIC,
     ENDPOINT_OPENAI,
     ENDPOINT_AZURE,
     ENDPOINT_ANTHROPIC,
+    ENDPOINT_AWS_BEDROCK,
     ENDPOINT_GOOGLE,
+    ENDPOINT_GOOGLE_CACHE,
     ENDPOINT_LOCALAI,
     ENDPOINT_OLLAMA,
     ENDPOINT_OPENWEBUI,
@@ -39,6 +47,7 @@ from .const import (
     ERROR_NOT_CONFIGURED,
     ERROR_GROQ_MULTIPLE_IMAGES,
     ERROR_NO_IMAGE_INPUT,
+    ERROR_GENERATION_FAILED,
     DEFAULT_OPENAI_MODEL,
     DEFAULT_ANTHROPIC_MODEL,
     DEFAULT_AZURE_MODEL,
@@ -58,15 +67,77 @@ from .const import (
     CONF_THINK,
     CONF_REASONING_EFFORT,
     CONF_REQUEST_TIMEOUT,
+    CONF_MAX_RETRIES,
+    CONF_FALLBACK_PROVIDER,
+    CONF_FALLBACK_PROVIDERS,
+    CONF_FALLBACK_SORT_BY_LATENCY,
+    CONF_HEDGE_REQUESTS,
+    CONF_HEDGE_PERCENTILE,
+    CONF_HEDGE_MIN_DELAY,
+    CONF_BATCH_WINDOW,
+    CONF_CASCADE_PROVIDER,
+    CONF_CASCADE_CONFIDENCE,
+    CONF_CASCADE_TRIAGE_FRAMES,
+    CASCADE_TRIAGE_PROMPT,
+    CASCADE_TRIAGE_STRUCTURE,
     CONF_SYSTEM_PROMPT,
     CONF_TITLE_PROMPT,
     DEFAULT_SYSTEM_PROMPT,
     DEFAULT_TITLE_PROMPT,
     GLIMPSE_V1_INSTRUCTIONS,
+    GLIMPSE_NO_ACTIVITY_TITLE,
 )
+from .aws import EventStreamDecoder, SigV4Signer
+from .batching import RequestBatcher
+from .cache import ResponseCache
+from .health import HealthRegistry
+from .metrics import MetricsRegistry
+from .scheduler import AdmissionControl, RequestContext, request_context, PRIORITIES
+from .tracing import annotate, span
+from .usage import UsageRegistry, summarize
+from .warmup import WarmupRegistry
 
 _LOGGER = logging.getLogger(__name__)
 
+def _payload_size(data: Any) -> int:
+    """Approximate size of data serialized as JSON, without serializing it"""
+    if isinstance(data, str):
+        return len(data) + 2
+    if isinstance(data, dict):
+        return sum(len(str(key)) + 4 + _payload_size(v) for key, v in data.items())
+    if isinstance(data, (list, tuple)):
+        return sum(_payload_size(item) + 1 for item in data) + 2
+    return len(str(data))
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Backoff of Provider._post for transient failures
+
+    Args:
+        base_delay (float): Seconds before the first retry, doubled for each retry
+        max_delay (float): Upper bound of a single backoff
+        statuses (tuple): HTTP statuses worth retrying
+    """
+
+    base_delay: float = 1.0
+    max_delay: float = 20.0
+    statuses: tuple[int, ...] = (429, 500, 502, 503, 504)
+
+    def backoff(self, retry: int, retry_after: float | None = None) -> float:
+        """Seconds to wait before retry number retry (full jitter)"""
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (retry - 1))
+        )
+
+
+# Lifetime of Gemini cached contents holding the memory prefix
+GOOGLE_CACHE_TTL = 3600
+
+PROVIDER_DATA = f"{DOMAIN}_providers"
+
 
 class Request:
 
@@ -78,6 +149,14 @@ class Request:
         self.temperature = temperature
         self.base64_images = []
         self.filenames = []
+        # Time spent waiting for admission by all provider requests of this call
+        self.queue_waits: list[float] = []
+        # Prompt tokens read from provider prompt caches by this call
+        self.cached_token_counts: list[int] = []
+        # Status of every retried provider request of this call
+        self.retry_statuses: list[int] = []
+        # Token usage of every provider request of this call
+        self.usage_records: list[dict] = []
 
     @staticmethod
     def sanitize_data(data):
@@ -151,11 +230,231 @@ class Request:
         if not call.provider:
             raise ServiceValidationError(ERROR_NOT_CONFIGURED)
 
-    async def call(self, call: Any, _is_fallback_retry: bool = False):
+    async def call(self, call: Any):
         """
         Forwards a request to the specified provider and optionally generates a title.
+        Near-identical requests are answered from the response cache if enabled.
+        """
+        cache = ResponseCache.get(self.hass)
+        if cache is None:
+            return await self._dispatch(call)
+
+        with span("cache_lookup"):
+            hashes = await cache.async_hash_frames(self.base64_images)
+            cached = None
+            if hashes:
+                text_key = self._get_cache_key(call)
+                cached = await cache.async_lookup(text_key, hashes)
+            annotate(hit=cached is not None)
+        if not hashes:
+            return await self._dispatch(call)
+        if cached is not None:
+            _LOGGER.debug("Response served from cache")
+            cached["cached"] = True
+            self._add_stats(cached)
+            return cached
+
+        result = await self._dispatch(call)
+        if result.get("response_text") != ERROR_GENERATION_FAILED:
+            # Statistics of this call are not part of the cached response
+            stats = ("cached", "queue_wait", "cached_tokens", "retries", "usage")
+            await cache.async_store(
+                text_key,
+                hashes,
+                {
+                    key: value
+                    for key, value in result.items()
+                    if key not in stats and key != "batched"
+                },
+            )
+        result["cached"] = False
+        return result
+
+    def _get_cache_key(self, call: Any) -> str:
+        """Digest of the request inputs besides the frames"""
+        settings = {}
+        for _, data in (self.hass.data.get(DOMAIN) or {}).items():
+            if data.get(CONF_PROVIDER) == "Settings":
+                settings = data
+                break
+        memory = getattr(call, "memory", None)
+        use_memory = bool(getattr(call, "use_memory", False))
+        return ResponseCache.text_key(
+            call.provider,
+            getattr(call, "model", None) or self.get_default_model(call.provider),
+            settings.get(CONF_SYSTEM_PROMPT, DEFAULT_SYSTEM_PROMPT),
+            call.message,
+            getattr(call, "response_format", "text"),
+            getattr(call, "structure", None),
+            bool(getattr(call, "generate_title", False)),
+            getattr(call, "title_field", None),
+            use_memory,
+            getattr(memory, "entries_key", None) if use_memory else None,
+            self.filenames if getattr(call, "include_filename", False) else None,
+            getattr(call, "image_entities", None),
+        )
+
+    def _get_settings_entry(self) -> dict | None:
+        """Data of the Settings config entry"""
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            if entry.data.get("provider") == "Settings":
+                return entry.data
+        return None
+
+    async def _dispatch(self, call: Any) -> dict:
+        """Batch the request with concurrent ones if enabled, otherwise send it"""
+        settings = self._get_settings_entry() or {}
+        try:
+            window = float(settings.get(CONF_BATCH_WINDOW, 0) or 0) / 1000
+        except (TypeError, ValueError):
+            window = 0
+        if window > 0 and RequestBatcher.can_batch(self, call):
+            batcher = RequestBatcher.get(self.hass)
+            # Triage first so only escalated events are batched
+            return await self._cascade_call(
+                call, send=lambda escalated: batcher.submit(self, escalated, window)
+            )
+        return await self._cascade_call(call)
+
+    async def _cascade_call(
+        self, call: Any, send: Callable[[Any], Awaitable[dict]] | None = None
+    ) -> dict:
+        """Let a local model triage the event before asking the call's provider.
+
+        The triage provider sees a few of the frames. Only events it finds
+        interesting, or is not confident about, are escalated to the call's
+        provider with all frames, using send (default: _call). The result records
+        which tier answered.
         """
+        send = send or self._call
+        settings = self._get_settings_entry() or {}
+        triage_provider = settings.get(CONF_CASCADE_PROVIDER)
+        if not triage_provider or triage_provider not in (
+            self.hass.data.get(DOMAIN) or {}
+        ):
+            return await send(call)
+        if triage_provider == call.provider:
+            result = await send(call)
+            result["tier"] = "local"
+            return result
+        # The triage answer can't follow the requested structure
+        if call.response_format == "json" or not HealthRegistry.get(
+            self.hass
+        ).is_available(triage_provider):
+            result = await send(call)
+            result["tier"] = "cloud"
+            return result
+
+        triage_call = copy.copy(call)
+        triage_call.provider = triage_provider
+        triage_call.model = None
+        triage_call.message = CASCADE_TRIAGE_PROMPT + call.message
+        triage_call.response_format = "json"
+        triage_call.structure = CASCADE_TRIAGE_STRUCTURE
+        triage_call.title_field = "title"
+        triage_call.generate_title = False
+
+        base64_images, filenames = self.base64_images, self.filenames
+        indices = self._triage_indices(
+            len(base64_images), int(settings.get(CONF_CASCADE_TRIAGE_FRAMES, 2))
+        )
+        self.base64_images = [base64_images[i] for i in indices]
+        if len(filenames) == len(base64_images):
+            self.filenames = [filenames[i] for i in indices]
+        try:
+            with span("triage", provider=triage_provider):
+                triage = await self._call(triage_call, fallback=False)
+        except ServiceValidationError as e:
+            _LOGGER.warning(f"Triage by {triage_provider} failed: {e}")
+            triage = {}
+        finally:
+            self.base64_images, self.filenames = base64_images, filenames
+
+        interesting, confidence, title, description = self._triage_verdict(
+            triage, triage_call
+        )
+        threshold = float(settings.get(CONF_CASCADE_CONFIDENCE, 0.7))
+        if (
+            not interesting
+            and description is not None
+            and confidence is not None
+            and confidence >= threshold
+        ):
+            _LOGGER.info(
+                f"Triage found nothing of interest (confidence {confidence}), "
+                "not escalating"
+            )
+            result = {}
+            if call.generate_title and title:
+                result["title"] = re.sub(r"[^a-zA-Z0-9À-ÖØ-öø-ɏ\s]", "", title)
+            result["response_text"] = description
+            result["tier"] = "local"
+            result["triage_confidence"] = confidence
+            self._add_stats(result)
+            return result
+
+        _LOGGER.debug(
+            f"Escalating to {call.provider} (interesting: {interesting}, "
+            f"confidence: {confidence})"
+        )
+        result = await send(call)
+        result["tier"] = "cloud"
+        result["triage_confidence"] = confidence
+        return result
+
+    @staticmethod
+    def _triage_indices(count: int, frames: int) -> list[int]:
+        """Evenly spaced indices of the frames shown to the triage model"""
+        if frames <= 0 or count <= frames:
+            return list(range(count))
+        if frames == 1:
+            return [0]
+        return sorted({round(i * (count - 1) / (frames - 1)) for i in range(frames)})
+
+    def _triage_verdict(
+        self, triage: dict, triage_call: Any
+    ) -> tuple[bool, float | None, str | None, str | None]:
+        """Whether the triage found the event interesting and how confident it is"""
+        if triage.get("response_text") == ERROR_GENERATION_FAILED:
+            return True, None, None, None
+        # Glimpse ignores the triage prompt but reports empty scenes by title
+        if triage_call.model_is_glimpse():
+            title = triage.get("title")
+            description = triage.get("response_text")
+            quiet = (title or "").strip().lower() == GLIMPSE_NO_ACTIVITY_TITLE.lower()
+            return not quiet, 1.0 if title else None, title, description
+
+        verdict = triage.get("structured_response")
+        if not isinstance(verdict, dict):
+            try:
+                verdict = json.loads(self.heal_json(triage.get("response_text")))
+            except (TypeError, ValueError):
+                verdict = None
+        if not isinstance(verdict, dict):
+            return True, None, None, None
+        try:
+            confidence = float(verdict.get("confidence"))
+        except (TypeError, ValueError):
+            confidence = None
+        description = verdict.get("description")
+        return (
+            bool(verdict.get("interesting", True)),
+            confidence,
+            verdict.get("title"),
+            str(description) if description is not None else None,
+        )
+
+    async def _call(
+        self,
+        call: Any,
+        _is_fallback_retry: bool = False,
+        _tried: set | None = None,
+        fallback: bool = True,
+    ):
+        """Forward the request, walking the fallback chain on failure"""
         entry_id = call.provider
+        tried = _tried if _tried is not None else set()
+        tried.add(entry_id)
         domain_data = self.hass.data.get(DOMAIN) or {}
         config = domain_data.get(entry_id)
         if config is None:
@@ -174,50 +473,81 @@ class Request:
         call.filenames = self.filenames
 
         self.validate(call)
-
-        # Get fallback provider from settings
-        settings_entry = None
-        for entry in self.hass.config_entries.async_entries(DOMAIN):
-            if entry.data.get("provider") == "Settings":
-                settings_entry = entry.data
-                break
-        fallback_provider = (
-            settings_entry.get("fallback_provider", None) if settings_entry else None
-        )
-        _LOGGER.debug("Fallback provider: %s", fallback_provider)
-
-        # Instantiate via factory
         if not isinstance(call.model, str):
             raise ServiceValidationError("invalid_model")
+
+        # Get fallback chain from settings
+        settings_entry = self._get_settings_entry()
+        fallback_chain = self._get_fallback_chain(settings_entry) if fallback else []
+        _LOGGER.debug("Fallback chain: %s", fallback_chain)
+
+        # Skip providers whose circuit breaker is open if another one is available
+        health = HealthRegistry.get(self.hass)
+        if not health.allow_request(entry_id):
+            next_provider = self._next_fallback(fallback_chain, tried)
+            if next_provider:
+                _LOGGER.info(
+                    f"Circuit breaker for {provider_name} is open, "
+                    f"using fallback provider: {next_provider}"
+                )
+                call.provider = next_provider
+                call.model = None
+                MetricsRegistry.get(self.hass).record_fallback()
+                return await self._call(call, _is_fallback_retry=True, _tried=tried)
+            _LOGGER.warning(
+                f"Circuit breaker for {provider_name} is open and no fallback "
+                "is available, trying anyway"
+            )
+
+        # Reuse the provider instance of this entry and model
         try:
-            provider_instance = ProviderFactory.create(
-                hass=self.hass,
-                provider_name=provider_name,
-                config=config,
-                model=call.model,
+            provider_instance = ProviderRegistry.get(self.hass).get_provider(
+                entry_id, provider_name, config, call.model
             )
         except Exception as e:
             _LOGGER.error(f"Provider factory failed for {provider_name}: {e}")
+            health.release(entry_id)
             raise ServiceValidationError("invalid_provider")
 
+        hedge_provider = None
+        if (
+            settings_entry
+            and settings_entry.get(CONF_HEDGE_REQUESTS, False)
+            and not _is_fallback_retry
+        ):
+            hedge_provider = self._next_fallback(fallback_chain, tried)
+
         try:
             # Make call to provider
-            response_text = await provider_instance.vision_request(call)
+            if hedge_provider is not None:
+                (
+                    response_text,
+                    provider_instance,
+                    provider_name,
+                ) = await self._hedged_vision_request(
+                    call,
+                    provider_instance,
+                    provider_name,
+                    hedge_provider,
+                    self._get_hedge_delay(settings_entry, entry_id),
+                    tried,
+                )
+            else:
+                response_text = await self._timed_vision_request(
+                    provider_instance, call
+                )
         except Exception as e:
             _LOGGER.error(f"Provider {provider_name} failed: {e}")
-            # Try fallback if configured and not already tried
-            if (
-                fallback_provider
-                and fallback_provider != "no_fallback"
-                and not _is_fallback_retry
-                and fallback_provider != call.provider
-            ):
-                _LOGGER.info(f"Trying fallback provider: {fallback_provider}")
-                call.provider = fallback_provider
+            # Try the next fallback provider that has not been tried yet
+            next_provider = self._next_fallback(fallback_chain, tried)
+            if next_provider:
+                _LOGGER.info(f"Trying fallback provider: {next_provider}")
+                call.provider = next_provider
                 call.model = None
-                return await self.call(call, _is_fallback_retry=True)
+                MetricsRegistry.get(self.hass).record_fallback()
+                return await self._call(call, _is_fallback_retry=True, _tried=tried)
             else:
-                response_text = "Couldn't generate content. Check logs for details."
+                response_text = ERROR_GENERATION_FAILED
         # Handle Glimpse-v1 responses
         try:
             _LOGGER.debug(
@@ -237,6 +567,7 @@ class Request:
                             )
                         if desc_val is not None:
                             result["response_text"] = str(desc_val)
+                        self._add_stats(result)
                         return result
                 except Exception as e:
                     _LOGGER.debug(f"Ollama Glimpse JSON parse failed: {e}")
@@ -260,20 +591,18 @@ class Request:
                     + "Create a title for this text: "
                     + response_text
                 )
-                gen_title = await provider_instance.title_request(call)
+                gen_title = await self._title_request(provider_instance, call)
         except Exception as e:
             _LOGGER.error(f"Provider {provider_name} failed to generate title: {e}")
-            # Try fallback if configured and not already tried
-            if (
-                fallback_provider
-                and fallback_provider != "no_fallback"
-                and not _is_fallback_retry
-                and fallback_provider != call.provider
-            ):
-                _LOGGER.info(f"Trying fallback provider for title: {fallback_provider}")
-                call.provider = fallback_provider
+            health.record_failure(call.provider)
+            # Try the next fallback provider that has not been tried yet
+            next_provider = self._next_fallback(fallback_chain, tried)
+            if next_provider:
+                _LOGGER.info(f"Trying fallback provider for title: {next_provider}")
+                call.provider = next_provider
                 call.model = None
-                return await self.call(call, _is_fallback_retry=True)
+                MetricsRegistry.get(self.hass).record_fallback()
+                return await self._call(call, _is_fallback_retry=True, _tried=tried)
             else:
                 gen_title = "Event Detected"
 
@@ -299,8 +628,221 @@ class Request:
         else:
             result["response_text"] = response_text
 
+        self._add_stats(result)
         return result
 
+    def _get_fallback_chain(self, settings: dict | None) -> list[str]:
+        """Ordered fallback providers from the Settings entry.
+
+        The fallback provider comes first, followed by any additional fallback
+        providers. Optionally sorted by the median latency observed for each.
+        """
+        if not settings:
+            return []
+        chain = [settings.get(CONF_FALLBACK_PROVIDER)] + list(
+            settings.get(CONF_FALLBACK_PROVIDERS) or []
+        )
+        domain_data = self.hass.data.get(DOMAIN) or {}
+        chain = [
+            entry_id
+            for entry_id in dict.fromkeys(chain)
+            if entry_id and entry_id != "no_fallback" and entry_id in domain_data
+        ]
+        if settings.get(CONF_FALLBACK_SORT_BY_LATENCY, False):
+            health = HealthRegistry.get(self.hass)
+
+            def _latency(entry_id):
+                latency = health.percentile(entry_id, 50)
+                return latency if latency is not None else float("inf")
+
+            chain.sort(key=_latency)
+        return chain
+
+    def _next_fallback(self, chain: list[str], tried: set) -> str | None:
+        """First provider in the chain that was not tried and whose breaker is closed"""
+        health = HealthRegistry.get(self.hass)
+        for entry_id in chain:
+            if entry_id not in tried and health.is_available(entry_id):
+                return entry_id
+        return None
+
+    def _get_hedge_delay(self, settings: dict, entry_id: str) -> float:
+        """Seconds to wait for the primary before also asking the fallback provider.
+
+        Uses the configured percentile of recent latencies for the primary, but never
+        less than the configured minimum delay (also used until enough samples exist).
+        """
+        try:
+            min_delay = float(settings.get(CONF_HEDGE_MIN_DELAY, 3))
+        except (TypeError, ValueError):
+            min_delay = 3.0
+        try:
+            pct = float(settings.get(CONF_HEDGE_PERCENTILE, 95))
+        except (TypeError, ValueError):
+            pct = 95.0
+        observed = HealthRegistry.get(self.hass).percentile(entry_id, pct)
+        if observed is None:
+            return min_delay
+        return max(min_delay, observed)
+
+    async def _timed_vision_request(self, provider_instance, call: Any) -> str:
+        """Run a vision request and record the outcome in the provider's health"""
+        health = HealthRegistry.get(self.hass)
+        entry_id = call.provider
+        metrics = MetricsRegistry.get(self.hass)
+        frames = len(self.base64_images)
+        start = time.monotonic()
+        token = self._set_request_context(call)
+        try:
+            with span("vision_request", provider=entry_id, model=call.model):
+                response_text = await provider_instance.vision_request(call)
+        except asyncio.CancelledError:
+            health.release(entry_id)
+            raise
+        except Exception:
+            health.record_failure(entry_id)
+            metrics.record_request(entry_id, time.monotonic() - start, frames, True)
+            raise
+        finally:
+            request_context.reset(token)
+        duration = time.monotonic() - start
+        health.record_success(entry_id, duration)
+        metrics.record_request(entry_id, duration, frames)
+        return response_text
+
+    async def _title_request(self, provider_instance, call: Any) -> str:
+        token = self._set_request_context(call)
+        try:
+            with span("title_request", provider=call.provider, model=call.model):
+                return await provider_instance.title_request(call)
+        finally:
+            request_context.reset(token)
+
+    def _set_request_context(self, call: Any):
+        """Apply admission control of the call's provider to requests made from here"""
+        priority = getattr(call, "priority", None)
+        return request_context.set(
+            RequestContext(
+                entry_id=call.provider,
+                priority=PRIORITIES.get(
+                    priority if isinstance(priority, str) else "normal",
+                    PRIORITIES["normal"],
+                ),
+                waits=self.queue_waits,
+                cached_tokens=self.cached_token_counts,
+                retries=self.retry_statuses,
+                usage=self.usage_records,
+            )
+        )
+
+    @property
+    def queue_wait(self) -> float:
+        """Total seconds this call waited for admission"""
+        return round(sum(self.queue_waits), 3)
+
+    @property
+    def cached_tokens(self) -> int:
+        """Total prompt tokens this call read from provider prompt caches"""
+        return sum(self.cached_token_counts)
+
+    @property
+    def retries(self) -> int:
+        """Number of provider requests of this call that were retried"""
+        return len(self.retry_statuses)
+
+    @property
+    def usage(self) -> dict:
+        """Tokens, server time and cost of all provider requests of this call"""
+        return summarize(self.usage_records)
+
+    def _add_stats(self, result: dict) -> None:
+        """Add the statistics of this call to a result"""
+        result["queue_wait"] = self.queue_wait
+        result["cached_tokens"] = self.cached_tokens
+        result["retries"] = self.retries
+        result["usage"] = self.usage
+
+    async def _hedged_vision_request(
+        self,
+        call: Any,
+        provider_instance,
+        provider_name: str,
+        fallback_provider: str,
+        delay: float,
+        tried: set,
+    ):
+        """Race the primary against the fallback provider once delay seconds pass.
+
+        The first successful answer wins and the other request is cancelled. Returns
+        (response_text, provider_instance, provider_name) of the winner and adds the
+        fallback to tried once it was fired. Raises the last error if all fail.
+        """
+        primary_task = asyncio.ensure_future(
+            self._timed_vision_request(provider_instance, call)
+        )
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=delay)
+        except asyncio.CancelledError:
+            primary_task.cancel()
+            raise
+        if done:
+            return primary_task.result(), provider_instance, provider_name
+
+        health = HealthRegistry.get(self.hass)
+        hedge_call = copy.copy(call)
+        hedge_call.provider = fallback_provider
+        hedge_call.model = self.get_default_model(fallback_provider)
+        hedge_name = Request.get_provider(self.hass, fallback_provider)
+        hedge_config = (self.hass.data.get(DOMAIN) or {}).get(fallback_provider)
+        if not health.allow_request(fallback_provider):
+            return await primary_task, provider_instance, provider_name
+        tried.add(fallback_provider)
+        try:
+            hedge_instance = ProviderRegistry.get(self.hass).get_provider(
+                fallback_provider, hedge_name, hedge_config, hedge_call.model
+            )
+        except Exception as e:
+            _LOGGER.warning(f"Could not create hedge provider {hedge_name}: {e}")
+            health.release(fallback_provider)
+            return await primary_task, provider_instance, provider_name
+
+        _LOGGER.info(
+            f"{provider_name} has not answered after {delay:.1f}s, "
+            f"hedging with {hedge_name}"
+        )
+        hedge_task = asyncio.ensure_future(
+            self._timed_vision_request(hedge_instance, hedge_call)
+        )
+        contenders = {
+            primary_task: (call, provider_instance, provider_name),
+            hedge_task: (hedge_call, hedge_instance, hedge_name),
+        }
+        pending = set(contenders)
+        last_error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    error = task.exception()
+                    winner_call, winner_instance, winner_name = contenders[task]
+                    if error is not None:
+                        _LOGGER.warning(
+                            f"Hedged request to {winner_name} failed: {error}"
+                        )
+                        last_error = error
+                        continue
+                    _LOGGER.debug(f"Hedged request answered by {winner_name}")
+                    # Continue (e.g. title generation) with the provider that answered
+                    call.provider = winner_call.provider
+                    call.model = winner_call.model
+                    return task.result(), winner_instance, winner_name
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error or ServiceValidationError("Hedged request failed")
+
     def add_frame(self, base64_image, filename):
         self.base64_images.append(base64_image)
         self.filenames.append(filename)
@@ -415,6 +957,8 @@ class Provider(ABC):
         endpoint (dict, optional): Endpoint configuration for the provider
     """
 
+    retry_policy = RetryPolicy()
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -495,6 +1039,17 @@ class Provider(ABC):
                 return data.get(CONF_TITLE_PROMPT, DEFAULT_TITLE_PROMPT)
         return DEFAULT_TITLE_PROMPT
 
+    def _resolve_max_retries(self) -> int:
+        """Resolve how often transient failures are retried from the Settings entry"""
+        domain_data = self.hass.data.get(DOMAIN) or {}
+        for _, data in domain_data.items():
+            if data.get(CONF_PROVIDER) == "Settings":
+                try:
+                    return max(0, int(data.get(CONF_MAX_RETRIES, 2)))
+                except (TypeError, ValueError):
+                    return 2
+        return 2
+
     def _resolve_request_timeout(self) -> int:
         """Resolve request timeout (seconds) from the Settings config entry stored in hass.data."""
         domain_data = self.hass.data.get(DOMAIN) or {}
@@ -509,7 +1064,8 @@ class Provider(ABC):
         return 60
 
     async def vision_request(self, call: dict) -> str:
-        data = self._prepare_vision_data(call)
+        with span("payload"):
+            data = self._prepare_vision_data(call)
         return await self._make_request(data)
 
     async def title_request(self, call: Any) -> str:
@@ -517,34 +1073,217 @@ class Provider(ABC):
             call["max_tokens"] = 4096
         else:
             call.max_tokens = 4096
-        data = self._prepare_text_data(call)
+        with span("payload"):
+            data = self._prepare_text_data(call)
         return await self._make_request(data)
 
-    async def _post(self, url: str, headers: dict, data: dict) -> dict:
-        """Post data to url and return response data"""
+    async def _post(
+        self,
+        url: str,
+        headers: dict,
+        data: dict,
+        body: bytes | None = None,
+        read_response: Callable[[Any], Awaitable[Any]] | None = None,
+    ) -> dict:
+        """Post data to url and return response data
+
+        Args:
+            body (bytes, optional): Serialized data to send as is (e.g. when signed)
+            read_response (callable, optional): Reads a successful response
+                instead of response.json()
+        """
         _LOGGER.debug(f"Request data: {Request.sanitize_data(data)}")
         # Sanitize url
         san_url = re.sub(r"\?key=[^&]*", "", url)
-        try:
-            _LOGGER.debug(f"Posting to {san_url}")
-            response = await self.session.post(
-                url,
-                headers=headers,
-                json=data,
-                timeout=ClientTimeout(total=self.request_timeout),
-            )
-        except Exception as e:
-            raise ServiceValidationError(f"Request failed: {e}")
+        # Admission control applies to requests made on behalf of a service call
+        context = request_context.get()
+        scheduler = (
+            AdmissionControl.get(self.hass).for_entry(context.entry_id)
+            if context
+            else None
+        )
+        deadline = time.monotonic() + self.request_timeout
+        max_retries = self._resolve_max_retries()
+        payload = {"json": data} if body is None else {"data": body}
+        size = len(body) if body is not None else _payload_size(data)
+        retry = 0
+        delay = 0.0
+        while True:
+            if delay:
+                await asyncio.sleep(delay)
+            if scheduler and context:
+                with span("queue"):
+                    context.waits.append(await scheduler.acquire(context.priority))
+            remaining = deadline - time.monotonic()
+            try:
+                try:
+                    _LOGGER.debug(f"Posting to {san_url}")
+                    # Upload and time to the response headers (incl. model time)
+                    with span("http", attempt=retry + 1) as attempt:
+                        response = await self.session.post(
+                            url,
+                            headers=headers,
+                            timeout=ClientTimeout(total=max(remaining, 1)),
+                            **payload,
+                        )
+                        if attempt is not None:
+                            attempt.attributes["status"] = response.status
+                    if context:
+                        MetricsRegistry.get(self.hass).record_upload(
+                            context.entry_id, size
+                        )
+                except (ClientConnectionError, asyncio.TimeoutError) as e:
+                    delay = self._retry_delay(retry, max_retries, deadline)
+                    if delay is None:
+                        raise ServiceValidationError(f"Request failed: {e}")
+                    retry += 1
+                    self._record_retry(0)
+                    _LOGGER.info(
+                        f"Request to {san_url} failed ({e}), "
+                        f"retrying in {delay:.1f}s"
+                    )
+                    continue
+                except Exception as e:
+                    raise ServiceValidationError(f"Request failed: {e}")
+
+                if response.status in self.retry_policy.statuses:
+                    retry_after = self._get_retry_after(response)
+                    if response.status == 429 and scheduler and retry_after:
+                        # Pause the provider even if this request is not retried
+                        scheduler.defer(retry_after)
+                    delay = self._retry_delay(
+                        retry, max_retries, deadline, retry_after
+                    )
+                    if delay is not None:
+                        retry += 1
+                        self._record_retry(response.status)
+                        _LOGGER.info(
+                            f"{san_url} returned {response.status}, "
+                            f"retrying in {delay:.1f}s"
+                        )
+                        # Return the connection to the pool before backing off
+                        response.release()
+                        if response.status == 429 and scheduler:
+                            # Rate limited: pause this provider and queue again
+                            scheduler.defer(delay)
+                            delay = 0.0
+                        continue
 
-        if response.status != 200:
-            frame = inspect.stack()[1]
-            provider = frame.frame.f_locals["self"].__class__.__name__.lower()
-            parsed_response = await self._resolve_error(response, provider)
-            raise ServiceValidationError(parsed_response)
-        else:
-            response_data = await response.json()
-            _LOGGER.debug(f"Response data: {response_data}")
-            return response_data
+                if response.status != 200:
+                    frame = inspect.stack()[1]
+                    provider = frame.frame.f_locals["self"].__class__.__name__.lower()
+                    parsed_response = await self._resolve_error(response, provider)
+                    raise ServiceValidationError(parsed_response)
+                else:
+                    with span("download"):
+                        if read_response is not None:
+                            response_data = await read_response(response)
+                        else:
+                            response_data = await response.json()
+                    _LOGGER.debug(f"Response data: {response_data}")
+                    return response_data
+            finally:
+                if scheduler:
+                    scheduler.release()
+
+    def _retry_delay(
+        self,
+        retry: int,
+        max_retries: int,
+        deadline: float,
+        retry_after: float | None = None,
+    ) -> float | None:
+        """Backoff before the next attempt, None if no attempt is left"""
+        if retry >= max_retries:
+            return None
+        delay = self.retry_policy.backoff(retry + 1, retry_after)
+        # Leave the next attempt at least a second before the deadline
+        if time.monotonic() + delay + 1 >= deadline:
+            return None
+        return delay
+
+    @staticmethod
+    def _record_retry(status: int) -> None:
+        context = request_context.get()
+        if context:
+            context.retries.append(status)
+
+    @staticmethod
+    def _record_cached_tokens(tokens: Any) -> None:
+        """Add prompt tokens served from the provider's cache to the request"""
+        context = request_context.get()
+        if context and isinstance(tokens, int) and tokens > 0:
+            context.cached_tokens.append(tokens)
+
+    def _record_usage(
+        self,
+        input_tokens: Any,
+        output_tokens: Any,
+        cached_tokens: Any = None,
+        server_time: Any = None,
+    ) -> None:
+        """Count the tokens of a response towards the request and provider
+
+        Args:
+            input_tokens: Prompt tokens including those read from the cache
+            server_time (float, optional): Seconds the provider spent on it
+        """
+        self._record_cached_tokens(cached_tokens)
+        context = request_context.get()
+        if not context:
+            return
+
+        def _count(value: Any) -> int:
+            return value if isinstance(value, int) and value > 0 else 0
+
+        usage = {
+            "input_tokens": _count(input_tokens),
+            "output_tokens": _count(output_tokens),
+            "cached_tokens": _count(cached_tokens),
+            "server_time": (
+                round(float(server_time), 3)
+                if isinstance(server_time, (int, float))
+                else None
+            ),
+        }
+        usage["cost"] = UsageRegistry.get(self.hass).record(
+            context.entry_id, self.model, usage
+        )
+        context.usage.append(usage)
+        annotate(**{key: value for key, value in usage.items() if value is not None})
+
+    def _record_chat_usage(self, response: Any) -> None:
+        """Record the usage of a chat completion"""
+        usage = response.get("usage") if isinstance(response, dict) else None
+        if not isinstance(usage, dict):
+            return
+        details = usage.get("prompt_tokens_details")
+        self._record_usage(
+            usage.get("prompt_tokens"),
+            usage.get("completion_tokens"),
+            details.get("cached_tokens") if isinstance(details, dict) else None,
+            # Groq reports the time spent on the request
+            usage.get("total_time"),
+        )
+
+    @staticmethod
+    def _get_retry_after(response) -> float | None:
+        """Parse the Retry-After header (seconds or HTTP date) of a response"""
+        try:
+            value = response.headers.get("Retry-After")
+        except Exception:
+            return None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
 
     async def _resolve_error(self, response, provider: str) -> str:
         """Translate response status to error message for both HTTP and SDK responses"""
@@ -651,6 +1390,7 @@ class OpenAI(Provider):
             print(f"[OpenRouter DEBUG] Data: {Request.sanitize_data(data)}")
 
         response = await self._post(url=url, headers=headers, data=data)
+        self._record_chat_usage(response)
         choices = response.get("choices") if isinstance(response, dict) else None
         if not isinstance(choices, list) or not choices:
             raise ServiceValidationError("empty_response")
@@ -823,6 +1563,7 @@ class AzureOpenAI(Provider):
         )
 
         response = await self._post(url=endpoint, headers=headers, data=data)
+        self._record_chat_usage(response)
         choices = response.get("choices") if isinstance(response, dict) else None
         if not isinstance(choices, list) or not choices:
             raise ServiceValidationError("empty_response")
@@ -979,6 +1720,8 @@ class AzureOpenAI(Provider):
 
 
 class Anthropic(Provider):
+    # 529: the API is overloaded
+    retry_policy = RetryPolicy(statuses=(429, 500, 502, 503, 504, 529))
 
     def __init__(self, hass: HomeAssistant, api_key: str, model: str):
         super().__init__(hass, api_key, model)
@@ -997,6 +1740,14 @@ class Anthropic(Provider):
     async def _make_request(self, data: dict) -> str:
         headers = self._generate_headers()
         response = await self._post(url=ENDPOINT_ANTHROPIC, headers=headers, data=data)
+        usage = response.get("usage") or {}
+        cache_read = usage.get("cache_read_input_tokens") or 0
+        cache_write = usage.get("cache_creation_input_tokens") or 0
+        self._record_usage(
+            (usage.get("input_tokens") or 0) + cache_read + cache_write,
+            usage.get("output_tokens"),
+            cache_read,
+        )
 
         # Handle tool use response for structured output
         if "content" in response and len(response["content"]) > 0:
@@ -1070,13 +1821,24 @@ class Anthropic(Provider):
             )
         # User message
         payload["messages"][0]["content"].append({"type": "text", "text": call.message})
-        # System prompt
-        payload["system"] = self._get_system_prompt()
+        # System prompt, cached as prefix of every request
+        payload["system"] = [
+            {
+                "type": "text",
+                "text": self._get_system_prompt(),
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
 
         # Memory images if use_memory is set
         if getattr(call, "use_memory", False):
             memory_content = call.memory._get_memory_images(memory_type="Anthropic")
             if memory_content:
+                # Cache breakpoint after the last memory block so the system
+                # prompt and memory are read from the prompt cache
+                memory_content = memory_content[:-1] + [
+                    {**memory_content[-1], "cache_control": {"type": "ephemeral"}}
+                ]
                 payload["messages"].insert(
                     0, {"role": "user", "content": memory_content}
                 )
@@ -1154,6 +1916,9 @@ class Google(Provider):
         endpoint={"base_url": ENDPOINT_GOOGLE},
     ):
         super().__init__(hass, api_key, model, endpoint)
+        # memory content and system prompt -> (cachedContent name or None, renew at)
+        self._cached_contents: dict[tuple, tuple[str | None, float]] = {}
+        self._cached_content_lock = asyncio.Lock()
 
     def supports_structured_output(self) -> bool:
         """Return True if provider supports structured output."""
@@ -1165,6 +1930,67 @@ class Google(Provider):
     def _generate_headers(self) -> dict:
         return {"content-type": "application/json"}
 
+    async def vision_request(self, call: Any) -> str:
+        with span("payload"):
+            data = self._prepare_vision_data(call)
+        # Memory, system prompt and user turn: send the first two as cached content
+        if getattr(call, "use_memory", False) and len(data["contents"]) > 2:
+            system_prompt = data["contents"][-2]["parts"][0]["text"]
+            name = await self._get_cached_content(
+                data["contents"][:-1], (*call.memory.content_key, system_prompt)
+            )
+            if name:
+                data["contents"] = data["contents"][-1:]
+                data["cachedContent"] = name
+        try:
+            return await self._make_request(data)
+        except ServiceValidationError:
+            if "cachedContent" in data:
+                # The cache may have been deleted, create a new one next time
+                self._cached_contents.clear()
+            raise
+
+    async def _get_cached_content(self, contents: list, key: tuple) -> str | None:
+        """Name of a cachedContent holding contents, created when key changes
+
+        key identifies contents without hashing the images in them. Gemini rejects
+        caches below a model specific token count, so failures are remembered as
+        well and those requests keep sending the memory inline.
+        """
+        if self.endpoint.get("base_url") != ENDPOINT_GOOGLE:
+            return None
+        async with self._cached_content_lock:
+            now = time.monotonic()
+            cached = self._cached_contents.get(key)
+            if cached and now < cached[1]:
+                return cached[0]
+            # Memory differs per camera, so keep one cache per selection
+            self._cached_contents = {
+                cached_key: value
+                for cached_key, value in self._cached_contents.items()
+                if now < value[1]
+            }
+            name = None
+            try:
+                response = await self._post(
+                    url=ENDPOINT_GOOGLE_CACHE.format(api_key=self.api_key),
+                    headers=self._generate_headers(),
+                    data={
+                        "model": f"models/{self.model}",
+                        "contents": contents,
+                        "ttl": f"{GOOGLE_CACHE_TTL}s",
+                    },
+                )
+                name = response.get("name")
+            except ServiceValidationError as e:
+                _LOGGER.debug(f"Could not create Gemini cached content: {e}")
+            # Renew a minute before the server drops the cache
+            self._cached_contents[key] = (
+                name,
+                time.monotonic() + GOOGLE_CACHE_TTL - 60,
+            )
+            return name
+
     async def _make_request(self, data) -> str:
         try:
             endpoint = self.endpoint.get("base_url").format(
@@ -1172,6 +1998,14 @@ class Google(Provider):
             )
             headers = self._generate_headers()
             response = await self._post(url=endpoint, headers=headers, data=data)
+            usage = response.get("usageMetadata") or {}
+            self._record_usage(
+                usage.get("promptTokenCount"),
+                # Thinking tokens are billed as output
+                (usage.get("candidatesTokenCount") or 0)
+                + (usage.get("thoughtsTokenCount") or 0),
+                usage.get("cachedContentTokenCount"),
+            )
             candidates = response.get("candidates")
             if not candidates or not isinstance(candidates, list) or not candidates[0]:
                 raise ServiceValidationError(
@@ -1326,6 +2160,7 @@ class Groq(Provider):
     async def _make_request(self, data: dict) -> str:
         headers = self._generate_headers()
         response = await self._post(url=ENDPOINT_GROQ, headers=headers, data=data)
+        self._record_chat_usage(response)
 
         choices = response.get("choices") if isinstance(response, dict) else None
         if not isinstance(choices, list) or not choices:
@@ -1474,6 +2309,7 @@ class LocalAI(Provider):
         response = await self._post(url=endpoint, headers=headers, data=data)
         if not isinstance(response, dict):
             raise ServiceValidationError("invalid_response")
+        self._record_chat_usage(response)
 
         choices = response.get("choices")
         if not isinstance(choices, list) or not choices:
@@ -1616,6 +2452,8 @@ class LocalAI(Provider):
 
 
 class Ollama(Provider):
+    # Local server: connection resets and reloads resolve quickly
+    retry_policy = RetryPolicy(base_delay=0.5, max_delay=5.0)
 
     def __init__(
         self,
@@ -1648,11 +2486,35 @@ class Ollama(Provider):
         response = await self._post(url=endpoint, headers={}, data=data)
         if not isinstance(response, dict):
             raise ServiceValidationError("invalid_response")
+        self._record_load_duration(response)
+        total_duration = response.get("total_duration")
+        self._record_usage(
+            response.get("prompt_eval_count"),
+            response.get("eval_count"),
+            server_time=(
+                total_duration / 1e9
+                if isinstance(total_duration, (int, float))
+                else None
+            ),
+        )
         response_text = response.get("message", {}).get("content")
         if response_text is None:
             raise ServiceValidationError("invalid_response")
         return response_text
 
+    def _record_load_duration(self, response: dict) -> None:
+        """Report whether the request found the model loaded (durations are in ns)"""
+        context = request_context.get()
+        load_duration = response.get("load_duration")
+        total_duration = response.get("total_duration")
+        if not context or not isinstance(load_duration, (int, float)):
+            return
+        if not isinstance(total_duration, (int, float)):
+            total_duration = load_duration
+        WarmupRegistry.get(self.hass).record_request(
+            context.entry_id, total_duration / 1e9, load_duration / 1e9
+        )
+
     def _prepare_vision_data(self, call: Any) -> dict:
         default_parameters = self._get_default_parameters(call)
         payload = {
@@ -1703,7 +2565,8 @@ class Ollama(Provider):
         if getattr(call, "use_memory", False):
             memory_content = call.memory._get_memory_images(memory_type="Ollama")
             if memory_content:
-                payload["messages"].extend(memory_content)
+                # Before the user message so Ollama can reuse the cached prefix
+                payload["messages"][0:0] = memory_content
 
         return payload
 
@@ -1777,6 +2640,7 @@ class AWSBedrock(Provider):
         aws_region_name: str,
         model: str,
         api_key: str | None = None,
+        stream: bool = False,
     ):
         # If api_key is provided, use Bearer token authentication
         # Otherwise, use traditional IAM credentials
@@ -1790,6 +2654,12 @@ class AWSBedrock(Provider):
             self.aws_secret_access_key = aws_secret_access_key
             self.aws_region = aws_region_name
             self.use_bearer_token = False
+            # Keeps the derived signing key for the rest of the day
+            self.signer = SigV4Signer(
+                aws_access_key_id, aws_secret_access_key, aws_region_name
+            )
+        # Use converse-stream instead of converse for IAM credentials
+        self.stream = stream
 
     def _generate_headers(self) -> dict:
         return {
@@ -1802,11 +2672,14 @@ class AWSBedrock(Provider):
         if self.use_bearer_token:
             # Use Bearer token with direct HTTP API
             headers = self._generate_headers()
-            endpoint = f"https://bedrock-runtime.{self.aws_region}.amazonaws.com/model/{self.model}/converse"
+            endpoint = ENDPOINT_AWS_BEDROCK.format(
+                region=self.aws_region, model=self.model, action="converse"
+            )
             response = await self._post(url=endpoint, headers=headers, data=data)
 
             if not isinstance(response, dict):
                 raise ServiceValidationError("invalid_response")
+            self._record_bedrock_usage(response)
 
             output = response.get("output")
             if not isinstance(output, dict):
@@ -1831,8 +2704,10 @@ class AWSBedrock(Provider):
             # Regular text response
             return content.get("text", "")
         else:
-            # Use traditional IAM credentials with boto3
-            response = await self.invoke_bedrock(model=self.model, data=data)
+            # Use traditional IAM credentials with SigV4 signed requests
+            response = await self.invoke_bedrock(
+                model=self.model, data=data, stream=self.stream
+            )
 
             if not isinstance(response, dict):
                 raise ServiceValidationError("invalid_response")
@@ -1856,64 +2731,125 @@ class AWSBedrock(Provider):
             # Regular text response
             return content.get("text", "")
 
-    async def invoke_bedrock(self, model: str, data: dict) -> dict:
-        """Post data to url and return response data"""
-        _LOGGER.debug(f"AWS Bedrock request data: {Request.sanitize_data(data)}")
+    async def invoke_bedrock(
+        self, model: str, data: dict, stream: bool = False
+    ) -> dict:
+        """Sign a Converse request with SigV4, post it and return its output"""
+        converse_data = {
+            "messages": data.get("messages"),
+            "inferenceConfig": data.get("inferenceConfig"),
+        }
+        # Add toolConfig if present (for structured output)
+        if "toolConfig" in data:
+            converse_data["toolConfig"] = data.get("toolConfig")
+        # Add system prompt if present (for structured output)
+        if "system" in data:
+            converse_data["system"] = data.get("system")
+
+        action = "converse-stream" if stream else "converse"
+        endpoint = ENDPOINT_AWS_BEDROCK.format(
+            region=self.aws_region, model=quote(model, safe=""), action=action
+        )
+        # The REST API expects image bytes as base64 strings
+        body = json.dumps(converse_data, default=self._encode_bytes).encode("utf-8")
+        headers = self.signer.sign(
+            "POST", endpoint, {"Content-Type": "application/json"}, body
+        )
+        _LOGGER.info(f"Invoking Bedrock model {model} in {self.aws_region}")
+        response = await self._post(
+            url=endpoint,
+            headers=headers,
+            data=converse_data,
+            body=body,
+            read_response=self._read_event_stream if stream else None,
+        )
+        if not isinstance(response, dict):
+            raise ServiceValidationError("invalid_response")
+
+        # get observability data
+        latency = (response.get("metrics") or {}).get("latencyMs")
+        token_usage = response.get("usage") or {}
+        _LOGGER.debug(
+            f"AWS Bedrock call latency: {latency}ms "
+            f"inputTokens: {token_usage.get('inputTokens')} "
+            f"outputTokens: {token_usage.get('outputTokens')} "
+            f"totalTokens: {token_usage.get('totalTokens')}"
+        )
+        self._record_bedrock_usage(response)
+        response_data = response.get("output")
+        _LOGGER.debug(f"AWS Bedrock call response data: {response_data}")
+        return response_data
+
+    def _record_bedrock_usage(self, response: dict) -> None:
+        """Record the usage and latency of a converse response"""
+        usage = response.get("usage") or {}
+        latency = (response.get("metrics") or {}).get("latencyMs")
+        cache_read = usage.get("cacheReadInputTokens") or 0
+        self._record_usage(
+            (usage.get("inputTokens") or 0)
+            + cache_read
+            + (usage.get("cacheWriteInputTokens") or 0),
+            usage.get("outputTokens"),
+            cache_read,
+            latency / 1000 if isinstance(latency, (int, float)) else None,
+        )
 
+    @staticmethod
+    def _encode_bytes(value):
+        if isinstance(value, bytes):
+            return base64.b64encode(value).decode("utf-8")
+        raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+    async def _read_event_stream(self, response) -> dict:
+        """Assemble a converse-stream response into the shape of a converse one"""
+        decoder = EventStreamDecoder()
+        blocks: dict[int, dict] = {}
+        tool_inputs: dict[int, str] = {}
+        result: dict = {}
         try:
-            _LOGGER.info(f"Invoking Bedrock model {model} in {self.aws_region}")
-            client = await self.hass.async_add_executor_job(
-                partial(
-                    boto3.client,
-                    "bedrock-runtime",
-                    region_name=self.aws_region,
-                    aws_access_key_id=self.aws_access_key_id,
-                    aws_secret_access_key=self.aws_secret_access_key,
+            async for chunk in response.content.iter_any():
+                for headers, payload in decoder.feed(chunk):
+                    event = json.loads(payload) if payload else {}
+                    if headers.get(":message-type") != "event":
+                        raise ServiceValidationError(
+                            event.get("message")
+                            or headers.get(":exception-type")
+                            or "Unknown error"
+                        )
+                    event_type = headers.get(":event-type")
+                    index = event.get("contentBlockIndex", 0)
+                    if event_type == "contentBlockStart":
+                        tool_use = (event.get("start") or {}).get("toolUse")
+                        if isinstance(tool_use, dict):
+                            blocks[index] = {"toolUse": dict(tool_use)}
+                    elif event_type == "contentBlockDelta":
+                        delta = event.get("delta") or {}
+                        if "toolUse" in delta:
+                            blocks.setdefault(index, {"toolUse": {}})
+                            tool_inputs[index] = tool_inputs.get(index, "") + (
+                                delta["toolUse"].get("input") or ""
+                            )
+                        elif "text" in delta:
+                            block = blocks.setdefault(index, {"text": ""})
+                            block["text"] = block.get("text", "") + delta["text"]
+                    elif event_type == "messageStop":
+                        result["stopReason"] = event.get("stopReason")
+                    elif event_type == "metadata":
+                        result["usage"] = event.get("usage")
+                        result["metrics"] = event.get("metrics")
+            for index, tool_input in tool_inputs.items():
+                blocks[index]["toolUse"]["input"] = (
+                    json.loads(tool_input) if tool_input else {}
                 )
-            )
-
-            # Invoke the model with the response stream
-            converse_kwargs = {
-                "modelId": model,
-                "messages": data.get("messages"),
-                "inferenceConfig": data.get("inferenceConfig"),
+        except ValueError as e:
+            raise ServiceValidationError(f"Invalid Bedrock stream: {e}")
+        result["output"] = {
+            "message": {
+                "role": "assistant",
+                "content": [blocks[index] for index in sorted(blocks)],
             }
-
-            # Add toolConfig if present (for structured output)
-            if "toolConfig" in data:
-                converse_kwargs["toolConfig"] = data.get("toolConfig")
-
-            # Add system prompt if present (for structured output)
-            if "system" in data:
-                converse_kwargs["system"] = data.get("system")
-
-            response = await self.hass.async_add_executor_job(
-                partial(client.converse, **converse_kwargs)
-            )
-            _LOGGER.debug(f"AWS Bedrock call Response: {response}")
-
-        except Exception as e:
-            raise ServiceValidationError(f"Request failed: {e}")
-
-        if response["ResponseMetadata"]["HTTPStatusCode"] != 200:
-            frame = inspect.stack()[1]
-            provider = frame.frame.f_locals["self"].__class__.__name__.lower()
-            parsed_response = await self._resolve_error(response, provider)
-            raise ServiceValidationError(parsed_response)
-        else:
-            # get observability data
-            metrics = response.get("metrics")
-            latency = metrics.get("latencyMs")
-            token_usage = response.get("usage")
-            tokens_in = token_usage.get("inputTokens")
-            tokens_out = token_usage.get("outputTokens")
-            tokens_total = token_usage.get("totalTokens")
-            _LOGGER.debug(
-                f"AWS Bedrock call latency: {latency}ms inputTokens: {tokens_in} outputTokens: {tokens_out} totalTokens: {tokens_total}"
-            )
-            response_data = response.get("output")
-            _LOGGER.debug(f"AWS Bedrock call response data: {response_data}")
-        return response_data
+        }
+        return result
 
     def _prepare_vision_data(self, call: Any) -> dict:
         _LOGGER.debug(f"Found model type `{self.model}` for AWS Bedrock call.")
@@ -2135,6 +3071,7 @@ class ProviderFactory:
                 ),
                 aws_region_name=cast(str, config.get(CONF_AWS_REGION_NAME) or ""),
                 model=model,
+                stream=bool(config.get(CONF_AWS_STREAM, False)),
             )
 
         if provider_name in ("OpenWebUI", "Open WebUI"):
@@ -2161,3 +3098,44 @@ class ProviderFactory:
             )
 
         raise ServiceValidationError("invalid_provider")
+
+
+class ProviderRegistry:
+    """Provider instances per config entry and model, shared by all requests
+
+    Instances (and the SDK clients they hold) are created on first use and kept
+    until the config entry is set up again.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._providers: dict[tuple[str, str], Provider] = {}
+
+    @staticmethod
+    def get(hass: HomeAssistant) -> "ProviderRegistry":
+        """Return the registry stored in hass.data, creating it if needed"""
+        registry = hass.data.get(PROVIDER_DATA)
+        if not isinstance(registry, ProviderRegistry):
+            registry = ProviderRegistry(hass)
+            hass.data[PROVIDER_DATA] = registry
+        return registry
+
+    def get_provider(
+        self, entry_id: str, provider_name: str, config: dict, model: str
+    ) -> Provider:
+        key = (entry_id, model)
+        provider = self._providers.get(key)
+        if provider is None:
+            provider = ProviderFactory.create(
+                hass=self.hass,
+                provider_name=provider_name,
+                config=config,
+                model=model,
+            )
+            self._providers[key] = provider
+        return provider
+
+    def remove(self, entry_id: str) -> None:
+        """Forget all instances of an entry, e.g. after it has been reconfigured"""
+        for key in [key for key in self._providers if key[0] == entry_id]:
+            del self._providers[key]
@@ -0,0 +1,187 @@
+"""Per-provider admission control for llmvision requests"""
+
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from homeassistant.core import HomeAssistant
+from .const import (
+    DOMAIN,
+    CONF_PROVIDER,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_REQUESTS_PER_MINUTE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SCHEDULER_DATA = f"{DOMAIN}_scheduler"
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+
+@dataclass
+class RequestContext:
+    """Per-request state shared with Provider._post"""
+
+    entry_id: str
+    priority: int = PRIORITIES["normal"]
+    # Seconds waited for admission, appended to by every request
+    waits: list[float] = field(default_factory=list)
+    # Prompt tokens served from the provider's prompt cache
+    cached_tokens: list[int] = field(default_factory=list)
+    # Status of every retried attempt (0 for connection errors)
+    retries: list[int] = field(default_factory=list)
+    # Token usage and cost reported by every provider response
+    usage: list[dict] = field(default_factory=list)
+
+
+request_context: ContextVar[RequestContext | None] = ContextVar(
+    "llmvision_request_context", default=None
+)
+
+
+class ProviderScheduler:
+    """Concurrency limit, token bucket and priority queue for one provider entry
+
+    Args:
+        max_concurrent (int): Requests allowed in flight at the same time
+        requests_per_minute (float): Sustained request rate, 0 disables rate limiting
+    """
+
+    def __init__(self, max_concurrent: int = 4, requests_per_minute: float = 0):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.rate = max(0.0, float(requests_per_minute)) / 60
+        # Allow a burst of up to max_concurrent requests
+        self.capacity = float(self.max_concurrent)
+        self.tokens = self.capacity
+        self.active = 0
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._waiters: list = []
+        self._counter = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def acquire(self, priority: int = PRIORITIES["normal"]) -> float:
+        """Wait for a slot and return the time spent waiting in seconds"""
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted right before cancellation
+                self.release()
+            raise
+        return time.monotonic() - start
+
+    def release(self) -> None:
+        self.active = max(0, self.active - 1)
+        self._dispatch()
+
+    def defer(self, seconds: float) -> None:
+        """Stop admitting requests for seconds (e.g. after a Retry-After header)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    def _refill(self, now: float) -> None:
+        if self.rate:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self._updated) * self.rate
+            )
+        self._updated = now
+
+    def _admission_delay(self, now: float) -> float:
+        """Seconds until the next request may start (ignoring concurrency)"""
+        delay = self.blocked_until - now
+        if self.rate and self.tokens < 1:
+            delay = max(delay, (1 - self.tokens) / self.rate)
+        return max(0.0, delay)
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters and self.active < self.max_concurrent:
+            _, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._admission_delay(now)
+            if delay > 0:
+                self._schedule(delay)
+                return
+            heapq.heappop(self._waiters)
+            if self.rate:
+                self.tokens -= 1
+            self.active += 1
+            future.set_result(None)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._wake)
+
+    def _wake(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+
+class AdmissionControl:
+    """Schedulers of every provider entry, shared by all requests"""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._schedulers: dict[str, ProviderScheduler] = {}
+
+    @staticmethod
+    def get(hass: HomeAssistant) -> "AdmissionControl":
+        """Return the admission control stored in hass.data, creating it if needed"""
+        admission = hass.data.get(SCHEDULER_DATA)
+        if not isinstance(admission, AdmissionControl):
+            admission = AdmissionControl(hass)
+            hass.data[SCHEDULER_DATA] = admission
+        return admission
+
+    def for_entry(self, entry_id: str) -> ProviderScheduler:
+        scheduler = self._schedulers.get(entry_id)
+        if scheduler is None:
+            max_concurrent, requests_per_minute = self._get_limits(entry_id)
+            scheduler = self._schedulers[entry_id] = ProviderScheduler(
+                max_concurrent, requests_per_minute
+            )
+        return scheduler
+
+    def remove(self, entry_id: str) -> None:
+        """Forget an entry's scheduler, e.g. after its limits were reconfigured"""
+        self._schedulers.pop(entry_id, None)
+
+    def _get_limits(self, entry_id: str) -> tuple[int, float]:
+        """Limits of the provider entry, the Settings entry's limits if unset"""
+        domain_data = self.hass.data.get(DOMAIN) or {}
+        max_concurrent, requests_per_minute = 4, 0.0
+        for _, data in domain_data.items():
+            if data.get(CONF_PROVIDER) == "Settings":
+                max_concurrent, requests_per_minute = self._parse_limits(
+                    data, (max_concurrent, requests_per_minute)
+                )
+                break
+        return self._parse_limits(
+            domain_data.get(entry_id) or {}, (max_concurrent, requests_per_minute)
+        )
+
+    @staticmethod
+    def _parse_limits(data: dict, default: tuple[int, float]) -> tuple[int, float]:
+        """Limits set in data, default for those unset or if invalid"""
+        max_concurrent, requests_per_minute = default
+        try:
+            if data.get(CONF_MAX_CONCURRENT_REQUESTS) is not None:
+                max_concurrent = int(data[CONF_MAX_CONCURRENT_REQUESTS])
+            if data.get(CONF_REQUESTS_PER_MINUTE) is not None:
+                requests_per_minute = float(data[CONF_REQUESTS_PER_MINUTE])
+        except (TypeError, ValueError):
+            return default
+        return max_concurrent, requests_per_minute
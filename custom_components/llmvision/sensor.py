@@ -0,0 +1,236 @@
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from .cache import ResponseCache
+from .const import (
+    CONF_PROVIDER,
+    SIGNAL_CACHE_UPDATED,
+    SIGNAL_PROVIDER_HEALTH_UPDATED,
+    SIGNAL_USAGE_UPDATED,
+    SIGNAL_WARMUP_UPDATED,
+)
+from .health import BREAKER_STATES, HealthRegistry
+from .usage import UsageRegistry
+from .warmup import WarmupRegistry
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ProviderHealthSensor(SensorEntity):
+    """Diagnostic sensor showing the circuit breaker state of a provider"""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = BREAKER_STATES
+    _attr_should_poll = False
+
+    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry):
+        """Initialize the sensor"""
+        self.hass = hass
+        self._entry_id = config_entry.entry_id
+        self._attr_name = f"{config_entry.title} circuit breaker"
+        self._attr_unique_id = f"{config_entry.entry_id}_circuit_breaker"
+
+    @property
+    def icon(self) -> str:  # type: ignore
+        """Return the icon to use in the frontend"""
+        return "mdi:heart-pulse"
+
+    @property
+    def native_value(self) -> str:  # type: ignore
+        """Return the breaker state"""
+        return HealthRegistry.get(self.hass).get_health(self._entry_id).state
+
+    @property
+    def extra_state_attributes(self) -> dict:  # type: ignore
+        """Return error rate and latency of recent requests"""
+        health = HealthRegistry.get(self.hass).get_health(self._entry_id).as_dict()
+        health.pop("state")
+        return health
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to health updates of this provider"""
+
+        @callback
+        def _handle_health_updated(entry_id: str) -> None:
+            if entry_id == self._entry_id:
+                self.async_write_ha_state()
+
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_PROVIDER_HEALTH_UPDATED, _handle_health_updated
+            )
+        )
+
+
+class ResponseCacheSensor(SensorEntity):
+    """Diagnostic sensor counting requests answered from the response cache"""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_should_poll = False
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the sensor"""
+        self.hass = hass
+        self._attr_name = "LLM Vision response cache hits"
+        self._attr_unique_id = "llm_vision_response_cache_hits"
+
+    @property
+    def icon(self) -> str:  # type: ignore
+        """Return the icon to use in the frontend"""
+        return "mdi:cached"
+
+    @property
+    def native_value(self) -> int:  # type: ignore
+        """Return the number of cache hits"""
+        cache = ResponseCache.get(self.hass)
+        return cache.hits if cache else 0
+
+    @property
+    def extra_state_attributes(self) -> dict:  # type: ignore
+        """Return misses, hit rate and number of cached responses"""
+        cache = ResponseCache.get(self.hass)
+        if cache is None:
+            return {"enabled": False}
+        total = cache.hits + cache.misses
+        return {
+            "enabled": True,
+            "misses": cache.misses,
+            "hit_rate": round(cache.hits / total, 3) if total else None,
+            "entries": cache.size,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to cache updates"""
+
+        @callback
+        def _handle_cache_updated() -> None:
+            self.async_write_ha_state()
+
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_CACHE_UPDATED, _handle_cache_updated
+            )
+        )
+
+
+class ProviderUsageSensor(SensorEntity):
+    """Diagnostic sensor counting the tokens used with a provider"""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_native_unit_of_measurement = "tokens"
+    _attr_should_poll = False
+
+    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry):
+        """Initialize the sensor"""
+        self.hass = hass
+        self._entry_id = config_entry.entry_id
+        self._attr_name = f"{config_entry.title} tokens"
+        self._attr_unique_id = f"{config_entry.entry_id}_tokens"
+
+    @property
+    def icon(self) -> str:  # type: ignore
+        """Return the icon to use in the frontend"""
+        return "mdi:counter"
+
+    @property
+    def native_value(self) -> int:  # type: ignore
+        """Return the input and output tokens used since startup"""
+        return UsageRegistry.get(self.hass).get_counters(self._entry_id).total_tokens
+
+    @property
+    def extra_state_attributes(self) -> dict:  # type: ignore
+        """Return token counts, server time and cost, also per model"""
+        registry = UsageRegistry.get(self.hass)
+        attributes = registry.get_counters(self._entry_id).as_dict()
+        attributes["models"] = {
+            model: counters.as_dict()
+            for model, counters in registry.get_models(self._entry_id).items()
+        }
+        return attributes
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to usage updates of this provider"""
+
+        @callback
+        def _handle_usage_updated(entry_id: str) -> None:
+            if entry_id == self._entry_id:
+                self.async_write_ha_state()
+
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_USAGE_UPDATED, _handle_usage_updated
+            )
+        )
+
+
+class OllamaWarmupSensor(SensorEntity):
+    """Diagnostic sensor with the last model warm-up and cold vs. warm latency"""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_should_poll = False
+
+    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry):
+        """Initialize the sensor"""
+        self.hass = hass
+        self._entry_id = config_entry.entry_id
+        self._attr_name = f"{config_entry.title} last warm-up"
+        self._attr_unique_id = f"{config_entry.entry_id}_last_warmup"
+
+    @property
+    def icon(self) -> str:  # type: ignore
+        """Return the icon to use in the frontend"""
+        return "mdi:fire"
+
+    @property
+    def native_value(self):  # type: ignore
+        """Return when the model was last warmed up"""
+        return WarmupRegistry.get(self.hass).get_stats(self._entry_id).last_warmup
+
+    @property
+    def extra_state_attributes(self) -> dict:  # type: ignore
+        """Return the number and median latency of cold and warm requests"""
+        return WarmupRegistry.get(self.hass).get_stats(self._entry_id).as_dict()
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to warm-up updates of this provider"""
+
+        @callback
+        def _handle_warmup_updated(entry_id: str) -> None:
+            if entry_id == self._entry_id:
+                self.async_write_ha_state()
+
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_WARMUP_UPDATED, _handle_warmup_updated
+            )
+        )
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the cache sensor for Settings and health sensors for providers"""
+    if config_entry.data.get(CONF_PROVIDER) == "Settings":
+        async_add_entities([ResponseCacheSensor(hass)])
+    else:
+        entities = [
+            ProviderHealthSensor(hass, config_entry),
+            ProviderUsageSensor(hass, config_entry),
+        ]
+        if config_entry.data.get(CONF_PROVIDER) == "Ollama":
+            entities.append(OllamaWarmupSensor(hass, config_entry))
+        async_add_entities(entities)
@@ -0,0 +1,326 @@
+"""Index of the key frame snapshots of timeline events in events.db
+
+Snapshots are stored in date subdirectories of SNAPSHOTS_PATH. Each file has a row
+in the snapshots table, keyed by its path relative to SNAPSHOTS_PATH, that counts
+the events referencing it. Files no event references are found by query instead of
+listing the directory. Key frames are named by the hash of their contents, which
+is indexed too so that a repeated frame is stored once.
+
+Small JPEG thumbnails of each snapshot are kept next to the snapshots folder, one
+folder per width, for the timeline card to list events without the full frames.
+"""
+
+from collections import Counter
+from datetime import datetime
+import logging
+import os
+import time
+from urllib.parse import quote
+
+import aiosqlite
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from PIL import Image, UnidentifiedImageError
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+SNAPSHOTS_PATH = f"/media/{DOMAIN}/snapshots"
+# Key frames are stored as /media/llmvision/snapshots/... or, after the v4.1
+# migration, as /media/local/llmvision/snapshots/...
+SNAPSHOTS_MARKER = f"/{DOMAIN}/snapshots/"
+# Seconds an unreferenced snapshot is kept for the event being created with it
+ORPHAN_GRACE = 3600
+# Names per statement, below SQLite's limit of host parameters
+BATCH_SIZE = 500
+# Widths of the thumbnails of each snapshot, in pixels
+THUMBNAIL_WIDTHS = (160, 480)
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_URL = f"/api/{DOMAIN}/timeline/thumbnail"
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS snapshots (
+        name TEXT PRIMARY KEY,
+        refs INTEGER NOT NULL DEFAULT 0,
+        created REAL NOT NULL,
+        hash TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_snapshots_refs ON snapshots (refs, created)",
+    "CREATE INDEX IF NOT EXISTS idx_snapshots_hash ON snapshots (hash)",
+)
+
+
+def _batches(names: list[str]):
+    for start in range(0, len(names), BATCH_SIZE):
+        yield names[start : start + BATCH_SIZE]
+
+
+def snapshot_name(key_frame: str | None) -> str | None:
+    """Path of a key frame relative to the snapshots folder, None if outside it"""
+    if not key_frame:
+        return None
+    _, marker, name = key_frame.partition(SNAPSHOTS_MARKER)
+    if not marker or not name or name.startswith("/") or ".." in name.split("/"):
+        return None
+    return name
+
+
+def thumbnail_urls(key_frame: str | None) -> dict[str, str] | None:
+    """URLs of the thumbnails of a key frame by width, None if it has none"""
+    name = snapshot_name(key_frame)
+    if name is None:
+        return None
+    return {
+        str(width): f"{THUMBNAIL_URL}/{width}/{quote(name)}"
+        for width in THUMBNAIL_WIDTHS
+    }
+
+
+def thumbnail_path(root: str, name: str, width: int) -> str:
+    """Path of the thumbnail of snapshot name, in a folder next to root"""
+    stem, _ = os.path.splitext(name)
+    return os.path.join(
+        os.path.dirname(root.rstrip("/")), "thumbnails", str(width), f"{stem}.jpg"
+    )
+
+
+def generate_thumbnails(root: str, name: str) -> list[int]:
+    """Write the missing thumbnails of snapshot name, returns their widths
+
+    Runs in the executor. Snapshots that cannot be read get no thumbnails.
+    """
+    missing = [
+        width
+        for width in THUMBNAIL_WIDTHS
+        if not os.path.exists(thumbnail_path(root, name, width))
+    ]
+    if not missing:
+        return []
+    try:
+        with Image.open(os.path.join(root, name)) as image:
+            image.load()
+            frame = image.convert("RGB")
+    except (OSError, UnidentifiedImageError) as e:
+        _LOGGER.debug(f"No thumbnails for snapshot {name}: {e}")
+        return []
+
+    written = []
+    for width in missing:
+        thumbnail = frame.copy()
+        # Scales down to the width, frames narrower than it are kept as they are
+        thumbnail.thumbnail((width, frame.height))
+        path = thumbnail_path(root, name, width)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Renamed into place so that the view never serves a partial file
+            thumbnail.save(f"{path}.tmp", format="JPEG", quality=THUMBNAIL_QUALITY)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            _LOGGER.warning(f"Failed to write thumbnail of snapshot {name}: {e}")
+            continue
+        written.append(width)
+    return written
+
+
+def new_snapshot_path(filename: str, now: datetime | None = None) -> str:
+    """Path for a new snapshot in the folder of the current day"""
+    now = now or dt_util.now()
+    return os.path.join(SNAPSHOTS_PATH, now.strftime("%Y/%m/%d"), filename)
+
+
+def _db_path(hass: HomeAssistant) -> str:
+    return os.path.join(hass.config.path(DOMAIN), "events.db")
+
+
+async def async_create_table(db: aiosqlite.Connection) -> None:
+    await db.execute(SCHEMA[0])
+    async with db.execute("PRAGMA table_info(snapshots)") as cursor:
+        columns = {row[1] for row in await cursor.fetchall()}
+    if "hash" not in columns:
+        await db.execute("ALTER TABLE snapshots ADD COLUMN hash TEXT")
+    for statement in SCHEMA[1:]:
+        await db.execute(statement)
+
+
+async def async_register_snapshot(
+    hass: HomeAssistant, key_frame: str, digest: str | None = None
+) -> None:
+    """Index a newly written snapshot, without references until its event exists"""
+    name = snapshot_name(key_frame)
+    if name is None:
+        return
+    try:
+        async with aiosqlite.connect(_db_path(hass)) as db:
+            await async_create_table(db)
+            await db.execute(
+                """
+                INSERT INTO snapshots (name, refs, created, hash) VALUES (?, 0, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    created = excluded.created, hash = excluded.hash
+                """,
+                (name, time.time(), digest),
+            )
+            await db.commit()
+    except aiosqlite.Error as e:
+        _LOGGER.error(f"Error indexing snapshot {key_frame}: {e}")
+
+
+async def async_claim_snapshot(hass: HomeAssistant, digest: str) -> str | None:
+    """Key frame path of the snapshot with this content hash, None if there is none
+
+    The creation time of the snapshot is renewed, so that the cleanup keeps it for
+    the event about to reference it even if no other event does.
+    """
+    try:
+        async with aiosqlite.connect(_db_path(hass)) as db:
+            await async_create_table(db)
+            async with db.execute(
+                "SELECT name FROM snapshots WHERE hash = ? LIMIT 1", (digest,)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return None
+            await db.execute(
+                "UPDATE snapshots SET created = ? WHERE name = ?", (time.time(), row[0])
+            )
+            await db.commit()
+    except aiosqlite.Error as e:
+        _LOGGER.error(f"Error looking up snapshot {digest}: {e}")
+        return None
+    return os.path.join(SNAPSHOTS_PATH, row[0])
+
+
+async def async_add_refs(
+    db: aiosqlite.Connection, key_frames: list[str | None], delta: int
+) -> list[str]:
+    """Change the reference count of the snapshots of key_frames by delta
+
+    Snapshots missing from the index are added. Runs in the transaction of the
+    caller and returns the names of the snapshots that are no longer referenced.
+    """
+    names = [name for name in map(snapshot_name, key_frames) if name]
+    if not names:
+        return []
+    now = time.time()
+    await db.executemany(
+        """
+        INSERT INTO snapshots (name, refs, created) VALUES (?, MAX(?, 0), ?)
+        ON CONFLICT(name) DO UPDATE SET refs = MAX(refs + ?, 0)
+        """,
+        [(name, delta, now, delta) for name in names],
+    )
+    if delta > 0:
+        return []
+    released = []
+    for batch in _batches(sorted(set(names))):
+        placeholders = ",".join("?" * len(batch))
+        async with db.execute(
+            f"SELECT name FROM snapshots WHERE refs = 0 AND name IN ({placeholders})",
+            batch,
+        ) as cursor:
+            released.extend(row[0] for row in await cursor.fetchall())
+    return released
+
+
+async def async_orphans(
+    db: aiosqlite.Connection, grace: float = ORPHAN_GRACE
+) -> list[str]:
+    """Names of the snapshots without references older than grace seconds"""
+    async with db.execute(
+        "SELECT name FROM snapshots WHERE refs = 0 AND created < ?",
+        (time.time() - grace,),
+    ) as cursor:
+        return [row[0] for row in await cursor.fetchall()]
+
+
+def _remove_files(root: str, names: list[str]) -> list[str]:
+    """Delete the files of names below root and their thumbnails
+
+    Returns the names that are gone.
+    """
+    gone = []
+    for name in names:
+        try:
+            os.remove(os.path.join(root, name))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            _LOGGER.warning(f"Failed to remove snapshot {name}: {e}")
+            continue
+        gone.append(name)
+        for width in THUMBNAIL_WIDTHS:
+            try:
+                os.remove(thumbnail_path(root, name, width))
+            except OSError:
+                pass
+    return gone
+
+
+async def async_remove_snapshots(
+    hass: HomeAssistant, db: aiosqlite.Connection, root: str, names: list[str]
+) -> int:
+    """Delete unreferenced snapshots, the files in one executor job
+
+    Snapshots referenced again in the meantime are kept. Commits and returns the
+    number of snapshots removed.
+    """
+    unreferenced = []
+    for batch in _batches(sorted(set(names))):
+        placeholders = ",".join("?" * len(batch))
+        async with db.execute(
+            f"SELECT name FROM snapshots WHERE refs = 0 AND name IN ({placeholders})",
+            batch,
+        ) as cursor:
+            unreferenced.extend(row[0] for row in await cursor.fetchall())
+    if not unreferenced:
+        return 0
+
+    gone = await hass.async_add_executor_job(_remove_files, root, unreferenced)
+    for batch in _batches(gone):
+        placeholders = ",".join("?" * len(batch))
+        await db.execute(
+            f"DELETE FROM snapshots WHERE refs = 0 AND name IN ({placeholders})",
+            batch,
+        )
+    await db.commit()
+    return len(gone)
+
+
+def _scan(root: str) -> list[tuple[str, float]]:
+    """Names and modification times of all files below root"""
+    files = []
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            try:
+                files.append((os.path.relpath(path, root), os.path.getmtime(path)))
+            except OSError:
+                continue
+    return files
+
+
+async def async_index_snapshots(
+    hass: HomeAssistant,
+    db: aiosqlite.Connection,
+    root: str,
+    key_frames: list[str | None],
+) -> int:
+    """Index the files already in root with the references of key_frames
+
+    Used once for databases from before the snapshots table. Runs in the
+    transaction of the caller and returns the number of files indexed.
+    """
+    files = await hass.async_add_executor_job(_scan, root)
+    await db.executemany(
+        "INSERT OR IGNORE INTO snapshots (name, refs, created) VALUES (?, 0, ?)",
+        files,
+    )
+    references = Counter(name for name in map(snapshot_name, key_frames) if name)
+    await db.executemany(
+        "UPDATE snapshots SET refs = ? WHERE name = ?",
+        [(count, name) for name, count in references.items()],
+    )
+    return len(files)
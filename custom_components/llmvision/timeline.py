@@ -4,17 +4,40 @@ import datetime
 import uuid
 import os, re
 import json
+import random
+import time
 import asyncio
+from typing import Callable
 from .const import DOMAIN, CONF_RETENTION_TIME, CONF_TIMELINE_LANGUAGE
+from .snapshots import (
+    SNAPSHOTS_PATH,
+    async_add_refs,
+    async_create_table,
+    async_index_snapshots,
+    async_orphans,
+    async_remove_snapshots,
+    generate_thumbnails,
+    snapshot_name,
+    thumbnail_urls,
+)
 from homeassistant.util import dt as dt_util
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.event import async_track_time_change
 from functools import partial
 import logging
 
 _LOGGER = logging.getLogger(__name__)
 
-DB_VERSION = 4
+DB_VERSION = 5
+
+# Report of the last database maintenance, shown in the diagnostics
+MAINTENANCE_DATA = f"{DOMAIN}_timeline_maintenance"
+# Local hour of the nightly database maintenance
+MAINTENANCE_HOUR = 3
+# Expired events are deleted in batches of this many rows
+PURGE_BATCH_SIZE = 500
+AUTO_VACUUM_INCREMENTAL = 2
 
 
 async def _get_category_and_label(
@@ -206,15 +229,16 @@ class Timeline:
         self.today_summary = ""
         self.retention_time = config_entry.data.get(CONF_RETENTION_TIME)
 
-        # Track key_frame paths whose DB rows are not yet committed
-        self._pending_key_frames: set[str] = set()
+        # Held while events are inserted and snapshots removed
         self._cleanup_lock = asyncio.Lock()
         self._config_entry = config_entry
         self._migrating = True
+        # Set once _migrate has finished, successfully or not
+        self._migrated = asyncio.Event()
 
         # Path to the JSON file where events are stored
         self._db_path = os.path.join(self.hass.config.path("llmvision"), "events.db")
-        self._media_path = f"/media/llmvision/snapshots"
+        self._media_path = SNAPSHOTS_PATH
         os.makedirs(os.path.dirname(self._db_path), exist_ok=True)
         os.makedirs(self._media_path, exist_ok=True)
 
@@ -271,6 +295,9 @@ class Timeline:
         """Initialize database"""
         try:
             async with aiosqlite.connect(self._db_path) as db:
+                # Only applies to new databases, existing ones switch in async_maintain
+                await db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                await db.execute("PRAGMA journal_mode = WAL")
                 await db.execute("""
                     CREATE TABLE IF NOT EXISTS events (
                         uid TEXT PRIMARY KEY,
@@ -290,6 +317,7 @@ class Timeline:
                 await db.execute("""
                     CREATE INDEX IF NOT EXISTS idx_end ON events (end)
                 """)
+                await async_create_table(db)
                 await db.commit()
         except aiosqlite.Error as e:
             _LOGGER.error(f"Error initializing database: {e}")
@@ -305,7 +333,7 @@ class Timeline:
             _LOGGER.debug(f"Post-init version set skipped: {e}")
 
     async def _migrate(self):
-        """Handles migration for events.db (current v4)"""
+        """Handles migration for events.db (current v5)"""
         try:
             current_version = await self._get_db_version()
             if current_version >= DB_VERSION:
@@ -498,16 +526,148 @@ class Timeline:
             except aiosqlite.Error as e:
                 _LOGGER.error(f"Error migrating events.db to v4.3: {e}")
 
+            # v4 -> v5: Index the existing snapshots with their references
+            if current_version < 5:
+                try:
+                    async with aiosqlite.connect(self._db_path) as db:
+                        await async_create_table(db)
+                        async with db.execute(
+                            "SELECT key_frame FROM events"
+                        ) as cursor:
+                            key_frames = [row[0] for row in await cursor.fetchall()]
+                        indexed = await async_index_snapshots(
+                            self.hass, db, self._media_path, key_frames
+                        )
+                        await db.commit()
+                        _LOGGER.info(f"Indexed {indexed} snapshot(s)")
+                except aiosqlite.Error as e:
+                    _LOGGER.error(f"Error migrating events.db to v5: {e}")
+
             # Mark migration complete by setting user_version
             await self._set_db_version(DB_VERSION)
             _LOGGER.info(f"DB migration complete (user_version={DB_VERSION})")
         finally:
             self._migrating = False
+            self._migrated.set()
             try:
                 await self._cleanup()
             except Exception as e:
                 _LOGGER.warning(f"Post-migration cleanup failed: {e}")
 
+    def start_maintenance(self) -> Callable[[], None]:
+        """Purge expired events every hour and maintain the database every night
+
+        The purge runs at a random minute so that it does not coincide with other
+        hourly jobs. Returns a callback to stop both.
+        """
+
+        @callback
+        def _handle_purge(now: datetime.datetime | None = None) -> None:
+            self.hass.async_create_background_task(
+                self._purge_expired_events(), f"{DOMAIN} timeline retention purge"
+            )
+
+        @callback
+        def _handle_time(now: datetime.datetime) -> None:
+            self.hass.async_create_background_task(
+                self.async_maintain(), f"{DOMAIN} timeline maintenance"
+            )
+
+        unsubscribe = [
+            async_track_time_change(
+                self.hass,
+                _handle_purge,
+                minute=random.randint(0, 59),
+                second=random.randint(0, 59),
+            ),
+            async_track_time_change(
+                self.hass, _handle_time, hour=MAINTENANCE_HOUR, minute=0, second=0
+            ),
+        ]
+        # Events may have expired while Home Assistant was stopped
+        self.hass.async_create_background_task(
+            self._purge_after_migration(), f"{DOMAIN} timeline startup purge"
+        )
+
+        @callback
+        def _stop() -> None:
+            for unsub in unsubscribe:
+                unsub()
+
+        return _stop
+
+    async def _purge_after_migration(self) -> int:
+        """Purge expired events once the database is migrated"""
+        await self._migrated.wait()
+        return await self._purge_expired_events()
+
+    def _db_size(self) -> int:
+        """Bytes used by the database and its write-ahead log"""
+        size = 0
+        for path in (self._db_path, f"{self._db_path}-wal"):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    async def async_maintain(self) -> dict | None:
+        """Vacuum, analyze and checkpoint the database
+
+        Databases created before incremental auto_vacuum are rebuilt with a full
+        VACUUM once. Returns a report of the run, which is also kept for the
+        diagnostics, or None if the database is being migrated.
+        """
+        if getattr(self, "_migrating", False):
+            return None
+
+        start = time.monotonic()
+        size_before = await self.hass.async_add_executor_job(self._db_size)
+        report = {"timestamp": dt_util.now().isoformat()}
+        try:
+            async with aiosqlite.connect(self._db_path) as db:
+                async with db.execute("PRAGMA freelist_count") as cursor:
+                    report["free_pages"] = (await cursor.fetchone())[0]
+                async with db.execute("PRAGMA auto_vacuum") as cursor:
+                    auto_vacuum = (await cursor.fetchone())[0]
+                report["full_vacuum"] = auto_vacuum != AUTO_VACUUM_INCREMENTAL
+                if report["full_vacuum"]:
+                    # Changing auto_vacuum only takes effect with a VACUUM
+                    await db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                    await db.execute("VACUUM")
+                else:
+                    # execute() steps the pragma once, which frees a single page
+                    await db.executescript("PRAGMA incremental_vacuum;")
+
+                async with db.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+                ) as cursor:
+                    analyzed = await cursor.fetchone() is not None
+                # optimize only refreshes stats that exist, gather them the first time
+                await db.execute("PRAGMA optimize" if analyzed else "ANALYZE")
+
+                await db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                await db.commit()
+        except aiosqlite.Error as e:
+            _LOGGER.error(f"Error maintaining timeline database: {e}")
+            report["error"] = str(e)
+
+        size_after = await self.hass.async_add_executor_job(self._db_size)
+        report.update(
+            {
+                "duration": round(time.monotonic() - start, 3),
+                "size_before": size_before,
+                "size_after": size_after,
+                "reclaimed": max(0, size_before - size_after),
+            }
+        )
+        _LOGGER.info(
+            f"Timeline database maintained in {report['duration']}s, "
+            f"reclaimed {report['reclaimed']} bytes"
+        )
+        self.hass.data[MAINTENANCE_DATA] = report
+        return report
+
     def _ensure_datetime(self, dt):
         """Ensures the input is a datetime.datetime object"""
         if isinstance(dt, datetime.date) and not isinstance(dt, datetime.datetime):
@@ -539,45 +699,64 @@ class Timeline:
 
         return days
 
-    async def _purge_expired_events(self) -> None:
-        """Remove events older than now - retention_time days."""
+    async def _purge_expired_events(self) -> int:
+        """Remove events older than now - retention_time days and their key frames
+
+        Rows are deleted in batches along the start index within one transaction,
+        snapshots no other event references are removed afterwards in one executor
+        job. Returns the number of purged events.
+        """
         if getattr(self, "_migrating", False):
-            return
+            return 0
 
         retention_days = self._get_retention_days()
         if retention_days is None:
-            return
+            return 0
 
         cutoff = dt_util.utcnow() - datetime.timedelta(days=retention_days)
         cutoff_local = dt_util.as_local(self._ensure_datetime(cutoff)).isoformat()
 
+        purged = 0
+        released: list[str] = []
         try:
             async with aiosqlite.connect(self._db_path) as db:
-                async with db.execute(
-                    """
-                    SELECT uid, key_frame FROM events
-                    WHERE start IS NOT NULL AND start < ?
-                """,
-                    (cutoff_local,),
-                ) as cursor:
-                    stale_rows = list(await cursor.fetchall())
-
-                if not stale_rows:
-                    return
-
-                await db.executemany(
-                    "DELETE FROM events WHERE uid = ?",
-                    [(row[0],) for row in stale_rows],
-                )
+                while True:
+                    async with db.execute(
+                        """
+                        SELECT uid, key_frame FROM events
+                        WHERE start IS NOT NULL AND start < ?
+                        ORDER BY start LIMIT ?
+                    """,
+                        (cutoff_local, PURGE_BATCH_SIZE),
+                    ) as cursor:
+                        batch = list(await cursor.fetchall())
+                    if not batch:
+                        break
+                    placeholders = ",".join("?" * len(batch))
+                    await db.execute(
+                        f"DELETE FROM events WHERE uid IN ({placeholders})",
+                        [row[0] for row in batch],
+                    )
+                    purged += len(batch)
+                    released += await async_add_refs(
+                        db, [row[1] for row in batch], -1
+                    )
                 await db.commit()
-
-                _LOGGER.info(
-                    "Purged %s expired timeline event(s) older than %s day(s)",
-                    len(stale_rows),
-                    retention_days,
-                )
         except aiosqlite.Error as e:
             _LOGGER.error(f"Error purging expired timeline events: {e}")
+            return 0
+
+        if not purged:
+            return 0
+        removed = await self._remove_snapshots(released)
+        _LOGGER.info(
+            "Purged %s expired timeline event(s) and %s snapshot(s) older than "
+            "%s day(s)",
+            purged,
+            removed,
+            retention_days,
+        )
+        return purged
 
     async def _get_category_from_label(self, label: str) -> str:
         """Returns the category for a given label using the language regex template."""
@@ -594,7 +773,6 @@ class Timeline:
 
     async def load_events(self):
         """Loads events from the database into memory"""
-        await self._purge_expired_events()
         self.events = []
         try:
             async with aiosqlite.connect(self._db_path) as db:
@@ -653,6 +831,7 @@ class Timeline:
                     "end": event.end.isoformat() if event.end else None,
                     "description": event.description,
                     "key_frame": event.key_frame,
+                    "thumbnails": thumbnail_urls(event.key_frame),
                     "camera_name": event.camera_name,
                     "category": event.category,
                     "label": event.label,
@@ -677,7 +856,6 @@ class Timeline:
         _LOGGER.debug(
             f"Fetching events with filters - cameras: {cameras}, categories: {categories}, labels: {labels}, start: {start}, end: {end}, include_no_activity: {include_no_activity}"
         )
-        await self._purge_expired_events()
         events: list[dict] = []
 
         # Normalize start/end inputs to timezone-aware datetimes (or None)
@@ -755,6 +933,7 @@ class Timeline:
                             "end": row[3],
                             "description": row[4],
                             "key_frame": row[6],
+                            "thumbnails": thumbnail_urls(row[6]),
                             "camera_name": row[7],
                             "category": row[5],
                             "label": row[8],
@@ -798,52 +977,48 @@ class Timeline:
         start = dt_util.as_local(start)
         end = dt_util.as_local(end)
 
-        # Mark key_frame as pending so cleanup won't remove it before DB insert
-        pending_name = (
-            (os.path.basename(key_frame) or "").lower() if key_frame else None
-        )
-
+        # Snapshots are not removed while the event referencing them is inserted
         async with self._cleanup_lock:
-            if pending_name:
-                self._pending_key_frames.add(pending_name)
-            try:
-                await self.load_events()
+            await self.load_events()
 
-                # Resolve category and label if not provided
-                if not label:
-                    try:
-                        query_text = " ".join(
-                            part for part in (title or "", description or "") if part
-                        )
-                        auto_category, auto_label = await _get_category_and_label(
-                            self.hass, self._config_entry, query_text
-                        )
-                        if not category:
-                            category = auto_category
-                        if not label:
-                            label = auto_label
-                    except Exception as e:
-                        _LOGGER.warning(f"Failed to resolve category: {e}")
-                else:
-                    category = await self._get_category_from_label(label)
-
-                event = Event(
-                    uid=str(uuid.uuid4()),
-                    title=title,
-                    start=start,
-                    end=end,
-                    description=description,
-                    key_frame=key_frame,
-                    camera_name=camera_name,
-                    category=category,
-                    label=label,
-                )
-                _LOGGER.info(f"Creating event: {event}")
-                await self._insert_event(event)
-            finally:
-                # Remove from pending once DB insert is done
-                if pending_name:
-                    self._pending_key_frames.discard(pending_name)
+            # Resolve category and label if not provided
+            if not label:
+                try:
+                    query_text = " ".join(
+                        part for part in (title or "", description or "") if part
+                    )
+                    auto_category, auto_label = await _get_category_and_label(
+                        self.hass, self._config_entry, query_text
+                    )
+                    if not category:
+                        category = auto_category
+                    if not label:
+                        label = auto_label
+                except Exception as e:
+                    _LOGGER.warning(f"Failed to resolve category: {e}")
+            else:
+                category = await self._get_category_from_label(label)
+
+            event = Event(
+                uid=str(uuid.uuid4()),
+                title=title,
+                start=start,
+                end=end,
+                description=description,
+                key_frame=key_frame,
+                camera_name=camera_name,
+                category=category,
+                label=label,
+            )
+            _LOGGER.info(f"Creating event: {event}")
+            await self._insert_event(event)
+
+        # The snapshot is referenced now, so the cleanup leaves it alone
+        name = snapshot_name(key_frame)
+        if name is not None:
+            await self.hass.async_add_executor_job(
+                generate_thumbnails, self._media_path, name
+            )
 
     async def _insert_event(self, event: Event) -> None:
         """Inserts a new event into the database"""
@@ -869,6 +1044,7 @@ class Timeline:
                         event.label,
                     ),
                 )
+                await async_add_refs(db, [event.key_frame], 1)
                 await db.commit()
                 await self.load_events()
         except aiosqlite.Error as e:
@@ -897,9 +1073,14 @@ class Timeline:
         start = dt_util.as_local(start)
         end = dt_util.as_local(end)
 
+        released = []
         try:
             async with aiosqlite.connect(self._db_path) as db:
                 _LOGGER.info(f"Updating event with UID {uid}")
+                async with db.execute(
+                    "SELECT key_frame FROM events WHERE uid = ?", (uid,)
+                ) as cursor:
+                    row = await cursor.fetchone()
                 await db.execute(
                     """
                     UPDATE events
@@ -918,10 +1099,14 @@ class Timeline:
                         uid,
                     ),
                 )
+                if row and row[0] != key_frame:
+                    await async_add_refs(db, [key_frame], 1)
+                    released = await async_add_refs(db, [row[0]], -1)
                 await db.commit()
                 await self.load_events()
         except aiosqlite.Error as e:
             _LOGGER.error(f"Error updating event in database: {e}")
+        await self._remove_snapshots(released)
 
     async def delete_event(
         self,
@@ -929,100 +1114,54 @@ class Timeline:
     ) -> bool:
         """Deletes an event from the calendar."""
         _LOGGER.info(f"Deleting event with UID: {uid}")
+        try:
+            async with aiosqlite.connect(self._db_path) as db:
+                async with db.execute(
+                    "SELECT key_frame FROM events WHERE uid = ?", (uid,)
+                ) as cursor:
+                    row = await cursor.fetchone()
+                await db.execute("DELETE FROM events WHERE uid = ?", (uid,))
+                released = await async_add_refs(db, [row[0]] if row else [], -1)
+                await db.commit()
+        except aiosqlite.Error as e:
+            _LOGGER.error(f"Error deleting event from database: {e}")
+            return False
+        await self._remove_snapshots(released)
+        return True
 
-        async def _delete_event_from_db(uid: str) -> bool:
-            """Deletes an event from the database"""
-            try:
-                async with aiosqlite.connect(self._db_path) as db:
-                    await db.execute("DELETE FROM events WHERE uid = ?", (uid,))
-                    await db.commit()
-            except aiosqlite.Error as e:
-                _LOGGER.error(f"Error deleting event from database: {e}")
-                return False
-            return True
-
-        async def _delete_image(uid: str) -> bool:
-            """Deletes the image associated with the event"""
+    async def _remove_snapshots(self, names: list[str]) -> int:
+        """Deletes snapshots without references, returns how many were removed"""
+        if not names:
+            return 0
+        async with self._cleanup_lock:
             try:
                 async with aiosqlite.connect(self._db_path) as db:
-                    async with db.execute(
-                        "SELECT key_frame FROM events WHERE uid = ?", (uid,)
-                    ) as cursor:
-                        key_frame = await cursor.fetchone()
-                        if key_frame:
-                            key_frame = key_frame[0]
-                            if os.path.exists(key_frame) and f"/{DOMAIN}/" in key_frame:
-                                os.remove(key_frame)
-                                _LOGGER.info(f"Deleted image: {key_frame}")
+                    removed = await async_remove_snapshots(
+                        self.hass, db, self._media_path, names
+                    )
             except aiosqlite.Error as e:
-                _LOGGER.error(f"Error deleting image: {e}")
-                return False
-            return True
-
-        success_image = await _delete_image(uid)
-        success_event = await _delete_event_from_db(uid)
-        return success_image and success_event
+                _LOGGER.error(f"Error removing snapshots: {e}")
+                return 0
+        return removed
 
     async def _cleanup(self):
-        """Deletes images not associated with any events.
-        Protects:
-          - Images linked to events.
-          - Pending key_frames (event insert in progress).
-          - Very new files (grace period).
+        """Deletes snapshots not associated with any events.
+
+        Snapshots are indexed when they are written, so orphans are found by query.
+        Unreferenced ones from the last hour are kept for the event that is about
+        to be created with them.
         """
         if getattr(self, "_migrating", False):
             # Skip cleanup during migration
             return
 
-        GRACE_SECONDS = 10
-
-        async with self._cleanup_lock:
-            linked_frames = {
-                (os.path.basename(n) or "").lower()
-                for n in await self.get_linked_images()
-            }
-
-            # List files in snapshots dir (in executor, non-blocking)
-            try:
-                files = await self.hass.async_add_executor_job(
-                    os.listdir, self._media_path
-                )
-            except FileNotFoundError:
-                return
-
-            now_ts = datetime.datetime.now().timestamp()
-            removed = 0
-
-            for file in files:
-                file_path = os.path.join(self._media_path, file)
-                is_file = await self.hass.async_add_executor_job(
-                    os.path.isfile, file_path
-                )
-                if not is_file:
-                    continue
-
-                base = (file or "").lower()
-
-                # Protect if linked to an event or pending
-                if base in linked_frames or base in self._pending_key_frames:
-                    continue
-
-                # Protect new files (grace window)
-                try:
-                    mtime = await self.hass.async_add_executor_job(
-                        os.path.getmtime, file_path
-                    )
-                    if (now_ts - mtime) < GRACE_SECONDS:
-                        continue
-                except OSError:
-                    continue
-
-                _LOGGER.info(f"[CLEANUP] Removing unlinked snapshot: {file}")
-                try:
-                    await self.hass.async_add_executor_job(os.remove, file_path)
-                    removed += 1
-                except OSError as e:
-                    _LOGGER.warning(f"[CLEANUP] Failed to remove {file_path}: {e}")
+        try:
+            async with aiosqlite.connect(self._db_path) as db:
+                orphans = await async_orphans(db)
+        except aiosqlite.Error as e:
+            _LOGGER.error(f"[CLEANUP] Error querying orphaned snapshots: {e}")
+            return
 
-            if removed:
-                _LOGGER.debug(f"[CLEANUP] Removed {removed} orphaned snapshot(s)")
+        removed = await self._remove_snapshots(orphans)
+        if removed:
+            _LOGGER.debug(f"[CLEANUP] Removed {removed} orphaned snapshot(s)")
@@ -0,0 +1,140 @@
+"""Per-stage latency traces of analyzer service calls"""
+
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any
+import time
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from .const import DOMAIN
+
+TRACE_DATA = f"{DOMAIN}_traces"
+
+# Number of recent traces kept for diagnostics
+MAX_TRACES = 50
+
+
+class Span:
+    """A timed stage of a service call with its nested stages"""
+
+    def __init__(self, name: str, attributes: dict | None = None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start = time.monotonic()
+        self.end: float | None = None
+        self.children: list[Span] = []
+
+    def finish(self) -> None:
+        if self.end is None:
+            self.end = time.monotonic()
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.monotonic()) - self.start
+
+    def as_dict(self, origin: float | None = None) -> dict:
+        """Span tree with start offsets and durations in milliseconds"""
+        origin = self.start if origin is None else origin
+        result: dict[str, Any] = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 1),
+            "duration_ms": round(self.duration * 1000, 1),
+        }
+        if self.attributes:
+            result["attributes"] = self.attributes
+        if self.children:
+            result["children"] = [child.as_dict(origin) for child in self.children]
+        return result
+
+
+current_span: ContextVar[Span | None] = ContextVar(
+    "llmvision_current_span", default=None
+)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a stage as a child of the current span (no-op outside a trace)"""
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, attributes)
+    parent.children.append(child)
+    token = current_span.set(child)
+    try:
+        yield child
+    finally:
+        child.finish()
+        current_span.reset(token)
+
+
+def traced(name: str):
+    """Decorator timing every call of a coroutine function as a span"""
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def annotate(**attributes) -> None:
+    """Add attributes to the current span"""
+    current = current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def add_span(name: str, duration: float, **attributes) -> None:
+    """Add a stage that was timed separately and just ended"""
+    parent = current_span.get()
+    if parent is None:
+        return
+    child = Span(name, attributes)
+    child.end = child.start
+    child.start -= duration
+    parent.children.append(child)
+
+
+class TraceRegistry:
+    """Ring buffer of the most recent traces"""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._traces: deque[dict] = deque(maxlen=MAX_TRACES)
+
+    @staticmethod
+    def get(hass: HomeAssistant) -> "TraceRegistry":
+        """Return the registry stored in hass.data, creating it if needed"""
+        registry = hass.data.get(TRACE_DATA)
+        if not isinstance(registry, TraceRegistry):
+            registry = TraceRegistry(hass)
+            hass.data[TRACE_DATA] = registry
+        return registry
+
+    @contextmanager
+    def trace(self, service: str, **attributes):
+        """Record the spans of a service call, yields the root span"""
+        root = Span(service, attributes)
+        timestamp = dt_util.utcnow().isoformat()
+        token = current_span.set(root)
+        try:
+            yield root
+        except Exception as e:
+            root.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            root.finish()
+            current_span.reset(token)
+            self._traces.append({"timestamp": timestamp, **root.as_dict()})
+
+    def traces(self) -> list[dict]:
+        """Recent traces, oldest first"""
+        return list(self._traces)
@@ -0,0 +1,154 @@
+"""Token usage and cost of provider requests"""
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from .const import DOMAIN, CONF_PROVIDER, CONF_COST_TABLE, SIGNAL_USAGE_UPDATED
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+USAGE_DATA = f"{DOMAIN}_usage"
+
+
+def parse_cost_table(text: str | None) -> dict[str, tuple[float, float, float]]:
+    """Parse 'model: input, output[, cached]' lines (USD per million tokens)
+
+    Cached input tokens are charged at the input price if no cached price is
+    given. Invalid lines are skipped.
+    """
+    table = {}
+    for line in str(text or "").splitlines():
+        # Model names may contain colons themselves (e.g. gemma3:4b)
+        model, _, prices = line.rpartition(":")
+        model = model.strip().lower()
+        if not model or not prices:
+            continue
+        try:
+            values = [float(value) for value in prices.split(",")]
+        except ValueError:
+            _LOGGER.warning(f"Invalid cost table line: {line}")
+            continue
+        if len(values) == 2:
+            values.append(values[0])
+        if len(values) != 3:
+            _LOGGER.warning(f"Invalid cost table line: {line}")
+            continue
+        table[model] = (values[0], values[1], values[2])
+    return table
+
+
+class UsageCounters:
+    """Totals of the requests made to one provider or model"""
+
+    def __init__(self):
+        self.requests = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cached_tokens = 0
+        self.server_time = 0.0
+        self.cost: float | None = None
+
+    def add(self, usage: dict, cost: float | None) -> None:
+        self.requests += 1
+        self.input_tokens += usage.get("input_tokens") or 0
+        self.output_tokens += usage.get("output_tokens") or 0
+        self.cached_tokens += usage.get("cached_tokens") or 0
+        self.server_time += usage.get("server_time") or 0.0
+        if cost is not None:
+            self.cost = (self.cost or 0.0) + cost
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cached_tokens": self.cached_tokens,
+            "server_time": round(self.server_time, 3),
+            "cost": round(self.cost, 6) if self.cost is not None else None,
+        }
+
+
+def summarize(records: list[dict]) -> dict:
+    """Usage of all provider requests made for one service call"""
+    counters = UsageCounters()
+    for record in records:
+        counters.add(record, record.get("cost"))
+    return counters.as_dict()
+
+
+class UsageRegistry:
+    """Usage counters per provider entry and per model since startup"""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._entries: dict[str, UsageCounters] = {}
+        self._models: dict[str, dict[str, UsageCounters]] = {}
+        self._cost_text: str | None = None
+        self._cost_table: dict[str, tuple[float, float, float]] = {}
+
+    @staticmethod
+    def get(hass: HomeAssistant) -> "UsageRegistry":
+        """Return the registry stored in hass.data, creating it if needed"""
+        registry = hass.data.get(USAGE_DATA)
+        if not isinstance(registry, UsageRegistry):
+            registry = UsageRegistry(hass)
+            hass.data[USAGE_DATA] = registry
+        return registry
+
+    def get_counters(self, entry_id: str) -> UsageCounters:
+        counters = self._entries.get(entry_id)
+        if counters is None:
+            counters = self._entries[entry_id] = UsageCounters()
+        return counters
+
+    def get_models(self, entry_id: str) -> dict[str, UsageCounters]:
+        return self._models.get(entry_id, {})
+
+    def record(self, entry_id: str, model: str, usage: dict) -> float | None:
+        """Add the usage of one request, returns its cost if the model is priced"""
+        cost = self.cost(model, usage)
+        self.get_counters(entry_id).add(usage, cost)
+        models = self._models.setdefault(entry_id, {})
+        models.setdefault(model, UsageCounters()).add(usage, cost)
+        async_dispatcher_send(self.hass, SIGNAL_USAGE_UPDATED, entry_id)
+        return cost
+
+    def cost(self, model: str, usage: dict) -> float | None:
+        """USD cost of usage, None if the model is not in the cost table"""
+        prices = self._get_prices(model)
+        if prices is None:
+            return None
+        input_price, output_price, cached_price = prices
+        input_tokens = usage.get("input_tokens") or 0
+        cached_tokens = min(usage.get("cached_tokens") or 0, input_tokens)
+        return (
+            (input_tokens - cached_tokens) * input_price
+            + cached_tokens * cached_price
+            + (usage.get("output_tokens") or 0) * output_price
+        ) / 1_000_000
+
+    def remove(self, entry_id: str) -> None:
+        self._entries.pop(entry_id, None)
+        self._models.pop(entry_id, None)
+
+    def _get_prices(self, model: str) -> tuple[float, float, float] | None:
+        text = None
+        for data in (self.hass.data.get(DOMAIN) or {}).values():
+            if data.get(CONF_PROVIDER) == "Settings":
+                text = data.get(CONF_COST_TABLE)
+                break
+        if text != self._cost_text:
+            self._cost_text = text
+            self._cost_table = parse_cost_table(text)
+        model = (model or "").lower()
+        if model in self._cost_table:
+            return self._cost_table[model]
+        # Fall back to the longest entry the model name starts with
+        for name in sorted(self._cost_table, key=len, reverse=True):
+            if model.startswith(name):
+                return self._cost_table[name]
+        return None
@@ -0,0 +1,269 @@
+"""Keep local Ollama models loaded and report cold vs. warm request latency"""
+
+from collections import deque
+from datetime import datetime, time as dt_time, timedelta
+from typing import Callable
+import asyncio
+import logging
+import time
+from aiohttp import ClientTimeout
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_time_interval,
+)
+from homeassistant.util import dt as dt_util
+from .const import (
+    DOMAIN,
+    CONF_IP_ADDRESS,
+    CONF_PORT,
+    CONF_HTTPS,
+    CONF_DEFAULT_MODEL,
+    CONF_KEEP_ALIVE,
+    CONF_WARMUP_INTERVAL,
+    CONF_WARMUP_SENSORS,
+    CONF_WARMUP_START,
+    CONF_WARMUP_END,
+    DEFAULT_OLLAMA_MODEL,
+    ENDPOINT_OLLAMA_GENERATE,
+    SIGNAL_WARMUP_UPDATED,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+WARMUP_DATA = f"{DOMAIN}_warmup"
+
+# Requests that spent longer loading the model are counted as cold
+COLD_LOAD_THRESHOLD = 0.5
+WARMUP_TIMEOUT = 120
+
+
+def _parse_time(value) -> dt_time | None:
+    if not value:
+        return None
+    try:
+        return dt_time.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+class WarmupStats:
+    """Latency of requests that found the model loaded (warm) or had to load it
+
+    Args:
+        window (int): Number of recent requests to keep per kind
+    """
+
+    def __init__(self, window: int = 50):
+        self.cold: deque = deque(maxlen=window)
+        self.warm: deque = deque(maxlen=window)
+        self.last_warmup: datetime | None = None
+        self.last_warmup_load: float | None = None
+
+    def record_request(self, latency: float, load_duration: float) -> None:
+        if load_duration >= COLD_LOAD_THRESHOLD:
+            self.cold.append(latency)
+        else:
+            self.warm.append(latency)
+
+    def record_warmup(self, load_duration: float) -> None:
+        self.last_warmup = dt_util.now()
+        self.last_warmup_load = round(load_duration, 3)
+
+    @staticmethod
+    def _median(values: deque) -> float | None:
+        if not values:
+            return None
+        ordered = sorted(values)
+        return round(ordered[len(ordered) // 2], 3)
+
+    def as_dict(self) -> dict:
+        return {
+            "cold_requests": len(self.cold),
+            "warm_requests": len(self.warm),
+            "cold_latency_p50": self._median(self.cold),
+            "warm_latency_p50": self._median(self.warm),
+            "last_warmup_load_duration": self.last_warmup_load,
+        }
+
+
+class OllamaWarmer:
+    """Preload the default model of one Ollama entry and keep it loaded
+
+    The model is loaded at startup, every warmup_interval minutes and whenever
+    one of the warm-up sensors turns on, but only between warmup_start and
+    warmup_end if those are set.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, config: dict):
+        self.hass = hass
+        self.entry_id = entry_id
+        self.model = config.get(CONF_DEFAULT_MODEL) or DEFAULT_OLLAMA_MODEL
+        self.keep_alive = config.get(CONF_KEEP_ALIVE, "5m")
+        self.url = ENDPOINT_OLLAMA_GENERATE.format(
+            protocol="https" if config.get(CONF_HTTPS) else "http",
+            ip_address=config.get(CONF_IP_ADDRESS),
+            port=config.get(CONF_PORT),
+        )
+        try:
+            self.interval = float(config.get(CONF_WARMUP_INTERVAL, 4))
+        except (TypeError, ValueError):
+            self.interval = 4.0
+        self.sensors: list[str] = list(config.get(CONF_WARMUP_SENSORS) or [])
+        self.start_time = _parse_time(config.get(CONF_WARMUP_START))
+        self.end_time = _parse_time(config.get(CONF_WARMUP_END))
+        self._task: asyncio.Task | None = None
+        self._unsubscribe: list[Callable[[], None]] = []
+
+    def in_window(self, now: datetime) -> bool:
+        """Whether warm-ups are allowed at now (windows may span midnight)"""
+        if self.start_time is None or self.end_time is None:
+            return True
+        if self.start_time == self.end_time:
+            return True
+        current = now.time()
+        if self.start_time < self.end_time:
+            return self.start_time <= current < self.end_time
+        return current >= self.start_time or current < self.end_time
+
+    @callback
+    def start(self) -> None:
+        self._schedule("startup")
+        if self.interval > 0:
+            self._unsubscribe.append(
+                async_track_time_interval(
+                    self.hass,
+                    self._handle_interval,
+                    timedelta(minutes=self.interval),
+                )
+            )
+        if self.sensors:
+            self._unsubscribe.append(
+                async_track_state_change_event(
+                    self.hass, self.sensors, self._handle_sensor
+                )
+            )
+
+    @callback
+    def stop(self) -> None:
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe.clear()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    @callback
+    def _handle_interval(self, now: datetime) -> None:
+        self._schedule("interval")
+
+    @callback
+    def _handle_sensor(self, event) -> None:
+        new_state = event.data.get("new_state")
+        old_state = event.data.get("old_state")
+        if new_state is None or new_state.state != "on":
+            return
+        if old_state is not None and old_state.state == "on":
+            return
+        self._schedule(new_state.entity_id)
+
+    @callback
+    def _schedule(self, reason: str) -> None:
+        if not self.in_window(dt_util.now()):
+            _LOGGER.debug(f"Skipping warm-up of {self.model} outside warm-up hours")
+            return
+        if self._task is not None and not self._task.done():
+            return
+        self._task = self.hass.async_create_background_task(
+            self.async_warm_up(reason), f"{DOMAIN} warm-up {self.entry_id}"
+        )
+
+    async def async_warm_up(self, reason: str) -> None:
+        """Load the model with an empty generate request"""
+        session = async_get_clientsession(self.hass)
+        start = time.monotonic()
+        try:
+            response = await session.post(
+                self.url,
+                json={"model": self.model, "keep_alive": self.keep_alive},
+                timeout=ClientTimeout(total=WARMUP_TIMEOUT),
+            )
+            if response.status != 200:
+                _LOGGER.warning(
+                    f"Warm-up of {self.model} failed with status {response.status}"
+                )
+                return
+            data = await response.json()
+        except Exception as e:
+            _LOGGER.warning(f"Warm-up of {self.model} failed: {e}")
+            return
+        load_duration = (data.get("load_duration") or 0) / 1e9
+        _LOGGER.debug(
+            f"Warmed up {self.model} ({reason}) in {time.monotonic() - start:.2f}s, "
+            f"load duration {load_duration:.2f}s"
+        )
+        WarmupRegistry.get(self.hass).record_warmup(self.entry_id, load_duration)
+
+
+class WarmupRegistry:
+    """Warmers and latency stats of every Ollama entry"""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._warmers: dict[str, OllamaWarmer] = {}
+        self._stats: dict[str, WarmupStats] = {}
+
+    @staticmethod
+    def get(hass: HomeAssistant) -> "WarmupRegistry":
+        """Return the registry stored in hass.data, creating it if needed"""
+        registry = hass.data.get(WARMUP_DATA)
+        if not isinstance(registry, WarmupRegistry):
+            registry = WarmupRegistry(hass)
+            hass.data[WARMUP_DATA] = registry
+        return registry
+
+    def get_stats(self, entry_id: str) -> WarmupStats:
+        stats = self._stats.get(entry_id)
+        if stats is None:
+            stats = self._stats[entry_id] = WarmupStats()
+        return stats
+
+    @callback
+    def start(self, entry_id: str, config: dict) -> Callable[[], None]:
+        """Start warming the model of an entry, returns a callback to stop"""
+        self.stop(entry_id)
+        warmer = self._warmers[entry_id] = OllamaWarmer(self.hass, entry_id, config)
+        warmer.start()
+        return lambda: self.stop(entry_id)
+
+    @callback
+    def stop(self, entry_id: str) -> None:
+        warmer = self._warmers.pop(entry_id, None)
+        if warmer is not None:
+            warmer.stop()
+
+    def record_request(
+        self, entry_id: str, latency: float, load_duration: float
+    ) -> None:
+        stats = self.get_stats(entry_id)
+        stats.record_request(latency, load_duration)
+        if load_duration >= COLD_LOAD_THRESHOLD:
+            _LOGGER.info(
+                f"Ollama request of {entry_id} loaded the model for "
+                f"{load_duration:.2f}s (cold start)"
+            )
+        self._notify(entry_id)
+
+    def record_warmup(self, entry_id: str, load_duration: float) -> None:
+        self.get_stats(entry_id).record_warmup(load_duration)
+        self._notify(entry_id)
+
+    def remove(self, entry_id: str) -> None:
+        """Stop the warmer and forget the stats of an entry"""
+        self.stop(entry_id)
+        self._stats.pop(entry_id, None)
+
+    def _notify(self, entry_id: str) -> None:
+        async_dispatcher_send(self.hass, SIGNAL_WARMUP_UPDATED, entry_id)
@@ -1,26 +1,33 @@
-"""Unit tests for api.py timeline views."""
+"""Unit tests for api.py views."""
 
 import json
 from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, Mock, patch
 
+from PIL import Image
 import pytest
 
 from custom_components.llmvision.api import (
+    MetricsView,
     TimelineEventCreateView,
     TimelineEventsView,
     TimelineEventView,
+    TimelineThumbnailView,
     async_get_settings_entry,
 )
+from custom_components.llmvision.metrics import MetricsRegistry
 
 
 pytestmark = pytest.mark.unit
 
 
-def _make_request(hass, query=None, json_body=None, json_exception=None):
+def _make_request(
+    hass, query=None, json_body=None, json_exception=None, headers=None
+):
     request = Mock()
     request.app = {"hass": hass}
     request.query = query or {}
+    request.headers = headers or {}
     request.json = AsyncMock()
     if json_exception is not None:
         request.json.side_effect = json_exception
@@ -603,3 +610,79 @@ class TestTimelineEventView:
 
         assert response.status == 200
         assert _response_payload(response) == {"event_id": "event-1", "status": "updated"}
+
+
+class TestTimelineThumbnailView:
+    """Tests for TimelineThumbnailView."""
+
+    @pytest.fixture
+    def snapshots(self, mock_hass, tmp_path):
+        root = tmp_path / "snapshots"
+        (root / "2026/01/02").mkdir(parents=True)
+        Image.new("RGB", (960, 540)).save(root / "2026/01/02/abc.jpg")
+        mock_hass.async_add_executor_job = AsyncMock(
+            side_effect=lambda func, *args: func(*args)
+        )
+        with patch("custom_components.llmvision.api.SNAPSHOTS_PATH", str(root)):
+            yield tmp_path
+
+    @pytest.mark.asyncio
+    async def test_serves_thumbnail_with_cache_headers(self, mock_hass, snapshots):
+        request = _make_request(mock_hass)
+
+        response = await TimelineThumbnailView().get(request, "160", "2026/01/02/abc.jpg")
+
+        assert response.status == 200
+        assert response.content_type == "image/jpeg"
+        assert response.headers["ETag"].startswith('"')
+        assert response.headers["Cache-Control"] == "private, max-age=86400"
+        # Snapshots from before thumbnails get them on the first request
+        assert (snapshots / "thumbnails/160/2026/01/02/abc.jpg").exists()
+
+    @pytest.mark.asyncio
+    async def test_returns_304_for_matching_etag(self, mock_hass, snapshots):
+        view = TimelineThumbnailView()
+        first = await view.get(_make_request(mock_hass), "480", "2026/01/02/abc.jpg")
+        etag = first.headers["ETag"]
+        request = _make_request(mock_hass, headers={"If-None-Match": f'"other", {etag}'})
+
+        response = await view.get(request, "480", "2026/01/02/abc.jpg")
+
+        assert response.status == 304
+        assert response.headers["ETag"] == etag
+        assert not response.body
+
+    @pytest.mark.asyncio
+    async def test_returns_404_for_unknown_width_or_snapshot(self, mock_hass, snapshots):
+        view = TimelineThumbnailView()
+        request = _make_request(mock_hass)
+
+        assert (await view.get(request, "999", "2026/01/02/abc.jpg")).status == 404
+        assert (await view.get(request, "160", "../secrets.yaml")).status == 404
+        assert (await view.get(request, "160", "2026/01/02/missing.jpg")).status == 404
+
+
+class TestMetricsView:
+    """Tests for MetricsView."""
+
+    @pytest.mark.asyncio
+    async def test_serves_prometheus_text_by_default(self, mock_hass):
+        request = _make_request(mock_hass)
+
+        response = await MetricsView().get(request)
+
+        assert response.status == 200
+        assert response.content_type == "text/plain"
+        assert "# TYPE llmvision_service_duration_seconds histogram" in response.text
+
+    @pytest.mark.asyncio
+    async def test_serves_json(self, mock_hass):
+        MetricsRegistry.get(mock_hass).record_call("image_analyzer", 1.2)
+        request = _make_request(mock_hass, query={"format": "json"})
+
+        response = await MetricsView().get(request)
+
+        payload = _response_payload(response)
+        assert payload["services"]["image_analyzer"]["count"] == 1
+        assert payload["frames_sent"] == 0
+
@@ -0,0 +1,86 @@
+"""Unit tests for aws.py module."""
+
+from datetime import datetime, timezone
+import struct
+import zlib
+import pytest
+from custom_components.llmvision.aws import EventStreamDecoder, SigV4Signer
+
+URL = "https://bedrock-runtime.us-east-1.amazonaws.com/model/m%3A0/converse"
+NOW = datetime(2015, 8, 30, 12, 36, 0, tzinfo=timezone.utc)
+
+
+def _message(headers: bytes, payload: bytes) -> bytes:
+    prelude = struct.pack(">II", 12 + len(headers) + len(payload) + 4, len(headers))
+    message = prelude + struct.pack(">I", zlib.crc32(prelude)) + headers + payload
+    return message + struct.pack(">I", zlib.crc32(message))
+
+
+class TestSigV4Signer:
+    def test_sign_matches_reference_signature(self):
+        """Test the signature matches the one botocore computes for this request."""
+        signer = SigV4Signer(
+            "AKIDEXAMPLE", "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY", "us-east-1"
+        )
+        headers = signer.sign(
+            "POST",
+            URL,
+            {"Content-Type": "application/json"},
+            b'{"messages": []}',
+            now=NOW,
+        )
+
+        assert headers["X-Amz-Date"] == "20150830T123600Z"
+        assert headers["Content-Type"] == "application/json"
+        assert headers["Authorization"] == (
+            "AWS4-HMAC-SHA256 "
+            "Credential=AKIDEXAMPLE/20150830/us-east-1/bedrock/aws4_request, "
+            "SignedHeaders=content-type;host;x-amz-date, "
+            "Signature=2bfcff5e49e591bf2c7471e606b2ebd56661ff92cfec094ea3447efef3d66368"
+        )
+
+    def test_signing_key_is_cached_per_day(self, monkeypatch):
+        """Test the signing key is derived once per date."""
+        signer = SigV4Signer("AK", "SK", "us-east-1", session_token="TOKEN")
+        derived = []
+        original = signer._signing_key.__func__
+
+        def _spy(self, date_stamp):
+            if self._key_date != date_stamp:
+                derived.append(date_stamp)
+            return original(self, date_stamp)
+
+        monkeypatch.setattr(SigV4Signer, "_signing_key", _spy)
+        first = signer.sign("POST", URL, {}, b"", now=NOW)
+        signer.sign("POST", URL, {}, b"{}", now=NOW)
+        signer.sign("POST", URL, {}, b"", now=NOW.replace(day=31))
+
+        assert derived == ["20150830", "20150831"]
+        assert first["X-Amz-Security-Token"] == "TOKEN"
+        assert "x-amz-security-token" in first["Authorization"]
+
+
+class TestEventStreamDecoder:
+    def test_feed_returns_complete_messages(self):
+        """Test messages split across chunks are returned once complete."""
+        name = b":event-type"
+        headers = bytes([len(name)]) + name + b"\x07" + struct.pack(">H", 5) + b"delta"
+        headers += bytes([4]) + b"flag" + b"\x00"
+        data = _message(headers, b'{"a": 1}') + _message(b"", b"")
+        decoder = EventStreamDecoder()
+
+        assert decoder.feed(data[:20]) == []
+        messages = decoder.feed(data[20:])
+
+        assert messages == [
+            ({":event-type": "delta", "flag": True}, b'{"a": 1}'),
+            ({}, b""),
+        ]
+
+    def test_feed_rejects_corrupt_messages(self):
+        """Test checksum mismatches raise ValueError."""
+        data = bytearray(_message(b"", b"payload"))
+        data[-5] ^= 0xFF
+
+        with pytest.raises(ValueError):
+            EventStreamDecoder().feed(bytes(data))
@@ -0,0 +1,114 @@
+"""Unit tests for cache.py module."""
+
+import base64
+import io
+import json
+import pytest
+from unittest.mock import Mock
+from PIL import Image
+from custom_components.llmvision.const import DOMAIN
+from custom_components.llmvision.cache import (
+    ResponseCache,
+    frame_hash,
+    hamming_distance,
+)
+
+
+def _make_base64_jpeg(reverse=False, offset=0):
+    """Create a base64 JPEG with a horizontal gradient."""
+    img = Image.new("L", (72, 48))
+    for x in range(72):
+        value = (x * 3 if reverse else 215 - x * 3) + offset
+        img.paste(value, (x, 0, x + 1, 48))
+    buffer = io.BytesIO()
+    img.convert("RGB").save(buffer, format="JPEG")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+@pytest.fixture
+def cache_hass(tmp_path):
+    """Mock hass with an executor that runs jobs inline and a tmp config dir."""
+    hass = Mock()
+    hass.data = {
+        DOMAIN: {"settings": {"provider": "Settings", "response_cache": True}}
+    }
+    hass.config.path = lambda *parts: str(tmp_path.joinpath(*parts))
+
+    async def _run(func, *args):
+        return func(*args)
+
+    hass.async_add_executor_job = _run
+    return hass
+
+
+def test_frame_hash_tolerates_small_changes():
+    """Test near-identical frames hash close together and different ones don't."""
+    base = frame_hash(_make_base64_jpeg())
+    brighter = frame_hash(_make_base64_jpeg(offset=20))
+    reversed_ = frame_hash(_make_base64_jpeg(reverse=True))
+
+    assert hamming_distance(base, brighter) <= 4
+    assert hamming_distance(base, reversed_) > 32
+
+
+def test_get_returns_none_when_disabled(cache_hass):
+    """Test the cache is only created when enabled in Settings."""
+    cache_hass.data[DOMAIN]["settings"]["response_cache"] = False
+    assert ResponseCache.get(cache_hass) is None
+
+    cache_hass.data[DOMAIN]["settings"]["response_cache"] = True
+    assert ResponseCache.get(cache_hass) is ResponseCache.get(cache_hass)
+
+
+@pytest.mark.anyio
+async def test_lookup_within_tolerance_and_counters(cache_hass):
+    """Test hits require matching text and frames within tolerance."""
+    cache = ResponseCache(cache_hass, tolerance=2)
+    await cache.async_store("key", [0b1111], {"response_text": "cached"})
+
+    assert await cache.async_lookup("key", [0b0111]) == {"response_text": "cached"}
+    assert await cache.async_lookup("key", [0b0000]) is None
+    assert await cache.async_lookup("other", [0b1111]) is None
+    assert await cache.async_lookup("key", [0b1111, 0b1111]) is None
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+@pytest.mark.anyio
+async def test_expired_entries_are_dropped(cache_hass):
+    """Test entries older than the TTL are not served."""
+    cache = ResponseCache(cache_hass, ttl=60)
+    await cache.async_store("key", [1], {"response_text": "old"})
+    next(iter(cache._entries.values()))["created"] -= 120
+
+    assert await cache.async_lookup("key", [1]) is None
+    assert cache.size == 0
+
+
+@pytest.mark.anyio
+async def test_lru_is_bounded(cache_hass):
+    """Test the least recently used entry is evicted first."""
+    cache = ResponseCache(cache_hass, tolerance=0, max_entries=2)
+    await cache.async_store("a", [1], {"response_text": "a"})
+    await cache.async_store("b", [2], {"response_text": "b"})
+    assert await cache.async_lookup("a", [1]) is not None
+    await cache.async_store("c", [3], {"response_text": "c"})
+
+    assert await cache.async_lookup("b", [2]) is None
+    assert await cache.async_lookup("a", [1]) is not None
+    assert cache.size == 2
+
+
+@pytest.mark.anyio
+async def test_cache_is_persisted(cache_hass, tmp_path):
+    """Test entries and counters survive a restart."""
+    cache = ResponseCache(cache_hass)
+    await cache.async_lookup("key", [5])
+    await cache.async_store("key", [5], {"response_text": "saved"})
+
+    stored = json.loads((tmp_path / DOMAIN / "response_cache.json").read_text())
+    assert stored["misses"] == 1
+
+    reloaded = ResponseCache(cache_hass)
+    assert await reloaded.async_lookup("key", [5]) == {"response_text": "saved"}
+    assert reloaded.misses == 1
+    assert reloaded.hits == 1
@@ -22,12 +22,14 @@ from custom_components.llmvision.const import (
     CONF_HTTPS,
     CONF_IP_ADDRESS,
     CONF_KEEP_ALIVE,
+    CONF_MAX_CONCURRENT_REQUESTS,
     CONF_MEMORY_PATHS,
     CONF_MEMORY_STRINGS,
     CONF_PORT,
     CONF_PROVIDER,
     CONF_REASONING_EFFORT,
     CONF_REQUEST_TIMEOUT,
+    CONF_REQUESTS_PER_MINUTE,
     CONF_RETENTION_TIME,
     CONF_SYSTEM_PROMPT,
     CONF_TEMPERATURE,
@@ -358,6 +360,7 @@ class TestProviderSteps:
 
         assert result["type"] == "form"
         assert result["step_id"] == step_name
+        assert "limits_section" in result["data_schema"].schema
 
     @pytest.mark.asyncio
     async def test_openai_creates_entry_after_successful_validation(self, build_flow):
@@ -489,6 +492,7 @@ class TestProviderSteps:
                 CONF_CONTEXT_WINDOW: 4096,
                 CONF_KEEP_ALIVE: "10m",
             },
+            "limits_section": {CONF_MAX_CONCURRENT_REQUESTS: 1},
         }
         provider_instance = Mock(validate=AsyncMock())
 
@@ -500,6 +504,9 @@ class TestProviderSteps:
 
         assert result["type"] == "create_entry"
         assert result["title"] == "Ollama (https://ollama.local)"
+        # Unset limits fall back to the Settings entry
+        assert result["data"][CONF_MAX_CONCURRENT_REQUESTS] == 1
+        assert CONF_REQUESTS_PER_MINUTE not in result["data"]
         ollama_cls.assert_called_once_with(
             flow.hass,
             api_key="",
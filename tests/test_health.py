@@ -0,0 +1,91 @@
+"""Unit tests for health.py module."""
+
+from custom_components.llmvision.health import (
+    HealthRegistry,
+    ProviderHealth,
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+)
+
+
+class TestProviderHealth:
+    def test_percentile_requires_min_samples(self):
+        """Test percentiles are only reported once enough samples exist."""
+        health = ProviderHealth(min_samples=5)
+        for value in (1.0, 2.0, 3.0, 4.0):
+            health.record_success(value)
+        assert health.percentile(95) is None
+
+        health.record_success(5.0)
+        assert health.percentile(95) == 5.0
+        assert health.percentile(50) == 2.0
+
+    def test_error_rate_over_window(self):
+        """Test the error rate only considers the rolling window."""
+        health = ProviderHealth(window=4, failure_threshold=10)
+        health.record_failure(0)
+        health.record_failure(0)
+        health.record_success(1.0)
+        health.record_success(1.0)
+        assert health.error_rate == 0.5
+
+        health.record_success(1.0)
+        health.record_success(1.0)
+        assert health.error_rate == 0.0
+
+    def test_breaker_opens_after_consecutive_failures(self):
+        """Test the breaker opens after the failure threshold is reached."""
+        health = ProviderHealth(failure_threshold=3, cooldown=60)
+        for _ in range(2):
+            health.record_failure(100)
+        assert health.state == STATE_CLOSED
+
+        health.record_failure(100)
+        assert health.state == STATE_OPEN
+        assert health.is_available(159) is False
+        assert health.allow_request(159) is False
+
+    def test_half_open_allows_single_probe(self):
+        """Test only one probe is let through after the cooldown."""
+        health = ProviderHealth(failure_threshold=1, cooldown=60)
+        health.record_failure(100)
+
+        assert health.allow_request(160) is True
+        assert health.state == STATE_HALF_OPEN
+        assert health.allow_request(161) is False
+
+        health.release()
+        assert health.allow_request(162) is True
+
+    def test_half_open_probe_outcome(self):
+        """Test a successful probe closes and a failed probe reopens the breaker."""
+        health = ProviderHealth(failure_threshold=1, cooldown=60)
+        health.record_failure(100)
+        health.allow_request(160)
+        health.record_failure(160)
+        assert health.state == STATE_OPEN
+        assert health.opened_at == 160
+
+        health.allow_request(220)
+        health.record_success(0.5)
+        assert health.state == STATE_CLOSED
+        assert health.consecutive_failures == 0
+
+
+class TestHealthRegistry:
+    def test_get_is_shared_per_hass(self, mock_hass):
+        """Test the registry is stored in and reused from hass.data."""
+        assert HealthRegistry.get(mock_hass) is HealthRegistry.get(mock_hass)
+
+    def test_record_and_remove(self, mock_hass):
+        """Test outcomes are tracked per entry and can be reset."""
+        registry = HealthRegistry(mock_hass)
+        registry.record_success("a", 1.0)
+        registry.record_failure("b")
+
+        assert registry.get_health("a").as_dict()["error_rate"] == 0.0
+        assert registry.get_health("b").as_dict()["consecutive_failures"] == 1
+
+        registry.remove("b")
+        assert registry.get_health("b").consecutive_failures == 0
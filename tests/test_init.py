@@ -5,7 +5,7 @@ from __future__ import annotations
 import datetime
 from dataclasses import dataclass
 from types import SimpleNamespace
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import AsyncMock, Mock, call, patch
 
 import pytest
 from homeassistant.exceptions import ServiceValidationError
@@ -23,11 +23,15 @@ from custom_components.llmvision import (
 )
 from custom_components.llmvision.const import (
     CONF_API_KEY,
+    CONF_COST_TABLE,
     CONF_DEFAULT_MODEL,
+    CONF_MAX_RETRIES,
     CONF_PROVIDER,
     CONF_RETENTION_TIME,
     DOMAIN,
 )
+from custom_components.llmvision.providers import Provider
+from custom_components.llmvision.usage import UsageRegistry
 
 
 def _build_data_call(data: dict) -> Mock:
@@ -128,6 +132,7 @@ class TestServiceCallData:
         assert call.model_is_glimpse() is True
         assert call.get("max_tokens") == 1000
         assert call.get("missing", "fallback") == "fallback"
+        assert call.priority == "normal"
         assert call.get_service_call_data() is call
 
     def test_initialization_with_image_video_and_event_ids(self):
@@ -178,6 +183,9 @@ class TestEntryLifecycle:
         assert hass.data[DOMAIN]["entry1"]["provider"] == "OpenAI"
         assert "default_model" not in hass.data[DOMAIN]["entry1"]
         assert hass.data[DOMAIN]["entry1"]["temperature"] == 0.7
+        hass.config_entries.async_forward_entry_setups.assert_awaited_once_with(
+            entry, ["sensor"]
+        )
 
     @pytest.mark.anyio
     async def test_async_setup_entry_settings_forwards_calendar_and_cleanup(self):
@@ -196,9 +204,43 @@ class TestEntryLifecycle:
 
         assert ok is True
         hass.config_entries.async_forward_entry_setups.assert_awaited_once_with(
-            entry, ["calendar"]
+            entry, ["calendar", "sensor"]
         )
         timeline_instance._cleanup.assert_awaited_once()
+        entry.async_on_unload.assert_called_once_with(
+            timeline_instance.start_maintenance.return_value
+        )
+
+    @pytest.mark.anyio
+    async def test_async_setup_entry_settings_configures_retries(self):
+        hass = _make_hass()
+        entry = Mock()
+        entry.entry_id = "settings"
+        entry.title = "Settings"
+        entry.data = {"provider": "Settings", CONF_MAX_RETRIES: 0}
+
+        with patch("custom_components.llmvision.Timeline") as timeline:
+            timeline.return_value._cleanup = AsyncMock()
+            await async_setup_entry(hass, entry)
+
+        assert Provider._resolve_max_retries(SimpleNamespace(hass=hass)) == 0
+
+    @pytest.mark.anyio
+    async def test_async_setup_entry_settings_prices_usage(self):
+        hass = _make_hass()
+        entry = Mock()
+        entry.entry_id = "settings"
+        entry.title = "Settings"
+        entry.data = {"provider": "Settings", CONF_COST_TABLE: "gpt-4o: 2.5, 10"}
+
+        with patch("custom_components.llmvision.Timeline") as timeline:
+            timeline.return_value._cleanup = AsyncMock()
+            await async_setup_entry(hass, entry)
+
+        usage = {"input_tokens": 1_000_000, "output_tokens": 100_000}
+        with patch("custom_components.llmvision.usage.async_dispatcher_send"):
+            cost = UsageRegistry.get(hass).record("entry1", "gpt-4o", usage)
+        assert cost == pytest.approx(3.5)
 
     @pytest.mark.anyio
     async def test_async_remove_entry_non_settings(self):
@@ -264,8 +306,11 @@ class TestEntryLifecycle:
 
         assert await async_unload_entry(hass, with_calendar) is True
         assert await async_unload_entry(hass, without_calendar) is True
-        hass.config_entries.async_unload_platforms.assert_awaited_once_with(
-            with_calendar, ["calendar"]
+        hass.config_entries.async_unload_platforms.assert_has_awaits(
+            [
+                call(with_calendar, ["calendar", "sensor"]),
+                call(without_calendar, ["sensor"]),
+            ]
         )
 
 
@@ -534,7 +579,9 @@ class TestSetupServices:
             patch("custom_components.llmvision.ServiceCallData", return_value=call_obj),
             patch("custom_components.llmvision.Request", return_value=request_obj),
             patch("custom_components.llmvision.MediaProcessor", return_value=processor),
-            patch("custom_components.llmvision.Memory", return_value=memory_obj),
+            patch(
+                "custom_components.llmvision.Memory.get", return_value=memory_obj
+            ),
             patch(
                 "custom_components.llmvision._create_event", new=AsyncMock()
             ) as create_event_mock,
@@ -554,6 +601,87 @@ class TestSetupServices:
         assert stream_result["key_frame"] == "frame.jpg"
         assert create_event_mock.await_count == 3
 
+    @pytest.mark.anyio
+    async def test_image_analyzer_skips_unchanged_scene(self):
+        hass = _make_hass()
+        assert setup(hass, {}) is True
+        handlers = self._registered_handlers(hass)
+
+        call_obj = ServiceCallData(
+            _build_data_call(
+                _base_service_data(
+                    unchanged_threshold=0.95, include_previous_response=True
+                )
+            )
+        )
+        request_obj = Mock()
+        request_obj.call = AsyncMock()
+        processor = Mock()
+        processor.add_images = AsyncMock(return_value=request_obj)
+        processor.compare_to_baseline = AsyncMock(return_value=0.987654)
+        processor.previous_response = Mock(return_value={"response_text": "old"})
+
+        with (
+            patch("custom_components.llmvision.ServiceCallData", return_value=call_obj),
+            patch("custom_components.llmvision.Request", return_value=request_obj),
+            patch("custom_components.llmvision.MediaProcessor", return_value=processor),
+            patch(
+                "custom_components.llmvision._create_event", new=AsyncMock()
+            ) as create_event_mock,
+        ):
+            result = await handlers["image_analyzer"](
+                _build_data_call(_base_service_data())
+            )
+
+        assert result == {
+            "no_significant_change": True,
+            "similarity": 0.9877,
+            "previous_response": {"response_text": "old"},
+        }
+        request_obj.call.assert_not_awaited()
+        create_event_mock.assert_not_awaited()
+
+    @pytest.mark.anyio
+    async def test_image_analyzer_returns_timings_when_requested(self):
+        hass = _make_hass()
+        assert setup(hass, {}) is True
+        handlers = self._registered_handlers(hass)
+
+        call_obj = ServiceCallData(_build_data_call(_base_service_data()))
+        request_obj = Mock()
+        request_obj.call = AsyncMock(side_effect=lambda call: {"response_text": "ok"})
+        memory_obj = Mock()
+        memory_obj._update_memory = AsyncMock()
+        processor = Mock()
+        processor.key_frame = ""
+        processor.add_images = AsyncMock(return_value=request_obj)
+
+        with (
+            patch("custom_components.llmvision.ServiceCallData", return_value=call_obj),
+            patch("custom_components.llmvision.Request", return_value=request_obj),
+            patch("custom_components.llmvision.MediaProcessor", return_value=processor),
+            patch(
+                "custom_components.llmvision.Memory.get", return_value=memory_obj
+            ),
+            patch("custom_components.llmvision._create_event", new=AsyncMock()),
+        ):
+            result = await handlers["image_analyzer"](
+                _build_data_call(_base_service_data(include_timings=True))
+            )
+            untimed = await handlers["image_analyzer"](
+                _build_data_call(_base_service_data())
+            )
+
+        timings = result["timings"]
+        assert timings["name"] == "image_analyzer"
+        assert [child["name"] for child in timings["children"]] == [
+            "media",
+            "memory",
+            "request",
+        ]
+        assert "timings" not in untimed
+        assert len(init_module.TraceRegistry.get(hass).traces()) == 2
+
     @pytest.mark.anyio
     async def test_data_analyzer_boolean_and_number_and_text_and_option(self):
         hass = _make_hass()
@@ -576,7 +704,9 @@ class TestSetupServices:
             patch("custom_components.llmvision.ServiceCallData", return_value=call_obj),
             patch("custom_components.llmvision.Request", return_value=request_obj),
             patch("custom_components.llmvision.MediaProcessor", return_value=processor),
-            patch("custom_components.llmvision.Memory", return_value=memory_obj),
+            patch(
+                "custom_components.llmvision.Memory.get", return_value=memory_obj
+            ),
             patch("custom_components.llmvision._create_event", new=AsyncMock()),
             patch(
                 "custom_components.llmvision._update_sensor", new=AsyncMock()
@@ -636,7 +766,9 @@ class TestSetupServices:
             patch("custom_components.llmvision.ServiceCallData", return_value=call_obj),
             patch("custom_components.llmvision.Request", return_value=request_obj),
             patch("custom_components.llmvision.MediaProcessor", return_value=processor),
-            patch("custom_components.llmvision.Memory", return_value=memory_obj),
+            patch(
+                "custom_components.llmvision.Memory.get", return_value=memory_obj
+            ),
         ):
             hass.states.get.return_value = SimpleNamespace(
                 state="unavailable", attributes={"options": []}
@@ -715,4 +847,6 @@ class TestSetupServices:
         assert hass.services.register.call_count == 6
         hass.http.register_view.assert_any_call(init_module.TimelineEventsView)
         hass.http.register_view.assert_any_call(init_module.TimelineEventView)
+        hass.http.register_view.assert_any_call(init_module.TimelineThumbnailView)
         hass.http.register_view.assert_any_call(init_module.TimelineEventCreateView)
+        hass.http.register_view.assert_any_call(init_module.MetricsView)
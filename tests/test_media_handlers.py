@@ -3,10 +3,12 @@ import pytest
 from unittest.mock import Mock, patch, AsyncMock, MagicMock
 from PIL import Image
 import io
+import re
 import base64
+import hashlib
 from types import SimpleNamespace
 from homeassistant.exceptions import ServiceValidationError
-from custom_components.llmvision.media_handlers import MediaProcessor
+from custom_components.llmvision.media_handlers import SCENE_DATA, MediaProcessor
 
 
 def _make_jpeg_bytes(color):
@@ -69,6 +71,7 @@ class TestMediaProcessor:
     def mock_hass(self):
         """Create a mock Home Assistant instance."""
         hass = Mock()
+        hass.data = {}
         hass.loop = Mock()
         hass.loop.run_in_executor = AsyncMock()
         hass.states = Mock()
@@ -111,21 +114,23 @@ class TestMediaProcessor:
         # Verify it's valid base64
         base64.b64decode(result)
 
-    @pytest.mark.asyncio
-    async def test_save_clip_writes_base64_image(self, processor, tmp_path):
-        """_save_clip should decode base64 image payloads before writing."""
-        processor.hass.loop.run_in_executor.side_effect = (
-            lambda _executor, func, *args: func(*args)
-        )
-        output = tmp_path / "snapshot.jpg"
+    def test_write_key_frame_reencodes_to_webp(self, tmp_path):
+        """_write_key_frame should convert JPEG bytes to the format of the path."""
+        path = tmp_path / "2026" / "01" / "02" / "frame.webp"
 
-        with patch("custom_components.llmvision.media_handlers.os.makedirs"):
-            await processor._save_clip(
-                image_data=base64.b64encode(b"image-bytes").decode("utf-8"),
-                image_path=str(output),
-            )
+        MediaProcessor._write_key_frame(str(path), _make_jpeg_bytes("olive"))
+
+        with Image.open(path) as image:
+            assert image.format == "WEBP"
+
+    def test_write_key_frame_keeps_existing_file(self, tmp_path):
+        """Stored key frames are not written again."""
+        path = tmp_path / "frame.jpg"
+        path.write_bytes(b"stored")
 
-        assert output.read_bytes() == b"image-bytes"
+        MediaProcessor._write_key_frame(str(path), _make_jpeg_bytes("olive"))
+
+        assert path.read_bytes() == b"stored"
 
     @pytest.mark.asyncio
     async def test_expose_image_uses_frame_path_once(self, processor, tmp_path):
@@ -135,23 +140,61 @@ class TestMediaProcessor:
         )
         source = tmp_path / "frame.jpg"
         source.write_bytes(_make_jpeg_bytes("navy"))
-        processor._save_clip = AsyncMock()
+        processor._write_key_frame = Mock()
 
-        with patch("custom_components.llmvision.media_handlers.os.makedirs"):
-            await processor._expose_image(
-                frame_name="7",
-                image_data=None,
-                uid="deadbeef",
-                frame_path=str(source),
-            )
+        with patch(
+            "custom_components.llmvision.media_handlers.async_claim_snapshot",
+            return_value=None,
+        ), patch(
+            "custom_components.llmvision.media_handlers.async_register_snapshot"
+        ) as register:
+            await processor._expose_image(frame_path=str(source))
+            await processor._expose_image(image_data="ignored")
+
+        # Named by the hash of the JPEG bytes, in the folder of the day
+        assert re.search(
+            r"/snapshots/\d{4}/\d{2}/\d{2}/[0-9a-f]{32}\.jpg$", processor.key_frame
+        )
+        processor._write_key_frame.assert_called_once()
+        register.assert_awaited_once()
+        assert register.await_args.args[1] == processor.key_frame
+
+    @pytest.mark.asyncio
+    async def test_expose_image_reuses_stored_key_frame(self, processor):
+        """Identical key frames should reference the stored file."""
+        processor.hass.loop.run_in_executor.side_effect = (
+            lambda _executor, func, *args: func(*args)
+        )
+        processor._write_key_frame = Mock()
+        stored = "/media/llmvision/snapshots/2026/01/02/stored.jpg"
+        data = _make_jpeg_bytes("navy")
+
+        with patch(
+            "custom_components.llmvision.media_handlers.async_claim_snapshot",
+            return_value=stored,
+        ) as claim, patch(
+            "custom_components.llmvision.media_handlers.async_register_snapshot"
+        ) as register:
             await processor._expose_image(
-                frame_name="8",
-                image_data="ignored",
-                uid="second",
+                image_data=base64.b64encode(data).decode("utf-8")
             )
 
-        assert processor.key_frame.endswith("deadbeef-7.jpg")
-        processor._save_clip.assert_awaited_once()
+        assert processor.key_frame == stored
+        assert claim.await_args.args[1] == hashlib.sha256(data).hexdigest()[:32]
+        register.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_key_frame_format_from_settings(self, processor):
+        """The key frame format is read from the Settings entry."""
+        settings = {"provider": "Settings", "key_frame_format": "webp"}
+        processor.hass.data = {"llmvision": {"settings_entry": settings}}
+        with patch(
+            "custom_components.llmvision.media_handlers._can_encode",
+            return_value=True,
+        ):
+            assert processor._key_frame_format() == "webp"
+        processor.hass.data = {}
+        assert processor._key_frame_format() == "jpeg"
 
     @pytest.mark.asyncio
     async def test_select_keyframe_index_picks_lowest_similarity(self, processor):
@@ -235,6 +278,55 @@ class TestMediaProcessor:
         assert isinstance(score, float)
         assert 0 <= score <= 1
 
+    def test_split_jpeg_frames_keeps_incomplete_frame(self):
+        """_split_jpeg_frames should return complete frames and keep the rest."""
+        first = b"\xff\xd8one\xff\xd9"
+        second = b"\xff\xd8two\xff\xd9"
+
+        frames, rest = MediaProcessor._split_jpeg_frames(
+            b"junk" + first + second + b"\xff\xd8thr"
+        )
+
+        assert frames == [first, second]
+        assert rest == b"\xff\xd8thr"
+
+    def test_select_frames_prefers_first_and_most_changed_frames(self):
+        """_select_frames should keep first frames, then the lowest scores in order."""
+        first_frames = {
+            "camera.a": ("a-0", b"a0"),
+            "camera.b": ("b-0", b"b0"),
+        }
+        camera_frames = {
+            "camera.a": {
+                "a-1": {
+                    "frame_data": b"a1",
+                    "ssim_score": 0.2,
+                    "camera_number": 0,
+                    "frame_index": 1,
+                },
+                "a-2": {
+                    "frame_data": b"a2",
+                    "ssim_score": 0.9,
+                    "camera_number": 0,
+                    "frame_index": 2,
+                },
+            },
+            "camera.b": {
+                "b-1": {
+                    "frame_data": b"b1",
+                    "ssim_score": 0.1,
+                    "camera_number": 1,
+                    "frame_index": 1,
+                },
+            },
+        }
+
+        selected = MediaProcessor._select_frames(
+            ["camera.a", "camera.b"], first_frames, camera_frames, 4
+        )
+
+        assert [name for name, _, _ in selected] == ["a-0", "b-0", "a-1", "b-1"]
+
     @pytest.mark.asyncio
     async def test_fetch_retries_until_success(self, processor):
         """_fetch should retry failed responses before succeeding."""
@@ -326,9 +418,8 @@ class TestMediaProcessor:
 
         processor._fetch = AsyncMock(side_effect=fake_fetch)
         processor._similarity_score = Mock(side_effect=[0.9, 0.1])
-        processor.resize_image = AsyncMock(
-            side_effect=["encoded-0", "encoded-1", "encoded-2"]
-        )
+        encoded = [base64.b64encode(f"frame-{i}".encode()).decode() for i in range(3)]
+        processor.resize_image = AsyncMock(side_effect=encoded)
         processor._select_keyframe_index = AsyncMock(return_value=0)
 
         with patch(
@@ -357,7 +448,13 @@ class TestMediaProcessor:
         assert [
             call.kwargs["base64_image"]
             for call in processor.client.add_frame.call_args_list
-        ] == ["encoded-0", "encoded-1", "encoded-2"]
+        ] == encoded
+        # The frames sent are the scene baseline, not the last one captured
+        assert processor.source_frames == {
+            "camera.front#0": b"frame-0",
+            "camera.front#1": b"frame-1",
+            "camera.front#2": b"frame-2",
+        }
 
     @pytest.mark.asyncio
     async def test_record_raises_when_no_cameras_available(self, processor):
@@ -403,7 +500,13 @@ class TestMediaProcessor:
         )
         processor.hass.states.get.return_value = entity_state
         processor._fetch = AsyncMock(return_value=b"entity-bytes")
-        processor.resize_image = AsyncMock(side_effect=["entity-frame", "path-frame"])
+        # Resized frames are base64, the last one sent per source is kept decoded
+        processor.resize_image = AsyncMock(
+            side_effect=[
+                base64.b64encode(b"entity-frame").decode("utf-8"),
+                base64.b64encode(b"path-frame").decode("utf-8"),
+            ]
+        )
         processor._expose_image = AsyncMock()
 
         with patch(
@@ -424,6 +527,10 @@ class TestMediaProcessor:
             for call in processor.client.add_frame.call_args_list
         ] == ["Front Door", "still"]
         assert processor._expose_image.await_count == 2
+        assert processor.source_frames == {
+            "camera.front": b"entity-frame",
+            str(image_path): b"path-frame",
+        }
 
     @pytest.mark.asyncio
     async def test_add_images_raises_for_missing_file(self, processor):
@@ -758,3 +865,51 @@ class TestMediaProcessor:
 
         assert result is processor.client
         processor.add_images.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_compare_to_baseline_without_baseline(self, processor):
+        """compare_to_baseline should return None until a baseline was stored."""
+        processor.hass.data = {}
+        processor.source_frames = {"camera.front": _make_jpeg_bytes("gray")}
+
+        assert await processor.compare_to_baseline() is None
+
+    @pytest.mark.asyncio
+    async def test_compare_to_baseline_scores_against_last_frames(self, processor):
+        """Frames should be compared to the baseline of the same camera."""
+        processor.hass.data = {}
+        processor.hass.async_add_executor_job = AsyncMock(
+            side_effect=lambda func, *args: func(*args)
+        )
+        processor.source_frames = {"camera.front": _make_jpeg_bytes("gray")}
+        await processor.update_baseline({"response_text": "A quiet porch"})
+
+        assert await processor.compare_to_baseline() > 0.99
+        assert processor.previous_response() == {"response_text": "A quiet porch"}
+
+        processor.source_frames = {"camera.front": _make_jpeg_bytes("white")}
+        assert await processor.compare_to_baseline() < 0.9
+
+        # A different set of cameras has no baseline yet
+        processor.source_frames["camera.back"] = _make_jpeg_bytes("gray")
+        assert await processor.compare_to_baseline() is None
+
+    @pytest.mark.asyncio
+    async def test_previous_response_is_kept_per_prompt(self, processor):
+        """A response should only be reused for the prompt that produced it."""
+        processor.hass.data = {}
+        processor.hass.async_add_executor_job = AsyncMock(
+            side_effect=lambda func, *args: func(*args)
+        )
+        processor.client.message = "Who is at the door?"
+        processor.source_frames = {"camera.front": _make_jpeg_bytes("gray")}
+        await processor.update_baseline({"response_text": "Nobody"})
+
+        processor.client.message = "Is the porch light on?"
+        assert processor.previous_response() is None
+        assert await processor.compare_to_baseline() is None
+
+        # Responses to earlier prompts are replaced rather than accumulated
+        await processor.update_baseline({"response_text": "Yes"})
+        assert processor.previous_response() == {"response_text": "Yes"}
+        assert len(processor.hass.data[SCENE_DATA]["responses"]) == 1
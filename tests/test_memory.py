@@ -1,7 +1,11 @@
 """Unit tests for memory.py module."""
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
-from custom_components.llmvision.memory import Memory
+from custom_components.llmvision.memory import (
+    MEMORY_DATA,
+    Memory,
+    encode_memory_image,
+)
 from custom_components.llmvision.const import (
     DOMAIN,
     DEFAULT_SYSTEM_PROMPT,
@@ -229,3 +233,123 @@ class TestMemoryAdvanced:
         assert len(memory.memory_strings) == 2
         assert len(memory.memory_paths) == 2
         assert memory._system_prompt == "Custom prompt"
+
+
+class TestMemoryStore:
+    """Tests for the memory image store and shared memory."""
+
+    def test_get_memory_images_reuses_blocks_until_memory_changes(self, mock_hass):
+        """Test content blocks are built once and rebuilt when images change."""
+        memory = Memory(mock_hass, strings=["A", "B"], paths=[])
+        memory.memory_images = ["img_a", "img_a"]
+
+        first = memory._get_memory_images(memory_type="OpenAI")
+        assert memory._get_memory_images(memory_type="OpenAI") is first
+        # Duplicate images keep their own descriptions
+        assert [item["text"] for item in first[1::2]] == ["A:", "B:"]
+
+        memory.memory_images = ["img_c"]
+        rebuilt = memory._get_memory_images(memory_type="OpenAI")
+        assert rebuilt is not first
+        assert len(rebuilt) == 3
+
+    def test_get_returns_shared_instance(self, mock_hass):
+        """Test Memory.get keeps one instance in hass.data."""
+        memory = Memory.get(mock_hass)
+
+        assert Memory.get(mock_hass) is memory
+        assert mock_hass.data[MEMORY_DATA] is memory
+        copy = memory.with_system_prompt("extract")
+        assert copy._system_prompt == "extract"
+        assert memory._system_prompt == DEFAULT_SYSTEM_PROMPT
+
+    @pytest.mark.asyncio
+    async def test_update_memory_uses_image_store(
+        self, mock_hass, mock_config_entry, tmp_path
+    ):
+        """Test images are encoded once, stored on disk and removed from the entry."""
+        from PIL import Image
+
+        image_path = tmp_path / "car.png"
+        Image.new("RGBA", (800, 400), (255, 0, 0, 255)).save(image_path)
+        mock_config_entry.data.update(
+            {
+                "memory_strings": ["Car", "Missing"],
+                "memory_paths": [str(image_path), str(tmp_path / "missing.jpg")],
+                "images": ["stale"],
+            }
+        )
+        mock_hass.config_entries.async_entries = Mock(return_value=[mock_config_entry])
+        mock_hass.config.path = Mock(return_value=str(tmp_path / "llmvision"))
+        mock_hass.async_add_executor_job = AsyncMock(
+            side_effect=lambda func, *args: func(*args)
+        )
+
+        memory = Memory(mock_hass)
+        with patch(
+            "custom_components.llmvision.memory.encode_memory_image",
+            wraps=encode_memory_image,
+        ) as encode:
+            await memory._update_memory()
+            assert encode.call_count == 1
+
+            # A new memory reads the stored image instead of encoding it again
+            reloaded = Memory(mock_hass)
+            await reloaded._update_memory()
+            assert encode.call_count == 1
+
+        assert memory.memory_strings == ["Car"]
+        assert reloaded.memory_images == memory.memory_images
+        stored = list((tmp_path / "llmvision" / "memory").glob("*.jpg"))
+        assert len(stored) == 1
+        updated = mock_hass.config_entries.async_update_entry.call_args.kwargs["data"]
+        assert "images" not in updated
+        assert "memory_images_encoded" not in updated
+
+    def test_for_entities_selects_relevant_entries(self, mock_hass, mock_config_entry):
+        """Test only entries tagged with the analyzed cameras or untagged are sent."""
+        mock_config_entry.data.update(
+            {
+                "memory_strings": ["Package shelf", "Car", "Dog"],
+                "memory_paths": ["/a.jpg", "/b.jpg", "/c.jpg"],
+                "memory_cameras": ["camera.front_door", "Driveway, garage"],
+            }
+        )
+        mock_hass.config_entries.async_entries = Mock(return_value=[mock_config_entry])
+        memory = Memory(mock_hass)
+        memory.memory_images = ["img_a", "img_b", "img_c"]
+
+        backyard = memory.for_entities(["camera.backyard"])
+        content = backyard._get_memory_images(memory_type="OpenAI")
+        assert [item["text"] for item in content[1::2]] == ["Dog:"]
+
+        driveway = memory.for_entities(["camera.driveway_cam"])
+        content = driveway._get_memory_images(memory_type="Google")
+        assert [item["text"] for item in content[1::2]] == ["Car:", "Dog:"]
+
+        # Without camera context every entry is sent
+        assert len(memory.for_entities(None)._get_memory_images("OpenAI")) == 7
+
+        memory.max_images = 1
+        capped = memory.for_entities(["camera.front_door"])
+        content = capped._get_memory_images(memory_type="OpenAI")
+        assert [item["text"] for item in content[1::2]] == ["Package shelf:"]
+
+    def test_content_key_changes_with_memory(self, mock_hass):
+        """Test the content key follows the memory content and selection."""
+        memory = Memory(mock_hass, strings=["Car"], paths=[])
+        key = memory.content_key
+        assert memory.content_key == key
+        assert memory.for_entities(["camera.driveway"]).content_key != key
+
+        memory.memory_images = ["img"]
+        assert memory.content_key != key
+
+    def test_entries_key_is_stable(self, mock_hass):
+        """Test the entries key only depends on the stored entries."""
+        memory = Memory(mock_hass, strings=["Car"], paths=["/car.jpg"])
+        again = Memory(mock_hass, strings=["Car"], paths=["/car.jpg"])
+        assert memory.entries_key == again.entries_key
+        assert memory.for_entities(["camera.driveway"]).entries_key != (
+            memory.entries_key
+        )
@@ -0,0 +1,81 @@
+"""Unit tests for metrics.py module."""
+
+import pytest
+from custom_components.llmvision.const import DOMAIN
+from custom_components.llmvision.metrics import Histogram, MetricsRegistry
+
+
+@pytest.fixture
+def metrics_hass(mock_hass):
+    mock_hass.data[DOMAIN] = {
+        "settings": {"provider": "Settings"},
+        "entry1": {"provider": "OpenAI"},
+    }
+    return mock_hass
+
+
+def test_histogram_quantiles():
+    """Test quantiles are interpolated within fixed buckets."""
+    histogram = Histogram(buckets=(1.0, 2.0, 4.0))
+    assert histogram.quantile(0.5) is None
+
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(value)
+    histogram.observe(10.0)
+
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.quantile(0.5) == 1.75
+    # Samples above the largest bound are reported at that bound
+    assert histogram.quantile(0.99) == 4.0
+    assert histogram.as_dict()["p50"] == 1.75
+
+
+def test_registry_as_dict(metrics_hass):
+    """Test calls, requests, frames, uploads and fallbacks are aggregated."""
+    registry = MetricsRegistry.get(metrics_hass)
+    registry.record_call("image_analyzer", 2.0)
+    registry.record_call("image_analyzer", 30.0, failed=True)
+    registry.record_request("entry1", 1.5, frames=3)
+    registry.record_request("entry1", 9.0, frames=3, failed=True)
+    registry.record_frames_captured(10)
+    registry.record_upload("entry1", 2048)
+    registry.record_fallback()
+
+    metrics = registry.as_dict()
+    assert metrics["services"]["image_analyzer"]["count"] == 2
+    assert metrics["services"]["image_analyzer"]["errors"] == 1
+    provider = metrics["providers"]["entry1"]
+    assert provider["provider"] == "OpenAI"
+    assert provider["count"] == 1
+    assert provider["errors"] == 1
+    assert provider["bytes_uploaded"] == 2048
+    assert metrics["frames_captured"] == 10
+    assert metrics["frames_sent"] == 6
+    assert metrics["cache_hits"] == 0
+    assert metrics["fallback_rate"] == 0.5
+
+
+def test_prometheus_exposition(metrics_hass):
+    """Test histograms and counters are rendered in the Prometheus format."""
+    registry = MetricsRegistry.get(metrics_hass)
+    registry.record_call("video_analyzer", 0.3)
+    registry.record_upload("entry1", 100)
+
+    lines = registry.prometheus().splitlines()
+    assert "# TYPE llmvision_service_duration_seconds histogram" in lines
+    assert (
+        'llmvision_service_duration_seconds_bucket{service="video_analyzer",le="0.25"} 0'
+        in lines
+    )
+    assert (
+        'llmvision_service_duration_seconds_bucket{service="video_analyzer",le="0.5"} 1'
+        in lines
+    )
+    assert (
+        'llmvision_service_duration_seconds_bucket{service="video_analyzer",le="+Inf"} 1'
+        in lines
+    )
+    assert (
+        'llmvision_upload_bytes_total{entry_id="entry1",provider="OpenAI"} 100' in lines
+    )
+    assert "llmvision_frames_captured_total 0" in lines
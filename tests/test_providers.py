@@ -1,12 +1,19 @@
 """Comprehensive unit tests for providers.py module."""
 
+import asyncio
 import json
+import struct
+import time
+import zlib
 import pytest
 import base64
+from aiohttp import ClientConnectionError
 from types import SimpleNamespace
 from unittest.mock import Mock, patch, AsyncMock, MagicMock, call
 from homeassistant.exceptions import ServiceValidationError
 from custom_components.llmvision.providers import (
+    PROVIDER_DATA,
+    ProviderRegistry,
     Request,
     Provider,
     OpenAI,
@@ -18,6 +25,15 @@ from custom_components.llmvision.providers import (
     Ollama,
     AWSBedrock,
     ProviderFactory,
+    RetryPolicy,
+)
+from custom_components.llmvision.cache import ResponseCache
+from custom_components.llmvision.health import HealthRegistry, STATE_OPEN
+from custom_components.llmvision.scheduler import (
+    AdmissionControl,
+    PRIORITIES,
+    RequestContext,
+    request_context,
 )
 from custom_components.llmvision.const import (
     DOMAIN,
@@ -1112,8 +1128,13 @@ class TestProviderFactory:
             provider = ProviderFactory.create(
                 mock_hass, "AWS Bedrock", config, "claude-3"
             )
+            streaming = ProviderFactory.create(
+                mock_hass, "AWS Bedrock", {**config, "aws_stream": True}, "claude-3"
+            )
 
             assert isinstance(provider, AWSBedrock)
+            assert provider.stream is False
+            assert streaming.stream is True
 
     def test_create_open_webui(self, mock_hass):
         """Test ProviderFactory creates OpenWebUI provider."""
@@ -1164,6 +1185,13 @@ def coverage_hass(monkeypatch):
     return obj
 
 
+def fake_memory_images(memory_type):
+    """Memory content shaped like Memory._get_memory_images for memory_type."""
+    if memory_type == "Google":
+        return [{"text": f"mem-{memory_type}"}]
+    return [{"type": "text", "text": f"mem-{memory_type}"}]
+
+
 def make_coverage_call(**overrides):
     call_obj = SimpleNamespace(
         provider="provider_openai",
@@ -1181,9 +1209,8 @@ def make_coverage_call(**overrides):
         use_memory=False,
         memory=SimpleNamespace(
             title_prompt="tp:",
-            _get_memory_images=lambda memory_type: [
-                {"type": "text", "text": f"mem-{memory_type}"}
-            ],
+            content_key=(0, None),
+            _get_memory_images=fake_memory_images,
         ),
     )
     call_obj.model_is_glimpse = lambda: False
@@ -1365,41 +1392,375 @@ async def test_provider_post_success_and_errors_coverage(coverage_hass):
         await provider._post("https://x", {}, {})
 
 
+@pytest.mark.anyio
+async def test_provider_post_honors_retry_after(coverage_hass):
+    """Test a 429 with Retry-After pauses the provider and is queued again."""
+    provider = OpenAI(coverage_hass, "k", "gpt-4")
+
+    limited = Mock(status=429)
+    limited.headers = {"Retry-After": "0.01"}
+    ok_response = Mock(status=200)
+    ok_response.json = AsyncMock(return_value={"ok": True})
+    provider.session.post = AsyncMock(side_effect=[limited, ok_response])
+
+    context = RequestContext(entry_id="provider_openai")
+    token = request_context.set(context)
+    try:
+        parsed = await provider._post("https://x", {}, {})
+    finally:
+        request_context.reset(token)
+
+    assert parsed["ok"] is True
+    assert provider.session.post.await_count == 2
+    assert len(context.waits) == 2
+    assert context.waits[1] >= 0.005
+    scheduler = AdmissionControl.get(coverage_hass).for_entry("provider_openai")
+    assert scheduler.active == 0
+
+
+@pytest.mark.anyio
+async def test_provider_post_retries_transient_errors(monkeypatch, coverage_hass):
+    """Test server errors and connection resets are retried with backoff."""
+    monkeypatch.setattr(
+        "custom_components.llmvision.providers.random.uniform", lambda a, b: 0.01
+    )
+    provider = OpenAI(coverage_hass, "k", "gpt-4")
+    unavailable = Mock(status=503)
+    unavailable.headers = {}
+    ok_response = Mock(status=200)
+    ok_response.json = AsyncMock(return_value={"ok": True})
+    provider.session.post = AsyncMock(
+        side_effect=[unavailable, ClientConnectionError("reset"), ok_response]
+    )
+
+    context = RequestContext(entry_id="provider_openai")
+    token = request_context.set(context)
+    try:
+        parsed = await provider._post("https://x", {}, {"a": 1})
+    finally:
+        request_context.reset(token)
+
+    assert parsed["ok"] is True
+    assert context.retries == [503, 0]
+    unavailable.release.assert_called_once()
+    # The prepared payload is sent as is by every attempt
+    payloads = [c.kwargs["json"] for c in provider.session.post.await_args_list]
+    assert payloads == [{"a": 1}] * 3
+
+
+@pytest.mark.anyio
+async def test_provider_post_retries_are_bounded(monkeypatch, coverage_hass):
+    """Test retries stop after max_retries and before the request deadline."""
+    monkeypatch.setattr(
+        "custom_components.llmvision.providers.random.uniform", lambda a, b: 0.01
+    )
+    coverage_hass.data[DOMAIN]["settings"]["max_retries"] = 1
+    provider = OpenAI(coverage_hass, "k", "gpt-4")
+    frame = SimpleNamespace(frame=SimpleNamespace(f_locals={"self": provider}))
+    monkeypatch.setattr(
+        "custom_components.llmvision.providers.inspect.stack",
+        lambda: [None, frame],
+    )
+    failing = Mock(status=502)
+    failing.headers = {}
+    failing.text = AsyncMock(return_value="bad gateway")
+    provider.session.post = AsyncMock(return_value=failing)
+
+    with pytest.raises(ServiceValidationError):
+        await provider._post("https://x", {}, {})
+    assert provider.session.post.await_count == 2
+
+    # A Retry-After beyond the deadline fails right away
+    failing.headers = {"Retry-After": "600"}
+    provider.session.post.reset_mock()
+    with pytest.raises(ServiceValidationError):
+        await provider._post("https://x", {}, {})
+    assert provider.session.post.await_count == 1
+
+
+@pytest.mark.anyio
+async def test_provider_post_defers_without_retries(monkeypatch, coverage_hass):
+    """Test a 429 pauses the provider even when retries are disabled."""
+    coverage_hass.data[DOMAIN]["settings"]["max_retries"] = 0
+    provider = OpenAI(coverage_hass, "k", "gpt-4")
+    frame = SimpleNamespace(frame=SimpleNamespace(f_locals={"self": provider}))
+    monkeypatch.setattr(
+        "custom_components.llmvision.providers.inspect.stack",
+        lambda: [None, frame],
+    )
+    limited = Mock(status=429)
+    limited.headers = {"Retry-After": "30"}
+    limited.text = AsyncMock(return_value="rate limited")
+    provider.session.post = AsyncMock(return_value=limited)
+
+    context = RequestContext(entry_id="provider_openai")
+    token = request_context.set(context)
+    try:
+        with pytest.raises(ServiceValidationError):
+            await provider._post("https://x", {}, {})
+    finally:
+        request_context.reset(token)
+
+    assert provider.session.post.await_count == 1
+    scheduler = AdmissionControl.get(coverage_hass).for_entry("provider_openai")
+    assert scheduler.blocked_until > time.monotonic() + 20
+
+
+def test_retry_policy_backoff():
+    """Test the backoff grows exponentially, is capped and honors Retry-After."""
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+    for retry, limit in ((1, 1.0), (2, 2.0), (3, 4.0), (6, 5.0)):
+        assert 0 <= policy.backoff(retry) <= limit
+    assert policy.backoff(1, retry_after=7.5) == 7.5
+    assert 529 in Anthropic.retry_policy.statuses
+
+
+def test_provider_get_retry_after_formats():
+    """Test Retry-After is parsed from seconds and HTTP dates."""
+    assert Provider._get_retry_after(Mock(headers={"Retry-After": "3"})) == 3.0
+    assert Provider._get_retry_after(Mock(headers={})) is None
+    assert (
+        Provider._get_retry_after(
+            Mock(headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        )
+        == 0.0
+    )
+    assert Provider._get_retry_after(Mock(headers={"Retry-After": "soon"})) is None
+
+
+@pytest.mark.anyio
+async def test_request_call_reports_queue_wait(monkeypatch, coverage_hass):
+    """Test the response contains the time spent waiting for admission."""
+    req = Request(coverage_hass, "m", 10, 0.2)
+    req.base64_images = ["aW1n"]
+    req.filenames = ["f.jpg"]
+
+    class QueuedProvider(DummyProvider):
+        async def vision_request(self, call):
+            context = request_context.get()
+            assert context.entry_id == "provider_openai"
+            assert context.priority == PRIORITIES["high"]
+            context.waits.append(0.25)
+            return "ok"
+
+    monkeypatch.setattr(ProviderFactory, "create", lambda **kwargs: QueuedProvider())
+
+    result = await req.call(make_coverage_call(priority="high"))
+
+    assert result["queue_wait"] == 0.25
+    assert request_context.get() is None
+
+
+@pytest.mark.anyio
+async def test_request_call_reports_cached_tokens(monkeypatch, coverage_hass):
+    """Test prompt tokens read from provider caches are added to the response."""
+    req = Request(coverage_hass, "m", 10, 0.2)
+    req.base64_images = ["aW1n"]
+    req.filenames = ["f.jpg"]
+
+    class CachingProvider(DummyProvider):
+        async def vision_request(self, call):
+            Provider._record_cached_tokens(1200)
+            Provider._record_cached_tokens(None)
+            return "ok"
+
+    monkeypatch.setattr(ProviderFactory, "create", lambda **kwargs: CachingProvider())
+
+    result = await req.call(make_coverage_call())
+
+    assert result["cached_tokens"] == 1200
+
+
+@pytest.mark.anyio
+async def test_request_call_serves_repeated_request_from_cache(
+    monkeypatch, coverage_hass, tmp_path
+):
+    """Test a repeated request is answered from the response cache."""
+    coverage_hass.data[DOMAIN]["settings"]["response_cache"] = True
+    coverage_hass.config.path = lambda *parts: str(tmp_path.joinpath(*parts))
+
+    async def _run(func, *args):
+        return func(*args)
+
+    coverage_hass.async_add_executor_job = _run
+    monkeypatch.setattr(
+        ResponseCache, "async_hash_frames", AsyncMock(return_value=[0xFF])
+    )
+    create = Mock(return_value=DummyProvider(response_text="fresh", supports=False))
+    monkeypatch.setattr(ProviderFactory, "create", create)
+
+    first = Request(coverage_hass, "m", 10, 0.2)
+    first.base64_images = ["aW1n"]
+    result = await first.call(make_coverage_call())
+    assert result["response_text"] == "fresh"
+    assert result["cached"] is False
+
+    second = Request(coverage_hass, "m", 10, 0.2)
+    second.base64_images = ["aW1n"]
+    result = await second.call(make_coverage_call())
+    assert result["response_text"] == "fresh"
+    assert result["cached"] is True
+    assert create.call_count == 1
+
+    third = Request(coverage_hass, "m", 10, 0.2)
+    third.base64_images = ["aW1n"]
+    result = await third.call(make_coverage_call(message="something else"))
+    assert result["cached"] is False
+    # The provider instance is reused for the same entry and model
+    assert create.call_count == 1
+
+    # Other cameras, providers or memory entries are not served the same response
+    for overrides in (
+        {"image_entities": ["camera.driveway"]},
+        {"provider": "provider_groq"},
+        {
+            "use_memory": True,
+            "memory": SimpleNamespace(
+                title_prompt="tp:", entries_key=(("Car",), ("/car.jpg",), None)
+            ),
+        },
+    ):
+        request = Request(coverage_hass, "m", 10, 0.2)
+        request.base64_images = ["aW1n"]
+        result = await request.call(make_coverage_call(**overrides))
+        assert result["cached"] is False
+
+
+def test_provider_registry_reuses_instances_per_entry_and_model(
+    monkeypatch, coverage_hass
+):
+    """Test providers are created once per entry and model until removed."""
+    create = Mock(side_effect=lambda **kwargs: DummyProvider())
+    monkeypatch.setattr(ProviderFactory, "create", create)
+    registry = ProviderRegistry.get(coverage_hass)
+    config = coverage_hass.data[DOMAIN]["provider_openai"]
+
+    def _get(model):
+        return registry.get_provider("provider_openai", "OpenAI", config, model)
+
+    first = _get("gpt-4o")
+    assert _get("gpt-4o") is first
+    assert _get("gpt-5") is not first
+    assert create.call_count == 2
+
+    registry.remove("provider_openai")
+    assert _get("gpt-4o") is not first
+    assert create.call_count == 3
+
+
+def _event_frame(event_type, payload, message_type="event"):
+    """Encode one application/vnd.amazon.eventstream message."""
+    headers = b""
+    for name, value in ((":event-type", event_type), (":message-type", message_type)):
+        raw = value.encode()
+        headers += bytes([len(name)]) + name.encode() + b"\x07"
+        headers += struct.pack(">H", len(raw)) + raw
+    body = json.dumps(payload).encode()
+    prelude = struct.pack(">II", 12 + len(headers) + len(body) + 4, len(headers))
+    message = prelude + struct.pack(">I", zlib.crc32(prelude)) + headers + body
+    return message + struct.pack(">I", zlib.crc32(message))
+
+
 @pytest.mark.anyio
 async def test_aws_invoke_bedrock_success_and_error_coverage(coverage_hass):
-    provider = AWSBedrock(coverage_hass, "AK", "SK", "us-east-1", "m")
+    provider = AWSBedrock(coverage_hass, "AK", "SK", "us-east-1", "m:0")
 
-    client = Mock()
-    client.converse = Mock(
+    ok_response = Mock(status=200)
+    ok_response.json = AsyncMock(
         return_value={
-            "ResponseMetadata": {"HTTPStatusCode": 200},
             "metrics": {"latencyMs": 1},
             "usage": {"inputTokens": 1, "outputTokens": 1, "totalTokens": 2},
             "output": {"message": {"content": [{"text": "ok"}]}},
         }
     )
-
-    coverage_hass.async_add_executor_job = AsyncMock(
-        side_effect=[client, client.converse()]
+    provider.session.post = AsyncMock(return_value=ok_response)
+    output = await provider.invoke_bedrock(
+        "m:0", {"messages": [], "inferenceConfig": {}}
     )
-    output = await provider.invoke_bedrock("m", {"messages": [], "inferenceConfig": {}})
     assert "message" in output
 
-    bad = {
-        "ResponseMetadata": {"HTTPStatusCode": 400},
-        "error": {"message": "bad"},
-    }
-    coverage_hass.async_add_executor_job = AsyncMock(side_effect=[client, bad])
+    # Signed on the event loop and posted over aiohttp, no executor involved
+    coverage_hass.async_add_executor_job.assert_not_called()
+    args, kwargs = provider.session.post.await_args
+    assert args[0] == (
+        "https://bedrock-runtime.us-east-1.amazonaws.com/model/m%3A0/converse"
+    )
+    assert json.loads(kwargs["data"]) == {"messages": [], "inferenceConfig": {}}
+    assert kwargs["headers"]["Authorization"].startswith(
+        "AWS4-HMAC-SHA256 Credential=AK/"
+    )
+    assert "/us-east-1/bedrock/aws4_request" in kwargs["headers"]["Authorization"]
+
+    bad = Mock(status=400)
+    bad.text = AsyncMock(return_value='{"message": "bad"}')
+    provider.session.post = AsyncMock(return_value=bad)
     frame = SimpleNamespace(frame=SimpleNamespace(f_locals={"self": provider}))
     with pytest.MonkeyPatch.context() as monkeypatch_ctx:
         monkeypatch_ctx.setattr(
             "custom_components.llmvision.providers.inspect.stack",
             lambda: [None, frame],
         )
-        with pytest.raises(ServiceValidationError):
+        with pytest.raises(ServiceValidationError, match="bad"):
             await provider.invoke_bedrock("m", {"messages": [], "inferenceConfig": {}})
 
 
+@pytest.mark.anyio
+async def test_aws_invoke_bedrock_converse_stream(coverage_hass):
+    """Test converse-stream events are assembled like a converse response."""
+    provider = AWSBedrock(coverage_hass, "AK", "SK", "us-east-1", "m", stream=True)
+    stream = b"".join(
+        [
+            _event_frame("messageStart", {"role": "assistant"}),
+            _event_frame(
+                "contentBlockDelta", {"contentBlockIndex": 0, "delta": {"text": "A "}}
+            ),
+            _event_frame(
+                "contentBlockDelta", {"contentBlockIndex": 0, "delta": {"text": "cat"}}
+            ),
+            _event_frame("messageStop", {"stopReason": "end_turn"}),
+            _event_frame("metadata", {"usage": {"inputTokens": 3}, "metrics": {}}),
+        ]
+    )
+
+    class _Content:
+        async def iter_any(self):
+            # Split frames across chunks like a network read would
+            for start in range(0, len(stream), 7):
+                yield stream[start : start + 7]
+
+    response = Mock(status=200)
+    response.content = _Content()
+    provider.session.post = AsyncMock(return_value=response)
+
+    assert await provider._make_request({"messages": []}) == "A cat"
+    assert provider.session.post.await_args.args[0].endswith("/m/converse-stream")
+
+    tool_stream = b"".join(
+        [
+            _event_frame(
+                "contentBlockStart",
+                {"contentBlockIndex": 0, "start": {"toolUse": {"name": "t"}}},
+            ),
+            _event_frame(
+                "contentBlockDelta",
+                {"contentBlockIndex": 0, "delta": {"toolUse": {"input": '{"a"'}}},
+            ),
+            _event_frame(
+                "contentBlockDelta",
+                {"contentBlockIndex": 0, "delta": {"toolUse": {"input": ": 1}"}}},
+            ),
+        ]
+    )
+    stream = tool_stream
+    assert json.loads(await provider._make_request({"messages": []})) == {"a": 1}
+
+    stream = _event_frame(
+        "throttlingException", {"message": "slow down"}, message_type="exception"
+    )
+    with pytest.raises(ServiceValidationError, match="slow down"):
+        await provider._make_request({"messages": []})
+
+
 @pytest.mark.anyio
 async def test_provider_coverage_misc_paths(monkeypatch, coverage_hass):
     original_factory_create = ProviderFactory.create
@@ -1431,6 +1792,7 @@ async def test_provider_coverage_misc_paths(monkeypatch, coverage_hass):
         "create",
         lambda **kwargs: (_ for _ in ()).throw(RuntimeError("boom")),
     )
+    coverage_hass.data.pop(PROVIDER_DATA, None)
     with pytest.raises(ServiceValidationError):
         await req.call(make_coverage_call(model="gpt-4o"))
 
@@ -1439,6 +1801,7 @@ async def test_provider_coverage_misc_paths(monkeypatch, coverage_hass):
         "create",
         lambda **kwargs: DummyProvider(response_text="not-json", supports=True),
     )
+    coverage_hass.data.pop(PROVIDER_DATA, None)
     result = await req.call(
         make_coverage_call(response_format="json", structure={"type": "object"})
     )
@@ -1716,6 +2079,56 @@ async def test_anthropic_make_request_prepare_text_and_validate_paths(coverage_h
         await no_key.validate()
 
 
+@pytest.mark.anyio
+async def test_providers_record_token_usage(coverage_hass):
+    """Test tokens and server time are read from every provider's response."""
+    openai_response = make_openai_chat_completion_response()
+    openai_response["usage"]["prompt_tokens_details"] = {"cached_tokens": 4}
+    anthropic_response = make_anthropic_text_response()
+    anthropic_response["usage"]["cache_read_input_tokens"] = 100
+    google_response = make_google_generate_content_response()
+    google_response["usageMetadata"] = {
+        "promptTokenCount": 300,
+        "candidatesTokenCount": 20,
+        "thoughtsTokenCount": 10,
+        "cachedContentTokenCount": 200,
+    }
+    ollama_response = {
+        "message": {"content": "ok"},
+        "prompt_eval_count": 30,
+        "eval_count": 7,
+        "total_duration": 2_500_000_000,
+    }
+    ollama = Ollama(
+        coverage_hass,
+        "",
+        "gemma3:4b",
+        endpoint={"ip_address": "127.0.0.1", "port": "11434", "https": False},
+    )
+    cases = [
+        (OpenAI(coverage_hass, "k", "gpt-4o"), openai_response, (10, 5, 4, None)),
+        (Anthropic(coverage_hass, "k", "c"), anthropic_response, (112, 6, 100, None)),
+        (Google(coverage_hass, "k", "g"), google_response, (300, 30, 200, None)),
+        (ollama, ollama_response, (30, 7, 0, 2.5)),
+    ]
+
+    for provider, response, expected in cases:
+        provider._post = AsyncMock(return_value=response)
+        context = RequestContext(entry_id="provider_openai")
+        token = request_context.set(context)
+        try:
+            assert await provider._make_request({}) == "ok"
+        finally:
+            request_context.reset(token)
+        usage = context.usage[0]
+        assert (
+            usage["input_tokens"],
+            usage["output_tokens"],
+            usage["cached_tokens"],
+            usage["server_time"],
+        ) == expected
+
+
 @pytest.mark.anyio
 async def test_google_make_request_prepare_text_and_validate_paths(coverage_hass):
     provider = Google(coverage_hass, "k", "gemini-2.5-pro")
@@ -1953,6 +2366,7 @@ async def test_request_call_error_and_title_fallback_branches(
         "create",
         lambda **kwargs: DummyProvider(response_text="not-json", supports=False),
     )
+    coverage_hass.data.pop(PROVIDER_DATA, None)
     result = await req.call(
         make_coverage_call(
             model="glimpse-v1",
@@ -1979,6 +2393,7 @@ async def test_request_call_error_and_title_fallback_branches(
         DummyProvider(response_text="body2", title_text="Title#2", supports=False),
     ]
     monkeypatch.setattr(ProviderFactory, "create", lambda **kwargs: providers.pop(0))
+    coverage_hass.data.pop(PROVIDER_DATA, None)
     result = await req.call(
         make_coverage_call(
             provider="provider_groq", generate_title=True, response_format="text"
@@ -1988,6 +2403,455 @@ async def test_request_call_error_and_title_fallback_branches(
     assert result["response_text"] == "body2"
 
 
+class SlowProvider(DummyProvider):
+    def __init__(self, delay, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+        self.cancelled = False
+
+    async def vision_request(self, _call):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return await super().vision_request(_call)
+
+
+@pytest.mark.anyio
+async def test_request_call_hedges_slow_primary(monkeypatch, coverage_hass):
+    """Test a slow primary is raced against the fallback and cancelled."""
+    coverage_hass.config_entries.async_entries.return_value = [
+        SimpleNamespace(
+            data={
+                "provider": "Settings",
+                "fallback_provider": "provider_openai",
+                "hedge_requests": True,
+                "hedge_min_delay": 0.01,
+            }
+        )
+    ]
+    req = Request(coverage_hass, "m", 10, 0.2)
+    req.base64_images = ["aW1n"]
+    req.filenames = ["f.jpg"]
+
+    primary = SlowProvider(5, response_text="slow")
+    hedge = DummyProvider(response_text="fast", title_text="Hedged", supports=False)
+    providers = [primary, hedge]
+    monkeypatch.setattr(ProviderFactory, "create", lambda **kwargs: providers.pop(0))
+
+    call_obj = make_coverage_call(provider="provider_groq", generate_title=True)
+    result = await req.call(call_obj)
+    await asyncio.sleep(0)
+
+    assert result["response_text"] == "fast"
+    assert result["title"] == "Hedged"
+    assert call_obj.provider == "provider_openai"
+    assert primary.cancelled
+
+
+@pytest.mark.anyio
+async def test_request_call_hedge_not_fired_for_fast_primary(
+    monkeypatch, coverage_hass
+):
+    """Test the fallback is not contacted when the primary answers in time."""
+    coverage_hass.config_entries.async_entries.return_value = [
+        SimpleNamespace(
+            data={
+                "provider": "Settings",
+                "fallback_provider": "provider_openai",
+                "hedge_requests": True,
+                "hedge_min_delay": 5,
+            }
+        )
+    ]
+    req = Request(coverage_hass, "m", 10, 0.2)
+    req.base64_images = ["aW1n"]
+    req.filenames = ["f.jpg"]
+
+    create = Mock(return_value=DummyProvider(response_text="primary"))
+    monkeypatch.setattr(ProviderFactory, "create", create)
+
+    result = await req.call(make_coverage_call(provider="provider_groq"))
+
+    assert result["response_text"] == "primary"
+    assert create.call_count == 1
+    health = HealthRegistry.get(coverage_hass).get_health("provider_groq")
+    assert len(health.latencies) == 1
+
+
+@pytest.mark.anyio
+async def test_request_call_hedge_waits_for_primary_when_fallback_fails(
+    monkeypatch, coverage_hass
+):
+    """Test a failing hedge does not abort the still running primary."""
+    coverage_hass.config_entries.async_entries.return_value = [
+        SimpleNamespace(
+            data={
+                "provider": "Settings",
+                "fallback_provider": "provider_openai",
+                "hedge_requests": True,
+                "hedge_min_delay": 0.01,
+            }
+        )
+    ]
+    req = Request(coverage_hass, "m", 10, 0.2)
+    req.base64_images = ["aW1n"]
+    req.filenames = ["f.jpg"]
+
+    providers = [
+        SlowProvider(0.05, response_text="primary"),
+        DummyProvider(fail_vision=True),
+    ]
+    monkeypatch.setattr(ProviderFactory, "create", lambda **kwargs: providers.pop(0))
+
+    call_obj = make_coverage_call(provider="provider_groq")
+    result = await req.call(call_obj)
+
+    assert result["response_text"] == "primary"
+    assert call_obj.provider == "provider_groq"
+
+
+@pytest.mark.anyio
+async def test_request_call_hedge_failure_does_not_retry_fallback(
+    monkeypatch, coverage_hass
+):
+    """Test the fallback is not asked again after the primary and hedge failed."""
+    coverage_hass.config_entries.async_entries.return_value = [
+        SimpleNamespace(
+            data={
+                "provider": "Settings",
+                "fallback_provider": "provider_openai",
+                "hedge_requests": True,
+                "hedge_min_delay": 0.01,
+            }
+        )
+    ]
+    req = Request(coverage_hass, "m", 10, 0.2)
+    req.base64_images = ["aW1n"]
+    req.filenames = ["f.jpg"]
+
+    providers = [
+        SlowProvider(0.05, fail_vision=True),
+        DummyProvider(fail_vision=True),
+    ]
+    create = Mock(side_effect=lambda **kwargs: providers.pop(0))
+    monkeypatch.setattr(ProviderFactory, "create", create)
+
+    result = await req.call(make_coverage_call(provider="provider_groq"))
+
+    assert result["response_text"].startswith("Couldn't generate content")
+    assert create.call_count == 2
+
+
+@pytest.mark.anyio
+async def test_request_call_walks_fallback_chain(monkeypatch, coverage_hass):
+    """Test every provider in the fallback chain is tried in order."""
+    coverage_hass.data[DOMAIN]["provider_ollama"] = {
+        CONF_PROVIDER: "Ollama",
+        CONF_DEFAULT_MODEL: "gemma3:4b",
+    }
+    coverage_hass.config_entries.async_entries.return_value = [
+        SimpleNamespace(
+            data={
+                "provider": "Settings",
+                "fallback_provider": "provider_openai",
+                "fallback_providers": ["provider_ollama", "provider_openai"],
+            }
+        )
+    ]
+    req = Request(coverage_hass, "m", 10, 0.2)
+    req.base64_images = ["aW1n"]
+    req.filenames = ["f.jpg"]
+
+    names = []
+
+    def create(**kwargs):
+        names.append(kwargs["provider_name"])
+        if kwargs["provider_name"] == "Ollama":
+            return DummyProvider(response_text="local")
+        return DummyProvider(fail_vision=True)
+
+    monkeypatch.setattr(ProviderFactory, "create", create)
+
+    call_obj = make_coverage_call(provider="provider_groq")
+    result = await req.call(call_obj)
+
+    assert names == ["Groq", "OpenAI", "Ollama"]
+    assert result["response_text"] == "local"
+    assert call_obj.provider == "provider_ollama"
+
+
+@pytest.mark.anyio
+async def test_request_call_skips_open_breaker(monkeypatch, coverage_hass):
+    """Test a provider with an open breaker is skipped in favour of the fallback."""
+    health = HealthRegistry.get(coverage_hass)
+    for _ in range(5):
+        health.record_failure("provider_groq")
+    assert health.get_health("provider_groq").state == STATE_OPEN
+
+    req = Request(coverage_hass, "m", 10, 0.2)
+    req.base64_images = ["aW1n"]
+    req.filenames = ["f.jpg"]
+    create = Mock(return_value=DummyProvider(response_text="fallback"))
+    monkeypatch.setattr(ProviderFactory, "create", create)
+
+    call_obj = make_coverage_call(provider="provider_groq")
+    result = await req.call(call_obj)
+
+    assert result["response_text"] == "fallback"
+    assert create.call_args.kwargs["provider_name"] == "OpenAI"
+
+
+@pytest.mark.anyio
+async def test_request_call_sorts_fallbacks_by_latency(monkeypatch, coverage_hass):
+    """Test the fallback chain can be ordered by observed latency."""
+    coverage_hass.data[DOMAIN]["provider_ollama"] = {CONF_PROVIDER: "Ollama"}
+    coverage_hass.config_entries.async_entries.return_value = [
+        SimpleNamespace(
+            data={
+                "provider": "Settings",
+                "fallback_provider": "provider_openai",
+                "fallback_providers": ["provider_ollama"],
+                "fallback_sort_by_latency": True,
+            }
+        )
+    ]
+    health = HealthRegistry.get(coverage_hass)
+    for _ in range(10):
+        health.record_success("provider_openai", 4.0)
+        health.record_success("provider_ollama", 0.5)
+
+    req = Request(coverage_hass, "m", 10, 0.2)
+    settings = coverage_hass.config_entries.async_entries.return_value[0].data
+    assert req._get_fallback_chain(settings) == ["provider_ollama", "provider_openai"]
+
+
+def cascade_hass(coverage_hass, confidence=0.7):
+    coverage_hass.data[DOMAIN]["provider_ollama"] = {
+        CONF_PROVIDER: "Ollama",
+        CONF_DEFAULT_MODEL: "gemma3:4b",
+    }
+    coverage_hass.config_entries.async_entries.return_value = [
+        SimpleNamespace(
+            data={
+                "provider": "Settings",
+                "fallback_provider": "provider_openai",
+                "cascade_provider": "provider_ollama",
+                "cascade_confidence": confidence,
+                "cascade_triage_frames": 2,
+            }
+        )
+    ]
+    return coverage_hass
+
+
+class TriageProvider(DummyProvider):
+    def __init__(self, name, responses):
+        super().__init__()
+        self.name = name
+        self.responses = responses
+        self.seen = []
+
+    async def vision_request(self, call):
+        self.seen.append((self.name, list(call.base64_images)))
+        return self.responses.pop(0)
+
+
+@pytest.mark.anyio
+async def test_request_call_cascade_answers_locally(monkeypatch, coverage_hass):
+    """Test confident uninteresting triage results are not escalated."""
+    req = Request(cascade_hass(coverage_hass), "m", 10, 0.2)
+    req.base64_images = ["a", "b", "c", "d", "e"]
+    req.filenames = ["1.jpg", "2.jpg", "3.jpg", "4.jpg", "5.jpg"]
+    verdict = {
+        "interesting": False,
+        "confidence": 0.9,
+        "title": "Empty driveway",
+        "description": "Nothing happens.",
+    }
+    provider = TriageProvider("Ollama", [json.dumps(verdict)])
+    create = Mock(return_value=provider)
+    monkeypatch.setattr(ProviderFactory, "create", create)
+
+    call_obj = make_coverage_call(generate_title=True)
+    result = await req.call(call_obj)
+
+    assert create.call_args.kwargs["provider_name"] == "Ollama"
+    assert provider.seen == [("Ollama", ["a", "e"])]
+    assert result["tier"] == "local"
+    assert result["title"] == "Empty driveway"
+    assert result["response_text"] == "Nothing happens."
+    assert req.base64_images == ["a", "b", "c", "d", "e"]
+    assert call_obj.provider == "provider_openai"
+
+
+@pytest.mark.anyio
+async def test_request_call_cascade_escalates(monkeypatch, coverage_hass):
+    """Test interesting or low confidence events go to the call's provider."""
+    req = Request(cascade_hass(coverage_hass), "m", 10, 0.2)
+    req.base64_images = ["a", "b", "c"]
+    req.filenames = ["1.jpg", "2.jpg", "3.jpg"]
+    verdicts = [
+        {"interesting": True, "confidence": 0.9},
+        {"interesting": False, "confidence": 0.3},
+    ]
+    local = TriageProvider(
+        "Ollama",
+        [json.dumps({**v, "title": "t", "description": "d"}) for v in verdicts],
+    )
+    cloud = TriageProvider("OpenAI", ["A person at the door"] * 2)
+    monkeypatch.setattr(
+        ProviderFactory,
+        "create",
+        lambda **kwargs: local if kwargs["provider_name"] == "Ollama" else cloud,
+    )
+
+    for confidence in (0.9, 0.3):
+        result = await req.call(make_coverage_call())
+        assert result["tier"] == "cloud"
+        assert result["triage_confidence"] == confidence
+        assert result["response_text"] == "A person at the door"
+
+    assert [len(images) for _, images in local.seen] == [2, 2]
+    assert [len(images) for _, images in cloud.seen] == [3, 3]
+
+
+@pytest.mark.anyio
+async def test_request_call_cascade_glimpse_no_activity(monkeypatch, coverage_hass):
+    """Test Glimpse triage is answered locally when it reports no activity."""
+    req = Request(cascade_hass(coverage_hass), "m", 10, 0.2)
+    req.base64_images = ["aW1n"]
+    req.filenames = ["f.jpg"]
+    monkeypatch.setattr(
+        ProviderFactory,
+        "create",
+        lambda **kwargs: DummyProvider(
+            response_text='{"title": "No activity", "description": "Quiet yard."}'
+        ),
+    )
+    call_obj = make_coverage_call()
+    call_obj.model_is_glimpse = lambda: True
+    result = await req.call(call_obj)
+
+    assert result["tier"] == "local"
+    assert result["response_text"] == "Quiet yard."
+
+def batch_request(coverage_hass, images):
+    req = Request(coverage_hass, "m", 10, 0.2)
+    req.base64_images = list(images)
+    req.filenames = [f"{image}.jpg" for image in images]
+    return req
+
+
+@pytest.mark.anyio
+async def test_request_call_batches_concurrent_requests(monkeypatch, coverage_hass):
+    """Test requests within the batching window share one provider request."""
+    coverage_hass.config_entries.async_entries.return_value = [
+        SimpleNamespace(data={"provider": "Settings", "batch_window": 50})
+    ]
+    answer = {
+        "cameras": [
+            {"camera": 2, "title": "Car", "description": "A car passes."},
+            {"camera": 1, "title": "Car!", "description": "A red car."},
+        ]
+    }
+    provider = TriageProvider("OpenAI", [json.dumps(answer)])
+    monkeypatch.setattr(ProviderFactory, "create", lambda **kwargs: provider)
+
+    first, second = await asyncio.gather(
+        batch_request(coverage_hass, ["a", "b"]).call(
+            make_coverage_call(
+                message="front?", image_entities=["camera.front"], generate_title=True
+            )
+        ),
+        batch_request(coverage_hass, ["c"]).call(
+            make_coverage_call(message="drive?", image_entities=["camera.drive"])
+        ),
+    )
+
+    assert provider.seen == [("OpenAI", ["a", "b", "c"])]
+    assert first["title"] == "Car"
+    assert first["response_text"] == "A red car."
+    assert first["batched"] == 2
+    assert "title" not in second
+    assert second["response_text"] == "A car passes."
+
+
+@pytest.mark.anyio
+async def test_request_call_batch_sends_missing_sections_alone(
+    monkeypatch, coverage_hass
+):
+    """Test callers missing from the batched answer are sent individually."""
+    coverage_hass.config_entries.async_entries.return_value = [
+        SimpleNamespace(data={"provider": "Settings", "batch_window": 50})
+    ]
+    answer = {"cameras": [{"camera": 1, "title": "t", "description": "front"}]}
+    provider = TriageProvider("OpenAI", [json.dumps(answer), "drive"])
+    monkeypatch.setattr(ProviderFactory, "create", lambda **kwargs: provider)
+
+    first, second = await asyncio.gather(
+        batch_request(coverage_hass, ["a"]).call(make_coverage_call()),
+        batch_request(coverage_hass, ["b"]).call(make_coverage_call()),
+    )
+
+    assert provider.seen == [("OpenAI", ["a", "b"]), ("OpenAI", ["b"])]
+    assert first["response_text"] == "front"
+    assert second["response_text"] == "drive"
+    assert "batched" not in second
+
+
+@pytest.mark.anyio
+async def test_request_call_does_not_batch_different_options(
+    monkeypatch, coverage_hass
+):
+    """Test requests with different options are not merged."""
+    coverage_hass.config_entries.async_entries.return_value = [
+        SimpleNamespace(data={"provider": "Settings", "batch_window": 50})
+    ]
+    provider = TriageProvider("OpenAI", ["one", "two"])
+    monkeypatch.setattr(ProviderFactory, "create", lambda **kwargs: provider)
+
+    results = await asyncio.gather(
+        batch_request(coverage_hass, ["a"]).call(make_coverage_call(max_tokens=64)),
+        batch_request(coverage_hass, ["b"]).call(make_coverage_call(max_tokens=128)),
+    )
+
+    assert sorted(images for _, images in provider.seen) == [["a"], ["b"]]
+    assert all("batched" not in result for result in results)
+
+
+@pytest.mark.anyio
+async def test_request_call_batches_only_escalated_events(monkeypatch, coverage_hass):
+    """Test the cascade triage runs before requests are batched."""
+    cascade_hass(coverage_hass)
+    settings = coverage_hass.config_entries.async_entries.return_value[0].data
+    settings["batch_window"] = 50
+    quiet = {"interesting": False, "confidence": 0.9, "description": "Quiet."}
+    busy = {"interesting": True, "confidence": 0.9, "description": "Car."}
+
+    class Triage(DummyProvider):
+        async def vision_request(self, call):
+            return json.dumps(quiet if call.base64_images == ["a"] else busy)
+
+    cloud = TriageProvider("OpenAI", ["A red car."])
+    providers = {"Ollama": Triage(), "OpenAI": cloud}
+    monkeypatch.setattr(
+        ProviderFactory, "create", lambda **kwargs: providers[kwargs["provider_name"]]
+    )
+
+    first, second = await asyncio.gather(
+        batch_request(coverage_hass, ["a"]).call(make_coverage_call()),
+        batch_request(coverage_hass, ["b"]).call(make_coverage_call()),
+    )
+
+    assert first["tier"] == "local"
+    assert first["response_text"] == "Quiet."
+    assert cloud.seen == [("OpenAI", ["b"])]
+    assert second["tier"] == "cloud"
+    assert second["response_text"] == "A red car."
+
+
 def test_heal_json_extra_branches(mock_hass):
     with patch("custom_components.llmvision.providers.async_get_clientsession"):
         request = Request(mock_hass, "m", 10, 0.2)
@@ -2196,18 +3060,15 @@ async def test_anthropic_google_groq_localai_ollama_aws_extra_branches(coverage_
 @pytest.mark.anyio
 async def test_aws_invoke_and_text_validate_paths(coverage_hass):
     provider = AWSBedrock(coverage_hass, "AK", "SK", "us-east-1", "m")
-    client = Mock()
-    client.converse = Mock(
+    ok_response = Mock(status=200)
+    ok_response.json = AsyncMock(
         return_value={
-            "ResponseMetadata": {"HTTPStatusCode": 200},
             "metrics": {"latencyMs": 1},
             "usage": {"inputTokens": 1, "outputTokens": 1, "totalTokens": 2},
             "output": {"message": {"content": [{"text": "ok"}]}},
         }
     )
-    coverage_hass.async_add_executor_job = AsyncMock(
-        side_effect=[client, client.converse()]
-    )
+    provider.session.post = AsyncMock(return_value=ok_response)
     out = await provider.invoke_bedrock(
         "m",
         {
@@ -2218,8 +3079,19 @@ async def test_aws_invoke_and_text_validate_paths(coverage_hass):
         },
     )
     assert "message" in out
+    sent = json.loads(provider.session.post.await_args.kwargs["data"])
+    assert sent["toolConfig"] == {"t": 1}
+    assert sent["system"] == [{"text": "s"}]
 
-    coverage_hass.async_add_executor_job = AsyncMock(side_effect=RuntimeError("x"))
+    # Image bytes are sent base64 encoded
+    image = {"image": {"format": "jpeg", "source": {"bytes": b"img"}}}
+    await provider.invoke_bedrock(
+        "m", {"messages": [{"role": "user", "content": [image]}]}
+    )
+    sent = json.loads(provider.session.post.await_args.kwargs["data"])
+    assert sent["messages"][0]["content"][0]["image"]["source"]["bytes"] == "aW1n"
+
+    provider.session.post = AsyncMock(side_effect=RuntimeError("x"))
     with pytest.raises(ServiceValidationError):
         await provider.invoke_bedrock("m", {"messages": [], "inferenceConfig": {}})
 
@@ -2291,6 +3163,74 @@ async def test_all_providers_run_both_vision_and_text_requests(coverage_hass):
         assert (await provider.title_request(mk_call())).startswith("ok-")
 
 
+def test_memory_is_sent_as_cacheable_prefix(coverage_hass):
+    """Test memory precedes the user message and carries cache breakpoints."""
+    call = make_coverage_call(use_memory=True)
+
+    anthropic = Anthropic(coverage_hass, "k", "claude")
+    payload = anthropic._prepare_vision_data(call)
+    assert payload["system"][0]["cache_control"] == {"type": "ephemeral"}
+    assert payload["messages"][0]["content"][-1] == {
+        "type": "text",
+        "text": "mem-Anthropic",
+        "cache_control": {"type": "ephemeral"},
+    }
+
+    ollama = Ollama(
+        coverage_hass,
+        "",
+        "llava",
+        endpoint={"ip_address": "127.0.0.1", "port": "11434", "https": False},
+    )
+    messages = ollama._prepare_vision_data(call)["messages"]
+    assert messages[0]["text"] == "mem-Ollama"
+    assert messages[-1]["content"] == "hello"
+
+
+@pytest.mark.anyio
+async def test_google_sends_memory_as_cached_content(coverage_hass):
+    """Test the memory prefix is cached once and referenced by later requests."""
+    google = Google(coverage_hass, "k", "gemini-2.5-flash")
+    created = Mock(status=200)
+    created.json = AsyncMock(return_value={"name": "cachedContents/abc"})
+    generated = Mock(status=200)
+    generated.json = AsyncMock(
+        return_value={
+            "candidates": [{"content": {"parts": [{"text": "ok"}]}}],
+            "usageMetadata": {"cachedContentTokenCount": 2048},
+        }
+    )
+    google.session.post = AsyncMock(
+        side_effect=[created, generated, generated, created, generated]
+    )
+    req = Request(coverage_hass, "m", 10, 0.2)
+    call = make_coverage_call(use_memory=True)
+
+    token = req._set_request_context(call)
+    try:
+        assert await google.vision_request(call) == "ok"
+        assert await google.vision_request(call) == "ok"
+        # New memory content gets its own cache
+        call.memory.content_key = (1, None)
+        assert await google.vision_request(call) == "ok"
+    finally:
+        request_context.reset(token)
+
+    posts = google.session.post.await_args_list
+    assert len(posts) == 5
+    assert "/cachedContents?" in posts[3].args[0]
+    assert "/cachedContents?" in posts[0].args[0]
+    cache_body = posts[0].kwargs["json"]
+    assert cache_body["model"] == "models/gemini-2.5-flash"
+    assert cache_body["contents"][0]["parts"] == [{"text": "mem-Google"}]
+    assert cache_body["contents"][1]["parts"] == [{"text": "system"}]
+    sent = posts[2].kwargs["json"]
+    assert sent["cachedContent"] == "cachedContents/abc"
+    assert len(sent["contents"]) == 1
+    assert sent["contents"][0]["parts"][-1] == {"text": "hello"}
+    assert req.cached_tokens == 6144
+
+
 def test_provider_factory_openrouter_branch(coverage_hass):
     cfg = {CONF_API_KEY: "k"}
     created = ProviderFactory.create(coverage_hass, "OpenRouter", cfg, "m")
@@ -2319,6 +3259,7 @@ async def test_request_glimpse_outer_exception_and_resolve_error_tail(
         "create",
         lambda **kwargs: DummyProvider(response_text={"bad": True}),
     )
+    coverage_hass.data.pop(PROVIDER_DATA, None)
     parsed_fail_call = make_coverage_call(response_format="text")
     parsed_fail_call.model_is_glimpse = lambda: True
     result = await req.call(parsed_fail_call)
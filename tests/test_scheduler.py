@@ -0,0 +1,141 @@
+"""Unit tests for scheduler.py module."""
+
+import asyncio
+import pytest
+from unittest.mock import Mock
+from custom_components.llmvision.const import DOMAIN
+from custom_components.llmvision.scheduler import (
+    AdmissionControl,
+    ProviderScheduler,
+    PRIORITIES,
+)
+
+
+class TestProviderScheduler:
+    @pytest.mark.anyio
+    async def test_concurrency_limit(self):
+        """Test requests beyond the concurrency limit wait for a slot."""
+        scheduler = ProviderScheduler(max_concurrent=1)
+        await scheduler.acquire()
+
+        waiter = asyncio.ensure_future(scheduler.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        scheduler.release()
+        wait = await asyncio.wait_for(waiter, 1)
+        assert wait >= 0.01
+        assert scheduler.active == 1
+
+    @pytest.mark.anyio
+    async def test_priority_order(self):
+        """Test high priority requests are admitted before queued routine ones."""
+        scheduler = ProviderScheduler(max_concurrent=1)
+        await scheduler.acquire()
+        order = []
+
+        async def _acquire(name, priority):
+            await scheduler.acquire(priority)
+            order.append(name)
+
+        low = asyncio.ensure_future(_acquire("low", PRIORITIES["low"]))
+        await asyncio.sleep(0)
+        high = asyncio.ensure_future(_acquire("high", PRIORITIES["high"]))
+        await asyncio.sleep(0)
+
+        scheduler.release()
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.wait_for(asyncio.gather(low, high), 1)
+        assert order == ["high", "low"]
+
+    @pytest.mark.anyio
+    async def test_token_bucket_limits_rate(self):
+        """Test requests beyond the burst wait for the bucket to refill."""
+        scheduler = ProviderScheduler(max_concurrent=1, requests_per_minute=600)
+        await scheduler.acquire()
+        scheduler.release()
+
+        wait = await asyncio.wait_for(scheduler.acquire(), 1)
+        assert wait >= 0.05
+
+    @pytest.mark.anyio
+    async def test_defer_blocks_admission(self):
+        """Test a deferred scheduler admits nothing until the pause ends."""
+        scheduler = ProviderScheduler(max_concurrent=2)
+        scheduler.defer(0.05)
+
+        wait = await asyncio.wait_for(scheduler.acquire(), 1)
+        assert wait >= 0.04
+
+    @pytest.mark.anyio
+    async def test_cancelled_waiter_is_skipped(self):
+        """Test a cancelled waiter does not take a slot."""
+        scheduler = ProviderScheduler(max_concurrent=1)
+        await scheduler.acquire()
+        waiter = asyncio.ensure_future(scheduler.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+
+        scheduler.release()
+        assert scheduler.active == 0
+
+
+class TestAdmissionControl:
+    def test_limits_from_settings(self):
+        """Test schedulers use limits from the Settings entry."""
+        hass = Mock()
+        hass.data = {
+            DOMAIN: {
+                "settings": {
+                    "provider": "Settings",
+                    "max_concurrent_requests": 2,
+                    "requests_per_minute": 30,
+                }
+            }
+        }
+        scheduler = AdmissionControl.get(hass).for_entry("entry1")
+
+        assert scheduler.max_concurrent == 2
+        assert scheduler.rate == 0.5
+        assert AdmissionControl.get(hass).for_entry("entry1") is scheduler
+
+    def test_default_limits(self):
+        """Test defaults are used without a Settings entry."""
+        hass = Mock()
+        hass.data = {}
+        scheduler = AdmissionControl.get(hass).for_entry("entry1")
+
+        assert scheduler.max_concurrent == 4
+        assert scheduler.rate == 0
+
+    def test_limits_per_provider_entry(self):
+        """Test provider entries override the limits of the Settings entry."""
+        hass = Mock()
+        hass.data = {
+            DOMAIN: {
+                "settings": {
+                    "provider": "Settings",
+                    "max_concurrent_requests": 8,
+                    "requests_per_minute": 600,
+                },
+                "ollama": {
+                    "provider": "Ollama",
+                    "max_concurrent_requests": 1,
+                    "requests_per_minute": None,
+                },
+                "openai": {"provider": "OpenAI"},
+            }
+        }
+        admission = AdmissionControl.get(hass)
+        ollama = admission.for_entry("ollama")
+        openai = admission.for_entry("openai")
+
+        assert ollama.max_concurrent == 1
+        assert ollama.rate == 10
+        assert openai.max_concurrent == 8
+
+        hass.data[DOMAIN]["openai"]["max_concurrent_requests"] = 16
+        admission.remove("openai")
+        assert admission.for_entry("openai").max_concurrent == 16
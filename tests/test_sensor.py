@@ -0,0 +1,136 @@
+"""Unit tests for sensor.py module."""
+
+import pytest
+from unittest.mock import Mock
+from custom_components.llmvision.cache import ResponseCache
+from custom_components.llmvision.const import DOMAIN
+from custom_components.llmvision.health import HealthRegistry
+from custom_components.llmvision.usage import UsageRegistry
+from custom_components.llmvision.warmup import WarmupRegistry
+from custom_components.llmvision.sensor import (
+    OllamaWarmupSensor,
+    ProviderHealthSensor,
+    ProviderUsageSensor,
+    ResponseCacheSensor,
+    async_setup_entry,
+)
+
+
+class TestProviderHealthSensor:
+    """Test ProviderHealthSensor class."""
+
+    def test_reports_breaker_state_and_attributes(self, mock_hass, mock_config_entry):
+        """Test the sensor mirrors the provider's health."""
+        mock_config_entry.entry_id = "entry1"
+        mock_config_entry.title = "OpenAI"
+        sensor = ProviderHealthSensor(mock_hass, mock_config_entry)
+        registry = HealthRegistry.get(mock_hass)
+        for _ in range(5):
+            registry.record_failure("entry1")
+
+        assert sensor.unique_id == "entry1_circuit_breaker"
+        assert sensor.name == "OpenAI circuit breaker"
+        assert sensor.native_value == "open"
+        attributes = sensor.extra_state_attributes
+        assert attributes["error_rate"] == 1.0
+        assert attributes["consecutive_failures"] == 5
+        assert "state" not in attributes
+
+    @pytest.mark.anyio
+    async def test_async_setup_entry_adds_sensor(self, mock_hass, mock_config_entry):
+        """Test async_setup_entry adds health and usage sensors for providers."""
+        mock_config_entry.title = "OpenAI"
+        mock_config_entry.data = {"provider": "OpenAI"}
+        add_entities = Mock()
+        await async_setup_entry(mock_hass, mock_config_entry, add_entities)
+
+        entities = add_entities.call_args.args[0]
+        assert len(entities) == 2
+        assert isinstance(entities[0], ProviderHealthSensor)
+        assert isinstance(entities[1], ProviderUsageSensor)
+
+
+class TestOllamaWarmupSensor:
+    """Test OllamaWarmupSensor class."""
+
+    def test_reports_warmup_stats(self, mock_hass, mock_config_entry):
+        """Test the sensor shows the last warm-up and request latencies."""
+        mock_config_entry.entry_id = "entry1"
+        mock_config_entry.title = "Ollama"
+        sensor = OllamaWarmupSensor(mock_hass, mock_config_entry)
+        registry = WarmupRegistry.get(mock_hass)
+
+        assert sensor.unique_id == "entry1_last_warmup"
+        assert sensor.native_value is None
+
+        registry.record_warmup("entry1", 3.2)
+        registry.record_request("entry1", 1.5, 0.0)
+        assert sensor.native_value is not None
+        attributes = sensor.extra_state_attributes
+        assert attributes["last_warmup_load_duration"] == 3.2
+        assert attributes["warm_requests"] == 1
+
+    @pytest.mark.anyio
+    async def test_async_setup_entry_adds_warmup_sensor(
+        self, mock_hass, mock_config_entry
+    ):
+        """Test Ollama entries also get the warm-up sensor."""
+        mock_config_entry.title = "Ollama"
+        mock_config_entry.data = {"provider": "Ollama"}
+        add_entities = Mock()
+        await async_setup_entry(mock_hass, mock_config_entry, add_entities)
+
+        entities = add_entities.call_args.args[0]
+        assert isinstance(entities[0], ProviderHealthSensor)
+        assert isinstance(entities[2], OllamaWarmupSensor)
+
+
+class TestProviderUsageSensor:
+    """Test ProviderUsageSensor class."""
+
+    def test_reports_tokens_per_provider_and_model(self, mock_hass, mock_config_entry):
+        """Test the sensor sums the tokens of all models of a provider."""
+        mock_config_entry.entry_id = "entry1"
+        mock_config_entry.title = "OpenAI"
+        sensor = ProviderUsageSensor(mock_hass, mock_config_entry)
+        registry = UsageRegistry.get(mock_hass)
+        registry.record("entry1", "gpt-4o", {"input_tokens": 100, "output_tokens": 20})
+        registry.record("entry1", "gpt-4o-mini", {"input_tokens": 50})
+
+        assert sensor.unique_id == "entry1_tokens"
+        assert sensor.native_value == 170
+        attributes = sensor.extra_state_attributes
+        assert attributes["requests"] == 2
+        assert attributes["cost"] is None
+        assert attributes["models"]["gpt-4o"]["output_tokens"] == 20
+
+
+class TestResponseCacheSensor:
+    """Test ResponseCacheSensor class."""
+
+    @pytest.mark.anyio
+    async def test_async_setup_entry_adds_cache_sensor(
+        self, mock_hass, mock_config_entry
+    ):
+        """Test the Settings entry gets the response cache sensor."""
+        add_entities = Mock()
+        await async_setup_entry(mock_hass, mock_config_entry, add_entities)
+
+        entities = add_entities.call_args.args[0]
+        assert isinstance(entities[0], ResponseCacheSensor)
+
+    def test_reports_hits_and_misses(self, mock_hass):
+        """Test the sensor reports cache counters when enabled."""
+        sensor = ResponseCacheSensor(mock_hass)
+        assert sensor.native_value == 0
+        assert sensor.extra_state_attributes == {"enabled": False}
+
+        mock_hass.data[DOMAIN] = {
+            "settings": {"provider": "Settings", "response_cache": True}
+        }
+        cache = ResponseCache.get(mock_hass)
+        cache.hits, cache.misses = 3, 1
+
+        assert sensor.native_value == 3
+        assert sensor.extra_state_attributes["hit_rate"] == 0.75
+        assert sensor.extra_state_attributes["entries"] == 0
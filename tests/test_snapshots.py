@@ -0,0 +1,133 @@
+"""Unit tests for snapshots.py module."""
+
+import os
+from unittest.mock import Mock
+
+import aiosqlite
+from PIL import Image
+import pytest
+
+from custom_components.llmvision.snapshots import (
+    SNAPSHOTS_PATH,
+    THUMBNAIL_WIDTHS,
+    _remove_files,
+    async_claim_snapshot,
+    async_create_table,
+    async_register_snapshot,
+    generate_thumbnails,
+    snapshot_name,
+    thumbnail_path,
+    thumbnail_urls,
+)
+
+
+@pytest.fixture
+def hass(tmp_path):
+    hass = Mock()
+    hass.config.path = lambda *parts: str(tmp_path.joinpath(*parts))
+    (tmp_path / "llmvision").mkdir()
+    return hass
+
+
+def _db_path(hass) -> str:
+    return hass.config.path("llmvision", "events.db")
+
+
+class TestSnapshotName:
+    def test_relative_to_snapshots_folder(self):
+        assert snapshot_name("/media/llmvision/snapshots/2026/01/02/a.jpg") == (
+            "2026/01/02/a.jpg"
+        )
+        assert snapshot_name("/media/local/llmvision/snapshots/a.jpg") == "a.jpg"
+
+    def test_outside_snapshots_folder(self):
+        assert snapshot_name("/config/www/a.jpg") is None
+        assert snapshot_name("/media/llmvision/snapshots/../secrets.yaml") is None
+        assert snapshot_name("/media/llmvision/snapshots//etc/passwd") is None
+        assert snapshot_name("") is None
+
+
+class TestContentHash:
+    async def test_claim_returns_snapshot_with_same_hash(self, hass):
+        key_frame = f"{SNAPSHOTS_PATH}/2026/01/02/abc.jpg"
+        await async_register_snapshot(hass, key_frame, "abc")
+
+        assert await async_claim_snapshot(hass, "abc") == key_frame
+        assert await async_claim_snapshot(hass, "other") is None
+
+    async def test_claim_renews_creation_time(self, hass):
+        await async_register_snapshot(hass, f"{SNAPSHOTS_PATH}/abc.jpg", "abc")
+        async with aiosqlite.connect(_db_path(hass)) as db:
+            await db.execute("UPDATE snapshots SET created = 0")
+            await db.commit()
+
+        await async_claim_snapshot(hass, "abc")
+
+        async with aiosqlite.connect(_db_path(hass)) as db:
+            async with db.execute("SELECT created FROM snapshots") as cursor:
+                assert (await cursor.fetchone())[0] > 0
+
+    async def test_create_table_adds_hash_column(self, hass):
+        async with aiosqlite.connect(_db_path(hass)) as db:
+            await db.execute("""
+                CREATE TABLE snapshots (
+                    name TEXT PRIMARY KEY,
+                    refs INTEGER NOT NULL DEFAULT 0,
+                    created REAL NOT NULL
+                )
+            """)
+            await db.execute("INSERT INTO snapshots VALUES ('a.jpg', 1, 0)")
+            await async_create_table(db)
+            await db.commit()
+            async with db.execute("SELECT name, refs, hash FROM snapshots") as cursor:
+                assert await cursor.fetchall() == [("a.jpg", 1, None)]
+
+
+class TestThumbnails:
+    @pytest.fixture
+    def root(self, tmp_path):
+        root = tmp_path / "snapshots"
+        (root / "2026/01/02").mkdir(parents=True)
+        Image.new("RGB", (1920, 1080), "red").save(root / "2026/01/02/abc.webp")
+        return str(root)
+
+    def test_urls_by_width(self):
+        urls = thumbnail_urls(f"{SNAPSHOTS_PATH}/2026/01/02/a b.jpg")
+        assert urls == {
+            "160": "/api/llmvision/timeline/thumbnail/160/2026/01/02/a%20b.jpg",
+            "480": "/api/llmvision/timeline/thumbnail/480/2026/01/02/a%20b.jpg",
+        }
+        assert thumbnail_urls("/config/www/a.jpg") is None
+        assert thumbnail_urls(None) is None
+
+    def test_path_next_to_snapshots_folder(self):
+        assert thumbnail_path(SNAPSHOTS_PATH, "2026/01/02/a.webp", 160) == (
+            "/media/llmvision/thumbnails/160/2026/01/02/a.jpg"
+        )
+
+    def test_generates_jpeg_of_each_width(self, root):
+        assert generate_thumbnails(root, "2026/01/02/abc.webp") == list(
+            THUMBNAIL_WIDTHS
+        )
+
+        for width in THUMBNAIL_WIDTHS:
+            path = thumbnail_path(root, "2026/01/02/abc.webp", width)
+            with Image.open(path) as image:
+                assert image.format == "JPEG"
+                assert image.size == (width, width * 1080 // 1920)
+        assert generate_thumbnails(root, "2026/01/02/abc.webp") == []
+
+    def test_unreadable_snapshot_gets_no_thumbnails(self, root, tmp_path):
+        (tmp_path / "snapshots" / "fake.jpg").write_bytes(b"fake")
+
+        assert generate_thumbnails(root, "fake.jpg") == []
+        assert generate_thumbnails(root, "missing.jpg") == []
+
+    def test_removed_with_snapshot(self, root):
+        generate_thumbnails(root, "2026/01/02/abc.webp")
+
+        assert _remove_files(root, ["2026/01/02/abc.webp"]) == ["2026/01/02/abc.webp"]
+        for width in THUMBNAIL_WIDTHS:
+            assert not os.path.exists(
+                thumbnail_path(root, "2026/01/02/abc.webp", width)
+            )
@@ -1,12 +1,15 @@
 """Unit tests for timeline.py module."""
 
+import asyncio
 import datetime
 import os
+import time
 import uuid
 from functools import partial
 from unittest.mock import AsyncMock, Mock
 
 import aiosqlite
+from PIL import Image
 import pytest
 
 from custom_components.llmvision.const import (
@@ -15,6 +18,7 @@ from custom_components.llmvision.const import (
 )
 from custom_components.llmvision.timeline import (
     DB_VERSION,
+    MAINTENANCE_DATA,
     Event,
     Timeline,
     _get_category_and_label,
@@ -65,6 +69,28 @@ async def _insert_rows(db_path: str, rows: list[tuple]) -> None:
         await db.commit()
 
 
+async def _add_snapshot(tl, tmp_path, name: str, age: float) -> tuple[str, object]:
+    """Write an indexed snapshot without references, returns its key_frame and file"""
+    media_path = tmp_path / "snapshots"
+    tl._media_path = str(media_path)
+    path = media_path / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"fake")
+    async with aiosqlite.connect(tl._db_path) as db:
+        await db.execute(
+            "INSERT INTO snapshots (name, refs, created) VALUES (?, 0, ?)",
+            (name, time.time() - age),
+        )
+        await db.commit()
+    return f"/media/llmvision/snapshots/{name}", path
+
+
+async def _snapshot_refs(db_path: str) -> dict[str, int]:
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute("SELECT name, refs FROM snapshots") as cursor:
+            return dict(await cursor.fetchall())
+
+
 async def _fetch_titles(db_path: str) -> list[str]:
     async with aiosqlite.connect(db_path) as db:
         async with db.execute("SELECT title FROM events ORDER BY title") as cursor:
@@ -612,6 +638,7 @@ class TestLoadEvents:
         assert result["title"] == "known event"
         assert result["camera_name"] == "cam1"
         assert "start" in result and "end" in result
+        assert result["thumbnails"] is None
 
     async def test_get_event_not_found_returns_none(self, build_timeline):
         tl = build_timeline()
@@ -926,9 +953,17 @@ class TestRetentionAndPurge:
                 _make_row("recent", age_days=0.1),
             ],
         )
-        await tl.load_events()
+        assert await tl._purge_expired_events() == 1
         assert await _fetch_titles(tl._db_path) == ["recent"]
 
+    async def test_reads_do_not_purge(self, build_timeline):
+        tl = build_timeline(retention=2)
+        await tl._initialize_db()
+        await _insert_rows(tl._db_path, [_make_row("expired", age_days=5)])
+        await tl.load_events()
+        await tl.get_events_json()
+        assert await _fetch_titles(tl._db_path) == ["expired"]
+
     async def test_zero_retention_disables_purge(self, build_timeline):
         tl = build_timeline(retention=0)
         await tl._initialize_db()
@@ -939,7 +974,7 @@ class TestRetentionAndPurge:
                 _make_row("recent", age_days=0.5),
             ],
         )
-        await tl.load_events()
+        assert await tl._purge_expired_events() == 0
         titles = await _fetch_titles(tl._db_path)
         assert "expired" in titles
         assert "recent" in titles
@@ -962,7 +997,7 @@ class TestRetentionAndPurge:
                 _make_row("new", age_days=0.1),
             ],
         )
-        await tl.load_events()
+        await tl._purge_expired_events()
         titles = await _fetch_titles(tl._db_path)
         assert "old" not in titles
         assert "new" in titles
@@ -979,12 +1014,98 @@ class TestRetentionAndPurge:
                 _make_row("fresh", age_days=0.1),
             ],
         )
-        await tl.load_events()
+        await tl._purge_expired_events()
         titles = await _fetch_titles(tl._db_path)
         assert "too_old" not in titles
         assert "borderline_recent" in titles
         assert "fresh" in titles
 
+    async def test_purge_deletes_in_batches(self, build_timeline, monkeypatch):
+        monkeypatch.setattr(
+            "custom_components.llmvision.timeline.PURGE_BATCH_SIZE", 2
+        )
+        tl = build_timeline(retention=1)
+        await tl._initialize_db()
+        await _insert_rows(
+            tl._db_path,
+            [_make_row(f"old {n}", age_days=2 + n) for n in range(5)]
+            + [_make_row("new", age_days=0.1)],
+        )
+        assert await tl._purge_expired_events() == 5
+        assert await _fetch_titles(tl._db_path) == ["new"]
+
+    async def test_purge_removes_key_frames(self, build_timeline, tmp_path):
+        tl = build_timeline(retention=1)
+        await tl._initialize_db()
+        expired_key_frame, expired = await _add_snapshot(
+            tl, tmp_path, "expired.jpg", age=0
+        )
+        recent_key_frame, recent = await _add_snapshot(
+            tl, tmp_path, "recent.jpg", age=0
+        )
+        outside = tmp_path / "outside.jpg"
+        outside.write_bytes(b"fake")
+        await _insert_rows(
+            tl._db_path,
+            [
+                _make_row("expired", age_days=5, key_frame=expired_key_frame),
+                _make_row("outside", age_days=5, key_frame=str(outside)),
+                _make_row("recent", age_days=0.1, key_frame=recent_key_frame),
+            ],
+        )
+        async with aiosqlite.connect(tl._db_path) as db:
+            await db.execute("UPDATE snapshots SET refs = 1")
+            await db.commit()
+
+        assert await tl._purge_expired_events() == 2
+        assert not expired.exists()
+        assert recent.exists()
+        # Files outside the snapshots folder are never deleted
+        assert outside.exists()
+        assert await _snapshot_refs(tl._db_path) == {"recent.jpg": 1}
+
+    def test_start_maintenance_schedules_purge_and_maintenance(
+        self, build_timeline, monkeypatch
+    ):
+        tl = build_timeline()
+        unsubscribe = [Mock(), Mock()]
+        track = Mock(side_effect=unsubscribe)
+        monkeypatch.setattr(
+            "custom_components.llmvision.timeline.async_track_time_change", track
+        )
+        tl.hass.async_create_background_task = Mock(
+            side_effect=lambda coro, name: coro.close()
+        )
+
+        stop = tl.start_maintenance()
+
+        purge, maintenance = (c.kwargs for c in track.call_args_list)
+        assert "hour" not in purge
+        assert 0 <= purge["minute"] <= 59
+        assert maintenance == {"hour": 3, "minute": 0, "second": 0}
+        # One purge after the migration for events that expired while stopped
+        tl.hass.async_create_background_task.assert_called_once()
+        assert tl.hass.async_create_background_task.call_args.args[1] == (
+            "llmvision timeline startup purge"
+        )
+        stop()
+        for unsub in unsubscribe:
+            unsub.assert_called_once()
+
+
+    async def test_startup_purge_waits_for_migration(self, build_timeline):
+        tl = build_timeline(retention=1)
+        await tl._initialize_db()
+        await _insert_rows(tl._db_path, [_make_row("old", 3)])
+        tl._migrating = True
+
+        purge = asyncio.ensure_future(tl._purge_after_migration())
+        await asyncio.sleep(0.05)
+        assert not purge.done()
+
+        await tl._migrate()
+        assert await purge == 1
+        assert await _fetch_titles(tl._db_path) == []
 
 # ===========================================================================
 # _cleanup (orphaned snapshot removal)
@@ -992,17 +1113,12 @@ class TestRetentionAndPurge:
 
 
 class TestCleanup:
-    """Tests for the _cleanup orphan-removal routine."""
+    """Tests for the snapshot index and the _cleanup orphan-removal routine."""
 
     async def test_cleanup_skipped_during_migration(self, build_timeline, tmp_path):
         tl = build_timeline()
         await tl._initialize_db()
-        media_path = tmp_path / "snapshots"
-        media_path.mkdir()
-        tl._media_path = str(media_path)
-
-        orphan = media_path / "orphan.jpg"
-        orphan.write_bytes(b"fake")
+        _, orphan = await _add_snapshot(tl, tmp_path, "orphan.jpg", age=7200)
         tl._migrating = True
         await tl._cleanup()
 
@@ -1013,74 +1129,48 @@ class TestCleanup:
     ):
         tl = build_timeline()
         await tl._initialize_db()
-        media_path = tmp_path / "snapshots"
-        media_path.mkdir()
-        tl._media_path = str(media_path)
-
-        orphan = media_path / "orphan.jpg"
-        orphan.write_bytes(b"fake")
-        old_ts = datetime.datetime.now().timestamp() - 100
-        os.utime(str(orphan), (old_ts, old_ts))
+        _, orphan = await _add_snapshot(
+            tl, tmp_path, "2026/01/02/orphan.jpg", age=7200
+        )
 
         tl._migrating = False
         await tl._cleanup()
 
         assert not orphan.exists()
+        assert await _snapshot_refs(tl._db_path) == {}
 
     async def test_cleanup_protects_linked_images(self, build_timeline, tmp_path):
         tl = build_timeline()
         await tl._initialize_db()
-        media_path = tmp_path / "snapshots"
-        media_path.mkdir()
-        tl._media_path = str(media_path)
-
-        linked = media_path / "linked.jpg"
-        linked.write_bytes(b"fake")
-        old_ts = datetime.datetime.now().timestamp() - 100
-        os.utime(str(linked), (old_ts, old_ts))
-
+        key_frame, linked = await _add_snapshot(tl, tmp_path, "linked.jpg", age=7200)
         now = dt_util.utcnow()
-        async with aiosqlite.connect(tl._db_path) as db:
-            await db.execute(
-                """INSERT INTO events
-                    (uid, title, start, end, description, key_frame, camera_name, category, label)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    str(uuid.uuid4()),
-                    "ev",
-                    now.isoformat(),
-                    (now + datetime.timedelta(minutes=1)).isoformat(),
-                    "",
-                    str(linked),
-                    "",
-                    "",
-                    "",
-                ),
-            )
-            await db.commit()
+        await tl.create_event(
+            start=now,
+            end=now + datetime.timedelta(minutes=1),
+            title="ev",
+            description="",
+            key_frame=key_frame,
+            camera_name="",
+        )
 
         tl._migrating = False
         await tl._cleanup()
         assert linked.exists()
+        assert await _snapshot_refs(tl._db_path) == {"linked.jpg": 1}
 
-    async def test_cleanup_protects_pending_key_frames(self, build_timeline, tmp_path):
+    async def test_cleanup_protects_new_files_within_grace_period(
+        self, build_timeline, tmp_path
+    ):
         tl = build_timeline()
         await tl._initialize_db()
-        media_path = tmp_path / "snapshots"
-        media_path.mkdir()
-        tl._media_path = str(media_path)
-
-        pending = media_path / "pending.jpg"
-        pending.write_bytes(b"fake")
-        old_ts = datetime.datetime.now().timestamp() - 100
-        os.utime(str(pending), (old_ts, old_ts))
+        # Written moments ago, its event is not created yet
+        _, fresh = await _add_snapshot(tl, tmp_path, "fresh.jpg", age=0)
 
-        tl._pending_key_frames.add("pending.jpg")
         tl._migrating = False
         await tl._cleanup()
-        assert pending.exists()
+        assert fresh.exists()
 
-    async def test_cleanup_protects_new_files_within_grace_period(
+    async def test_cleanup_leaves_unindexed_files_untouched(
         self, build_timeline, tmp_path
     ):
         tl = build_timeline()
@@ -1088,27 +1178,152 @@ class TestCleanup:
         media_path = tmp_path / "snapshots"
         media_path.mkdir()
         tl._media_path = str(media_path)
-
-        fresh = media_path / "fresh.jpg"
-        fresh.write_bytes(b"fake")  # mtime = right now → inside grace window
+        other = media_path / "other.jpg"
+        other.write_bytes(b"fake")
 
         tl._migrating = False
         await tl._cleanup()
-        assert fresh.exists()
+        assert other.exists()
 
-    async def test_cleanup_leaves_directories_untouched(self, build_timeline, tmp_path):
+    async def test_delete_event_keeps_shared_snapshot(self, build_timeline, tmp_path):
         tl = build_timeline()
         await tl._initialize_db()
-        media_path = tmp_path / "snapshots"
-        media_path.mkdir()
-        tl._media_path = str(media_path)
+        key_frame, shared = await _add_snapshot(tl, tmp_path, "shared.jpg", age=0)
+        now = dt_util.utcnow()
+        for title in ("first", "second"):
+            await tl.create_event(
+                start=now,
+                end=now + datetime.timedelta(minutes=1),
+                title=title,
+                description="",
+                key_frame=key_frame,
+                camera_name="",
+            )
+        first, second = (event.uid for event in tl.events)
 
-        subdir = media_path / "subdir"
-        subdir.mkdir()
+        assert await tl.delete_event(first) is True
+        assert shared.exists()
+        assert await _snapshot_refs(tl._db_path) == {"shared.jpg": 1}
 
-        tl._migrating = False
-        await tl._cleanup()
-        assert subdir.exists()
+        assert await tl.delete_event(second) is True
+        assert not shared.exists()
+        assert await _snapshot_refs(tl._db_path) == {}
+
+    async def test_update_event_moves_reference(self, build_timeline, tmp_path):
+        tl = build_timeline()
+        await tl._initialize_db()
+        old_key_frame, old = await _add_snapshot(tl, tmp_path, "old.jpg", age=0)
+        new_key_frame, new = await _add_snapshot(tl, tmp_path, "new.jpg", age=0)
+        now = dt_util.utcnow()
+        await tl.create_event(
+            start=now,
+            end=now + datetime.timedelta(minutes=1),
+            title="ev",
+            description="",
+            key_frame=old_key_frame,
+            camera_name="",
+        )
+
+        await tl.update_event(
+            uid=tl.events[0].uid,
+            start=now,
+            end=now + datetime.timedelta(minutes=1),
+            title="ev",
+            description="",
+            key_frame=new_key_frame,
+            camera_name="",
+            label="",
+        )
+
+        assert not old.exists()
+        assert new.exists()
+        assert await _snapshot_refs(tl._db_path) == {"new.jpg": 1}
+
+    async def test_create_event_generates_thumbnails(self, build_timeline, tmp_path):
+        tl = build_timeline()
+        await tl._initialize_db()
+        key_frame, path = await _add_snapshot(tl, tmp_path, "2026/01/02/a.jpg", age=0)
+        Image.new("RGB", (640, 360)).save(path, format="JPEG")
+        now = dt_util.utcnow()
+        await tl.create_event(
+            start=now,
+            end=now + datetime.timedelta(minutes=1),
+            title="ev",
+            description="",
+            key_frame=key_frame,
+            camera_name="",
+        )
+
+        thumbnails = tmp_path / "thumbnails"
+        assert (thumbnails / "160/2026/01/02/a.jpg").exists()
+        assert (thumbnails / "480/2026/01/02/a.jpg").exists()
+        [event] = await tl.get_events_json(limit=None)
+        assert event["thumbnails"] == {
+            "160": "/api/llmvision/timeline/thumbnail/160/2026/01/02/a.jpg",
+            "480": "/api/llmvision/timeline/thumbnail/480/2026/01/02/a.jpg",
+        }
+
+        assert await tl.delete_event(event["uid"]) is True
+        assert not (thumbnails / "160/2026/01/02/a.jpg").exists()
+
+
+# ===========================================================================
+# async_maintain (vacuum, analyze, checkpoint)
+# ===========================================================================
+
+
+class TestMaintenance:
+    """Tests for the nightly database maintenance."""
+
+    async def test_maintain_reclaims_deleted_rows(self, build_timeline):
+        tl = build_timeline(retention=0)
+        await tl._initialize_db()
+        rows = [_make_row("x" * 2000, age_days=1) for _ in range(500)]
+        await _insert_rows(tl._db_path, rows)
+        async with aiosqlite.connect(tl._db_path) as db:
+            await db.execute("DELETE FROM events")
+            await db.commit()
+
+        report = await tl.async_maintain()
+
+        assert report["full_vacuum"] is False
+        assert report["free_pages"] > 0
+        assert report["reclaimed"] > 0
+        assert report["size_after"] < report["size_before"]
+        assert tl.hass.data[MAINTENANCE_DATA] is report
+        async with aiosqlite.connect(tl._db_path) as db:
+            async with db.execute("PRAGMA freelist_count") as cursor:
+                assert (await cursor.fetchone())[0] == 0
+            async with db.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            ) as cursor:
+                assert await cursor.fetchone() is not None
+
+    async def test_maintain_switches_existing_db_to_incremental_vacuum(
+        self, build_timeline
+    ):
+        tl = build_timeline()
+        # Database created before auto_vacuum was enabled
+        async with aiosqlite.connect(tl._db_path) as db:
+            await db.execute("CREATE TABLE legacy (id INTEGER)")
+            await db.commit()
+        await tl._initialize_db()
+
+        report = await tl.async_maintain()
+
+        assert report["full_vacuum"] is True
+        async with aiosqlite.connect(tl._db_path) as db:
+            async with db.execute("PRAGMA auto_vacuum") as cursor:
+                assert (await cursor.fetchone())[0] == 2
+        assert (await tl.async_maintain())["full_vacuum"] is False
+
+    async def test_maintain_skipped_during_migration(self, build_timeline):
+        tl = build_timeline()
+        await tl._initialize_db()
+        tl._migrating = True
+
+        assert await tl.async_maintain() is None
+        assert MAINTENANCE_DATA not in tl.hass.data
 
 
 # ===========================================================================
@@ -1189,6 +1404,39 @@ class TestMigration:
         assert ev.label == "car"
         assert ev.category == "vehicle"
 
+    async def test_migrate_indexes_existing_snapshots(self, build_timeline, tmp_path):
+        tl = build_timeline()
+        await tl._initialize_db()
+        media_path = tmp_path / "snapshots"
+        media_path.mkdir()
+        tl._media_path = str(media_path)
+        for name in ("linked.jpg", "orphan.jpg"):
+            (media_path / name).write_bytes(b"fake")
+        await _insert_rows(
+            tl._db_path,
+            [
+                _make_row("ev", 0.1, key_frame="/media/llmvision/snapshots/linked.jpg"),
+                # Path as rewritten by the v4.1 migration
+                _make_row(
+                    "ev", 0.1, key_frame="/media/local/llmvision/snapshots/linked.jpg"
+                ),
+            ],
+        )
+        async with aiosqlite.connect(tl._db_path) as db:
+            await db.execute("DROP TABLE snapshots")
+            await db.commit()
+        await tl._set_db_version(4)
+        tl._cleanup = AsyncMock()
+
+        tl._migrating = True
+        await tl._migrate()
+
+        assert await _snapshot_refs(tl._db_path) == {
+            "linked.jpg": 2,
+            "orphan.jpg": 0,
+        }
+        assert await tl._get_db_version() == DB_VERSION
+
     async def test_migrate_triggers_cleanup_when_version_is_current(
         self, build_timeline
     ):
@@ -0,0 +1,93 @@
+"""Unit tests for tracing.py module."""
+
+import asyncio
+from unittest.mock import Mock
+import pytest
+from custom_components.llmvision.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.llmvision.tracing import (
+    MAX_TRACES,
+    TraceRegistry,
+    add_span,
+    annotate,
+    span,
+    traced,
+)
+
+
+@traced("resize")
+async def resize():
+    annotate(width=640)
+
+
+def test_spans_are_ignored_outside_a_trace():
+    """Test stages can be timed without a trace being recorded."""
+    with span("fetch") as current:
+        annotate(camera="camera.front")
+        add_span("ffmpeg", 1.0)
+
+    assert current is None
+
+
+@pytest.mark.anyio
+async def test_trace_records_span_tree(mock_hass):
+    """Test nested and concurrent stages end up in the trace of the call."""
+    registry = TraceRegistry.get(mock_hass)
+
+    with registry.trace("image_analyzer", provider="entry1") as root:
+        with span("media"):
+            await asyncio.gather(resize(), resize())
+            add_span("ffmpeg", 0.5, frames=3)
+        with span("request"):
+            annotate(input_tokens=10)
+
+    timings = root.as_dict()
+    assert timings["name"] == "image_analyzer"
+    assert timings["attributes"] == {"provider": "entry1"}
+    media, request = timings["children"]
+    assert [child["name"] for child in media["children"]] == [
+        "resize",
+        "resize",
+        "ffmpeg",
+    ]
+    assert media["children"][0]["attributes"] == {"width": 640}
+    assert media["children"][2]["duration_ms"] == 500.0
+    assert request["attributes"] == {"input_tokens": 10}
+    assert registry.traces()[0]["children"] == timings["children"]
+    assert "timestamp" in registry.traces()[0]
+
+
+def test_trace_buffer_keeps_recent_traces_and_errors(mock_hass):
+    """Test only the most recent traces are kept, including failed calls."""
+    registry = TraceRegistry.get(mock_hass)
+    for _ in range(MAX_TRACES):
+        with registry.trace("image_analyzer"):
+            pass
+    with pytest.raises(ValueError):
+        with registry.trace("video_analyzer"):
+            raise ValueError("no frames")
+
+    traces = registry.traces()
+    assert len(traces) == MAX_TRACES
+    assert traces[-1]["name"] == "video_analyzer"
+    assert traces[-1]["attributes"] == {"error": "ValueError"}
+
+
+@pytest.mark.anyio
+async def test_diagnostics_filter_traces_by_provider(mock_hass):
+    """Test provider entries only list the calls they took part in."""
+    registry = TraceRegistry.get(mock_hass)
+    with registry.trace("image_analyzer", provider="entry1"):
+        with span("vision_request", provider="entry2"):
+            pass
+    with registry.trace("image_analyzer", provider="entry1"):
+        pass
+
+    settings = Mock(entry_id="settings", data={"provider": "Settings"})
+    fallback = Mock(entry_id="entry2", data={"provider": "OpenAI"})
+
+    diagnostics = await async_get_config_entry_diagnostics(mock_hass, settings)
+    assert len(diagnostics["traces"]) == 2
+    diagnostics = await async_get_config_entry_diagnostics(mock_hass, fallback)
+    assert len(diagnostics["traces"]) == 1
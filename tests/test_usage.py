@@ -0,0 +1,81 @@
+"""Unit tests for usage.py module."""
+
+import pytest
+from custom_components.llmvision.const import DOMAIN
+from custom_components.llmvision.usage import (
+    UsageRegistry,
+    parse_cost_table,
+    summarize,
+)
+
+
+@pytest.fixture
+def usage_hass(mock_hass):
+    """Set up mock_hass with a Settings entry holding the given cost table."""
+
+    def _with_cost_table(cost_table=""):
+        settings = {"provider": "Settings", "cost_table": cost_table}
+        mock_hass.data[DOMAIN] = {"settings": settings}
+        return mock_hass
+
+    return _with_cost_table
+
+
+def test_parse_cost_table():
+    """Test prices are parsed per model and invalid lines are skipped."""
+    table = parse_cost_table(
+        "gpt-4o-mini: 0.15, 0.6, 0.075\ngemma3:4b: 0, 0\nbroken line\nx: a, b"
+    )
+
+    assert table == {
+        "gpt-4o-mini": (0.15, 0.6, 0.075),
+        "gemma3:4b": (0.0, 0.0, 0.0),
+    }
+
+
+def test_cost_uses_cached_price_and_prefix_match(usage_hass):
+    """Test cached input is charged at its own price and names match by prefix."""
+    registry = UsageRegistry.get(usage_hass("gpt-4o: 2.5, 10, 1.25\ngpt: 1, 1"))
+    usage = {
+        "input_tokens": 1_000_000,
+        "output_tokens": 100_000,
+        "cached_tokens": 400_000,
+    }
+
+    # 600k uncached and 400k cached input tokens plus 100k output tokens
+    assert registry.cost("gpt-4o-2024-08-06", usage) == 1.5 + 0.5 + 1.0
+    assert registry.cost("gpt-3.5", {"input_tokens": 1_000_000}) == 1.0
+    assert registry.cost("claude-haiku-4-5", usage) is None
+
+
+def test_record_counts_per_entry_and_model(usage_hass):
+    """Test usage is summed per provider entry and per model."""
+    registry = UsageRegistry.get(usage_hass("m1: 1, 2"))
+    cost = registry.record("entry1", "m1", {"input_tokens": 10, "output_tokens": 5})
+    registry.record("entry1", "m2", {"input_tokens": 1, "server_time": 0.25})
+
+    assert cost == (10 * 1 + 5 * 2) / 1_000_000
+    counters = registry.get_counters("entry1").as_dict()
+    assert counters["requests"] == 2
+    assert counters["input_tokens"] == 11
+    assert counters["server_time"] == 0.25
+    assert counters["cost"] == round(cost, 6)
+    assert set(registry.get_models("entry1")) == {"m1", "m2"}
+
+    registry.remove("entry1")
+    assert registry.get_models("entry1") == {}
+
+
+def test_summarize_request_usage():
+    """Test the usage of all requests of a call is summed up."""
+    result = summarize(
+        [
+            {"input_tokens": 10, "output_tokens": 2, "cost": None},
+            {"input_tokens": 5, "cached_tokens": 5, "cost": 0.5},
+        ]
+    )
+
+    assert result["requests"] == 2
+    assert result["input_tokens"] == 15
+    assert result["cached_tokens"] == 5
+    assert result["cost"] == 0.5
@@ -0,0 +1,86 @@
+"""Unit tests for warmup.py module."""
+
+from datetime import datetime
+import pytest
+from custom_components.llmvision.providers import Ollama
+from custom_components.llmvision.scheduler import RequestContext, request_context
+from custom_components.llmvision.warmup import (
+    OllamaWarmer,
+    WarmupRegistry,
+    WarmupStats,
+)
+
+
+def make_warmer(hass, **config):
+    config = {"ip_address": "localhost", "port": 11434, **config}
+    return OllamaWarmer(hass, "entry1", config)
+
+
+class TestOllamaWarmer:
+    def test_endpoint_and_defaults(self, mock_hass):
+        """Test the warmer targets the generate endpoint of the entry."""
+        warmer = make_warmer(mock_hass, https=True, default_model="llava")
+
+        assert warmer.url == "https://localhost:11434/api/generate"
+        assert warmer.model == "llava"
+        assert warmer.keep_alive == "5m"
+        assert warmer.interval == 4.0
+
+    def test_in_window(self, mock_hass):
+        """Test warm-ups are limited to the configured hours."""
+        always = make_warmer(mock_hass)
+        day = make_warmer(mock_hass, warmup_start="08:00:00", warmup_end="20:00:00")
+        night = make_warmer(mock_hass, warmup_start="22:00:00", warmup_end="06:00:00")
+
+        noon = datetime(2024, 1, 1, 12, 0)
+        midnight = datetime(2024, 1, 1, 0, 30)
+        assert always.in_window(noon) and always.in_window(midnight)
+        assert day.in_window(noon)
+        assert not day.in_window(midnight)
+        assert not day.in_window(datetime(2024, 1, 1, 20, 0))
+        assert night.in_window(midnight)
+        assert night.in_window(datetime(2024, 1, 1, 23, 0))
+        assert not night.in_window(noon)
+
+
+class TestWarmupStats:
+    def test_requests_are_split_by_load_duration(self):
+        """Test requests that loaded the model count as cold."""
+        stats = WarmupStats()
+        stats.record_request(12.0, 9.5)
+        stats.record_request(2.0, 0.01)
+        stats.record_request(3.0, 0.0)
+
+        result = stats.as_dict()
+        assert result["cold_requests"] == 1
+        assert result["warm_requests"] == 2
+        assert result["cold_latency_p50"] == 12.0
+        assert result["warm_latency_p50"] == 3.0
+        assert result["last_warmup_load_duration"] is None
+
+
+class TestOllamaLoadDuration:
+    @pytest.mark.anyio
+    async def test_response_durations_are_recorded(self, mock_hass):
+        """Test Ollama responses report their load duration per entry."""
+        ollama = Ollama(
+            mock_hass,
+            api_key="",
+            model="gemma3:4b",
+            endpoint={"ip_address": "localhost", "port": 11434, "https": False},
+        )
+        response = {"load_duration": 4_000_000_000, "total_duration": 6_000_000_000}
+
+        # Without a request context nothing is recorded
+        ollama._record_load_duration(response)
+        stats = WarmupRegistry.get(mock_hass).get_stats("entry1")
+        assert stats.as_dict()["cold_requests"] == 0
+
+        token = request_context.set(RequestContext(entry_id="entry1"))
+        try:
+            ollama._record_load_duration(response)
+        finally:
+            request_context.reset(token)
+
+        assert stats.as_dict()["cold_requests"] == 1
+        assert stats.as_dict()["cold_latency_p50"] == 6.0